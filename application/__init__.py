@@ -1,6 +1,16 @@
 from flask import Flask
 from config import config
 from application.extensions import db, ma, limiter, cache, jwt, migrate
+from application.cache_invalidation import init_cache_invalidation
+from application.prerequisites import init_prerequisite_guard
+from application.commands import register_commands
+from application.passwords import password_hasher
+from application.revocation import token_revocation_list
+from application.json_provider import init_json_provider
+from application.compression import compressor
+from application.db_pool import init_engine_options, init_pool_monitor
+from application.db_routing import init_replica_bind, init_replica_routing
+from application.metrics import request_metrics
 from flasgger import Swagger
 
 
@@ -21,8 +31,21 @@ def create_app(config_name='default'):
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
     
-    # Initialize extensions with app
+    # Encode responses with orjson when it is installed (application/json_provider.py)
+    init_json_provider(app)
+    
+    # Initialize extensions with app (pool sizing from the DB_POOL_* settings)
+    init_engine_options(app)
+    init_replica_bind(app)
     db.init_app(app)
+    init_pool_monitor(app, db)
+    
+    # Per-endpoint latency, SQL and serialization metrics for GET /metrics (registered
+    # first, so its timing wraps the other hooks and it sees the compressed body size)
+    request_metrics.init_app(app)
+    
+    # GET requests read from the replica (REPLICA_DATABASE_URL), writes go to the primary
+    init_replica_routing(app, db)
     ma.init_app(app)
     
     # Configure rate limiter based on configuration
@@ -31,8 +54,19 @@ def create_app(config_name='default'):
     
     cache.init_app(app)
     jwt.init_app(app)
+    password_hasher.init_app(app)
+    token_revocation_list.init_app(app)
     migrate.init_app(app, db)
     
+    # gzip/brotli response compression negotiated from Accept-Encoding
+    compressor.init_app(app)
+    
+    # Bump versioned cache keys when the rows behind cached read models change
+    init_cache_invalidation()
+    
+    # Refuse commits that would store a cycle of service prerequisites
+    init_prerequisite_guard()
+    
     # Initialize Swagger
     swagger_config = {
         "headers": [],
@@ -80,16 +114,28 @@ def create_app(config_name='default'):
     from application.blueprints.service_ticket import service_ticket_bp
     from application.blueprints.mechanic import mechanic_bp
     from application.blueprints.inventory import inventory_bp
+    from application.blueprints.vehicle import vehicle_bp
+    from application.blueprints.deletion_job import deletion_job_bp
+    from application.blueprints.catalog import catalog_bp
+    from application.blueprints.internal import internal_bp, metrics_bp
     
     app.register_blueprint(customer_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(service_ticket_bp)
     app.register_blueprint(mechanic_bp)
     app.register_blueprint(inventory_bp)
+    app.register_blueprint(vehicle_bp)
+    app.register_blueprint(deletion_job_bp)
+    app.register_blueprint(catalog_bp)
+    app.register_blueprint(internal_bp)
+    app.register_blueprint(metrics_bp)
     
     # Register error handlers for JSON responses
     register_error_handlers(app)
     
+    # Register CLI commands (flask vin backfill, ...)
+    register_commands(app)
+    
     return app
 
 
@@ -112,6 +158,7 @@ def register_error_handlers(app):
         DataError, DatabaseError
     )
     from flask_jwt_extended import get_jwt_identity
+    from application.passwords import PasswordHashingBusy
     import logging
     import traceback
     import uuid
@@ -277,6 +324,17 @@ def register_error_handlers(app):
             details
         )
     
+    @app.errorhandler(PasswordHashingBusy)
+    def handle_password_hashing_busy(error):
+        """Handle a saturated password hashing pool (503, keeping the Retry-After header)"""
+        error_id = str(uuid.uuid4())
+        log_error(error_id, "Service Unavailable", error, 503)
+        
+        response, status_code = create_error_response("Service Unavailable", error.description, error_id, 503)
+        response.headers.update(error.get_headers())
+        response.headers['Content-Type'] = 'application/json'
+        return response, status_code
+    
     @app.errorhandler(HTTPException)
     def handle_http_exception(error):
         """Handle all other HTTP exceptions"""
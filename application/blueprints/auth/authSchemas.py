@@ -25,6 +25,11 @@ class LoginSchema(ma.Schema):
     email = fields.Email(required=True)
     password = fields.String(required=True, load_only=True)
 
+class LogoutSchema(ma.Schema):
+    """Schema for logout (the refresh token to revoke along with the presented token)"""
+    refresh_token = fields.String(required=False, load_only=True)
+
 # Create schema instances
 register_schema = RegisterSchema()
 login_schema = LoginSchema()
+logout_schema = LogoutSchema()
@@ -2,13 +2,17 @@ from typing import Any, Dict, cast
 from flask import request, jsonify
 from marshmallow import ValidationError
 from sqlalchemy import select
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from jwt.exceptions import PyJWTError
+from flask_jwt_extended import jwt_required, get_jwt, decode_token
 from flasgger import swag_from
 from application.blueprints.auth import auth_bp
-from application.blueprints.auth.authSchemas import register_schema, login_schema
+from application.blueprints.auth.authSchemas import register_schema, login_schema, logout_schema
 from application.blueprints.customer.customerSchemas import customer_schema
 from application.models import Customer
 from application.extensions import db, limiter
+from application.counters import customer_counter
+from application.identity import create_customer_token, create_customer_refresh_token, current_identity
+from application.revocation import token_revocation_list
 
 
 # REGISTER - POST /auth/register
@@ -22,7 +26,7 @@ def register():
     tags:
       - Authentication
     summary: Register a new customer
-    description: Creates a new customer account with hashed password and returns JWT access token
+    description: Creates a new customer account with hashed password and returns JWT access and refresh tokens
     parameters:
       - in: body
         name: body
@@ -78,6 +82,9 @@ def register():
             access_token:
               type: string
               example: eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9...
+            refresh_token:
+              type: string
+              example: eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9...
             customer:
               type: object
               properties:
@@ -116,6 +123,8 @@ def register():
             error:
               type: string
               example: Email already registered
+      503:
+        description: Password hashing pool saturated - retry after the Retry-After delay
     """
     # Check if request has JSON data
     if not request.json:
@@ -142,19 +151,23 @@ def register():
     
     db.session.add(new_customer)
     db.session.commit()
+    customer_counter.adjust(1)
     
-    # Create JWT access token (identity must be a string)
-    access_token = create_access_token(identity=str(new_customer.customer_id))
+    # Create JWT access and refresh tokens (identity must be a string, plus the token version claim)
+    access_token = create_customer_token(new_customer)
+    refresh_token = create_customer_refresh_token(new_customer)
     
     return jsonify({
         "message": "Customer registered successfully",
         "access_token": access_token,
+        "refresh_token": refresh_token,
         "customer": customer_schema.dump(new_customer)
     }), 201
 
 
 # LOGIN - POST /auth/login
 # Rate limiting applied: Prevents brute force attacks
+# Password checks run in the hashing pool (application/passwords.py); 503 when it is saturated
 @auth_bp.route("/login", methods=['POST'])
 @limiter.limit("5 per minute")
 def login():
@@ -164,7 +177,7 @@ def login():
     tags:
       - Authentication
     summary: Login to get access token
-    description: Authenticate with email and password to receive a JWT access token
+    description: Authenticate with email and password to receive a JWT access token and a refresh token
     parameters:
       - in: body
         name: body
@@ -196,6 +209,9 @@ def login():
             access_token:
               type: string
               example: eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9...
+            refresh_token:
+              type: string
+              example: eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9...
             customer:
               type: object
               properties:
@@ -224,6 +240,8 @@ def login():
               example: Invalid email or password
       400:
         description: Bad request - validation error
+      503:
+        description: Password hashing pool saturated - retry after the Retry-After delay
     """
     # Check if request has JSON data
     if not request.json:
@@ -243,16 +261,137 @@ def login():
     if not customer or not customer.check_password(login_data['password']):
         return jsonify({"error": "Invalid email or password"}), 401
     
-    # Create JWT access token (identity must be a string)
-    access_token = create_access_token(identity=str(customer.customer_id))
+    # Upgrade hashes made with older cost parameters while the plain-text password is at hand
+    if customer.password_needs_rehash():
+        customer.set_password(login_data['password'])
+        db.session.commit()
+    
+    # Create JWT access and refresh tokens (identity must be a string, plus the token version claim)
+    access_token = create_customer_token(customer)
+    refresh_token = create_customer_refresh_token(customer)
     
     return jsonify({
         "message": "Login successful",
         "access_token": access_token,
+        "refresh_token": refresh_token,
         "customer": customer_schema.dump(customer)
     }), 200
 
 
+# REFRESH - POST /auth/refresh
+# Refresh token required: Issues a new access token without another password check
+@auth_bp.route("/refresh", methods=['POST'])
+@limiter.limit("30 per minute")
+@jwt_required(refresh=True)
+def refresh():
+    """
+    Exchange a refresh token for a new access token
+    ---
+    tags:
+      - Authentication
+    summary: Refresh access token
+    description: Issues a new access token for the customer identified by the refresh token (send the refresh token as the Bearer token). Avoids the password-hashing login path when the access token expires.
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: New access token issued
+        schema:
+          type: object
+          properties:
+            access_token:
+              type: string
+              example: eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9...
+      401:
+        description: Unauthorized - missing, expired, revoked or non-refresh token
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: Token is no longer valid
+    """
+    # Resolve through the identity cache: also rejects tokens from before a token version bump
+    identity = current_identity()
+    
+    if not identity:
+        return jsonify({"error": "Token is no longer valid"}), 401
+    
+    # CurrentCustomer carries the customer_id and token_version the token is built from
+    access_token = create_customer_token(identity)
+    
+    return jsonify({"access_token": access_token}), 200
+
+
+# LOGOUT - POST /auth/logout
+# JWT required: Revokes the presented token (access or refresh) and, optionally, the client's refresh token
+@auth_bp.route("/logout", methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Revoke the current token
+    ---
+    tags:
+      - Authentication
+    summary: Logout
+    description: Revokes the presented access or refresh token. Send the refresh token in the body to revoke it in the same call.
+    security:
+      - Bearer: []
+    parameters:
+      - in: body
+        name: body
+        description: Refresh token to revoke along with the presented token
+        required: false
+        schema:
+          type: object
+          properties:
+            refresh_token:
+              type: string
+              example: eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9...
+    responses:
+      200:
+        description: Token(s) revoked
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Successfully logged out
+      400:
+        description: Bad request - invalid refresh token, or one issued to another customer
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: Invalid refresh token
+      401:
+        description: Unauthorized - missing, invalid or already revoked JWT token
+    """
+    claims = get_jwt()
+    payloads = [claims]
+    
+    body = request.get_json(silent=True) or {}
+    try:
+        logout_data = cast(Dict[str, Any], logout_schema.load(body))
+    except ValidationError as e:
+        return jsonify(e.messages), 400
+    
+    if logout_data.get('refresh_token'):
+        try:
+            refresh_claims = decode_token(logout_data['refresh_token'], allow_expired=True)
+        except PyJWTError:
+            return jsonify({"error": "Invalid refresh token"}), 400
+        if refresh_claims.get('type') != 'refresh' or refresh_claims.get('sub') != claims['sub']:
+            return jsonify({"error": "Invalid refresh token"}), 400
+        payloads.append(refresh_claims)
+    
+    for payload in payloads:
+        token_revocation_list.revoke(payload)
+    
+    return jsonify({"message": "Successfully logged out"}), 200
+
+
 # GET CURRENT USER - GET /auth/me
 # JWT required: Returns the currently authenticated user's information
 @auth_bp.route("/me", methods=['GET'])
@@ -299,13 +438,10 @@ def get_current_user():
       401:
         description: Unauthorized - missing or invalid JWT token
     """
-    # Get customer ID from JWT token (convert from string back to int)
-    current_customer_id = int(get_jwt_identity())
-    
-    # Fetch customer from database
-    customer = db.session.get(Customer, current_customer_id)
+    # Resolve the token through the identity cache (no database round trip for hot users)
+    identity = current_identity()
     
-    if not customer:
+    if not identity:
         return jsonify({"error": "Customer not found"}), 404
     
-    return customer_schema.jsonify(customer), 200
+    return jsonify(identity.profile), 200
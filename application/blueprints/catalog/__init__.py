@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+catalog_bp = Blueprint('catalog', __name__, url_prefix='/catalog')
+
+from application.blueprints.catalog import routes
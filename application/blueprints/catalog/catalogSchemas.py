@@ -0,0 +1,32 @@
+from marshmallow import fields, validate
+from application.extensions import ma
+from application.models import Service, ServicePackage, ServicePrerequisite
+
+
+class ServiceSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = Service
+
+
+class ServicePackageSchema(ma.SQLAlchemyAutoSchema):
+    # Numeric(5, 2) columns load as Decimal, which the JSON encoder can't write
+    package_discount_percentage = fields.Float()
+
+    class Meta:
+        model = ServicePackage
+
+
+class ServicePrerequisiteSchema(ma.SQLAlchemyAutoSchema):
+    prerequisite_service_id = fields.Integer(required=True)
+    recommended_gap_hours = fields.Integer(allow_none=True, validate=validate.Range(min=0))
+
+    class Meta:
+        model = ServicePrerequisite
+        include_fk = True
+        dump_only = ('service_id',)
+
+
+service_schema = ServiceSchema()
+services_schema = ServiceSchema(many=True)
+service_package_schema = ServicePackageSchema()
+service_prerequisite_schema = ServicePrerequisiteSchema()
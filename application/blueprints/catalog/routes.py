@@ -0,0 +1,344 @@
+from typing import Any, Dict, cast
+from flask import request, jsonify, Response
+from marshmallow import ValidationError
+from flask_jwt_extended import jwt_required
+from application.blueprints.catalog import catalog_bp
+from application.blueprints.catalog.catalogSchemas import service_prerequisite_schema
+from application.blueprints.catalog.snapshot import get_catalog_snapshot
+from application.models import Service, ServicePrerequisite
+from application.extensions import db
+from application.prerequisites import resolve_work_plan, PrerequisiteCycleError
+
+
+def _send(body):
+    """Serve a pre-serialized catalog body, or 304 if the client's ETag is current"""
+    response = Response(body.data, mimetype='application/json')
+    response.set_etag(body.etag)
+    # Shared and browser caches may keep the body but must revalidate (a cheap 304) before reuse
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response.make_conditional(request)
+
+
+# READ CATALOG - GET /catalog
+# Public: prices are the same for every client; served from the in-memory snapshot with an ETag
+@catalog_bp.route("", methods=['GET'])
+def get_catalog():
+    """
+    Get the full service catalog
+    ---
+    tags:
+      - Catalog
+    summary: Services and priced service packages
+    description: |
+      Every service with its base price, and every active package with its
+      services resolved and priced: per-item discounts, the package discount
+      and the final package price. Served from a precomputed snapshot that is
+      rebuilt only when catalog rows change. Send If-None-Match with the ETag
+      from the last response to get a 304 when nothing changed.
+    parameters:
+      - in: header
+        name: If-None-Match
+        type: string
+        required: false
+        description: ETag of the catalog the client already has
+    responses:
+      200:
+        description: Catalog retrieved successfully
+        headers:
+          ETag:
+            type: string
+            description: Changes whenever the catalog changes
+        schema:
+          type: object
+          properties:
+            services:
+              type: array
+              items:
+                type: object
+            packages:
+              type: array
+              items:
+                type: object
+      304:
+        description: The client's copy (If-None-Match) is current
+    """
+    return _send(get_catalog_snapshot().catalog)
+
+
+# READ SERVICES - GET /catalog/services
+@catalog_bp.route("/services", methods=['GET'])
+def get_catalog_services():
+    """
+    Get all services
+    ---
+    tags:
+      - Catalog
+    summary: Services with base prices
+    description: Every service with its base price and default labor minutes (ETag / If-None-Match supported)
+    responses:
+      200:
+        description: Services retrieved successfully
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              service_id:
+                type: integer
+                example: 1
+              name:
+                type: string
+                example: Oil Change
+              default_labor_minutes:
+                type: integer
+                example: 30
+              base_price_cents:
+                type: integer
+                example: 4999
+      304:
+        description: The client's copy (If-None-Match) is current
+    """
+    return _send(get_catalog_snapshot().services)
+
+
+# READ PACKAGES - GET /catalog/packages
+@catalog_bp.route("/packages", methods=['GET'])
+def get_catalog_packages():
+    """
+    Get all active service packages with prices
+    ---
+    tags:
+      - Catalog
+    summary: Priced service packages
+    description: |
+      Active packages with their services in sequence order. Each item carries
+      its list price (base price x quantity) and its price after the item
+      discount. The package's final_price_cents is the required items' price
+      less package_discount_percentage; optional items are not included in it.
+      ETag / If-None-Match supported.
+    responses:
+      200:
+        description: Packages retrieved successfully
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              package_id:
+                type: integer
+                example: 1
+              name:
+                type: string
+                example: 30k Mile Service
+              package_discount_percentage:
+                type: number
+                example: 10.0
+              items:
+                type: array
+                items:
+                  type: object
+              labor_minutes:
+                type: integer
+                example: 150
+              list_price_cents:
+                type: integer
+                example: 39996
+              items_price_cents:
+                type: integer
+                example: 37996
+              final_price_cents:
+                type: integer
+                example: 34196
+              savings_cents:
+                type: integer
+                example: 5800
+      304:
+        description: The client's copy (If-None-Match) is current
+    """
+    return _send(get_catalog_snapshot().packages)
+
+
+# READ PACKAGE - GET /catalog/packages/<package_id>
+@catalog_bp.route("/packages/<int:package_id>", methods=['GET'])
+def get_catalog_package(package_id):
+    """
+    Get one active service package with prices
+    ---
+    tags:
+      - Catalog
+    summary: One priced service package
+    description: Same shape as an entry of GET /catalog/packages (ETag / If-None-Match supported)
+    parameters:
+      - in: path
+        name: package_id
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Package retrieved successfully
+      304:
+        description: The client's copy (If-None-Match) is current
+      404:
+        description: Package not found or not active
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: Service package not found.
+    """
+    body = get_catalog_snapshot().package_bodies.get(package_id)
+    if body is None:
+        return jsonify({"error": "Service package not found."}), 404
+
+    return _send(body)
+
+
+# WORK PLAN - GET /catalog/work-plan?service_id=1&service_id=2
+# Public: resolves prerequisites from the in-memory graph (application/prerequisites.py)
+@catalog_bp.route("/work-plan", methods=['GET'])
+def get_work_plan():
+    """
+    Resolve the work plan for a set of services
+    ---
+    tags:
+      - Catalog
+    summary: Services to perform, prerequisites first
+    description: |
+      Expands the requested services with every required prerequisite,
+      transitively, and orders them so each service comes after the services
+      it depends on. Optional prerequisites that aren't in the plan are listed
+      under recommended.
+    parameters:
+      - in: query
+        name: service_id
+        type: array
+        items:
+          type: integer
+        collectionFormat: multi
+        required: true
+        description: Requested services (repeat the parameter)
+    responses:
+      200:
+        description: Work plan resolved
+        schema:
+          type: object
+          properties:
+            services:
+              type: array
+              items:
+                type: object
+                properties:
+                  service_id:
+                    type: integer
+                  name:
+                    type: string
+                  requested:
+                    type: boolean
+                  prerequisites:
+                    type: array
+                    items:
+                      type: object
+                  recommended:
+                    type: array
+                    items:
+                      type: integer
+            labor_minutes:
+              type: integer
+              example: 90
+            base_price_cents:
+              type: integer
+              example: 12999
+      400:
+        description: No services requested
+      404:
+        description: Unknown service
+    """
+    service_ids = request.args.getlist('service_id', type=int)
+    if not service_ids:
+        return jsonify({"error": "At least one service_id is required."}), 400
+    
+    try:
+        steps = resolve_work_plan(service_ids)
+    except KeyError as e:
+        return jsonify({"error": f"Service {e.args[0]} not found."}), 404
+    
+    return jsonify({
+        "services": list(steps),
+        "labor_minutes": sum(step['default_labor_minutes'] for step in steps),
+        "base_price_cents": sum(step['base_price_cents'] for step in steps)
+    }), 200
+
+
+# ADD PREREQUISITE - POST /catalog/services/<service_id>/prerequisites
+# JWT required: Rejects prerequisites that would make a service depend on itself
+@catalog_bp.route("/services/<int:service_id>/prerequisites", methods=['POST'])
+@jwt_required()
+def add_service_prerequisite(service_id):
+    """
+    Add a prerequisite to a service
+    ---
+    tags:
+      - Catalog
+    summary: Add a service prerequisite
+    description: Records that a service needs (or recommends) another service first. Cycles are rejected.
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: service_id
+        type: integer
+        required: true
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - prerequisite_service_id
+          properties:
+            prerequisite_service_id:
+              type: integer
+              example: 2
+            is_required:
+              type: boolean
+              example: true
+            recommended_gap_hours:
+              type: integer
+              example: 24
+            reason:
+              type: string
+              example: Alignment must follow suspension work
+    responses:
+      201:
+        description: Prerequisite added
+      400:
+        description: Validation error, duplicate prerequisite, or the prerequisite would create a cycle
+      404:
+        description: Service not found
+      401:
+        description: Unauthorized - missing or invalid JWT token
+    """
+    if not request.json:
+        return jsonify({"error": "No JSON data provided"}), 400
+    
+    try:
+        prerequisite_data = cast(Dict[str, Any], service_prerequisite_schema.load(request.json))
+    except ValidationError as e:
+        return jsonify(e.messages), 400
+    
+    if not db.session.get(Service, service_id) or not db.session.get(Service, prerequisite_data['prerequisite_service_id']):
+        return jsonify({"error": "Service not found."}), 404
+    
+    if db.session.get(ServicePrerequisite, (service_id, prerequisite_data['prerequisite_service_id'])):
+        return jsonify({"error": "Prerequisite already exists."}), 400
+    
+    prerequisite = ServicePrerequisite(service_id=service_id, **prerequisite_data)
+    db.session.add(prerequisite)
+    try:
+        db.session.commit()
+    except PrerequisiteCycleError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "cycle": e.service_ids}), 400
+    
+    return jsonify(service_prerequisite_schema.dump(prerequisite)), 201
@@ -0,0 +1,180 @@
+"""
+Service catalog read model
+
+The catalog (services, packages, package items) changes a few times a year but
+is read by every client that shows a price. It is built into a CatalogSnapshot
+once, with three queries, and served from process memory as pre-serialized
+JSON bytes:
+
+- services: every service with its base price and labor estimate
+- packages: active packages with their services resolved, each item priced
+  (base price x quantity, less the item's discount_percentage) and the package
+  priced (required items, less package_discount_percentage); optional items
+  are priced but not included in the package price
+- one body per package for GET /catalog/packages/<id>
+
+Every body carries a strong ETag (hash of the bytes), so clients that already
+have the current catalog get a 304 without a body.
+
+The snapshot records the catalog's cache version it was built from. Adding,
+changing or deleting a service, package or package item through the ORM bumps
+that version (see the @invalidates rule below), and the process that made the
+change rebuilds on its next request. The version lives in the per-process
+cache, so other workers, migrations and direct SQL edits don't bump it: every
+snapshot is also rebuilt once it is CATALOG_SNAPSHOT_MAX_AGE seconds old, which
+bounds how long those changes take to show. A rebuild of an unchanged catalog
+produces the same bytes and ETags, so clients keep getting 304s.
+"""
+import hashlib
+import json
+import threading
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from flask import current_app
+from sqlalchemy import select
+from application.extensions import db
+from application.models import Service, ServicePackage, ServicePackageItem
+from application.cache_invalidation import invalidates, on_bump, cache_version
+from application.db_routing import primary_reads
+from application.blueprints.catalog.catalogSchemas import services_schema, service_package_schema
+
+
+CATALOG_NAMESPACE = 'service_catalog'
+CATALOG_KEY = 'all'
+
+_HUNDRED = Decimal(100)
+
+
+class CatalogBody:
+    """One pre-serialized response body and its ETag"""
+    __slots__ = ('data', 'etag')
+
+    def __init__(self, payload):
+        self.data = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode()
+        self.etag = hashlib.sha256(self.data).hexdigest()[:32]
+
+
+class CatalogSnapshot:
+    """The whole catalog as immutable response bodies, built from one catalog version"""
+
+    def __init__(self, version, services, packages):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.catalog = CatalogBody({'services': services, 'packages': packages})
+        self.services = CatalogBody(services)
+        self.packages = CatalogBody(packages)
+        self.package_bodies = {package['package_id']: CatalogBody(package) for package in packages}
+        # Priced packages as dicts, for server-side consumers such as the quote builder (read-only)
+        self.packages_by_id = {package['package_id']: package for package in packages}
+
+
+_snapshot = None
+_build_lock = threading.Lock()
+
+
+def get_catalog_snapshot():
+    """Return the snapshot for the current catalog version, building it if the catalog changed or it expired"""
+    global _snapshot
+    version = cache_version(CATALOG_NAMESPACE, CATALOG_KEY)
+    max_age = current_app.config['CATALOG_SNAPSHOT_MAX_AGE']
+    snapshot = _snapshot
+    if _is_current(snapshot, version, max_age):
+        return snapshot
+
+    # One build per process per change, however many requests arrive while it runs
+    with _build_lock:
+        snapshot = _snapshot
+        if not _is_current(snapshot, version, max_age):
+            snapshot = build_catalog_snapshot(version)
+            _snapshot = snapshot
+    return snapshot
+
+
+def _is_current(snapshot, version, max_age):
+    return (snapshot is not None and snapshot.version == version
+            and time.monotonic() - snapshot.built_at < max_age)
+
+
+def _apply_discount(cents, percentage):
+    return cents * (_HUNDRED - Decimal(percentage or 0)) / _HUNDRED
+
+
+def _to_cents(value):
+    return int(Decimal(value).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+@primary_reads()  # Kept until the catalog version changes: never from a lagging replica
+def build_catalog_snapshot(version):
+    """Load the catalog (three queries) and price every package"""
+    services = db.session.execute(select(Service).order_by(Service.service_id)).scalars().all()
+    packages = db.session.execute(
+        select(ServicePackage).where(ServicePackage.is_active.is_(True)).order_by(ServicePackage.package_id)
+    ).scalars().all()
+    items = db.session.execute(
+        select(ServicePackageItem)
+        .join(ServicePackage, ServicePackageItem.package_id == ServicePackage.package_id)
+        .where(ServicePackage.is_active.is_(True))
+        .order_by(ServicePackageItem.package_id, ServicePackageItem.sequence_order, ServicePackageItem.service_id)
+    ).scalars().all()
+
+    services_by_id = {service.service_id: service for service in services}
+    items_by_package = {}
+    for item in items:
+        items_by_package.setdefault(item.package_id, []).append(item)
+
+    return CatalogSnapshot(
+        version,
+        services_schema.dump(services),
+        [_price_package(package, items_by_package.get(package.package_id, ()), services_by_id) for package in packages]
+    )
+
+
+def _price_package(package, items, services_by_id):
+    list_price = Decimal(0)
+    items_price = Decimal(0)
+    labor_minutes = 0
+    priced_items = []
+    for item in items:
+        service = services_by_id[item.service_id]
+        item_list_price = Decimal(service.base_price_cents) * item.quantity
+        item_price = _apply_discount(item_list_price, item.discount_percentage)
+        if not item.is_optional:
+            list_price += item_list_price
+            items_price += item_price
+            labor_minutes += service.default_labor_minutes * item.quantity
+        priced_items.append({
+            'service_id': service.service_id,
+            'name': service.name,
+            'sequence_order': item.sequence_order,
+            'quantity': item.quantity,
+            'default_labor_minutes': service.default_labor_minutes,
+            'is_optional': bool(item.is_optional),
+            'unit_price_cents': service.base_price_cents,
+            'discount_percentage': float(item.discount_percentage or 0),
+            'list_price_cents': _to_cents(item_list_price),
+            'price_cents': _to_cents(item_price)
+        })
+
+    final_price = _apply_discount(items_price, package.package_discount_percentage)
+    return {
+        **service_package_schema.dump(package),
+        'items': priced_items,
+        'labor_minutes': labor_minutes,
+        'list_price_cents': _to_cents(list_price),
+        'items_price_cents': _to_cents(items_price),
+        'final_price_cents': _to_cents(final_price),
+        'savings_cents': _to_cents(list_price) - _to_cents(final_price)
+    }
+
+
+# ===== CACHE INVALIDATION RULES =====
+
+@invalidates(Service, ServicePackage, ServicePackageItem)
+def _catalog_changed(session, row):
+    return [(CATALOG_NAMESPACE, CATALOG_KEY)]
+
+
+@on_bump(CATALOG_NAMESPACE)
+def _drop_snapshot(key):
+    global _snapshot
+    _snapshot = None
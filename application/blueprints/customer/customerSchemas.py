@@ -5,16 +5,22 @@ from application.models import Customer, Vehicle
 class CustomerSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Customer
-        exclude = ('password_hash',)  # Exclude password hash from serialization
+        # Exclude password hash, token version and the derived search columns from serialization
+        exclude = ('password_hash', 'token_version', 'phone_normalized', 'email_lower')
 
 
 class VehicleSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Vehicle
         include_fk = True  # Include foreign keys
+        # Decoded from the VIN by the server, never accepted from clients
+        dump_only = ('vin_wmi', 'vin_manufacturer', 'vin_model_year', 'vin_plant_code', 'vin_check_digit_valid')
 
 
 customer_schema = CustomerSchema()
 customers_schema = CustomerSchema(many=True)
 vehicle_schema = VehicleSchema()
 vehicles_schema = VehicleSchema(many=True)
+
+# Fleet onboarding validates many vehicles at once; ids are assigned by the database
+fleet_vehicles_schema = VehicleSchema(many=True, exclude=('vehicle_id', 'customer_id'))
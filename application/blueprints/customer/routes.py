@@ -1,12 +1,30 @@
+import re
 from typing import Any, Dict, cast
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from marshmallow import ValidationError
-from sqlalchemy import select
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, case, insert
+from flask_jwt_extended import jwt_required
 from application.blueprints.customer import customer_bp
-from application.blueprints.customer.customerSchemas import customer_schema, customers_schema, vehicle_schema, vehicles_schema
-from application.models import Customer, Vehicle
+from application.blueprints.customer.customerSchemas import customer_schema, customers_schema, vehicle_schema, vehicles_schema, fleet_vehicles_schema
+from application.blueprints.auth.authSchemas import register_schema
+from application.models import Customer, Vehicle, normalize_phone
+from application.vin_decoder import is_check_digit_valid, vin_columns
 from application.extensions import db, limiter
+from application.counters import customer_counter
+from application.identity import current_identity
+from application.blueprints.customer.summary import get_customer_summary
+from application.blueprints.deletion_job.deletionJobSchemas import deletion_job_schema
+from application.deletion import start_customer_deletion, JOB_COMPLETED, JOB_FAILED
+from application.schema_compiler import compiled
+from application.pagination import PaginationError, parse_keyset_args, wants_keyset, apply_keyset, keyset_page
+
+
+# Bulk onboarding limits
+MAX_FLEET_SIZE = 1000
+VIN_LOOKUP_CHUNK_SIZE = 500
+
+# Search text made only of digits and phone punctuation is treated as a phone number
+PHONE_QUERY_PATTERN = re.compile(r'[\d\s\-\(\)\+\.]+')
 
 
 # CREATE - POST /customers
@@ -22,7 +40,7 @@ def create_customer():
         return jsonify({"error": "No JSON data provided"}), 400
     
     try:
-        customer_data = cast(Dict[str, Any], customer_schema.load(request.json))
+        customer_data = cast(Dict[str, Any], compiled(customer_schema).load(request.json))
     except ValidationError as e:
         return jsonify(e.messages), 400
     
@@ -35,35 +53,202 @@ def create_customer():
     new_customer = Customer(**customer_data)
     db.session.add(new_customer)
     db.session.commit()
+    customer_counter.adjust(1)
     return jsonify(customer_schema.dump(new_customer)), 201
 
 
+# BULK FLEET ONBOARDING - POST /customers/fleet
+# JWT required: Staff onboard a fleet account (customer + all of its vehicles) in one call
+# Rate limiting applied: Bulk inserts are expensive, so they are limited to 10 per hour per IP
+# Cost is independent of fleet size:
+#   - Vehicles are validated in one VehicleSchema(many=True) pass
+#   - VIN uniqueness is checked with one IN query (chunked for very large fleets)
+#   - The customer and all vehicles are inserted in a single transaction
+@customer_bp.route("/fleet", methods=['POST'])
+@limiter.limit("10 per hour")
+@jwt_required()
+def onboard_fleet():
+    """
+    Create a customer account and its vehicles in one request.
+    
+    Request body:
+    {
+        "customer": {                  # Same fields as /auth/register
+            "first_name": "Acme", "last_name": "Logistics", "email": "fleet@acme.com",
+            "phone": "555-0100", "password": "..."
+        },
+        "vehicles": [                  # Up to 1000 vehicles
+            {"vin": "...", "make": "Ford", "model": "Transit", "year": 2022, "color": "White"},
+            ...
+        ]
+    }
+    
+    Query parameters:
+    - atomic: 'true' to reject the whole request if any vehicle is invalid
+              (default 'false': valid vehicles are created and invalid ones reported)
+    
+    Each rejected vehicle is reported in "errors" with its index in the request,
+    its VIN and the reasons (validation messages, duplicate VIN in the request,
+    or VIN already registered).
+    """
+    # Check if request has JSON data
+    if not request.json:
+        return jsonify({"error": "No JSON data provided"}), 400
+    
+    atomic = request.args.get('atomic', 'false').lower() == 'true'
+    customer_payload = request.json.get('customer')
+    vehicle_payload = request.json.get('vehicles')
+    
+    if not isinstance(customer_payload, dict):
+        return jsonify({"error": "customer object is required"}), 400
+    if not isinstance(vehicle_payload, list) or not vehicle_payload:
+        return jsonify({"error": "vehicles must be a non-empty list"}), 400
+    if len(vehicle_payload) > MAX_FLEET_SIZE:
+        return jsonify({"error": f"A fleet can contain at most {MAX_FLEET_SIZE} vehicles per request"}), 400
+    
+    try:
+        customer_data = cast(Dict[str, Any], register_schema.load(customer_payload))
+    except ValidationError as e:
+        return jsonify({"error": "Invalid customer", "customer_errors": e.messages}), 400
+    
+    # Check if email already exists
+    query = select(Customer.customer_id).where(Customer.email == customer_data['email'])
+    if db.session.execute(query).first():
+        return jsonify({"error": "Email already associated with an account."}), 400
+    
+    # Validate every vehicle in one pass; row errors are keyed by index
+    try:
+        loaded_vehicles = fleet_vehicles_schema.load(vehicle_payload)
+        row_errors = {}
+    except ValidationError as e:
+        loaded_vehicles = e.valid_data
+        row_errors = {index: messages for index, messages in cast(Dict[int, Any], e.messages).items()}
+    
+    # Reject VINs repeated within the request (first occurrence wins)
+    check_vins = requires_valid_vin()
+    seen_vins = {}
+    for index, vehicle_data in enumerate(loaded_vehicles):
+        vin = vehicle_data.get('vin')
+        if index in row_errors or vin is None:
+            continue
+        if check_vins and not is_check_digit_valid(vin):
+            row_errors[index] = {'vin': ['VIN check digit is invalid']}
+        elif vin in seen_vins:
+            row_errors[index] = {'vin': [f'Duplicate VIN in request (same as vehicle {seen_vins[vin]})']}
+        else:
+            seen_vins[vin] = index
+    
+    # One IN query (per chunk) for VINs that are already registered
+    existing_vins = find_existing_vins(list(seen_vins))
+    for vin in existing_vins:
+        row_errors[seen_vins[vin]] = {'vin': ['VIN already exists in the system']}
+    
+    errors = [
+        {
+            'index': index,
+            'vin': vehicle_payload[index].get('vin') if isinstance(vehicle_payload[index], dict) else None,
+            'errors': row_errors[index]
+        }
+        for index in sorted(row_errors)
+    ]
+    
+    if atomic and errors:
+        return jsonify({"error": "One or more vehicles are invalid; nothing was created", "errors": errors}), 400
+    
+    # Single transaction: customer first (for its id), then every vehicle in one executemany
+    password = customer_data.pop('password')
+    new_customer = Customer(**customer_data)
+    new_customer.set_password(password)
+    db.session.add(new_customer)
+    db.session.flush()
+    
+    # Bulk inserts bypass the model's @validates hook, so decode VINs here
+    vehicle_rows = [
+        {**vehicle_data, **vin_columns(vehicle_data['vin']), 'customer_id': new_customer.customer_id}
+        for index, vehicle_data in enumerate(loaded_vehicles)
+        if index not in row_errors
+    ]
+    if vehicle_rows:
+        db.session.execute(insert(Vehicle), vehicle_rows)
+    db.session.commit()
+    customer_counter.adjust(1)
+    
+    vehicles = db.session.execute(
+        select(Vehicle).where(Vehicle.customer_id == new_customer.customer_id).order_by(Vehicle.vehicle_id)
+    ).scalars().all()
+    
+    return jsonify({
+        "message": "Fleet onboarded successfully",
+        "customer": customer_schema.dump(new_customer),
+        "vehicles_created": len(vehicles),
+        "vehicles": vehicles_schema.dump(vehicles),
+        "errors": errors
+    }), 201
+
+
+def requires_valid_vin():
+    """Whether VIN check digits are enforced (VIN_REQUIRE_VALID_CHECK_DIGIT)"""
+    return current_app.config.get('VIN_REQUIRE_VALID_CHECK_DIGIT', False)
+
+
+def find_existing_vins(vins):
+    """Return the subset of vins already registered, using one IN query per chunk"""
+    existing = set()
+    for start in range(0, len(vins), VIN_LOOKUP_CHUNK_SIZE):
+        chunk = vins[start:start + VIN_LOOKUP_CHUNK_SIZE]
+        existing.update(db.session.execute(select(Vehicle.vin).where(Vehicle.vin.in_(chunk))).scalars())
+    return existing
+
+
 # READ ALL - GET /customers
 # JWT required: Only authenticated users can view customer list
-# Pagination applied: Returns results in manageable chunks using limit and offset
+# Two pagination modes are supported:
+#   - Page mode (default): page/per_page, backed by limit and offset
+#   - Cursor mode: limit/cursor, keyset pagination on customer_id (constant cost at any depth)
 # Query parameters:
 #   - page: Page number (default: 1)
 #   - per_page: Number of results per page (default: 10, max: 100)
+#   - limit: Page size in cursor mode (default: 20, max: 100)
+#   - cursor: next_cursor from the previous cursor-mode page
+#   - include_total: 'true'/'false' - include the (cached, approximate) customer total
 @customer_bp.route("", methods=['GET'])
 @jwt_required()
 def get_customers():
     """
     Get paginated list of customers.
     
-    This endpoint demonstrates efficient data retrieval with pagination:
+    Page mode (default) demonstrates classic pagination:
     1. limit: Controls how many results to return (page size)
     2. offset: Skips a certain number of results (for page navigation)
     
+    Cursor mode (send limit and/or cursor) uses keyset pagination instead:
+    WHERE customer_id > cursor ORDER BY customer_id LIMIT n, so page 5,000
+    costs the same index seek as page 1.
+    
+    total_customers is served from a cached counter that is adjusted on
+    register and delete, so it is approximate and never costs a COUNT(*) scan
+    on a warm cache. Page mode includes it by default (it drives total_pages);
+    cursor mode only includes it when include_total=true.
+    
     Query parameters:
     - page: Page number (default: 1)
     - per_page: Results per page (default: 10, max: 100)
+    - limit / cursor: Cursor mode page size and position
+    - include_total: Include total_customers (default: true in page mode, false in cursor mode)
     
     Example: /customers?page=2&per_page=20
     Returns the second page with 20 customers per page
+    
+    Example: /customers?limit=50&cursor=1200
+    Returns the 50 customers following customer_id 1200
     """
+    if wants_keyset(request.args):
+        return get_customers_by_cursor()
+    
     # Get pagination parameters from query string
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
+    include_total = request.args.get('include_total', 'true').lower() == 'true'
     
     # Validate pagination parameters
     if page < 1:
@@ -75,30 +260,145 @@ def get_customers():
     offset = (page - 1) * per_page
     
     # Build query with limit and offset for pagination
-    query = select(Customer).limit(per_page).offset(offset)
+    # One extra row tells us whether a next page exists without needing the total
+    query = select(Customer).order_by(Customer.customer_id).limit(per_page + 1).offset(offset)
     customers = db.session.execute(query).scalars().all()
+    has_next = len(customers) > per_page
     
-    # Get total count for pagination metadata
-    count_query = select(db.func.count(Customer.customer_id))
-    total_customers = db.session.execute(count_query).scalar() or 0
+    # Prepare response with pagination metadata
+    pagination = {
+        'page': page,
+        'per_page': per_page,
+        'has_next': has_next,
+        'has_prev': page > 1
+    }
     
-    # Calculate pagination metadata
-    total_pages = (total_customers + per_page - 1) // per_page  # Ceiling division
+    if include_total:
+        # Total comes from the cached counter, not a COUNT(*) per request
+        total_customers = customer_counter.get()
+        pagination['total_customers'] = total_customers
+        pagination['total_pages'] = (total_customers + per_page - 1) // per_page  # Ceiling division
     
-    # Prepare response with pagination metadata
     response = {
-        'customers': customers_schema.dump(customers),
+        'customers': compiled(customers_schema).dump(customers[:per_page]),
+        'pagination': pagination
+    }
+    
+    return jsonify(response), 200
+
+
+def get_customers_by_cursor():
+    """Cursor mode for GET /customers (keyset pagination on customer_id)"""
+    try:
+        limit, cursor = parse_keyset_args(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
+    
+    query = apply_keyset(select(Customer), Customer.customer_id, cursor, limit)
+    customers, pagination = keyset_page(db.session.execute(query).scalars().all(), limit, 'customer_id')
+    pagination['cursor'] = cursor
+    
+    if include_total:
+        pagination['total_customers'] = customer_counter.get()
+    
+    return jsonify({
+        'customers': compiled(customers_schema).dump(customers),
+        'pagination': pagination
+    }), 200
+
+
+# SEARCH - GET /customers/search
+# JWT required: Front desk lookup by phone, email or name
+# Every search shape is served by an index seek:
+#   - phone: exact/prefix match on phone_normalized (digits only, maintained on write)
+#   - email: exact/prefix match on email_lower (maintained on write)
+#   - name:  prefix match on the (last_name, first_name) index
+# Query parameters:
+#   - q: Search text (required, at least 2 characters)
+#   - page: Page number (default: 1)
+#   - per_page: Number of results per page (default: 10, max: 100)
+@customer_bp.route("/search", methods=['GET'])
+@jwt_required()
+def search_customers():
+    """
+    Search customers by phone, email or name.
+    
+    The kind of search is detected from q:
+    - Contains '@'                   -> email search
+    - Only digits and phone punctuation -> phone search (e.g. "(555) 100-1001", "5551001")
+    - Anything else                  -> name search ("Smith", "Smith, Al" or "Al Smith")
+    
+    Results are ranked with exact matches first, then prefix matches, then by name.
+    
+    Example: /customers/search?q=555-100
+    """
+    q = (request.args.get('q') or '').strip()
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    
+    if len(q) < 2:
+        return jsonify({"error": "Search text q must be at least 2 characters"}), 400
+    if page < 1:
+        return jsonify({"error": "Page must be >= 1"}), 400
+    if per_page < 1 or per_page > 100:
+        return jsonify({"error": "Per page must be between 1 and 100"}), 400
+    
+    if '@' in q:
+        match_type = 'email'
+        term = q.lower()
+        condition = Customer.email_lower.startswith(term, autoescape=True)
+        rank = case((Customer.email_lower == term, 0), else_=1)
+    elif PHONE_QUERY_PATTERN.fullmatch(q) and len(normalize_phone(q)) >= 3:
+        match_type = 'phone'
+        term = normalize_phone(q)
+        condition = Customer.phone_normalized.startswith(term, autoescape=True)
+        rank = case((Customer.phone_normalized == term, 0), else_=1)
+    else:
+        match_type = 'name'
+        last_name, first_name = split_name_query(q)
+        condition = Customer.last_name.startswith(last_name, autoescape=True)
+        rank = case((Customer.last_name == last_name, 0), else_=1)
+        if first_name:
+            condition = condition & Customer.first_name.startswith(first_name, autoescape=True)
+            rank = rank + case((Customer.first_name == first_name, 0), else_=1)
+    
+    # Fetch one extra row to know whether there is a next page without a COUNT query
+    query = (
+        select(Customer)
+        .where(condition)
+        .order_by(rank, Customer.last_name, Customer.first_name, Customer.customer_id)
+        .limit(per_page + 1)
+        .offset((page - 1) * per_page)
+    )
+    customers = db.session.execute(query).scalars().all()
+    has_next = len(customers) > per_page
+    
+    return jsonify({
+        'customers': compiled(customers_schema).dump(customers[:per_page]),
+        'match_type': match_type,
         'pagination': {
             'page': page,
             'per_page': per_page,
-            'total_customers': total_customers,
-            'total_pages': total_pages,
-            'has_next': page < total_pages,
+            'has_next': has_next,
             'has_prev': page > 1
         }
-    }
+    }), 200
+
+
+def split_name_query(q):
+    """
+    Split a name search into (last_name, first_name) prefixes.
     
-    return jsonify(response), 200
+    "Smith" -> ("Smith", None), "Smith, Al" -> ("Smith", "Al"), "Al Smith" -> ("Smith", "Al")
+    """
+    if ',' in q:
+        last_name, first_name = (part.strip() for part in q.split(',', 1))
+        return last_name, first_name or None
+    parts = q.split()
+    if len(parts) > 1:
+        return parts[-1], ' '.join(parts[:-1])
+    return q, None
 
 
 # READ ONE - GET /customers/<id>
@@ -113,16 +413,33 @@ def get_customer(customer_id):
     return jsonify({"error": "Customer not found."}), 404
 
 
+# SUMMARY - GET /customers/<id>/summary
+# JWT required: Customer 360 view for the front desk (vehicles, open tickets, spend, last visit)
+# Built from a fixed number of aggregate/batched queries (see customer/summary.py), so the
+# cost does not grow with the customer's history. Cached per customer and invalidated when
+# the customer, their vehicles, or their tickets (line items, mechanics, parts) change
+@customer_bp.route("/<int:customer_id>/summary", methods=['GET'])
+@jwt_required()
+def get_customer_summary_view(customer_id):
+    customer = db.session.get(Customer, customer_id)
+    if not customer:
+        return jsonify({"error": "Customer not found."}), 404
+    
+    return jsonify(get_customer_summary(customer)), 200
+
+
 # UPDATE - PUT /customers/<id>
 # JWT required: Only authenticated users can update customer information
 @customer_bp.route("/<int:customer_id>", methods=['PUT'])
 @jwt_required()
 def update_customer(customer_id):
-    # Get current user from JWT token (convert from string to int)
-    current_user_id = int(get_jwt_identity())
+    # Resolve the caller from the identity cache (no database round trip for hot users)
+    identity = current_identity()
+    if identity is None:
+        return jsonify({"error": "Token is no longer valid"}), 401
     
     # Users can only update their own information
-    if current_user_id != customer_id:
+    if identity.customer_id != customer_id:
         return jsonify({"error": "Unauthorized to update this customer"}), 403
     customer = db.session.get(Customer, customer_id)
     
@@ -150,23 +467,38 @@ def update_customer(customer_id):
 
 # DELETE - DELETE /customers/<id>
 # JWT required: Only authenticated users can delete their account
+# Vehicles, tickets and ticket child rows are removed by a chunked deletion job (application/deletion.py):
+#   - 200 when the job finished inline, 202 with the job while it runs in the background
+#   - Poll progress at GET /deletion_jobs/<job_id>
+# Query parameters:
+#   - restock: 'true' to return parts on unfinished tickets to inventory
 @customer_bp.route("/<int:customer_id>", methods=['DELETE'])
 @jwt_required()
 def delete_customer(customer_id):
-    # Get current user from JWT token (convert from string to int)
-    current_user_id = int(get_jwt_identity())
+    # Resolve the caller from the identity cache (no database round trip for hot users)
+    identity = current_identity()
+    if identity is None:
+        return jsonify({"error": "Token is no longer valid"}), 401
     
     # Users can only delete their own account
-    if current_user_id != customer_id:
+    if identity.customer_id != customer_id:
         return jsonify({"error": "Unauthorized to delete this customer"}), 403
     customer = db.session.get(Customer, customer_id)
     
     if not customer:
         return jsonify({"error": "Customer not found."}), 404
     
-    db.session.delete(customer)
-    db.session.commit()
-    return jsonify({"message": f'Customer id: {customer_id}, successfully deleted.'}), 200
+    restock = request.args.get('restock', 'false').lower() == 'true'
+    job = start_customer_deletion(customer_id, restock_parts=restock)
+    
+    if job.status == JOB_COMPLETED:
+        return jsonify({
+            "message": f'Customer id: {customer_id}, successfully deleted.',
+            "job": deletion_job_schema.dump(job)
+        }), 200
+    if job.status == JOB_FAILED:
+        return jsonify({"error": "Customer deletion failed.", "job": deletion_job_schema.dump(job)}), 500
+    return jsonify({"message": "Customer deletion started.", "job": deletion_job_schema.dump(job)}), 202
 
 
 # ===== VEHICLE ENDPOINTS =====
@@ -176,18 +508,15 @@ def delete_customer(customer_id):
 @jwt_required()
 def create_vehicle(customer_id):
     """Create a new vehicle for a customer"""
-    # Get current user from JWT token
-    current_user_id = int(get_jwt_identity())
+    # Resolve the caller from the identity cache; a resolved identity also proves the customer exists
+    identity = current_identity()
+    if identity is None:
+        return jsonify({"error": "Token is no longer valid"}), 401
     
     # Users can only add vehicles to their own account
-    if current_user_id != customer_id:
+    if identity.customer_id != customer_id:
         return jsonify({"error": "Unauthorized to add vehicles for this customer"}), 403
     
-    # Verify customer exists
-    customer = db.session.get(Customer, customer_id)
-    if not customer:
-        return jsonify({"error": "Customer not found"}), 404
-    
     # Check if request has JSON data
     if not request.json:
         return jsonify({"error": "No JSON data provided"}), 400
@@ -201,6 +530,9 @@ def create_vehicle(customer_id):
     except ValidationError as e:
         return jsonify(e.messages), 400
     
+    if requires_valid_vin() and not is_check_digit_valid(vehicle_data['vin']):
+        return jsonify({"error": "VIN check digit is invalid"}), 400
+    
     # Check if VIN already exists
     query = select(Vehicle).where(Vehicle.vin == vehicle_data['vin'])
     existing_vehicle = db.session.execute(query).scalars().first()
@@ -252,11 +584,13 @@ def get_vehicle(customer_id, vehicle_id):
 @jwt_required()
 def update_vehicle(customer_id, vehicle_id):
     """Update a vehicle"""
-    # Get current user from JWT token
-    current_user_id = int(get_jwt_identity())
+    # Resolve the caller from the identity cache (no database round trip for hot users)
+    identity = current_identity()
+    if identity is None:
+        return jsonify({"error": "Token is no longer valid"}), 401
     
     # Users can only update vehicles on their own account
-    if current_user_id != customer_id:
+    if identity.customer_id != customer_id:
         return jsonify({"error": "Unauthorized to update vehicles for this customer"}), 403
     
     vehicle = db.session.get(Vehicle, vehicle_id)
@@ -283,6 +617,8 @@ def update_vehicle(customer_id, vehicle_id):
     
     # If VIN is being changed, check if new VIN already exists
     if 'vin' in vehicle_data and vehicle_data['vin'] != vehicle.vin:
+        if requires_valid_vin() and not is_check_digit_valid(vehicle_data['vin']):
+            return jsonify({"error": "VIN check digit is invalid"}), 400
         query = select(Vehicle).where(Vehicle.vin == vehicle_data['vin'])
         existing_vehicle = db.session.execute(query).scalars().first()
         if existing_vehicle:
@@ -302,11 +638,13 @@ def update_vehicle(customer_id, vehicle_id):
 @jwt_required()
 def delete_vehicle(customer_id, vehicle_id):
     """Delete a vehicle"""
-    # Get current user from JWT token
-    current_user_id = int(get_jwt_identity())
+    # Resolve the caller from the identity cache (no database round trip for hot users)
+    identity = current_identity()
+    if identity is None:
+        return jsonify({"error": "Token is no longer valid"}), 401
     
     # Users can only delete vehicles from their own account
-    if current_user_id != customer_id:
+    if identity.customer_id != customer_id:
         return jsonify({"error": "Unauthorized to delete vehicles for this customer"}), 403
     
     vehicle = db.session.get(Vehicle, vehicle_id)
@@ -0,0 +1,143 @@
+"""
+Customer 360 summary read model
+
+Everything an advisor needs when opening a customer, in a fixed number of queries
+regardless of how many vehicles, tickets, line items or parts the customer has:
+
+1. Customer row (primary key lookup)
+2. Vehicles
+3. Ticket counts by status, plus the last visit date (one GROUP BY)
+4. Open tickets (status open / in_progress)
+5. Labor spend: SUM over ticket_line_items joined to the customer's tickets
+6. Parts spend: SUM over ticket_parts (cost plus markup) joined to the customer's tickets
+
+Cancelled tickets don't count towards spend. The result is cached per customer under
+a versioned key that is bumped whenever the customer, their vehicles or their
+tickets (including line items, mechanics and parts on those tickets) change.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import select, func
+from application.extensions import db, cache
+from application.models import Customer, Vehicle, ServiceTicket, TicketLineItem, TicketMechanic, TicketPart
+from application.cache_invalidation import invalidates, versioned_cache_key
+from application.db_routing import primary_reads
+from application.blueprints.customer.customerSchemas import customer_schema, vehicles_schema
+
+
+SUMMARY_NAMESPACE = 'customer_summary'
+SUMMARY_CACHE_TIMEOUT = 600  # 10 minutes
+OPEN_STATUSES = ('open', 'in_progress')
+EXCLUDED_FROM_SPEND = ('cancelled',)
+
+
+def get_customer_summary(customer):
+    """Return the summary for one customer, from the cache when possible"""
+    cache_key = versioned_cache_key(SUMMARY_NAMESPACE, customer.customer_id)
+    summary = cache.get(cache_key)
+    if summary is None:
+        summary = build_customer_summary(customer)
+        cache.set(cache_key, summary, timeout=SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def _to_cents(value):
+    if value is None:
+        return 0
+    return int(Decimal(value).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+@primary_reads()  # Cached under the current version: never from a lagging replica
+def build_customer_summary(customer):
+    """Assemble the summary with aggregate and batched queries"""
+    customer_id = customer.customer_id
+
+    vehicles = db.session.execute(
+        select(Vehicle).where(Vehicle.customer_id == customer_id).order_by(Vehicle.vehicle_id)
+    ).scalars().all()
+
+    status_rows = db.session.execute(
+        select(ServiceTicket.status, func.count(ServiceTicket.ticket_id), func.max(ServiceTicket.opened_at))
+        .where(ServiceTicket.customer_id == customer_id)
+        .group_by(ServiceTicket.status)
+    ).all()
+    tickets_by_status = {status: count for status, count, _ in status_rows}
+    last_visit = max((opened_at for _, _, opened_at in status_rows if opened_at is not None), default=None)
+
+    open_tickets = db.session.execute(
+        select(
+            ServiceTicket.ticket_id, ServiceTicket.vehicle_id, ServiceTicket.status,
+            ServiceTicket.opened_at, ServiceTicket.priority, ServiceTicket.odometer_miles
+        )
+        .where(ServiceTicket.customer_id == customer_id, ServiceTicket.status.in_(OPEN_STATUSES))
+        .order_by(ServiceTicket.priority, ServiceTicket.opened_at)
+    ).all()
+
+    billable_ticket = (
+        (ServiceTicket.customer_id == customer_id)
+        & ServiceTicket.status.notin_(EXCLUDED_FROM_SPEND)
+    )
+    labor_spend = db.session.execute(
+        select(func.sum(TicketLineItem.quantity * TicketLineItem.unit_price_cents))
+        .join(ServiceTicket, TicketLineItem.ticket_id == ServiceTicket.ticket_id)
+        .where(billable_ticket)
+    ).scalar()
+    parts_spend = db.session.execute(
+        select(func.sum(
+            TicketPart.quantity_used * TicketPart.unit_cost_cents * (100 + TicketPart.markup_percentage) / 100
+        ))
+        .join(ServiceTicket, TicketPart.ticket_id == ServiceTicket.ticket_id)
+        .where(billable_ticket)
+    ).scalar()
+
+    labor_spend_cents = _to_cents(labor_spend)
+    parts_spend_cents = _to_cents(parts_spend)
+
+    return {
+        'customer': customer_schema.dump(customer),
+        'vehicles': vehicles_schema.dump(vehicles),
+        'open_tickets': [
+            {
+                'ticket_id': row.ticket_id,
+                'vehicle_id': row.vehicle_id,
+                'status': row.status,
+                'opened_at': row.opened_at.isoformat() if row.opened_at else None,
+                'priority': row.priority,
+                'odometer_miles': row.odometer_miles
+            }
+            for row in open_tickets
+        ],
+        'stats': {
+            'vehicle_count': len(vehicles),
+            'total_tickets': sum(tickets_by_status.values()),
+            'tickets_by_status': tickets_by_status,
+            'labor_spend_cents': labor_spend_cents,
+            'parts_spend_cents': parts_spend_cents,
+            'lifetime_spend_cents': labor_spend_cents + parts_spend_cents,
+            'last_visit': last_visit.isoformat() if last_visit else None
+        }
+    }
+
+
+# ===== CACHE INVALIDATION RULES =====
+
+def _customer_id_for_ticket(session, ticket_id):
+    """Resolve a ticket's customer (identity map first, then a primary key lookup)"""
+    if ticket_id is None:
+        return None
+    ticket = session.get(ServiceTicket, ticket_id)
+    return ticket.customer_id if ticket is not None else None
+
+
+@invalidates(Customer)
+def _customer_changed(session, customer):
+    return [(SUMMARY_NAMESPACE, customer.customer_id)]
+
+
+@invalidates(Vehicle, ServiceTicket)
+def _customer_row_changed(session, row):
+    return [(SUMMARY_NAMESPACE, row.customer_id)]
+
+
+@invalidates(TicketLineItem, TicketMechanic, TicketPart)
+def _ticket_child_changed(session, row):
+    return [(SUMMARY_NAMESPACE, _customer_id_for_ticket(session, row.ticket_id))]
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+deletion_job_bp = Blueprint('deletion_job', __name__, url_prefix='/deletion_jobs')
+
+from application.blueprints.deletion_job import routes
@@ -0,0 +1,10 @@
+from application.extensions import ma
+from application.models import DeletionJob
+
+
+class DeletionJobSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = DeletionJob
+
+
+deletion_job_schema = DeletionJobSchema()
@@ -0,0 +1,66 @@
+from flask import jsonify
+from flask_jwt_extended import jwt_required
+from application.blueprints.deletion_job import deletion_job_bp
+from application.blueprints.deletion_job.deletionJobSchemas import deletion_job_schema
+from application.models import DeletionJob
+from application.extensions import db
+from application.db_routing import primary_reads
+
+
+# READ ONE - GET /deletion_jobs/<job_id>
+# JWT required: Poll the progress of a customer or service ticket deletion
+@deletion_job_bp.route("/<string:job_id>", methods=['GET'])
+@jwt_required()
+@primary_reads()  # Progress is written by a background worker: read it where it is written
+def get_deletion_job(job_id):
+    """
+    Get deletion job progress
+    ---
+    tags:
+      - Deletion Jobs
+    summary: Get the progress of a cascade delete
+    description: |
+      Deleting a customer or service ticket removes the dependent rows in small
+      transactions, usually in the background. The job reports its status
+      (pending, running, completed, failed), the rows deleted so far per table
+      and the number of parts returned to inventory.
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: job_id
+        type: string
+        required: true
+    responses:
+      200:
+        description: Job retrieved successfully
+        schema:
+          type: object
+          properties:
+            job_id:
+              type: string
+            target_type:
+              type: string
+              example: customer
+            target_id:
+              type: integer
+            status:
+              type: string
+              example: running
+            progress:
+              type: object
+              example: {"ticket_parts": 500, "ticket_mechanics": 120}
+            parts_restocked:
+              type: integer
+            error:
+              type: string
+      404:
+        description: Job not found
+      401:
+        description: Unauthorized - missing or invalid JWT token
+    """
+    job = db.session.get(DeletionJob, job_id)
+    if not job:
+        return jsonify({"error": "Deletion job not found."}), 404
+    
+    return jsonify(deletion_job_schema.dump(job)), 200
@@ -0,0 +1,8 @@
+from flask import Blueprint
+
+internal_bp = Blueprint('internal', __name__, url_prefix='/internal')
+
+# GET /metrics sits at the root, where Prometheus scrapes by default
+metrics_bp = Blueprint('metrics', __name__)
+
+from application.blueprints.internal import routes
@@ -0,0 +1,80 @@
+from flask import request, jsonify, current_app, abort
+from application.blueprints.internal import internal_bp, metrics_bp
+from application.metrics import CONTENT_TYPE
+
+
+@internal_bp.before_request
+@metrics_bp.before_request
+def allow_internal_callers_only():
+    """Operational endpoints answer only INTERNAL_ALLOWED_IPS; everyone else gets a plain 404"""
+    if request.remote_addr not in current_app.config['INTERNAL_ALLOWED_IPS']:
+        abort(404)
+
+
+# READ POOL STATS - GET /internal/db-pool
+# Internal: live connection pool statistics for dashboards and load tests
+@internal_bp.route("/db-pool", methods=['GET'])
+def get_db_pool_stats():
+    """
+    Get database connection pool statistics
+    ---
+    tags:
+      - Internal
+    summary: Live connection pool statistics
+    description: |
+      Connections checked out, checked in and in overflow, the configured limits,
+      a cumulative histogram of the time requests waited for a connection
+      (buckets in milliseconds), pool timeouts, and connections held longer than
+      DB_POOL_HOLD_WARNING seconds together with the request holding them.
+      With a read replica configured, also its health and how many requests read from it.
+      Only answered for INTERNAL_ALLOWED_IPS (loopback by default). Send
+      reset=true to zero the counters after reading them.
+    parameters:
+      - in: query
+        name: reset
+        type: boolean
+        default: false
+    responses:
+      200:
+        description: Pool statistics
+      404:
+        description: Caller is not in INTERNAL_ALLOWED_IPS
+    """
+    monitor = current_app.extensions['db_pool_monitor']
+    stats = monitor.stats()
+    router = current_app.extensions.get('db_router')
+    if router is not None:
+        stats['replica'] = router.stats()
+    if request.args.get('reset', 'false').lower() == 'true':
+        monitor.reset()
+    return jsonify(stats), 200
+
+
+# READ METRICS - GET /metrics
+# Internal: per-endpoint request metrics in the Prometheus text format
+@metrics_bp.route("/metrics", methods=['GET'])
+def get_metrics():
+    """
+    Get request metrics for Prometheus
+    ---
+    tags:
+      - Internal
+    summary: Per-endpoint request metrics (Prometheus text format)
+    description: |
+      Latency histograms, SQL statements per request, SQL time, rows loaded,
+      serialization time and response bytes, labelled by endpoint, method and
+      status, plus connection pool and read replica gauges. Counters run from
+      process start. Only answered for INTERNAL_ALLOWED_IPS (loopback by default).
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Metrics in the Prometheus text exposition format
+      404:
+        description: Caller is not in INTERNAL_ALLOWED_IPS, or METRICS_ENABLED is off
+    """
+    metrics = current_app.extensions.get('request_metrics')
+    if metrics is None:
+        abort(404)
+    text = metrics.render(current_app.extensions.get('db_pool_monitor'), current_app.extensions.get('db_router'))
+    return current_app.response_class(text, status=200, content_type=CONTENT_TYPE)
@@ -6,7 +6,18 @@ from flask_jwt_extended import jwt_required
 from application.blueprints.inventory import inventory_bp
 from application.blueprints.inventory.inventorySchemas import part_schema, parts_schema
 from application.models import Part
+from application.schema_compiler import compiled
 from application.extensions import db, limiter
+from application.pagination import (
+    PaginationError, parse_fields, parse_keyset_args, wants_keyset,
+    apply_keyset, keyset_page, projection_options, sparse_schema
+)
+
+
+# Columns read by computed schema fields, so sparse fieldsets still load what they need
+PART_FIELD_DEPENDENCIES = {
+    'needs_reorder': ('quantity_in_stock', 'reorder_level')
+}
 
 
 # CREATE - POST /inventory
@@ -86,7 +97,7 @@ def create_part():
         return jsonify({"error": "No JSON data provided"}), 400
     
     try:
-        part_data = part_schema.load(request.json)
+        part_data = compiled(part_schema).load(request.json)
     except ValidationError as e:
         return jsonify(e.messages), 400
     
@@ -112,7 +123,15 @@ def get_parts():
     tags:
       - Inventory
     summary: Get all parts
-    description: Retrieves all parts with optional category filtering and low stock detection
+    description: |
+      Retrieves all parts with optional category filtering and low stock detection.
+
+      Send limit and/or cursor to switch to keyset pagination; the response is then an
+      object with a parts list and pagination metadata. Pass the returned next_cursor
+      as cursor to fetch the following page.
+
+      Use fields to request a sparse fieldset (e.g. fields=part_id,name,quantity_in_stock).
+      Only the columns backing those fields are read from the database.
     security:
       - Bearer: []
     parameters:
@@ -127,9 +146,23 @@ def get_parts():
         enum: [true, false]
         default: false
         description: Filter for low stock items
+      - in: query
+        name: limit
+        type: integer
+        default: 20
+        description: Page size for keyset pagination (max 100)
+      - in: query
+        name: cursor
+        type: integer
+        description: next_cursor value from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
+        example: part_id,part_number,name,quantity_in_stock
     responses:
       200:
-        description: List of parts
+        description: List of parts (or a parts/pagination object when paginating)
         schema:
           type: array
           items:
@@ -145,6 +178,8 @@ def get_parts():
                 type: string
               quantity_in_stock:
                 type: integer
+      400:
+        description: Invalid pagination or fields parameter
       401:
         description: Unauthorized
     """
@@ -152,19 +187,41 @@ def get_parts():
     low_stock = request.args.get('low_stock', 'false').lower() == 'true'
     category = request.args.get('category')
     
+    try:
+        fields = parse_fields(request.args, parts_schema)
+        paginate = wants_keyset(request.args)
+        if paginate:
+            limit, cursor = parse_keyset_args(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    
     query = select(Part)
     
+    # Only read the columns the caller asked for (skips the description Text column in list views)
+    if fields:
+        query = query.options(*projection_options(Part, fields, Part.part_id, PART_FIELD_DEPENDENCIES))
+    
     # Apply filters if provided
     if category:
         query = query.where(Part.category == category)
     
-    parts = db.session.execute(query).scalars().all()
-    
-    # Filter for low stock items if requested
+    # Filter for low stock items in SQL so keyset pages stay full
     if low_stock:
-        parts = [part for part in parts if part.needs_reorder()]
+        query = query.where(Part.quantity_in_stock <= Part.reorder_level)
     
-    return jsonify(parts_schema.dump(parts)), 200
+    schema = compiled(sparse_schema(parts_schema, fields))
+    
+    if not paginate:
+        parts = db.session.execute(query).scalars().all()
+        return jsonify(schema.dump(parts)), 200
+    
+    query = apply_keyset(query, Part.part_id, cursor, limit)
+    parts, pagination = keyset_page(db.session.execute(query).scalars().all(), limit, 'part_id')
+    
+    return jsonify({
+        'parts': schema.dump(parts),
+        'pagination': pagination
+    }), 200
 
 
 # READ ONE - GET /inventory/<id>
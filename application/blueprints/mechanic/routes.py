@@ -1,12 +1,17 @@
 from typing import Any, Dict, cast
 from flask import request, jsonify
 from marshmallow import ValidationError
-from sqlalchemy import select
+from sqlalchemy import select, func
 from flask_jwt_extended import jwt_required
 from application.blueprints.mechanic import mechanic_bp
 from application.blueprints.mechanic.mechanicSchemas import mechanic_schema, mechanics_schema
-from application.models import Mechanic
+from application.models import Mechanic, TicketMechanic
+from application.schema_compiler import compiled
 from application.extensions import db, limiter, cache
+from application.pagination import (
+    PaginationError, parse_fields, parse_keyset_args, wants_keyset,
+    apply_keyset, keyset_page, projection_options, sparse_schema
+)
 
 
 # CREATE - POST /mechanics
@@ -93,7 +98,7 @@ def create_mechanic():
         return jsonify({"error": "No JSON data provided"}), 400
     
     try:
-        mechanic_data = cast(Dict[str, Any], mechanic_schema.load(request.json))
+        mechanic_data = cast(Dict[str, Any], compiled(mechanic_schema).load(request.json))
     except ValidationError as e:
         return jsonify(e.messages), 400
     
@@ -111,9 +116,10 @@ def create_mechanic():
 
 # READ ALL - GET /mechanics
 # Caching applied: Results are cached for 5 minutes to reduce database load
+# The cache key includes the query string so each page/fieldset is cached separately
 @mechanic_bp.route("", methods=['GET'])
 @jwt_required()
-@cache.cached(timeout=300)
+@cache.cached(timeout=300, query_string=True)
 def get_mechanics():
     """
     Get all mechanics
@@ -121,12 +127,35 @@ def get_mechanics():
     tags:
       - Mechanics
     summary: Get all mechanics
-    description: Retrieves a list of all mechanics in the system (cached for 5 minutes)
+    description: |
+      Retrieves a list of all mechanics in the system (cached for 5 minutes).
+
+      Send limit and/or cursor to switch to keyset pagination; the response is then an
+      object with a mechanics list and pagination metadata. Pass the returned next_cursor
+      as cursor to fetch the following page.
+
+      Use fields to request a sparse fieldset (e.g. fields=mechanic_id,full_name).
+      Only the columns backing those fields are read from the database.
     security:
       - Bearer: []
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        default: 20
+        description: Page size for keyset pagination (max 100)
+      - in: query
+        name: cursor
+        type: integer
+        description: next_cursor value from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated list of fields to return
+        example: mechanic_id,full_name,email
     responses:
       200:
-        description: List of mechanics retrieved successfully
+        description: List of mechanics retrieved successfully (or a mechanics/pagination object when paginating)
         schema:
           type: array
           items:
@@ -153,12 +182,41 @@ def get_mechanics():
               is_active:
                 type: boolean
                 example: true
+      400:
+        description: Invalid pagination or fields parameter
       401:
         description: Unauthorized - missing or invalid JWT token
     """
+    try:
+        fields = parse_fields(request.args, mechanics_schema)
+        paginate = wants_keyset(request.args)
+        if paginate:
+            limit, cursor = parse_keyset_args(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    
     query = select(Mechanic)
-    mechanics = db.session.execute(query).scalars().all()
-    return jsonify(mechanics_schema.dump(mechanics)), 200
+    
+    # Only read the columns the caller asked for
+    if fields:
+        query = query.options(*projection_options(Mechanic, fields, Mechanic.mechanic_id))
+    
+    schema = compiled(sparse_schema(mechanics_schema, fields))
+    
+    if not paginate:
+        mechanics = db.session.execute(query).scalars().all()
+        response = jsonify(schema.dump(mechanics))
+    else:
+        query = apply_keyset(query, Mechanic.mechanic_id, cursor, limit)
+        mechanics, pagination = keyset_page(db.session.execute(query).scalars().all(), limit, 'mechanic_id')
+        response = jsonify({
+            'mechanics': schema.dump(mechanics),
+            'pagination': pagination
+        })
+    
+    # Hashed once per cache fill; cache hits reuse the compressed body by ETag (application/compression.py)
+    response.add_etag()
+    return response, 200
 
 
 # GET MECHANICS BY POPULARITY - GET /mechanics/by-activity
@@ -177,10 +235,10 @@ def get_mechanics_by_activity():
       Returns mechanics sorted by the number of tickets they've worked on (descending order).
     
       This endpoint demonstrates:
-      1. Accessing related data through SQLAlchemy relationships (ticket_mechanics)
-      2. Using len() on relationship lists to count related records
-      3. Custom sorting with lambda functions based on relationship data
-      4. Creating insightful queries that reveal business metrics
+      1. Counting related records (ticket_mechanics) in SQL with a correlated subquery,
+         in one query however many mechanics there are
+      2. Custom sorting with lambda functions based on the counts
+      3. Creating insightful queries that reveal business metrics
     security:
       - Bearer: []
     parameters:
@@ -234,10 +292,9 @@ def get_mechanics_by_activity():
     Returns mechanics sorted by the number of tickets they've worked on (descending order).
     
     This endpoint demonstrates:
-    1. Accessing related data through SQLAlchemy relationships (ticket_mechanics)
-    2. Using len() on relationship lists to count related records
-    3. Custom sorting with lambda functions based on relationship data
-    4. Creating insightful queries that reveal business metrics
+    1. Counting related records (ticket_mechanics) in SQL with a correlated subquery
+    2. Custom sorting with lambda functions based on the counts
+    3. Creating insightful queries that reveal business metrics
     
     Query parameters:
     - order: 'desc' (default) for most active first, 'asc' for least active first
@@ -247,27 +304,29 @@ def get_mechanics_by_activity():
     order = request.args.get('order', 'desc').lower()
     active_only = request.args.get('active_only', 'false').lower() == 'true'
     
-    # Build query
-    query = select(Mechanic)
+    # Build query: each mechanic with the number of tickets they've worked on, counted in the
+    # database (len(mechanic.ticket_mechanics) would load every mechanic's tickets, one query each)
+    ticket_count = (
+        select(func.count())
+        .where(TicketMechanic.mechanic_id == Mechanic.mechanic_id)
+        .scalar_subquery()
+    )
+    query = select(Mechanic, ticket_count).order_by(Mechanic.mechanic_id)
     if active_only:
         query = query.where(Mechanic.is_active == True)
     
-    mechanics = db.session.execute(query).scalars().all()
-    
-    # Convert to list for sorting (SQLAlchemy result is not directly sortable)
-    mechanics_list = list(mechanics)
+    mechanics_list = list(db.session.execute(query).all())
     
     # Sort mechanics by the number of tickets they've worked on
     # Using lambda function to define custom sorting key
-    # The key function accesses the ticket_mechanics relationship and counts the items
     mechanics_list.sort(
-        key=lambda mechanic: len(mechanic.ticket_mechanics),
+        key=lambda row: row[1],
         reverse=(order == 'desc')
     )
     
     # Prepare response with ticket counts included
     result = []
-    for mechanic in mechanics_list:
+    for mechanic, count in mechanics_list:
         mechanic_dict = {
             'mechanic_id': mechanic.mechanic_id,
             'full_name': mechanic.full_name,
@@ -275,7 +334,7 @@ def get_mechanics_by_activity():
             'phone': mechanic.phone,
             'salary': mechanic.salary,
             'is_active': mechanic.is_active,
-            'ticket_count': len(mechanic.ticket_mechanics)  # Count of tickets worked on
+            'ticket_count': count  # Count of tickets worked on
         }
         result.append(mechanic_dict)
     
@@ -2,15 +2,22 @@ from typing import Any, Dict, cast
 from flask import request, jsonify
 from marshmallow import ValidationError
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from flask_jwt_extended import jwt_required
 from application.blueprints.service_ticket import service_ticket_bp
 from application.blueprints.service_ticket.serviceTicketSchemas import (
     service_ticket_schema, 
     service_tickets_schema,
-    edit_ticket_mechanics_schema
+    edit_ticket_mechanics_schema,
+    ticket_line_items_schema,
+    add_package_schema
 )
-from application.models import ServiceTicket, Mechanic, TicketMechanic, Part, TicketPart
+from application.models import ServiceTicket, Mechanic, TicketMechanic, Part, TicketPart, TicketLineItem
 from application.extensions import db, limiter
+from application.blueprints.deletion_job.deletionJobSchemas import deletion_job_schema
+from application.deletion import start_ticket_deletion, JOB_COMPLETED, JOB_FAILED
+from application.schema_compiler import compiled
+from application.quotes import build_package_quote, insert_quote_lines, PackageNotFound, InvalidOptionalServices
 
 
 # CREATE - POST /service_tickets
@@ -22,7 +29,7 @@ def create_service_ticket():
         return jsonify({"error": "No JSON data provided"}), 400
     
     try:
-        ticket_data = cast(Dict[str, Any], service_ticket_schema.load(request.json))
+        ticket_data = cast(Dict[str, Any], compiled(service_ticket_schema).load(request.json))
     except ValidationError as e:
         return jsonify(e.messages), 400
     
@@ -32,20 +39,28 @@ def create_service_ticket():
     return jsonify(service_ticket_schema.dump(new_ticket)), 201
 
 
+# The nested mechanics and line items the ticket schemas dump, loaded for all tickets at once (not per ticket
+# or per mechanic)
+TICKET_DUMP_OPTIONS = (
+    selectinload(ServiceTicket.ticket_mechanics).selectinload(TicketMechanic.mechanic),
+    selectinload(ServiceTicket.ticket_line_items)
+)
+
+
 # READ ALL - GET /service_tickets
 @service_ticket_bp.route("", methods=['GET'])
 @jwt_required()
 def get_service_tickets():
-    query = select(ServiceTicket)
+    query = select(ServiceTicket).options(*TICKET_DUMP_OPTIONS)
     tickets = db.session.execute(query).scalars().all()
-    return jsonify(service_tickets_schema.dump(tickets)), 200
+    return jsonify(compiled(service_tickets_schema).dump(tickets)), 200
 
 
 # READ ONE - GET /service_tickets/<id>
 @service_ticket_bp.route("/<int:ticket_id>", methods=['GET'])
 @jwt_required()
 def get_service_ticket(ticket_id):
-    ticket = db.session.get(ServiceTicket, ticket_id)
+    ticket = db.session.get(ServiceTicket, ticket_id, options=TICKET_DUMP_OPTIONS)
     
     if ticket:
         return jsonify(service_ticket_schema.dump(ticket)), 200
@@ -259,7 +274,7 @@ def edit_ticket_mechanics(ticket_id):
 @service_ticket_bp.route("/<int:ticket_id>", methods=['PUT'])
 @jwt_required()
 def update_service_ticket(ticket_id):
-    ticket = db.session.get(ServiceTicket, ticket_id)
+    ticket = db.session.get(ServiceTicket, ticket_id, options=TICKET_DUMP_OPTIONS)
     
     if not ticket:
         return jsonify({"error": "Service ticket not found."}), 404
@@ -377,7 +392,64 @@ def add_part_to_ticket(ticket_id, part_id):
     }), 200
 
 
+# ADD PACKAGE TO TICKET - POST /service_tickets/<ticket_id>/packages/<package_id>
+# Expands the package (and its prerequisites) into priced line items, inserted with one statement
+# (application/quotes.py). With dry_run the quote is returned without touching the ticket.
+@service_ticket_bp.route("/<int:ticket_id>/packages/<int:package_id>", methods=['POST'])
+@jwt_required()
+def add_package_to_ticket(ticket_id, package_id):
+    """
+    Add a service package to a service ticket
+    
+    Request body (all optional):
+    {
+        "optional_service_ids": [3],     # Optional package items to include
+        "include_prerequisites": true,   # Add missing required prerequisites, defaults to true
+        "dry_run": false                 # Quote only, defaults to false
+    }
+    """
+    ticket = db.session.get(ServiceTicket, ticket_id)
+    if not ticket:
+        return jsonify({"error": "Service ticket not found"}), 404
+    
+    try:
+        options = cast(Dict[str, Any], add_package_schema.load(request.get_json(silent=True) or {}))
+    except ValidationError as e:
+        return jsonify(e.messages), 400
+    
+    try:
+        quote = build_package_quote(package_id, options['optional_service_ids'], options['include_prerequisites'])
+    except PackageNotFound:
+        return jsonify({"error": "Service package not found."}), 404
+    except InvalidOptionalServices as e:
+        return jsonify({"error": "Not optional items of this package", "service_ids": e.service_ids}), 400
+    
+    if options['dry_run']:
+        return jsonify({"ticket_id": ticket_id, **quote}), 200
+    
+    insert_quote_lines(ticket, quote)
+    return jsonify({"ticket_id": ticket_id, **quote}), 201
+
+
+# READ LINE ITEMS - GET /service_tickets/<ticket_id>/line-items
+@service_ticket_bp.route("/<int:ticket_id>/line-items", methods=['GET'])
+@jwt_required()
+def get_ticket_line_items(ticket_id):
+    if not db.session.get(ServiceTicket, ticket_id):
+        return jsonify({"error": "Service ticket not found"}), 404
+    
+    line_items = db.session.execute(
+        select(TicketLineItem).where(TicketLineItem.ticket_id == ticket_id).order_by(TicketLineItem.line_item_id)
+    ).scalars().all()
+    return jsonify(ticket_line_items_schema.dump(line_items)), 200
+
+
 # DELETE - DELETE /service_tickets/<id>
+# Line items, mechanic assignments and parts are removed by a chunked deletion job (application/deletion.py):
+#   - 200 when the job finished inline, 202 with the job while it runs in the background
+#   - Poll progress at GET /deletion_jobs/<job_id>
+# Query parameters:
+#   - restock: 'true' to return the ticket's parts to inventory (unless the ticket was completed)
 @service_ticket_bp.route("/<int:ticket_id>", methods=['DELETE'])
 @jwt_required()
 def delete_service_ticket(ticket_id):
@@ -386,6 +458,14 @@ def delete_service_ticket(ticket_id):
     if not ticket:
         return jsonify({"error": "Service ticket not found."}), 404
     
-    db.session.delete(ticket)
-    db.session.commit()
-    return jsonify({"message": f'Service ticket id: {ticket_id}, successfully deleted.'}), 200
+    restock = request.args.get('restock', 'false').lower() == 'true'
+    job = start_ticket_deletion(ticket_id, restock_parts=restock)
+    
+    if job.status == JOB_COMPLETED:
+        return jsonify({
+            "message": f'Service ticket id: {ticket_id}, successfully deleted.',
+            "job": deletion_job_schema.dump(job)
+        }), 200
+    if job.status == JOB_FAILED:
+        return jsonify({"error": "Service ticket deletion failed.", "job": deletion_job_schema.dump(job)}), 500
+    return jsonify({"message": "Service ticket deletion started.", "job": deletion_job_schema.dump(job)}), 202
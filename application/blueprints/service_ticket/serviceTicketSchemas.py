@@ -45,9 +45,18 @@ class EditTicketMechanicsSchema(Schema):
     minutes_worked = fields.Int(load_default=0)
 
 
+class AddPackageSchema(Schema):
+    """Schema for adding a service package to a ticket"""
+    optional_service_ids = fields.List(fields.Int(), load_default=[])
+    include_prerequisites = fields.Bool(load_default=True)
+    dry_run = fields.Bool(load_default=False)
+
+
 # Initialize schema instances
 service_ticket_schema = ServiceTicketSchema()
 service_tickets_schema = ServiceTicketSchema(many=True)
 ticket_mechanic_schema = TicketMechanicSchema()
 ticket_mechanics_schema = TicketMechanicSchema(many=True)
 edit_ticket_mechanics_schema = EditTicketMechanicsSchema()
+ticket_line_items_schema = TicketLineItemSchema(many=True)
+add_package_schema = AddPackageSchema()
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+vehicle_bp = Blueprint('vehicle', __name__, url_prefix='/vehicles')
+
+from application.blueprints.vehicle import routes
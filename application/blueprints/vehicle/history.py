@@ -0,0 +1,171 @@
+"""
+Vehicle service history read model
+
+Assembles "what has been done to this car?" for one vehicle: its tickets (newest
+first), their line items, the parts installed (with warranty status) and the
+mechanics who worked on them.
+
+Query budget per page, independent of how many tickets, parts or mechanics are
+involved: one query for the page of tickets plus one batched IN query per
+relationship (line items, ticket mechanics, mechanics, ticket parts, parts,
+installing mechanics) via selectinload.
+
+Pages are cached per vehicle under a versioned key. The version is bumped when
+the vehicle or any of its tickets, line items, ticket mechanics or ticket parts
+change (see the @invalidates rules below). Renaming a part or mechanic is not
+tracked; those details refresh when the cache entry times out.
+"""
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import selectinload
+from application.extensions import db, cache
+from application.models import Vehicle, ServiceTicket, TicketLineItem, TicketMechanic, TicketPart, Part, Mechanic
+from application.pagination import apply_keyset, keyset_page
+from application.cache_invalidation import invalidates, versioned_cache_key
+from application.db_routing import primary_reads
+from application.blueprints.customer.customerSchemas import vehicle_schema
+
+
+HISTORY_NAMESPACE = 'vehicle_history'
+HISTORY_CACHE_TIMEOUT = 600  # 10 minutes
+
+
+def get_vehicle_history(vehicle, limit, cursor):
+    """
+    Return one page of a vehicle's service history, from the cache when possible
+
+    Args:
+        vehicle (Vehicle): The vehicle to report on
+        limit (int): Number of visits (tickets) per page
+        cursor (int | None): next_cursor from the previous page (visits older than this ticket_id)
+
+    Returns:
+        dict: {'vehicle': ..., 'visits': [...], 'pagination': {...}}
+    """
+    cache_key = versioned_cache_key(HISTORY_NAMESPACE, vehicle.vehicle_id, limit, cursor)
+    history = cache.get(cache_key)
+    if history is None:
+        history = build_vehicle_history(vehicle, limit, cursor)
+        cache.set(cache_key, history, timeout=HISTORY_CACHE_TIMEOUT)
+    return history
+
+
+@primary_reads()  # Cached under the current version: never from a lagging replica
+def build_vehicle_history(vehicle, limit, cursor):
+    """Assemble one page of service history with batched IN loads"""
+    mechanic_columns = (Mechanic.mechanic_id, Mechanic.full_name)
+    query = (
+        select(ServiceTicket)
+        .where(ServiceTicket.vehicle_id == vehicle.vehicle_id)
+        .options(
+            selectinload(ServiceTicket.ticket_line_items),
+            selectinload(ServiceTicket.ticket_mechanics)
+                .selectinload(TicketMechanic.mechanic).load_only(*mechanic_columns),
+            selectinload(ServiceTicket.parts_used).options(
+                selectinload(TicketPart.part).load_only(Part.part_id, Part.part_number, Part.name, Part.category),
+                selectinload(TicketPart.installed_by).load_only(*mechanic_columns)
+            )
+        )
+    )
+    query = apply_keyset(query, ServiceTicket.ticket_id, cursor, limit, descending=True)
+    tickets, pagination = keyset_page(db.session.execute(query).scalars().all(), limit, 'ticket_id')
+    pagination['cursor'] = cursor
+
+    now = datetime.utcnow()
+    return {
+        'vehicle': vehicle_schema.dump(vehicle),
+        'visits': [_serialize_visit(ticket, now) for ticket in tickets],
+        'pagination': pagination
+    }
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _mechanic_ref(mechanic):
+    if mechanic is None:
+        return None
+    return {'mechanic_id': mechanic.mechanic_id, 'full_name': mechanic.full_name}
+
+
+def _serialize_visit(ticket, now):
+    return {
+        'ticket_id': ticket.ticket_id,
+        'status': ticket.status,
+        'opened_at': _isoformat(ticket.opened_at),
+        'closed_at': _isoformat(ticket.closed_at),
+        'odometer_miles': ticket.odometer_miles,
+        'priority': ticket.priority,
+        'problem_description': ticket.problem_description,
+        'line_items': [
+            {
+                'line_item_id': item.line_item_id,
+                'service_id': item.service_id,
+                'line_type': item.line_type,
+                'description': item.description,
+                'quantity': float(item.quantity),
+                'unit_price_cents': item.unit_price_cents
+            }
+            for item in ticket.ticket_line_items
+        ],
+        'mechanics': [
+            {
+                **_mechanic_ref(assignment.mechanic),
+                'role': assignment.role,
+                'minutes_worked': assignment.minutes_worked
+            }
+            for assignment in ticket.ticket_mechanics
+        ],
+        'parts': [_serialize_part(ticket_part, now) for ticket_part in ticket.parts_used]
+    }
+
+
+def _serialize_part(ticket_part, now):
+    warranty_expires = None
+    if ticket_part.warranty_months and ticket_part.installed_date:
+        warranty_expires = ticket_part.installed_date + relativedelta(months=ticket_part.warranty_months)
+
+    return {
+        'part_id': ticket_part.part_id,
+        'part_number': ticket_part.part.part_number,
+        'name': ticket_part.part.name,
+        'category': ticket_part.part.category,
+        'quantity_used': ticket_part.quantity_used,
+        'unit_cost_cents': ticket_part.unit_cost_cents,
+        'markup_percentage': float(ticket_part.markup_percentage),
+        'total_cost': ticket_part.get_total_cost(),
+        'installed_date': _isoformat(ticket_part.installed_date),
+        'installed_by': _mechanic_ref(ticket_part.installed_by),
+        'warranty_months': ticket_part.warranty_months,
+        'warranty_expires': _isoformat(warranty_expires),
+        'under_warranty': warranty_expires is not None and now < warranty_expires
+    }
+
+
+# ===== CACHE INVALIDATION RULES =====
+
+def _vehicle_id_for_ticket(session, ticket_id):
+    """Resolve a ticket's vehicle (identity map first, then a primary key lookup)"""
+    if ticket_id is None:
+        return None
+    ticket = session.get(ServiceTicket, ticket_id)
+    return ticket.vehicle_id if ticket is not None else None
+
+
+@invalidates(Vehicle)
+def _vehicle_changed(session, vehicle):
+    return [(HISTORY_NAMESPACE, vehicle.vehicle_id)]
+
+
+@invalidates(ServiceTicket)
+def _ticket_changed(session, ticket):
+    # A ticket moved to another vehicle invalidates both histories
+    previous = inspect(ticket).attrs.vehicle_id.history.deleted or ()
+    return [(HISTORY_NAMESPACE, vehicle_id) for vehicle_id in {ticket.vehicle_id, *previous}]
+
+
+@invalidates(TicketLineItem, TicketMechanic, TicketPart)
+def _ticket_child_changed(session, row):
+    return [(HISTORY_NAMESPACE, _vehicle_id_for_ticket(session, row.ticket_id))]
@@ -0,0 +1,280 @@
+from flask import request, jsonify
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from flask_jwt_extended import jwt_required
+from application.blueprints.vehicle import vehicle_bp
+from application.blueprints.vehicle.history import get_vehicle_history
+from application.blueprints.vehicle.vehicleSchemas import service_reminders_schema
+from application.models import Vehicle, ServiceReminder
+from application.extensions import db
+from application.pagination import PaginationError, parse_keyset_args, apply_keyset, keyset_page
+from application.vin_decoder import decode_vin, VinDecodeError
+
+
+# SERVICE HISTORY - GET /vehicles/<vin>/history
+# Tickets, line items, parts and mechanics for one vehicle in a bounded number of queries
+# Cached per vehicle and invalidated whenever one of the vehicle's tickets changes
+@vehicle_bp.route("/<string:vin>/history", methods=['GET'])
+@jwt_required()
+def get_vehicle_history_by_vin(vin):
+    """
+    Get a vehicle's service history
+    ---
+    tags:
+      - Vehicles
+    summary: Get service history by VIN
+    description: |
+      Returns every visit (service ticket) for the vehicle, newest first, with its line items,
+      the parts installed (including warranty status) and the mechanics who worked on it.
+
+      Visits are paginated with a keyset cursor: pass the returned next_cursor as cursor to
+      fetch older visits. Each page is assembled in a fixed number of batched queries and
+      cached until one of the vehicle's tickets changes.
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: vin
+        type: string
+        required: true
+        description: The vehicle's VIN
+        example: 1HGCM82633A123456
+      - in: query
+        name: limit
+        type: integer
+        default: 20
+        description: Visits per page (max 100)
+      - in: query
+        name: cursor
+        type: integer
+        description: next_cursor value from the previous page
+    responses:
+      200:
+        description: Service history retrieved successfully
+        schema:
+          type: object
+          properties:
+            vehicle:
+              type: object
+            visits:
+              type: array
+              items:
+                type: object
+                properties:
+                  ticket_id:
+                    type: integer
+                  status:
+                    type: string
+                  opened_at:
+                    type: string
+                  odometer_miles:
+                    type: integer
+                  line_items:
+                    type: array
+                    items:
+                      type: object
+                  mechanics:
+                    type: array
+                    items:
+                      type: object
+                  parts:
+                    type: array
+                    items:
+                      type: object
+                      properties:
+                        part_number:
+                          type: string
+                        warranty_expires:
+                          type: string
+                        under_warranty:
+                          type: boolean
+            pagination:
+              type: object
+              properties:
+                limit:
+                  type: integer
+                next_cursor:
+                  type: integer
+                has_next:
+                  type: boolean
+      400:
+        description: Invalid pagination parameter
+      404:
+        description: Vehicle not found
+      401:
+        description: Unauthorized - missing or invalid JWT token
+    """
+    try:
+        limit, cursor = parse_keyset_args(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    vehicle = db.session.execute(select(Vehicle).where(Vehicle.vin == vin)).scalars().first()
+    if not vehicle:
+        return jsonify({"error": "Vehicle not found"}), 404
+
+    return jsonify(get_vehicle_history(vehicle, limit, cursor)), 200
+
+
+# DECODE VIN - GET /vehicles/decode/<vin>
+# Offline decode (no database access), e.g. to prefill make/year at the front desk
+@vehicle_bp.route("/decode/<string:vin>", methods=['GET'])
+@jwt_required()
+def decode_vehicle_vin(vin):
+    """
+    Decode a VIN
+    ---
+    tags:
+      - Vehicles
+    summary: Decode a VIN offline
+    description: |
+      Validates the VIN check digit and decodes the manufacturer (WMI), region,
+      model year and assembly plant from bundled lookup tables.
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: vin
+        type: string
+        required: true
+        example: 1HGCM82633A004352
+    responses:
+      200:
+        description: Decoded VIN
+        schema:
+          type: object
+          properties:
+            vin:
+              type: string
+            wmi:
+              type: string
+              example: 1HG
+            manufacturer:
+              type: string
+              example: Honda
+            region:
+              type: string
+              example: United States
+            model_year:
+              type: integer
+              example: 2003
+            plant_code:
+              type: string
+              example: A
+            plant:
+              type: string
+              example: Marysville, OH
+            check_digit_valid:
+              type: boolean
+      400:
+        description: Malformed VIN
+      401:
+        description: Unauthorized - missing or invalid JWT token
+    """
+    try:
+        decoded = decode_vin(vin)
+    except VinDecodeError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(decoded._asdict()), 200
+
+
+# DUE FOR SERVICE - GET /vehicles/due-for-service
+# Pages through the materialized reminder list (rebuilt by: flask reminders refresh)
+# Reminders are stored most-overdue first, so keyset order on reminder_id is due order
+@vehicle_bp.route("/due-for-service", methods=['GET'])
+@jwt_required()
+def get_vehicles_due_for_service():
+    """
+    List vehicles due for a service package
+    ---
+    tags:
+      - Vehicles
+    summary: Vehicles due for service, most overdue first
+    description: |
+      Each entry is a vehicle and a service package whose recommended mileage interval
+      the vehicle is projected to reach within the reminder horizon, based on its
+      odometer readings and mileage accrual rate from ticket history.
+
+      The list is materialized in a batch (flask reminders refresh) and paginated with
+      a keyset cursor: pass the returned next_cursor as cursor to fetch the next page.
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        default: 20
+        description: Reminders per page (max 100)
+      - in: query
+        name: cursor
+        type: integer
+        description: next_cursor value from the previous page
+      - in: query
+        name: package_id
+        type: integer
+        description: Only reminders for this service package
+    responses:
+      200:
+        description: Reminders retrieved successfully
+        schema:
+          type: object
+          properties:
+            reminders:
+              type: array
+              items:
+                type: object
+                properties:
+                  reminder_id:
+                    type: integer
+                  vehicle:
+                    type: object
+                  package_id:
+                    type: integer
+                  package_name:
+                    type: string
+                  projected_odometer_miles:
+                    type: integer
+                  due_odometer_miles:
+                    type: integer
+                  due_date:
+                    type: string
+                    example: "2026-11-02"
+                  miles_per_day:
+                    type: number
+            pagination:
+              type: object
+              properties:
+                limit:
+                  type: integer
+                next_cursor:
+                  type: integer
+                has_next:
+                  type: boolean
+      400:
+        description: Invalid pagination or filter parameter
+      401:
+        description: Unauthorized - missing or invalid JWT token
+    """
+    try:
+        limit, cursor = parse_keyset_args(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    package_id = request.args.get('package_id')
+    if package_id is not None and not package_id.isdigit():
+        return jsonify({"error": "package_id must be an integer"}), 400
+
+    query = select(ServiceReminder).options(
+        joinedload(ServiceReminder.vehicle),
+        joinedload(ServiceReminder.package)
+    )
+    if package_id is not None:
+        query = query.where(ServiceReminder.package_id == int(package_id))
+    query = apply_keyset(query, ServiceReminder.reminder_id, cursor, limit)
+
+    reminders, pagination = keyset_page(db.session.execute(query).scalars().all(), limit, 'reminder_id')
+    return jsonify({
+        "reminders": service_reminders_schema.dump(reminders),
+        "pagination": pagination
+    }), 200
@@ -0,0 +1,15 @@
+from application.extensions import ma
+from application.models import ServiceReminder
+from application.blueprints.customer.customerSchemas import VehicleSchema
+
+
+class ServiceReminderSchema(ma.SQLAlchemyAutoSchema):
+    vehicle = ma.Nested(VehicleSchema, only=('vehicle_id', 'customer_id', 'vin', 'make', 'model', 'year'))
+    package_name = ma.Function(lambda reminder: reminder.package.name)
+
+    class Meta:
+        model = ServiceReminder
+        include_fk = True
+
+
+service_reminders_schema = ServiceReminderSchema(many=True)
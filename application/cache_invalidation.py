@@ -0,0 +1,117 @@
+"""
+Versioned cache keys with automatic invalidation on commit
+
+Read models that are expensive to assemble (vehicle history, customer summaries)
+are cached under a key that embeds a version number for the entity they describe:
+
+    vehicle_history:42:v1697712345123456789:...
+
+Invalidating an entity is just bumping its version; old entries are never read
+again and age out of the cache on their own timeout.
+
+Versions are bumped from SQLAlchemy session events, so routes don't have to
+remember to invalidate anything. Each read model registers a rule with
+@invalidates(Model, ...) that maps a changed row to the (namespace, key) pairs
+it affects. Rules run after every flush; the collected versions are bumped
+after the transaction commits and discarded if it rolls back.
+
+Per-process caches that live outside the application cache (e.g. the identity
+cache) subscribe to a namespace with @on_bump(namespace) and are told the key
+whenever its version is bumped in this process.
+"""
+import time
+from collections import defaultdict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from application.extensions import cache
+
+
+_rules = defaultdict(list)
+_bump_listeners = defaultdict(list)
+_listening = False
+
+
+def _version_key(namespace, key):
+    return f'cache_version:{namespace}:{key}'
+
+
+def cache_version(namespace, key):
+    """
+    Return the current version of one cached entity
+
+    A missing version (never set, or evicted) is initialised to the current time in
+    nanoseconds rather than 0, so entries cached under an evicted version can't be
+    mistaken for fresh ones.
+    """
+    version = cache.get(_version_key(namespace, key))
+    if version is None:
+        version = time.time_ns()
+        cache.set(_version_key(namespace, key), version, timeout=0)
+    return version
+
+
+def bump_cache_version(namespace, key):
+    """Invalidate every cached entry for one entity"""
+    cache.set(_version_key(namespace, key), time.time_ns(), timeout=0)
+    for listener in _bump_listeners.get(namespace, ()):
+        listener(key)
+
+
+def versioned_cache_key(namespace, key, *parts):
+    """Build a cache key that changes whenever the entity's version is bumped"""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{namespace}:{key}:v{cache_version(namespace, key)}:{suffix}'
+
+
+def invalidates(*models):
+    """
+    Register an invalidation rule for one or more mapped classes
+
+    The decorated function is called as rule(session, obj) for every new, changed or
+    deleted instance of the given models and returns an iterable of (namespace, key)
+    pairs whose cache versions must be bumped once the transaction commits.
+    """
+    def decorator(rule):
+        for model in models:
+            _rules[model].append(rule)
+        return rule
+    return decorator
+
+
+def on_bump(namespace):
+    """Register listener(key), called whenever a version in the namespace is bumped in this process"""
+    def decorator(listener):
+        _bump_listeners[namespace].append(listener)
+        return listener
+    return decorator
+
+
+def _collect(session, flush_context):
+    if not _rules:
+        return
+    pending = session.info.setdefault('cache_invalidations', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        for rule in _rules.get(type(obj), ()):
+            pending.update(rule(session, obj) or ())
+
+
+def _apply(session):
+    pending = session.info.pop('cache_invalidations', None)
+    for namespace, key in pending or ():
+        if key is not None:
+            bump_cache_version(namespace, key)
+
+
+def _discard(session):
+    session.info.pop('cache_invalidations', None)
+
+
+def init_cache_invalidation():
+    """Attach the session listeners (safe to call once per app)"""
+    global _listening
+    if _listening:
+        return
+    event.listen(Session, 'after_flush', _collect)
+    event.listen(Session, 'after_commit', _apply)
+    event.listen(Session, 'after_soft_rollback', lambda session, previous_transaction: _discard(session))
+    _listening = True
@@ -0,0 +1,214 @@
+"""
+Flask CLI commands
+
+Registered on the app in create_app(), so they run with the app's configuration:
+
+    flask vin backfill              # Decode VINs for vehicles that have never been decoded
+    flask vin backfill --all        # Re-decode every vehicle (e.g. after updating the lookup tables)
+    flask deletion resume           # Finish deletion jobs that failed or were interrupted by a restart
+    flask reminders refresh         # Rebuild the mileage-based service due list
+    flask tokens purge              # Drop revoked tokens that have expired anyway
+    flask data generate             # Fill an empty database with synthetic data (see application/datagen.py)
+"""
+import os
+import time
+import click
+from sqlalchemy import create_engine, event, func, select, update
+from application.extensions import db
+from application.models import Customer, Vehicle
+from application import datagen
+from application.passwords import password_hasher
+from application.vin_decoder import vin_columns
+from application.deletion import resume_deletion_jobs
+from application.reminders import refresh_service_reminders
+from application.revocation import token_revocation_list
+
+
+def register_commands(app):
+    """Attach the CLI command groups to the app"""
+    app.cli.add_command(vin_cli)
+    app.cli.add_command(deletion_cli)
+    app.cli.add_command(reminders_cli)
+    app.cli.add_command(tokens_cli)
+    app.cli.add_command(data_cli)
+
+
+@click.group('vin', help='VIN decoding maintenance')
+def vin_cli():
+    pass
+
+
+@vin_cli.command('backfill')
+@click.option('--batch-size', default=1000, show_default=True, help='Vehicles decoded and updated per transaction')
+@click.option('--all', 'redecode_all', is_flag=True, help='Re-decode vehicles that already have decoded columns')
+def backfill_vins(batch_size, redecode_all):
+    """Store decoded VIN attributes for existing vehicles"""
+    updated = backfill_vehicle_vins(batch_size=batch_size, redecode_all=redecode_all)
+    click.echo(f'Decoded {updated} vehicle VINs')
+
+
+def backfill_vehicle_vins(batch_size=1000, redecode_all=False):
+    """
+    Decode and store VIN attributes in batches
+
+    Walks the vehicles table in primary key order (keyset, so each batch is an index
+    range seek) and writes each batch with one executemany UPDATE in its own short
+    transaction.
+
+    Returns:
+        int: Number of vehicles updated
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        query = (
+            select(Vehicle.vehicle_id, Vehicle.vin)
+            .where(Vehicle.vehicle_id > last_id)
+            .order_by(Vehicle.vehicle_id)
+            .limit(batch_size)
+        )
+        if not redecode_all:
+            query = query.where(Vehicle.vin_wmi.is_(None), Vehicle.vin_check_digit_valid.is_(None))
+        rows = db.session.execute(query).all()
+        if not rows:
+            break
+
+        db.session.execute(
+            update(Vehicle),
+            [{'vehicle_id': row.vehicle_id, **vin_columns(row.vin)} for row in rows]
+        )
+        db.session.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].vehicle_id
+
+    return updated
+
+
+@click.group('deletion', help='Chunked cascade delete jobs')
+def deletion_cli():
+    pass
+
+
+@deletion_cli.command('resume')
+@click.option('--chunk-size', type=int, default=None, help='Rows deleted per transaction (default: DELETION_CHUNK_SIZE)')
+def resume_deletions(chunk_size):
+    """Run pending, interrupted and failed deletion jobs to completion"""
+    jobs = resume_deletion_jobs(chunk_size=chunk_size)
+    for job in jobs:
+        click.echo(f'{job.job_id} {job.target_type} {job.target_id}: {job.status}')
+    click.echo(f'Resumed {len(jobs)} deletion jobs')
+
+
+@click.group('reminders', help='Mileage-based service reminders')
+def reminders_cli():
+    pass
+
+
+@reminders_cli.command('refresh')
+@click.option('--horizon-days', type=int, default=None, help='Include packages due within this many days (default: REMINDER_HORIZON_DAYS)')
+def refresh_reminders(horizon_days):
+    """Recompute which vehicles are due for which service packages"""
+    started = time.perf_counter()
+    stored = refresh_service_reminders(horizon_days=horizon_days)
+    click.echo(f'Stored {stored} service reminders in {time.perf_counter() - started:.2f}s')
+
+
+@click.group('tokens', help='JWT revocation list maintenance')
+def tokens_cli():
+    pass
+
+
+@tokens_cli.command('purge')
+def purge_tokens():
+    """Delete revoked tokens whose expiry has passed"""
+    purged = token_revocation_list.purge_expired()
+    click.echo(f'Purged {purged} expired revoked tokens')
+
+
+@click.group('data', help='Synthetic data for development and load tests')
+def data_cli():
+    pass
+
+
+@data_cli.command('generate')
+@click.option('--scale', type=click.Choice(list(datagen.SCALES)), default='small', show_default=True,
+              help='Row count preset')
+@click.option('--customers', type=int, help='Customers (overrides the preset)')
+@click.option('--vehicles', type=int, help='Vehicles (overrides the preset)')
+@click.option('--tickets', type=int, help='Service tickets (overrides the preset)')
+@click.option('--parts', type=int, help='Parts (overrides the preset)')
+@click.option('--mechanics', type=int, help='Mechanics (default: one per 2,500 tickets)')
+@click.option('--seed', type=int, default=42, show_default=True, help='Random seed')
+@click.option('--until', type=click.DateTime(['%Y-%m-%d']), help='Last day of ticket history (default: today)')
+@click.option('--batch-size', type=int, default=datagen.DEFAULT_BATCH_SIZE, show_default=True,
+              help='Rows per INSERT')
+@click.option('--sqlite', 'sqlite_path', type=click.Path(dir_okay=False), help='Write a new SQLite database file')
+@click.option('--mysql-dump', 'dump_path', type=click.Path(dir_okay=False), help='Write a MySQL dump (data only)')
+@click.option('--force', is_flag=True, help='Overwrite an existing --sqlite or --mysql-dump file')
+def generate_data(scale, customers, vehicles, tickets, parts, mechanics, seed, until, batch_size, sqlite_path,
+                  dump_path, force):
+    """Generate a reproducible dataset into the app's empty database, a SQLite file or a MySQL dump"""
+    if sqlite_path and dump_path:
+        raise click.UsageError('Pass one of --sqlite and --mysql-dump')
+    counts = datagen.scale_counts(scale, customers=customers, vehicles=vehicles, tickets=tickets, parts=parts,
+                                  mechanics=mechanics)
+    output = sqlite_path or dump_path
+    if output and os.path.exists(output):
+        if not force:
+            raise click.ClickException(f'{output} already exists (pass --force to overwrite it)')
+        os.remove(output)
+    # Every customer gets the same password, hashed once with the app's settings
+    password_hash = password_hasher.hash(datagen.DEFAULT_PASSWORD)
+    options = {'seed': seed, 'until': until, 'password_hash': password_hash, 'batch_size': batch_size,
+               'progress': _progress}
+    click.echo(f'Generating {counts} with seed {seed}')
+    started = time.perf_counter()
+
+    if dump_path:
+        header = (f'-- Synthetic data from `flask data generate --scale {scale} --seed {seed}`: {counts}\n'
+                  f'-- Load into an empty, migrated database (flask db upgrade): '
+                  f'mysql -u root -p mechanic_shop_v3 < {os.path.basename(dump_path)}\n'
+                  f'-- Log in as {datagen.DEMO_CUSTOMER[2]}; every customer\'s password is {datagen.DEFAULT_PASSWORD}\n\n')
+        with open(dump_path, 'w', encoding='utf-8') as file:
+            writer = datagen.MySQLDumpWriter(file, batch_size, header=header)
+            written = datagen.generate(writer, counts, **options)
+            writer.close()
+    elif sqlite_path:
+        engine = create_engine(f'sqlite:///{os.path.abspath(sqlite_path)}')
+        event.listen(engine, 'connect', _fast_sqlite_load)
+        db.metadata.create_all(engine)
+        writer = datagen.DatabaseWriter(engine, batch_size)
+        try:
+            written = datagen.generate(writer, counts, **options)
+        finally:
+            writer.close()
+            engine.dispose()
+    else:
+        if db.session.scalar(select(func.count()).select_from(Customer)):
+            raise click.ClickException('The database already has customers; generate into an empty database '
+                                       '(or use --sqlite / --mysql-dump)')
+        db.session.remove()
+        writer = datagen.DatabaseWriter(db.engine, batch_size)
+        try:
+            written = datagen.generate(writer, counts, **options)
+        finally:
+            writer.close()
+
+    click.echo()
+    click.echo(f'Wrote {sum(written.values())} rows in {time.perf_counter() - started:.1f}s '
+               f'to {output or "the app database"}')
+    click.echo(f'Log in as {datagen.DEMO_CUSTOMER[2]} (every customer\'s password is {datagen.DEFAULT_PASSWORD})')
+    click.echo('Run `flask reminders refresh` to build the service due list from the new tickets')
+
+
+def _progress(table, rows):
+    click.echo(f'\r  {table}: {rows}'.ljust(40), nl=False)
+
+
+def _fast_sqlite_load(dbapi_connection, connection_record):
+    # A half-written file is thrown away anyway, so skip the rollback journal and fsyncs
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode = OFF')
+    cursor.execute('PRAGMA synchronous = OFF')
+    cursor.close()
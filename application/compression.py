@@ -0,0 +1,183 @@
+"""
+Response compression
+
+Ticket lists and inventory exports are hundreds of KB of repetitive JSON, and
+they shrink 10-20x compressed. ResponseCompressor is an after_request hook that
+compresses responses with gzip, or brotli when it is installed, whichever the
+client's Accept-Encoding prefers (q-values honored; ties go to COMPRESSION_ALGORITHMS
+order):
+
+    COMPRESSION_ENABLED = True
+    COMPRESSION_ALGORITHMS = ('br', 'gzip')   # server preference
+    COMPRESSION_MIN_SIZE = 1024               # bytes; smaller bodies are sent as is
+    COMPRESSION_GZIP_LEVEL = 6                # 1 (fast) .. 9 (small)
+    COMPRESSION_BROTLI_LEVEL = 4              # 0 .. 11; above ~5 is too slow per request
+    COMPRESSION_MIMETYPES = ('application/json', 'text/html', ...)
+    COMPRESSION_CACHE_SIZE = 64               # compressed bodies kept, 0 to disable
+
+- Streamed responses are compressed chunk by chunk (each chunk is flushed, so
+  the client still receives data as it is produced); the size threshold does
+  not apply since the length isn't known up front.
+- Responses that are already encoded, partial (206), bodiless (204/304),
+  file passthroughs, or marked Cache-Control: no-transform are left alone.
+- Responses that carry an ETag are the ones served repeatedly from a cache
+  (the catalog snapshot, the cached mechanic list): their compressed bytes are
+  kept in an LRU keyed by (ETag, encoding, level), so the same payload isn't
+  compressed twice. A compressed response's ETag is made weak, since the bytes
+  on the wire differ; If-None-Match comparisons are weak, so 304s still work.
+"""
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+DEFAULT_MIMETYPES = (
+    'application/json', 'application/javascript', 'text/html', 'text/css', 'text/plain',
+    'text/csv', 'text/javascript', 'image/svg+xml'
+)
+
+_SKIP_STATUS = (204, 206, 304)
+
+
+class ResponseCompressor:
+    """Flask extension compressing responses negotiated from Accept-Encoding"""
+
+    def __init__(self, app=None):
+        self.algorithms = ('br', 'gzip')
+        self.min_size = 1024
+        self.levels = {'gzip': 6, 'br': 4}
+        self.mimetypes = frozenset(DEFAULT_MIMETYPES)
+        self.cache_size = 64
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        algorithms = tuple(config.setdefault('COMPRESSION_ALGORITHMS', self.algorithms))
+        unknown = [name for name in algorithms if name not in ('br', 'gzip')]
+        if unknown:
+            raise ValueError(f"Unknown COMPRESSION_ALGORITHMS {unknown}, expected 'br' and/or 'gzip'")
+        # Brotli is optional: without the package only gzip is offered
+        self.algorithms = tuple(name for name in algorithms if name != 'br' or brotli is not None)
+        self.min_size = config.setdefault('COMPRESSION_MIN_SIZE', self.min_size)
+        self.levels = {
+            'gzip': config.setdefault('COMPRESSION_GZIP_LEVEL', self.levels['gzip']),
+            'br': config.setdefault('COMPRESSION_BROTLI_LEVEL', self.levels['br'])
+        }
+        self.mimetypes = frozenset(config.setdefault('COMPRESSION_MIMETYPES', DEFAULT_MIMETYPES))
+        self.cache_size = config.setdefault('COMPRESSION_CACHE_SIZE', self.cache_size)
+        self.clear()
+        if config.setdefault('COMPRESSION_ENABLED', True) and self.algorithms:
+            app.after_request(self.after_request)
+        app.extensions['compression'] = self
+
+    def clear(self):
+        """Drop the cached compressed bodies"""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    # ===== NEGOTIATION =====
+
+    def negotiate(self, accept_encodings):
+        """Best encoding the client accepts (highest q, then our preference), or None"""
+        best, best_quality = None, 0
+        for name in self.algorithms:
+            quality = accept_encodings.quality(name)
+            if quality > best_quality:
+                best, best_quality = name, quality
+        return best
+
+    def after_request(self, response):
+        if response.mimetype not in self.mimetypes:
+            return response
+        # The body depends on Accept-Encoding from here on, whatever we decide for this one
+        response.vary.add('Accept-Encoding')
+        if (response.status_code < 200 or response.status_code in _SKIP_STATUS or response.direct_passthrough
+                or 'Content-Encoding' in response.headers or response.cache_control.no_transform):
+            return response
+
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(self._compress_cached(data, encoding, response.get_etag()[0]))
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    # ===== COMPRESSION =====
+
+    def compress(self, data, encoding):
+        """Compress a whole body (gzip output is reproducible: no timestamp)"""
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.levels['br'])
+        return gzip.compress(data, compresslevel=self.levels['gzip'], mtime=0)
+
+    def _compress_cached(self, data, encoding, etag):
+        if etag is None or not self.cache_size:
+            return self.compress(data, encoding)
+
+        key = (etag, encoding, self.levels[encoding])
+        with self._lock:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+
+        compressed = self.compress(data, encoding)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def _compress_stream(self, chunks, encoding):
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.levels['br'])
+            compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.levels['gzip'], zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip wrapper
+            compress, finish = compressor.compress, compressor.flush
+            flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                data = compress(chunk) + flush()
+                if data:
+                    yield data
+            yield finish()
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+
+# Response compression, initialized in the app factory
+compressor = ResponseCompressor()
@@ -0,0 +1,53 @@
+"""
+Cached row counters
+
+A full COUNT(*) on a large table is a scan on every request. A CachedCounter keeps
+the total in the application cache, adjusts it on the writes that change it, and
+falls back to a real COUNT only when the cached value is missing or has expired.
+
+The value is approximate: concurrent writers on different processes can make it
+drift slightly, and the timeout bounds how long any drift can survive.
+"""
+from sqlalchemy import select, func
+from application.extensions import db, cache
+from application.db_routing import primary_reads
+from application.models import Customer
+
+
+class CachedCounter:
+    """A row count for one table, served from the cache and adjusted on write"""
+
+    def __init__(self, key, column, timeout=600):
+        """
+        Args:
+            key (str): Cache key the total is stored under
+            column: Column to count (normally the table's primary key)
+            timeout (int): Seconds before the total is recounted from the database
+        """
+        self.key = key
+        self.column = column
+        self.timeout = timeout
+
+    def get(self):
+        """Return the cached total, counting the table only on a cache miss"""
+        total = cache.get(self.key)
+        if total is None:
+            # Counted on the primary: later writes adjust this total, not a replica's older one
+            with primary_reads():
+                total = db.session.execute(select(func.count(self.column))).scalar() or 0
+            cache.set(self.key, total, timeout=self.timeout)
+        return total
+
+    def adjust(self, delta):
+        """Apply a change to the cached total (a missing total is left for the next get() to recount)"""
+        if cache.get(self.key) is not None:
+            # inc() lives on the cache backend; Flask-Caching's wrapper does not proxy it
+            cache.cache.inc(self.key, delta)
+
+    def invalidate(self):
+        """Drop the cached total so the next get() recounts"""
+        cache.delete(self.key)
+
+
+# Total number of customer accounts (adjusted by register, create and delete)
+customer_counter = CachedCounter('counters:customers', Customer.customer_id)
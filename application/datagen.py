@@ -0,0 +1,503 @@
+"""
+Synthetic data generator
+
+Fills every table a running shop accumulates with realistic, reproducible rows:
+
+- customers, with one shared password (DEFAULT_PASSWORD) so any of them can log
+  in; customer 1 is always alice.johnson@email.com
+- vehicles: most customers own one or two, a few run fleets; makes weighted by
+  market share, model years skewed recent, and VINs that decode (real WMI and
+  plant codes, valid check digit), with the decoded columns filled in
+- mechanics and their specializations (certifications with expiry dates)
+- the service catalog: services, prerequisites, packages and package items
+- parts: a catalog per category with log-normal costs
+- service tickets spread evenly over the five years before --until: old tickets
+  are completed or cancelled, recent ones open or in progress; odometers grow
+  with each vehicle's own mileage rate; busy vehicles come back more often
+- for each ticket, one to four line items (common services far more often),
+  one to three mechanics, and for about half of them parts, where a few fast
+  movers make up most of the usage
+
+The same seed, counts and --until date give the same rows (the shared password
+hash is salted, so it differs between runs). Service reminders are derived
+data: run `flask reminders refresh` afterwards. Deletion jobs and revoked
+tokens stay empty.
+
+Rows go out through bulk Core inserts of batch_size rows, either into a
+database (DatabaseWriter) or as multi-row INSERT statements in a MySQL dump
+(MySQLDumpWriter). Tickets and their child rows are generated a batch at a
+time, so memory stays flat however many tickets are asked for.
+
+    flask data generate --scale sample                         # into the app's (empty) database
+    flask data generate --scale large --sqlite /tmp/shop.db    # a new SQLite file
+    flask data generate --scale medium --mysql-dump dump.sql   # for: mysql mechanic_shop_v3 < dump.sql
+"""
+import random
+from array import array
+from datetime import datetime, timedelta
+from decimal import Decimal
+from application.models import (
+    Customer, Vehicle, Mechanic, Specialization, MechanicSpecialization, Service, ServicePrerequisite,
+    ServicePackage, ServicePackageItem, Part, ServiceTicket, TicketLineItem, TicketMechanic, TicketPart,
+    normalize_phone
+)
+from application.vin_decoder import compute_check_digit, load_vin_tables, vin_columns
+
+DEFAULT_PASSWORD = 'password123'
+# Customer 1, the login the docs use for trying the API
+DEMO_CUSTOMER = ('Alice', 'Johnson', 'alice.johnson@email.com')
+DEFAULT_BATCH_SIZE = 5000
+
+# Row counts per preset; mechanics default to one per 2,500 tickets (at least 5)
+SCALES = {
+    'sample': {'customers': 25, 'vehicles': 40, 'tickets': 150, 'parts': 60},
+    'small': {'customers': 2_000, 'vehicles': 3_200, 'tickets': 20_000, 'parts': 1_600},
+    'medium': {'customers': 10_000, 'vehicles': 16_000, 'tickets': 100_000, 'parts': 8_000},
+    'large': {'customers': 50_000, 'vehicles': 80_000, 'tickets': 500_000, 'parts': 40_000},
+    'xlarge': {'customers': 500_000, 'vehicles': 800_000, 'tickets': 5_000_000, 'parts': 100_000},
+}
+
+HISTORY_DAYS = 5 * 365
+RECENT_DAYS = 14  # Tickets opened in the last two weeks may still be open
+
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+    'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Charles', 'Karen',
+    'Christopher', 'Lisa', 'Daniel', 'Nancy', 'Matthew', 'Betty', 'Anthony', 'Sandra', 'Mark', 'Margaret',
+    'Steven', 'Ashley', 'Andrew', 'Emily', 'Joshua', 'Donna', 'Kevin', 'Michelle', 'Brian', 'Carol',
+    'Maria', 'Jose', 'Wei', 'Priya', 'Ahmed', 'Olga', 'Kenji', 'Fatima', 'Luis', 'Aisha'
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Ramirez', 'Lewis', 'Robinson',
+    'Walker', 'Young', 'Allen', 'King', 'Wright', 'Scott', 'Torres', 'Nguyen', 'Hill', 'Flores',
+    'Green', 'Adams', 'Nelson', 'Baker', 'Hall', 'Rivera', 'Campbell', 'Mitchell', "O'Brien", 'Patel'
+]
+STREETS = ['Main St', 'Oak Ave', 'Pine Rd', 'Elm St', 'Maple Dr', 'Cedar Ln', 'Washington Blvd', 'Lake St',
+           'Hill Rd', 'Park Ave', 'Colfax Ave', 'Broadway', 'Sunset Dr', 'River Rd', 'Aspen Way']
+# (city, state, ZIP prefix, share of customers)
+CITIES = [('Denver', 'CO', '802', 30), ('Aurora', 'CO', '800', 15), ('Lakewood', 'CO', '802', 10),
+          ('Littleton', 'CO', '801', 8), ('Boulder', 'CO', '803', 8), ('Arvada', 'CO', '800', 7),
+          ('Westminster', 'CO', '800', 6), ('Centennial', 'CO', '801', 6), ('Golden', 'CO', '804', 4),
+          ('Cheyenne', 'WY', '820', 3), ('Colorado Springs', 'CO', '809', 3)]
+AREA_CODES = ['303', '720', '719', '970']
+
+# (make, market share, models); WMIs and plant codes come from the VIN decoder's tables
+MAKES = [
+    ('Toyota', 15, ['Camry', 'Corolla', 'RAV4', 'Tacoma', 'Highlander', 'Prius']),
+    ('Ford', 13, ['F-150', 'Escape', 'Explorer', 'Focus', 'Mustang', 'Ranger']),
+    ('Chevrolet', 12, ['Silverado', 'Malibu', 'Equinox', 'Tahoe', 'Colorado']),
+    ('Honda', 11, ['Accord', 'Civic', 'CR-V', 'Odyssey', 'Pilot']),
+    ('Nissan', 7, ['Altima', 'Sentra', 'Rogue', 'Frontier']),
+    ('Subaru', 6, ['Outback', 'Forester', 'Crosstrek', 'Impreza']),
+    ('Jeep', 5, ['Wrangler', 'Grand Cherokee', 'Cherokee']),
+    ('Hyundai', 5, ['Elantra', 'Sonata', 'Tucson', 'Santa Fe']),
+    ('Kia', 4, ['Soul', 'Sorento', 'Sportage', 'Forte']),
+    ('GMC', 4, ['Sierra', 'Acadia', 'Terrain']),
+    ('Ram', 4, ['1500', '2500']),
+    ('Volkswagen', 3, ['Jetta', 'Passat', 'Tiguan']),
+    ('Mazda', 3, ['Mazda3', 'CX-5', 'CX-9']),
+    ('BMW', 2, ['328i', 'X3', 'X5']),
+    ('Mercedes-Benz', 2, ['C300', 'GLC', 'E350']),
+    ('Tesla', 2, ['Model 3', 'Model Y']),
+    ('Lexus', 2, ['RX 350', 'ES 350']),
+]
+COLORS = [('White', 25), ('Black', 22), ('Gray', 18), ('Silver', 13), ('Blue', 9), ('Red', 9), ('Green', 2),
+          ('Brown', 2)]
+
+# The shop's catalog: (name, labor minutes, price in cents, share of line items)
+SERVICES = [
+    ('Oil Change', 30, 3500, 30), ('Tire Rotation', 45, 2500, 14), ('Brake Inspection', 60, 5000, 9),
+    ('Brake Pad Replacement', 120, 15000, 7), ('Engine Diagnostic', 90, 8500, 9),
+    ('Air Filter Replacement', 15, 2000, 8), ('Coolant Flush', 60, 7500, 4), ('Transmission Service', 180, 20000, 3),
+    ('Wheel Alignment', 90, 8000, 6), ('Battery Replacement', 30, 12000, 5), ('Cabin Air Filter Replacement', 15, 2500, 4),
+    ('Spark Plug Replacement', 90, 16000, 2), ('AC Recharge', 45, 13000, 3), ('Suspension Inspection', 45, 6000, 2),
+]
+# (service, prerequisite, required, recommended gap in hours, reason)
+PREREQUISITES = [
+    ('Brake Pad Replacement', 'Brake Inspection', True, None,
+     'Brake inspection must be completed before brake pad replacement'),
+    ('Transmission Service', 'Engine Diagnostic', False, 24,
+     'Engine diagnostic recommended before transmission service to rule out engine issues'),
+    ('Spark Plug Replacement', 'Engine Diagnostic', False, None, 'Confirm the misfire before replacing plugs'),
+    ('Wheel Alignment', 'Suspension Inspection', False, None, 'Worn suspension parts throw an alignment off again'),
+]
+# (name, description, discount %, active, mileage interval, [(service, optional, extra discount %)])
+PACKAGES = [
+    ('Basic Maintenance Package', 'Oil change, tire rotation, and multi-point inspection', 10, True, 5000,
+     [('Oil Change', False, 0), ('Tire Rotation', False, 0)]),
+    ('Premium Maintenance Package', 'Includes basic package plus air filter and fluid top-off', 15, True, 7500,
+     [('Oil Change', False, 0), ('Tire Rotation', False, 0), ('Air Filter Replacement', False, 0),
+      ('Cabin Air Filter Replacement', True, 5)]),
+    ('Brake Service Package', 'Complete brake inspection and service', 12, True, 30000,
+     [('Brake Inspection', False, 0), ('Brake Pad Replacement', True, 5)]),
+    ('Major Service Package', '30k/60k/90k mile major service', 20, True, 30000,
+     [('Oil Change', False, 0), ('Tire Rotation', False, 0), ('Air Filter Replacement', False, 0),
+      ('Coolant Flush', False, 0), ('Transmission Service', True, 10), ('Spark Plug Replacement', True, 10)]),
+    ('Summer Ready Package', 'AC recharge and battery check before the heat', 8, False, None,
+     [('AC Recharge', False, 0), ('Battery Replacement', True, 0)]),
+]
+# (name, description, category, certificate prefix)
+SPECIALIZATIONS = [
+    ('ASE Master Technician', 'Master level automotive service excellence certification', 'General', 'ASE'),
+    ('Brake Specialist', 'Advanced training in brake systems', 'Brakes', 'BRK'),
+    ('Engine Specialist', 'Advanced training in engine repair and diagnostics', 'Engine', 'ENG'),
+    ('Electrical Systems', 'Advanced training in automotive electrical systems', 'Electrical', 'ELC'),
+    ('Transmission Specialist', 'Advanced training in automatic and manual transmissions', 'Transmission', 'TRN'),
+    ('Hybrid/Electric Vehicle', 'Certified for hybrid and electric vehicle service', 'Alternative Fuel', 'HEV'),
+    ('HVAC Systems', 'Climate control systems specialist', 'Climate Control', 'HVC'),
+    ('Suspension & Steering', 'Suspension and steering systems expert', 'Suspension', 'SUS'),
+]
+PROFICIENCY_LEVELS = [('Beginner', 15), ('Intermediate', 35), ('Advanced', 35), ('Expert', 15)]
+# category: (part number prefix, median cost in cents, [(part, description)])
+PART_CATEGORIES = {
+    'Fluids': ('FLD', 1500, [('Engine Oil 5W-30', 'Synthetic blend engine oil, 5 quarts'),
+                             ('Coolant/Antifreeze', 'Pre-mixed coolant, 1 gallon'),
+                             ('Transmission Fluid', 'ATF transmission fluid, 1 quart'),
+                             ('Brake Fluid DOT 4', 'High temperature brake fluid, 12 oz')]),
+    'Filters': ('FLT', 1200, [('Oil Filter', 'Spin-on oil filter'), ('Air Filter', 'Engine air filter'),
+                              ('Cabin Air Filter', 'HVAC cabin air filter'), ('Fuel Filter', 'Inline fuel filter')]),
+    'Brakes': ('BRK', 5000, [('Brake Pad Set - Front', 'Ceramic brake pads, front axle'),
+                             ('Brake Pad Set - Rear', 'Ceramic brake pads, rear axle'),
+                             ('Brake Rotor - Front', 'Vented brake rotor, front'),
+                             ('Brake Caliper', 'Remanufactured brake caliper')]),
+    'Electrical': ('ELC', 6000, [('Car Battery 12V', '650 CCA battery'), ('Alternator', 'Remanufactured alternator'),
+                                 ('Starter Motor', 'Remanufactured starter'), ('Spark Plug', 'Iridium spark plug')]),
+    'Tires': ('TIR', 11000, [('All-Season Tire', 'Standard all-season tire'), ('Winter Tire', 'Studless winter tire'),
+                             ('Valve Stem', 'Rubber snap-in valve stem')]),
+    'Suspension': ('SUS', 9000, [('Strut Assembly', 'Complete front strut assembly'),
+                                 ('Control Arm', 'Lower control arm with ball joint'),
+                                 ('Tie Rod End', 'Outer tie rod end')]),
+    'Engine': ('ENG', 7000, [('Serpentine Belt', 'Multi-rib drive belt'), ('Water Pump', 'Engine water pump'),
+                             ('Thermostat', 'Engine thermostat with gasket'), ('Ignition Coil', 'Ignition coil pack')]),
+}
+MANUFACTURERS = ['Bosch', 'ACDelco', 'Motorcraft', 'Denso', 'NGK', 'Wagner', 'Brembo', 'FRAM', 'Mobil 1',
+                 'Valvoline', 'Monroe', 'Moog', 'Gates', 'Interstate', 'Michelin']
+SUPPLIERS = ['Auto Parts Warehouse', 'Brake Supply Co', 'Battery Depot', 'Tire Distributors', 'Rocky Mountain Parts']
+PROBLEMS = [
+    'Regular maintenance - oil change and tire rotation', 'Customer reports squeaking noise when braking',
+    'Check engine light is on - needs diagnostic', 'Annual inspection and maintenance package',
+    'Transmission slipping, needs inspection', "Battery replacement - car won't start",
+    'Vehicle pulls to the right', 'AC blowing warm air', 'Grinding noise from front wheels',
+    'Rough idle and hesitation on acceleration', 'Coolant leak under the engine', 'Scheduled 30k mile service',
+    'Tires worn unevenly', 'Vibration at highway speed', 'Clunking over bumps'
+]
+TICKET_PRIORITIES = [(1, 10), (2, 25), (3, 40), (4, 17), (5, 8)]
+MECHANICS_PER_TICKET = [(1, 70), (2, 25), (3, 5)]
+LINE_ITEMS_PER_TICKET = [(1, 45), (2, 30), (3, 15), (4, 10)]
+PARTS_PER_TICKET = [(0, 45), (1, 25), (2, 18), (3, 8), (4, 4)]
+PART_QUANTITIES = [(1, 70), (2, 15), (4, 10), (6, 5)]
+WARRANTY_MONTHS = [(None, 20), (3, 20), (6, 15), (12, 25), (24, 12), (36, 8)]
+
+# Model year codes (VIN position 10) repeat every 30 years from 1980
+MODEL_YEAR_CODES = 'ABCDEFGHJKLMNPRSTVWXY123456789'
+VIN_CHARACTERS = '0123456789ABCDEFGHJKLMNPRSTUVWXYZ'
+VIN_LETTERS = 'ABCDEFGHJKLMNPRSTUVWXYZ'
+
+
+def scale_counts(scale='small', **overrides):
+    """Row counts for a preset, with any of customers/vehicles/tickets/parts/mechanics overridden"""
+    counts = dict(SCALES[scale])
+    counts.update((name, value) for name, value in overrides.items() if value is not None)
+    counts.setdefault('mechanics', max(5, counts['tickets'] // 2500))
+    return counts
+
+
+class DatabaseWriter:
+    """Insert rows into a database with executemany batches, committing each batch"""
+
+    def __init__(self, engine, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.connection = engine.connect()
+
+    def insert(self, table, rows):
+        rows = list(rows)
+        for start in range(0, len(rows), self.batch_size):
+            self.connection.execute(table.insert(), rows[start:start + self.batch_size])
+            self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class MySQLDumpWriter:
+    """Write rows to a text file as multi-row MySQL INSERT statements"""
+
+    _ESCAPES = str.maketrans({'\\': '\\\\', "'": "\\'", '\n': '\\n', '\r': '\\r', '\0': '\\0', '\x1a': '\\Z'})
+
+    def __init__(self, file, batch_size=DEFAULT_BATCH_SIZE, header=''):
+        self.file = file
+        self.batch_size = batch_size
+        file.write(header)
+        file.write('SET NAMES utf8mb4;\nSET FOREIGN_KEY_CHECKS = 0;\nSET UNIQUE_CHECKS = 0;\nSET autocommit = 0;\n\n')
+
+    def insert(self, table, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        columns = list(rows[0])
+        prefix = f"INSERT INTO `{table.name}` ({', '.join(f'`{column}`' for column in columns)}) VALUES\n"
+        for start in range(0, len(rows), self.batch_size):
+            values = ',\n'.join(
+                '(' + ', '.join(self.literal(row[column]) for column in columns) + ')'
+                for row in rows[start:start + self.batch_size]
+            )
+            self.file.write(f'{prefix}{values};\nCOMMIT;\n')
+
+    def literal(self, value):
+        if value is None:
+            return 'NULL'
+        if isinstance(value, bool):
+            return '1' if value else '0'
+        if isinstance(value, (int, float, Decimal)):
+            return str(value)
+        if isinstance(value, datetime):
+            return f"'{value:%Y-%m-%d %H:%M:%S}'"
+        return "'" + str(value).translate(self._ESCAPES) + "'"
+
+    def close(self):
+        self.file.write('\nSET UNIQUE_CHECKS = 1;\nSET FOREIGN_KEY_CHECKS = 1;\n')
+
+
+def _picker(rng, weighted):
+    """Function drawing one value from [(value, weight), ...]"""
+    values = [value for value, _ in weighted]
+    cumulative = []
+    total = 0
+    for _, weight in weighted:
+        total += weight
+        cumulative.append(total)
+    return lambda: rng.choices(values, cum_weights=cumulative)[0]
+
+
+def generate(writer, counts, seed=42, until=None, password_hash='!', batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Write a complete synthetic dataset through writer (the target tables must be empty)
+
+    Args:
+        writer: DatabaseWriter or MySQLDumpWriter
+        counts: Row counts, see scale_counts()
+        seed: Random seed; the same seed, counts and until give the same rows
+        until: Date the history ends (default: today)
+        password_hash: Stored for every customer (hash DEFAULT_PASSWORD to allow logins)
+        progress: Optional callback(table name, rows written so far)
+
+    Returns:
+        dict: Rows written per table
+    """
+    rng = random.Random(seed)
+    if until is None:
+        until = datetime.now()
+    until = datetime(until.year, until.month, until.day)
+    start = until - timedelta(days=HISTORY_DAYS)
+    written = {}
+
+    def write(model, rows):
+        writer.insert(model.__table__, rows)
+        name = model.__tablename__
+        written[name] = written.get(name, 0) + len(rows)
+        if progress:
+            progress(name, written[name])
+
+    # ----- Reference data: the catalog and specializations -----
+    service_ids = {name: number for number, (name, *_) in enumerate(SERVICES, 1)}
+    write(Service, [{'service_id': number, 'name': name, 'default_labor_minutes': minutes, 'base_price_cents': price}
+                    for number, (name, minutes, price, _) in enumerate(SERVICES, 1)])
+    write(ServicePrerequisite, [{'service_id': service_ids[service], 'prerequisite_service_id': service_ids[before],
+                                 'is_required': required, 'recommended_gap_hours': gap, 'reason': reason}
+                                for service, before, required, gap, reason in PREREQUISITES])
+    write(ServicePackage, [{'package_id': number, 'name': name, 'description': description,
+                            'package_discount_percentage': Decimal(discount), 'is_active': active,
+                            'recommended_mileage_interval': interval}
+                           for number, (name, description, discount, active, interval, _) in enumerate(PACKAGES, 1)])
+    write(ServicePackageItem, [{'package_id': number, 'service_id': service_ids[service], 'quantity': 1,
+                                'is_optional': optional, 'discount_percentage': Decimal(discount),
+                                'sequence_order': order}
+                               for number, package in enumerate(PACKAGES, 1)
+                               for order, (service, optional, discount) in enumerate(package[5], 1)])
+    write(Specialization, [{'specialization_id': number, 'name': name, 'description': description,
+                            'category': category}
+                           for number, (name, description, category, _) in enumerate(SPECIALIZATIONS, 1)])
+
+    # ----- Customers -----
+    city = _picker(rng, [(entry[:3], entry[3]) for entry in CITIES])
+    rows = []
+    for number in range(1, counts['customers'] + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first}.{last.replace(chr(39), '')}{number}@example.com".lower()
+        if number == 1:
+            first, last, email = DEMO_CUSTOMER
+        phone = f'{rng.choice(AREA_CODES)}-555-{rng.randrange(10000):04d}'
+        name, state, zip_prefix = city()
+        rows.append({
+            'customer_id': number, 'first_name': first, 'last_name': last, 'email': email, 'email_lower': email,
+            'phone': phone, 'phone_normalized': normalize_phone(phone),
+            'address': f'{rng.randint(1, 9999)} {rng.choice(STREETS)}', 'city': name, 'state': state,
+            'postal_code': f'{zip_prefix}{rng.randrange(100):02d}', 'password_hash': password_hash,
+            'token_version': 0, 'created_at': start + timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+        })
+        if len(rows) == batch_size:
+            write(Customer, rows)
+            rows = []
+    write(Customer, rows)
+
+    # ----- Vehicles: everyone owns one while they last; extras go to households (70%) and fleets (30%) -----
+    customers = list(range(1, counts['customers'] + 1))
+    rng.shuffle(customers)
+    fleets = customers[:max(1, len(customers) // 100)]
+    owners = array('l', customers[:counts['vehicles']])
+    for _ in range(counts['vehicles'] - len(owners)):
+        owners.append(rng.choice(fleets) if rng.random() < 0.3 else rng.choice(customers))
+    tables = load_vin_tables()
+    makes = []
+    for make, share, models in MAKES:
+        wmis = sorted(wmi for wmi, manufacturer in tables['wmi'].items() if manufacturer == make)
+        plants = ''.join(sorted(tables['plants'].get(make, {}))) or VIN_CHARACTERS
+        makes.append(((make, models, wmis, plants), share))
+    make_picker = _picker(rng, makes)
+    color = _picker(rng, COLORS)
+    model_years = array('l')
+    miles_per_day = array('d')
+    rows = []
+    for number in range(1, counts['vehicles'] + 1):
+        (make, models, wmis, plants) = make_picker()
+        year = max(until.year - 25, until.year + 1 - int(rng.expovariate(1 / 6)))
+        vin = _vin(rng, number, rng.choice(wmis), year, rng.choice(plants))
+        model_years.append(year)
+        miles_per_day.append(rng.lognormvariate(3.4, 0.4))  # ~30 miles a day, 12k a year
+        rows.append({'vehicle_id': number, 'customer_id': owners[number - 1], 'vin': vin, 'make': make,
+                     'model': rng.choice(models), 'year': year, 'color': color(), **vin_columns(vin)})
+        if len(rows) == batch_size:
+            write(Vehicle, rows)
+            rows = []
+    write(Vehicle, rows)
+
+    # ----- Mechanics and their certifications -----
+    proficiency = _picker(rng, PROFICIENCY_LEVELS)
+    mechanics, certifications = [], []
+    for number in range(1, counts['mechanics'] + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        mechanics.append({'mechanic_id': number, 'full_name': f'{first} {last}',
+                          'email': f"{first}.{last.replace(chr(39), '')}{number}@mechanicshop.com".lower(),
+                          'phone': f'{rng.choice(AREA_CODES)}-555-{rng.randrange(10000):04d}',
+                          'salary': int(max(38000, rng.gauss(62000, 9000)) // 500 * 500),
+                          'is_active': rng.random() < 0.92})
+        for specialization in rng.sample(range(1, len(SPECIALIZATIONS) + 1), rng.choice((1, 1, 2, 2, 3, 4))):
+            certified = until - timedelta(days=rng.randrange(10 * 365))
+            certifications.append({
+                'mechanic_id': number, 'specialization_id': specialization, 'certified_date': certified,
+                'expiration_date': certified + timedelta(days=5 * 365) if rng.random() < 0.8 else None,
+                'certification_number': f'{SPECIALIZATIONS[specialization - 1][3]}-{certified.year}-{number:05d}',
+                'proficiency_level': proficiency()
+            })
+    write(Mechanic, mechanics)
+    write(MechanicSpecialization, certifications)
+
+    # ----- Parts -----
+    categories = list(PART_CATEGORIES.items())
+    part_costs = array('l')
+    rows = []
+    for number in range(1, counts['parts'] + 1):
+        category, (prefix, median_cost, templates) = rng.choice(categories)
+        name, description = rng.choice(templates)
+        manufacturer = rng.choice(MANUFACTURERS)
+        cost = max(100, int(median_cost * rng.lognormvariate(0, 0.5)))
+        part_costs.append(cost)
+        rows.append({'part_id': number, 'part_number': f'{prefix}-{number:06d}',
+                     'name': f'{name} ({manufacturer})', 'description': description, 'category': category,
+                     'manufacturer': manufacturer, 'current_cost_cents': cost,
+                     'quantity_in_stock': int(rng.expovariate(1 / 25)), 'reorder_level': rng.choice((3, 5, 10, 15)),
+                     'supplier': rng.choice(SUPPLIERS)})
+        if len(rows) == batch_size:
+            write(Part, rows)
+            rows = []
+    write(Part, rows)
+
+    # ----- Tickets with their line items, mechanics and parts, a batch of tickets at a time -----
+    priority = _picker(rng, TICKET_PRIORITIES)
+    mechanic_count = _picker(rng, MECHANICS_PER_TICKET)
+    line_item_count = _picker(rng, LINE_ITEMS_PER_TICKET)
+    parts_count = _picker(rng, PARTS_PER_TICKET)
+    part_quantity = _picker(rng, PART_QUANTITIES)
+    warranty = _picker(rng, WARRANTY_MONTHS)
+    service_weights = [share for *_, share in SERVICES]
+    service_numbers = list(range(1, len(SERVICES) + 1))
+    mechanic_numbers = list(range(1, counts['mechanics'] + 1))
+    recent = until - timedelta(days=RECENT_DAYS)
+    span_seconds = HISTORY_DAYS * 86400
+    tickets, line_items, assignments, parts_used = [], [], [], []
+    for number in range(1, counts['tickets'] + 1):
+        opened = start + timedelta(seconds=int(span_seconds * (number - rng.random()) / counts['tickets']))
+        for _ in range(20):
+            vehicle = int(counts['vehicles'] * rng.random() ** 1.5)  # Low ids come back more often
+            if model_years[vehicle] <= opened.year + 1:
+                break  # Not a car from the future
+        if opened >= recent:
+            status = rng.choice(('open', 'in_progress', 'in_progress', 'completed'))
+        else:
+            status = 'completed' if rng.random() < 0.94 else 'cancelled'
+        driven_days = max(0, (opened - datetime(model_years[vehicle] - 1, 10, 1)).days)
+        # Price increases over the years: tickets from five years ago paid ~85% of today's prices
+        price_factor = 0.85 + 0.15 * (opened - start) / (until - start)
+        services = set(rng.choices(service_numbers, service_weights, k=line_item_count()))
+        labor_minutes = sum(SERVICES[service - 1][1] for service in services)
+        tickets.append({
+            'ticket_id': number, 'vehicle_id': vehicle + 1, 'customer_id': owners[vehicle], 'status': status,
+            'opened_at': opened,
+            'closed_at': opened + timedelta(minutes=int(labor_minutes * rng.uniform(1.2, 6)))
+            if status == 'completed' else None,
+            'problem_description': rng.choice(PROBLEMS),
+            'odometer_miles': int(driven_days * miles_per_day[vehicle]) + rng.randrange(50),
+            'priority': priority()
+        })
+        for service in sorted(services):
+            name, _, price, _ = SERVICES[service - 1]
+            line_items.append({'ticket_id': number, 'service_id': service, 'line_type': 'service',
+                               'description': name, 'quantity': Decimal('1.00'),
+                               'unit_price_cents': int(price * price_factor)})
+        crew = rng.sample(mechanic_numbers, min(mechanic_count(), len(mechanic_numbers)))
+        worked = status in ('completed', 'in_progress')
+        for position, mechanic in enumerate(crew):
+            assignments.append({'ticket_id': number, 'mechanic_id': mechanic,
+                                'role': 'Lead Technician' if position == 0 else 'Assistant',
+                                'minutes_worked': int(labor_minutes * rng.uniform(0.8, 1.4) / (position + 1))
+                                if worked else 0})
+        if worked and counts['parts']:
+            # Popularity falls off steeply with the part id: a few fast movers dominate usage
+            used = {int(counts['parts'] * rng.random() ** 3) for _ in range(parts_count())}
+            for part in sorted(used):
+                parts_used.append({
+                    'ticket_id': number, 'part_id': part + 1, 'quantity_used': part_quantity(),
+                    'unit_cost_cents': int(part_costs[part] * price_factor),
+                    'markup_percentage': Decimal(rng.choice((25, 30, 30, 35, 40))),
+                    'installed_date': opened + timedelta(minutes=rng.randrange(30, 240)),
+                    'warranty_months': warranty(), 'installed_by_mechanic_id': crew[0]
+                })
+        if len(tickets) == batch_size:
+            _write_tickets(write, tickets, line_items, assignments, parts_used)
+            tickets, line_items, assignments, parts_used = [], [], [], []
+    _write_tickets(write, tickets, line_items, assignments, parts_used)
+    return written
+
+
+def _write_tickets(write, tickets, line_items, assignments, parts_used):
+    write(ServiceTicket, tickets)
+    write(TicketLineItem, line_items)
+    write(TicketMechanic, assignments)
+    write(TicketPart, parts_used)
+
+
+def _vin(rng, number, wmi, model_year, plant):
+    """
+    A VIN that decodes to wmi, model_year and plant, with a valid check digit
+
+    Position 4 and the serial number (positions 12-17) encode number, so VINs are unique.
+    """
+    descriptor = (VIN_CHARACTERS[number // 1_000_000 % len(VIN_CHARACTERS)]
+                  + rng.choice(VIN_CHARACTERS) + rng.choice(VIN_CHARACTERS)
+                  # Position 7 is a letter from model year 2010 on (see decode_model_year)
+                  + rng.choice(VIN_LETTERS if model_year >= 2010 else '0123456789')
+                  + rng.choice(VIN_CHARACTERS))
+    vin = f'{wmi}{descriptor}0{MODEL_YEAR_CODES[(model_year - 1980) % 30]}{plant}{number % 1_000_000:06d}'
+    return vin[:8] + compute_check_digit(vin) + vin[9:]
@@ -0,0 +1,209 @@
+"""
+Database connection pool
+
+Without SQLALCHEMY_ENGINE_OPTIONS the engine ran on SQLAlchemy's defaults: 5
+connections plus 10 overflow, no pre-ping and (on MySQL) a 2 hour recycle. MySQL
+drops connections idle for longer than its wait_timeout, so the first request
+after a quiet period got "Lost connection" (a 503 from handle_operational_error),
+and bursts queued for the 30 second pool timeout.
+
+init_engine_options() builds the engine options from per-environment settings
+in config.py (any key already in SQLALCHEMY_ENGINE_OPTIONS wins):
+
+    DB_POOL_SIZE         connections kept open
+    DB_MAX_OVERFLOW      extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT      seconds a request waits for a connection before failing
+    DB_POOL_RECYCLE      seconds after which a connection is replaced (keep it
+                         below the server's wait_timeout)
+    DB_POOL_PRE_PING     test each connection on checkout and reconnect if it is dead
+
+PoolMonitor records what the pool is doing, for GET /internal/db-pool:
+connections checked out and in overflow, a histogram of the time requests wait
+for a connection (TimedQueuePool), and connections held longer than
+DB_POOL_HOLD_WARNING seconds, with the endpoint that holds them.
+"""
+import bisect
+import logging
+import threading
+import time
+from flask import has_request_context, request
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (milliseconds) of the wait time histogram buckets; the last bucket is unbounded
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection"""
+
+    wait_observer = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            observer = self.wait_observer
+            if observer is not None:
+                observer(time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; keep reporting from the new one
+        pool = super().recreate()
+        pool.wait_observer = self.wait_observer
+        return pool
+
+
+def _uses_queue_pool(uri):
+    """False for in-memory SQLite, which Flask-SQLAlchemy runs on a single static connection"""
+    url = make_url(uri)
+    return not (url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:'))
+
+
+def pool_options(config, uri, options=None):
+    """Engine options for one database from the DB_POOL_* settings (keys already in options win)"""
+    options = dict(options or {})
+    if uri and _uses_queue_pool(uri):
+        options.setdefault('poolclass', TimedQueuePool)
+        options.setdefault('pool_size', config.setdefault('DB_POOL_SIZE', 5))
+        options.setdefault('max_overflow', config.setdefault('DB_MAX_OVERFLOW', 10))
+        options.setdefault('pool_timeout', config.setdefault('DB_POOL_TIMEOUT', 30))
+        options.setdefault('pool_recycle', config.setdefault('DB_POOL_RECYCLE', -1))
+    options.setdefault('pool_pre_ping', config.setdefault('DB_POOL_PRE_PING', False))
+    return options
+
+
+def init_engine_options(app):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS from the DB_POOL_* settings (call before db.init_app)"""
+    config = app.config
+    options = pool_options(config, config.get('SQLALCHEMY_DATABASE_URI'), config.get('SQLALCHEMY_ENGINE_OPTIONS'))
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    return options
+
+
+class PoolMonitor:
+    """Live statistics for one engine's connection pool"""
+
+    def __init__(self, engine, hold_warning=5.0):
+        self.engine = engine
+        self.hold_warning = hold_warning
+        self._lock = threading.Lock()
+        self._wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_sum = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._checkouts = 0
+        self._held = {}  # id(connection record) -> (checked out at, endpoint)
+        self._held_too_long = 0
+        self._longest_hold = 0.0
+
+        pool = engine.pool
+        if isinstance(pool, TimedQueuePool):
+            pool.wait_observer = self.record_wait
+        event.listen(pool, 'checkout', self._on_checkout)
+        event.listen(pool, 'checkin', self._on_checkin)
+
+    def record_wait(self, seconds, timed_out=False):
+        index = bisect.bisect_left(WAIT_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            self._timeouts += timed_out
+            self._wait_counts[index] += 1
+            self._wait_sum += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self._checkouts += 1
+            self._held[id(connection_record)] = (time.monotonic(), _current_endpoint())
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            checked_out = self._held.pop(id(connection_record), None)
+            if checked_out is None:
+                return
+            held = time.monotonic() - checked_out[0]
+            self._longest_hold = max(self._longest_hold, held)
+            too_long = held > self.hold_warning
+            if too_long:
+                self._held_too_long += 1
+        if too_long:
+            logger.warning("Database connection held for %.1fs by %s", held, checked_out[1] or 'no request')
+
+    def reset(self):
+        """Zero the counters (connections currently checked out stay tracked)"""
+        with self._lock:
+            self._wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self._wait_sum = self._wait_max = self._longest_hold = 0.0
+            self._checkouts = self._held_too_long = self._timeouts = 0
+
+    def stats(self):
+        """Current pool state and the counters since startup (JSON-ready)"""
+        pool = self.engine.pool
+        now = time.monotonic()
+        with self._lock:
+            wait_counts = list(self._wait_counts)
+            wait_sum, wait_max = self._wait_sum, self._wait_max
+            checkouts, timeouts = self._checkouts, self._timeouts
+            held_too_long, longest_hold = self._held_too_long, self._longest_hold
+            held = sorted(((now - started, endpoint) for started, endpoint in self._held.values()), reverse=True)
+
+        waits = sum(wait_counts)
+        cumulative, buckets = 0, []
+        for bound, count in zip(WAIT_BUCKETS_MS + (None,), wait_counts):
+            cumulative += count
+            buckets.append({'le_ms': bound if bound is not None else '+Inf', 'count': cumulative})
+
+        stats = {
+            'pool_class': type(pool).__name__,
+            'checked_out': len(held),
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'wait_time': {
+                'count': waits,
+                'sum_ms': round(wait_sum * 1000, 3),
+                'avg_ms': round(wait_sum * 1000 / waits, 3) if waits else None,
+                'max_ms': round(wait_max * 1000, 3),
+                'buckets': buckets
+            },
+            'held_too_long': {
+                'threshold_seconds': self.hold_warning,
+                'total': held_too_long,
+                'longest_seconds': round(max([longest_hold] + [age for age, _ in held[:1]]), 3),
+                'current': [
+                    {'held_seconds': round(age, 3), 'endpoint': endpoint}
+                    for age, endpoint in held if age > self.hold_warning
+                ]
+            }
+        }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+                'timeout_seconds': pool.timeout()
+            })
+        return stats
+
+
+def _current_endpoint():
+    if has_request_context():
+        return f'{request.method} {request.path}'
+    return None
+
+
+def init_pool_monitor(app, db):
+    """Attach a PoolMonitor to the app's engine (call after db.init_app)"""
+    with app.app_context():
+        engine = db.engine
+    monitor = PoolMonitor(engine, app.config.setdefault('DB_POOL_HOLD_WARNING', 5.0))
+    app.extensions['db_pool_monitor'] = monitor
+    return monitor
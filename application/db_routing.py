@@ -0,0 +1,215 @@
+"""
+Read-replica routing
+
+With REPLICA_DATABASE_URL set, the app gets a second engine (the 'replica'
+bind) and reads from it during GET and HEAD requests, so reporting-style lists
+(tickets, parts, mechanics by activity) stop competing with writes on the
+primary. Everything else stays on the primary:
+
+- flushes and INSERT/UPDATE/DELETE statements always use the primary, and once
+  a request has written, its later reads do too
+- a client that wrote is pinned to the primary for REPLICA_STICKY_SECONDS, so
+  it reads its own writes while the replica catches up. Clients are recognized
+  by their Authorization header (or address) in this process, and by a short
+  lived cookie across workers.
+- code that must not see stale rows runs under primary_reads(): identity and
+  token revocation checks, and everything that fills a cache keyed on data
+  versions (summaries, vehicle history, the catalog snapshot, counters)
+- the replica is probed (SELECT 1) every REPLICA_HEALTH_CHECK_INTERVAL seconds
+  and taken out of rotation on a failed probe or a disconnect error; reads go
+  to the primary until a later probe succeeds
+
+Locally, point REPLICA_DATABASE_URL at a second SQLite file holding a copy of
+the database (schema included: create_all() only creates the primary's tables).
+"""
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+STICKY_COOKIE = 'db_primary_until'
+READ_METHODS = ('GET', 'HEAD')
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends plain reads to the replica while routing is on"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return engine
+        info = self.info
+        if clause is None and not self._flushing:
+            return engine  # session.connection(), used by commit-time checks
+        if self._flushing or not getattr(clause, 'is_select', False):
+            # Writes go to the primary, and so does every read after them in this request
+            info['wrote'] = True
+            return engine
+        if not info.get('use_replica') or info.get('wrote') or info.get('primary_depth'):
+            return engine
+        engines = self._db.engines
+        if engine is not engines[None]:
+            return engine  # models on another bind
+        return engines.get(REPLICA_BIND, engine)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside this block (also usable as a decorator: @primary_reads())"""
+    if not has_app_context():
+        yield
+        return
+    from application.extensions import db
+    info = db.session.info
+    info['primary_depth'] = info.get('primary_depth', 0) + 1
+    try:
+        yield
+    finally:
+        info['primary_depth'] -= 1
+
+
+class ReplicaRouter:
+    """Decides per request whether reads may use the replica, and tracks its health"""
+
+    def __init__(self, engine, sticky_seconds, health_check_interval):
+        self.engine = engine
+        self.sticky_seconds = sticky_seconds
+        self.health_check_interval = health_check_interval
+        self.healthy = True
+        self.last_check = 0.0
+        self.last_error = None
+        self.routed_requests = 0
+        self._sticky = {}  # client key -> monotonic time the pin expires
+        self._lock = threading.Lock()
+        event.listen(engine, 'handle_error', self._on_error)
+
+    # ===== HEALTH =====
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_unhealthy(context.original_exception)
+
+    def mark_unhealthy(self, error):
+        if self.healthy:
+            logger.warning("Read replica out of rotation: %s", error)
+        self.healthy = False
+        self.last_error = str(error)
+        self.last_check = time.monotonic()
+
+    def is_available(self):
+        """True if the replica answered its latest probe (probing again when one is due)"""
+        now = time.monotonic()
+        if now - self.last_check < self.health_check_interval:
+            return self.healthy
+        with self._lock:
+            if now - self.last_check < self.health_check_interval:
+                return self.healthy
+            try:
+                with self.engine.connect() as connection:
+                    connection.execute(text('SELECT 1'))
+            except Exception as e:  # any failure means "don't read from it"
+                self.mark_unhealthy(e)
+                return False
+            if not self.healthy:
+                logger.info("Read replica back in rotation")
+            self.healthy = True
+            self.last_error = None
+            self.last_check = now
+        return True
+
+    # ===== STICKINESS =====
+
+    def _client_key(self):
+        credentials = request.headers.get('Authorization')
+        if credentials:
+            return hashlib.blake2b(credentials.encode(), digest_size=16).hexdigest()
+        return request.remote_addr
+
+    def is_sticky(self):
+        cookie = request.cookies.get(STICKY_COOKIE)
+        if cookie and cookie.isdigit() and int(cookie) > time.time():
+            return True  # pinned by a write served by another worker
+        until = self._sticky.get(self._client_key())
+        return until is not None and until > time.monotonic()
+
+    def stick(self, response):
+        now = time.monotonic()
+        with self._lock:
+            self._sticky[self._client_key()] = now + self.sticky_seconds
+            if len(self._sticky) > 10000:
+                self._sticky = {key: until for key, until in self._sticky.items() if until > now}
+        response.set_cookie(STICKY_COOKIE, str(int(time.time() + self.sticky_seconds) + 1),
+                            max_age=int(self.sticky_seconds) + 1, httponly=True, samesite='Lax')
+
+    # ===== REQUEST HOOKS =====
+
+    def before_request(self):
+        from application.extensions import db
+        info = db.session.info
+        info['wrote'] = False
+        info['primary_depth'] = 0
+        info['use_replica'] = use = (
+            request.method in READ_METHODS and not self.is_sticky() and self.is_available()
+        )
+        if use:
+            self.routed_requests += 1
+
+    def after_request(self, response):
+        from application.extensions import db
+        info = db.session.info
+        if info.get('wrote'):
+            self.stick(response)
+        info['use_replica'] = False
+        return response
+
+    def stats(self):
+        return {
+            'healthy': self.healthy,
+            'last_error': self.last_error,
+            'routed_requests': self.routed_requests,
+            'sticky_clients': sum(1 for until in self._sticky.values() if until > time.monotonic())
+        }
+
+
+def init_replica_bind(app):
+    """Add the replica bind to SQLALCHEMY_BINDS when REPLICA_DATABASE_URL is set (call before db.init_app)"""
+    from application.db_pool import pool_options
+    config = app.config
+    url = config.setdefault('REPLICA_DATABASE_URL', None)
+    if url:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds.setdefault(REPLICA_BIND, pool_options(config, url, {'url': url}))
+        config['SQLALCHEMY_BINDS'] = binds
+
+
+def init_replica_routing(app, db):
+    """Route GET/HEAD reads to the replica bind, if one is configured (call after db.init_app)"""
+    config = app.config
+    if not config.get('REPLICA_DATABASE_URL'):
+        return None
+    with app.app_context():
+        engine = db.engines[REPLICA_BIND]
+    # No model is bound to the replica (it mirrors the primary). Flask-SQLAlchemy still registers empty
+    # metadata for every bind key, which create_all()/drop_all() would then expect in every app.
+    db.metadatas.pop(REPLICA_BIND, None)
+    router = ReplicaRouter(
+        engine,
+        config.setdefault('REPLICA_STICKY_SECONDS', 5),
+        config.setdefault('REPLICA_HEALTH_CHECK_INTERVAL', 5)
+    )
+    app.before_request(router.before_request)
+    app.after_request(router.after_request)
+    app.extensions['db_router'] = router
+    return router
+
+
+def replica_router():
+    """The current app's ReplicaRouter, or None when no replica is configured"""
+    return current_app.extensions.get('db_router')
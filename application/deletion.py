@@ -0,0 +1,287 @@
+"""
+Chunked cascade deletes
+
+Customers and service tickets have no ON DELETE CASCADE rules, and deleting a
+long-lived customer in one transaction would lock every ticket, line item and
+vehicle they ever had. Instead a deletion runs as a DeletionJob that removes
+the dependent rows bottom-up in bounded chunks, each in its own short
+transaction:
+
+    ticket_parts -> ticket_mechanics -> ticket_line_items -> service_tickets
+    -> vehicles -> customers                          (customer deletions only)
+
+Every chunk re-selects the rows that are still left, so a job that fails or is
+interrupted can simply be run again (flask deletion resume). Progress (rows
+deleted per table, parts restocked) is committed with each chunk and can be
+polled at GET /deletion_jobs/<job_id>.
+
+With restock_parts, parts on tickets that were never completed are returned to
+inventory before their ticket_parts rows are removed; parts on completed
+tickets left the shop in the vehicle and are not restocked.
+
+Jobs run on a small thread pool when DELETION_RUN_IN_BACKGROUND is set, and
+inline otherwise (tests, CLI). The deletes are Core statements, which bypass
+the ORM session events, so the cached read models, the identity cache and the
+customer counter are invalidated explicitly when a job finishes.
+"""
+import logging
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, delete, update, bindparam, or_, tuple_
+from application.extensions import db
+from application.models import (
+    Customer, Vehicle, ServiceTicket, TicketLineItem, TicketMechanic, TicketPart, Part, DeletionJob
+)
+from application.cache_invalidation import bump_cache_version
+from application.counters import customer_counter
+from application.identity import IDENTITY_NAMESPACE
+
+
+logger = logging.getLogger(__name__)
+
+TARGET_CUSTOMER = 'customer'
+TARGET_SERVICE_TICKET = 'service_ticket'
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+ACTIVE_STATUSES = (JOB_PENDING, JOB_RUNNING)
+
+# Parts on tickets in these states were installed and are never returned to stock
+NON_RESTOCKABLE_STATUSES = ('completed',)
+
+_executor = None
+
+
+def start_customer_deletion(customer_id, restock_parts=False):
+    """Queue (or run inline) the deletion of a customer and everything that references them"""
+    return _start_job(TARGET_CUSTOMER, customer_id, restock_parts)
+
+
+def start_ticket_deletion(ticket_id, restock_parts=False):
+    """Queue (or run inline) the deletion of one service ticket and its child rows"""
+    return _start_job(TARGET_SERVICE_TICKET, ticket_id, restock_parts)
+
+
+def _start_job(target_type, target_id, restock_parts):
+    # A second delete request for the same target joins the job already in flight
+    job = db.session.execute(
+        select(DeletionJob).where(
+            DeletionJob.target_type == target_type,
+            DeletionJob.target_id == target_id,
+            DeletionJob.status.in_(ACTIVE_STATUSES)
+        )
+    ).scalars().first()
+    if job:
+        return job
+
+    job = DeletionJob(
+        job_id=uuid.uuid4().hex,
+        target_type=target_type,
+        target_id=target_id,
+        status=JOB_PENDING,
+        restock_parts=restock_parts,
+        progress={},
+        parts_restocked=0
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    if current_app.config.get('DELETION_RUN_IN_BACKGROUND', False):
+        app = current_app._get_current_object()
+        _get_executor(app).submit(_run_in_app_context, app, job.job_id)
+        return job
+
+    run_deletion_job(job.job_id)
+    return db.session.get(DeletionJob, job.job_id)
+
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config.get('DELETION_WORKERS', 2),
+            thread_name_prefix='deletion'
+        )
+    return _executor
+
+
+def _run_in_app_context(app, job_id):
+    with app.app_context():
+        run_deletion_job(job_id)
+
+
+def run_deletion_job(job_id, chunk_size=None):
+    """
+    Run (or resume) a deletion job to completion
+
+    Returns:
+        DeletionJob: The job, with status completed or failed
+    """
+    chunk_size = chunk_size or current_app.config.get('DELETION_CHUNK_SIZE', 500)
+    job = db.session.get(DeletionJob, job_id)
+    if job is None or job.status == JOB_COMPLETED:
+        return job
+
+    job.status = JOB_RUNNING
+    job.error = None
+    db.session.commit()
+
+    affected = _affected_cache_keys(job)
+    try:
+        if job.target_type == TARGET_CUSTOMER:
+            _delete_customer(job, chunk_size)
+        else:
+            _delete_ticket_rows(job, chunk_size)
+        job.status = JOB_COMPLETED
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        logger.exception('Deletion job %s failed', job_id)
+        db.session.rollback()
+        job = db.session.get(DeletionJob, job_id)
+        job.status = JOB_FAILED
+        job.error = str(e)
+        db.session.commit()
+    finally:
+        # Core deletes don't go through the session events, so bump the read models here
+        # (also after a failure: earlier chunks were already committed)
+        for namespace, key in affected:
+            bump_cache_version(namespace, key)
+
+    return job
+
+
+def _ticket_scope(job):
+    """Tickets that have to go before the target row can be deleted"""
+    if job.target_type == TARGET_SERVICE_TICKET:
+        return ServiceTicket.ticket_id == job.target_id
+    # A customer's vehicles may carry tickets opened under another customer account
+    return or_(
+        ServiceTicket.customer_id == job.target_id,
+        ServiceTicket.vehicle_id.in_(select(Vehicle.vehicle_id).where(Vehicle.customer_id == job.target_id))
+    )
+
+
+def _affected_cache_keys(job):
+    """(namespace, key) pairs for every cached read model the job can change"""
+    # Imported here: the blueprints import this module for their delete routes
+    from application.blueprints.customer.summary import SUMMARY_NAMESPACE
+    from application.blueprints.vehicle.history import HISTORY_NAMESPACE
+
+    rows = db.session.execute(
+        select(ServiceTicket.customer_id, ServiceTicket.vehicle_id).where(_ticket_scope(job)).distinct()
+    ).all()
+    keys = {(SUMMARY_NAMESPACE, row.customer_id) for row in rows}
+    keys.update((HISTORY_NAMESPACE, row.vehicle_id) for row in rows)
+    if job.target_type == TARGET_CUSTOMER:
+        keys.add((SUMMARY_NAMESPACE, job.target_id))
+        keys.add((IDENTITY_NAMESPACE, job.target_id))
+        vehicle_ids = db.session.execute(
+            select(Vehicle.vehicle_id).where(Vehicle.customer_id == job.target_id)
+        ).scalars()
+        keys.update((HISTORY_NAMESPACE, vehicle_id) for vehicle_id in vehicle_ids)
+    return keys
+
+
+def _delete_ticket_rows(job, chunk_size):
+    ticket_ids = select(ServiceTicket.ticket_id).where(_ticket_scope(job))
+
+    _delete_in_chunks(
+        job, TicketPart, (TicketPart.ticket_id, TicketPart.part_id),
+        _ticket_scope(job), chunk_size,
+        extra_columns=(TicketPart.quantity_used, ServiceTicket.status),
+        join=(ServiceTicket, TicketPart.ticket_id == ServiceTicket.ticket_id),
+        before_delete=_restock_parts if job.restock_parts else None
+    )
+    _delete_in_chunks(
+        job, TicketMechanic, (TicketMechanic.ticket_id, TicketMechanic.mechanic_id),
+        TicketMechanic.ticket_id.in_(ticket_ids), chunk_size
+    )
+    _delete_in_chunks(
+        job, TicketLineItem, (TicketLineItem.line_item_id,),
+        TicketLineItem.ticket_id.in_(ticket_ids), chunk_size
+    )
+    _delete_in_chunks(job, ServiceTicket, (ServiceTicket.ticket_id,), _ticket_scope(job), chunk_size)
+
+
+def _delete_customer(job, chunk_size):
+    _delete_ticket_rows(job, chunk_size)
+    _delete_in_chunks(
+        job, Vehicle, (Vehicle.vehicle_id,), Vehicle.customer_id == job.target_id, chunk_size
+    )
+    deleted = _delete_in_chunks(
+        job, Customer, (Customer.customer_id,), Customer.customer_id == job.target_id, chunk_size
+    )
+    if deleted:
+        customer_counter.adjust(-deleted)
+
+
+def _delete_in_chunks(job, model, key_columns, criteria, chunk_size,
+                      extra_columns=(), join=None, before_delete=None):
+    """
+    Delete the rows matching criteria, at most chunk_size per transaction
+
+    Each round selects the next chunk of primary keys (plus any extra columns
+    before_delete needs), deletes exactly those rows and commits together with
+    the job's progress.
+
+    Returns:
+        int: Rows deleted
+    """
+    table = model.__table__
+    total = 0
+    while True:
+        query = select(*key_columns, *extra_columns).where(criteria).order_by(*key_columns).limit(chunk_size)
+        if join is not None:
+            query = query.join(*join)
+        rows = db.session.execute(query).all()
+        if not rows:
+            return total
+
+        if before_delete:
+            before_delete(job, rows)
+
+        if len(key_columns) == 1:
+            condition = key_columns[0].in_([row[0] for row in rows])
+        else:
+            condition = tuple_(*key_columns).in_([tuple(row[:len(key_columns)]) for row in rows])
+        db.session.execute(delete(table).where(condition))
+
+        job.record_deleted(table.name, len(rows))
+        db.session.commit()
+        total += len(rows)
+
+
+def _restock_parts(job, rows):
+    """Return the parts on not-yet-completed tickets in this chunk to inventory"""
+    quantities = Counter()
+    for row in rows:
+        if row.status not in NON_RESTOCKABLE_STATUSES:
+            quantities[row.part_id] += row.quantity_used
+    if not quantities:
+        return
+
+    # Relative increments, so concurrent stock movements on the same part aren't lost
+    parts = Part.__table__
+    db.session.execute(
+        update(parts)
+        .where(parts.c.part_id == bindparam('restock_part_id'))
+        .values(quantity_in_stock=parts.c.quantity_in_stock + bindparam('restock_quantity')),
+        [{'restock_part_id': part_id, 'restock_quantity': quantity} for part_id, quantity in quantities.items()]
+    )
+    job.parts_restocked += sum(quantities.values())
+
+
+def resume_deletion_jobs(chunk_size=None):
+    """Run every job that is pending, was interrupted, or failed"""
+    job_ids = db.session.execute(
+        select(DeletionJob.job_id)
+        .where(DeletionJob.status.in_(ACTIVE_STATUSES + (JOB_FAILED,)))
+        .order_by(DeletionJob.created_at)
+    ).scalars().all()
+    return [run_deletion_job(job_id, chunk_size=chunk_size) for job_id in job_ids]
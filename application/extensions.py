@@ -12,10 +12,16 @@ class Base(DeclarativeBase):
     pass
 
 # Initialize extensions (without binding to app yet)
-db = SQLAlchemy(model_class=Base)
+# RoutingSession sends GET-request reads to the read replica when one is configured
+from application.db_routing import RoutingSession
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
 ma = Marshmallow()
 
+# Registers the sqlite:// rate limit storage scheme (shared by all workers on a host)
+import application.ratelimit_storage  # noqa: F401
+
 # Initialize Flask-Limiter with key function to identify clients
+# (storage and window strategy come from RATELIMIT_STORAGE_URI / RATELIMIT_STRATEGY)
 limiter = Limiter(key_func=get_remote_address)
 
 # Initialize Flask-Caching with SimpleCache (in-memory)
@@ -0,0 +1,124 @@
+"""
+Authenticated identity cache
+
+Routes that need the caller (/auth/me, the ownership checks in the customer
+routes) resolve the access token to a CurrentCustomer via current_identity().
+Resolved identities are kept in a per-process TTL cache keyed by the token's
+sub plus its token version ('ver' claim), so hot users are authorized and
+served /auth/me without a database round trip.
+
+- A token whose version no longer matches Customer.token_version resolves to
+  None (revoked)
+- Updating or deleting a customer drops their entry in this process (via the
+  'identity' invalidation namespace); other processes catch up within
+  IDENTITY_CACHE_TTL seconds
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt
+from application.extensions import db
+from application.models import Customer
+from application.cache_invalidation import invalidates, on_bump
+from application.db_routing import primary_reads
+
+
+IDENTITY_NAMESPACE = 'identity'
+
+
+class CurrentCustomer(NamedTuple):
+    """The authenticated customer, as cached for the lifetime of an identity cache entry"""
+    customer_id: int
+    token_version: int
+    profile: Dict[str, Any]  # customer_schema dump, served as-is by /auth/me
+
+
+class IdentityCache:
+    """Thread-safe LRU with a per-entry TTL, holding one entry per customer"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, customer_id, token_version):
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is None:
+                return None
+            expires_at, identity = entry
+            if expires_at < time.monotonic() or identity.token_version != token_version:
+                return None
+            self._entries.move_to_end(customer_id)
+            return identity
+
+    def set(self, identity, ttl, max_entries):
+        with self._lock:
+            self._entries[identity.customer_id] = (time.monotonic() + ttl, identity)
+            self._entries.move_to_end(identity.customer_id)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, customer_id):
+        with self._lock:
+            self._entries.pop(customer_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
+def create_customer_token(customer):
+    """Issue an access token carrying the customer's current token version"""
+    return create_access_token(identity=str(customer.customer_id), additional_claims={'ver': customer.token_version})
+
+
+def create_customer_refresh_token(customer):
+    """Issue a refresh token carrying the customer's current token version"""
+    return create_refresh_token(identity=str(customer.customer_id), additional_claims={'ver': customer.token_version})
+
+
+def current_identity():
+    """
+    Resolve the current request's access token to the authenticated customer
+
+    Must be called inside a @jwt_required() view (access or refresh token).
+
+    Returns:
+        CurrentCustomer | None: None if the customer no longer exists or the token was revoked
+    """
+    claims = get_jwt()
+    customer_id = int(claims['sub'])
+    token_version = claims.get('ver', 0)
+
+    identity = identity_cache.get(customer_id, token_version)
+    if identity is not None:
+        return identity
+
+    # Token versions must be current (logout everywhere), so never from a lagging replica
+    with primary_reads():
+        customer = db.session.get(Customer, customer_id)
+    if customer is None or customer.token_version != token_version:
+        return None
+
+    # Imported here: the customer blueprint imports this module for its ownership checks
+    from application.blueprints.customer.customerSchemas import customer_schema
+
+    identity = CurrentCustomer(customer_id, customer.token_version, customer_schema.dump(customer))
+    config = current_app.config
+    identity_cache.set(identity, config['IDENTITY_CACHE_TTL'], config['IDENTITY_CACHE_MAX_ENTRIES'])
+    return identity
+
+
+@invalidates(Customer)
+def _customer_changed(session, customer):
+    return [(IDENTITY_NAMESPACE, customer.customer_id)]
+
+
+@on_bump(IDENTITY_NAMESPACE)
+def _drop_identity(customer_id):
+    identity_cache.invalidate(customer_id)
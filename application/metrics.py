@@ -0,0 +1,306 @@
+"""
+Request metrics
+
+Records, per endpoint, what each request cost and exports it in the Prometheus
+text format at GET /metrics (INTERNAL_ALLOWED_IPS only, like /internal):
+
+    http_request_duration_seconds            histogram of request latency
+    http_request_sql_queries                 histogram of SQL statements per request
+    http_request_sql_duration_seconds_total  time spent executing SQL
+    http_request_sql_rows_total              rows fetched from the database
+    http_request_serialization_seconds_total time in compiled schema dumps and JSON encoding
+    http_response_bytes_total                body bytes sent (after compression; streams excluded)
+
+each labelled with the endpoint name (e.g. customer.get_customers), method and
+status code, plus the connection pool state from PoolMonitor (db_pool_*) and
+the replica's health when one is configured.
+
+The request's numbers are accumulated on a small object held in a context
+variable, by SQLAlchemy engine events (before/after_cursor_execute) and
+timed_serialization(); they are merged into the per-endpoint totals once per
+request, under a lock. Rows are counted per fetch call by wrapping the cursor
+of row-returning statements (an ORM load event would cost a call per row, and
+disables part of SQLAlchemy's loading fast path). Outside a request (CLI
+commands, background deletion jobs) the hooks return after one context
+variable lookup.
+
+    METRICS_ENABLED = True
+    METRICS_LATENCY_BUCKETS = (0.005, 0.01, ..., 10)   # seconds
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from flask import request
+from sqlalchemy import event
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Upper bounds of the SQL statements per request histogram
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class _RequestStats:
+    """What the current request has spent so far"""
+
+    __slots__ = ('started', 'queries', 'sql_seconds', 'rows', 'serialization_seconds', 'token')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.serialization_seconds = 0.0
+        self.token = None
+
+
+class _EndpointTotals:
+    """Totals for one (endpoint, method, status) since startup"""
+
+    __slots__ = ('latency_counts', 'latency_sum', 'query_counts', 'queries', 'sql_seconds', 'rows',
+                 'serialization_seconds', 'response_bytes')
+
+    def __init__(self, latency_buckets):
+        self.latency_counts = [0] * (len(latency_buckets) + 1)
+        self.latency_sum = 0.0
+        self.query_counts = [0] * (len(QUERY_COUNT_BUCKETS) + 1)
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.serialization_seconds = 0.0
+        self.response_bytes = 0
+
+
+def timed_serialization(function, *args, **kwargs):
+    """Call function, counting its duration as serialization time of the current request"""
+    stats = _current.get()
+    if stats is None:
+        return function(*args, **kwargs)
+    started = time.perf_counter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        stats.serialization_seconds += time.perf_counter() - started
+
+
+class _CountingCursor:
+    """DBAPI cursor wrapper adding the rows fetched through it to the request's count"""
+
+    __slots__ = ('_cursor', '_stats')
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, '_metrics_started', None)
+    if stats is not None and started is not None:
+        stats.queries += 1
+        stats.sql_seconds += time.perf_counter() - started
+        if cursor.description is not None and context.cursor is cursor:
+            # The result is built from context.cursor after this event
+            context.cursor = _CountingCursor(cursor, stats)
+
+
+def instrument_engine(engine):
+    """Count the statements an engine executes towards the current request (safe to call again)"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class RequestMetrics:
+    """Flask extension collecting per-endpoint request metrics"""
+
+    def __init__(self, app=None):
+        self.latency_buckets = DEFAULT_LATENCY_BUCKETS
+        self._totals = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the request hooks and instrument the app's engines (call after db.init_app)"""
+        from application.extensions import db
+        config = app.config
+        self.latency_buckets = tuple(sorted(config.setdefault('METRICS_LATENCY_BUCKETS', self.latency_buckets)))
+        self.reset()
+        if not config.setdefault('METRICS_ENABLED', True):
+            return
+        with app.app_context():
+            for engine in db.engines.values():
+                instrument_engine(engine)
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+        app.extensions['request_metrics'] = self
+
+    def reset(self):
+        """Forget the totals collected so far"""
+        with self._lock:
+            self._totals = {}
+
+    # ===== REQUEST HOOKS =====
+
+    def before_request(self):
+        stats = _RequestStats()
+        stats.token = _current.set(stats)
+
+    def after_request(self, response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        latency = time.perf_counter() - stats.started
+        key = (request.endpoint or 'unmatched', request.method, str(response.status_code))
+        size = None if response.is_streamed else response.content_length
+        latency_index = bisect.bisect_left(self.latency_buckets, latency)
+        queries_index = bisect.bisect_left(QUERY_COUNT_BUCKETS, stats.queries)
+        with self._lock:
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = _EndpointTotals(self.latency_buckets)
+            totals.latency_counts[latency_index] += 1
+            totals.latency_sum += latency
+            totals.query_counts[queries_index] += 1
+            totals.queries += stats.queries
+            totals.sql_seconds += stats.sql_seconds
+            totals.rows += stats.rows
+            totals.serialization_seconds += stats.serialization_seconds
+            totals.response_bytes += size or 0
+        return response
+
+    def teardown_request(self, error=None):
+        stats = _current.get()
+        if stats is not None and stats.token is not None:
+            _current.reset(stats.token)
+
+    # ===== EXPORT =====
+
+    def snapshot(self):
+        """Copy of the per-endpoint totals: {(endpoint, method, status): _EndpointTotals}"""
+        with self._lock:
+            copies = {}
+            for key, totals in self._totals.items():
+                copy = _EndpointTotals(self.latency_buckets)
+                for name in _EndpointTotals.__slots__:
+                    value = getattr(totals, name)
+                    setattr(copy, name, list(value) if isinstance(value, list) else value)
+                copies[key] = copy
+            return copies
+
+    def render(self, pool_monitor=None, replica_router=None):
+        """The metrics in the Prometheus text exposition format"""
+        totals = sorted(self.snapshot().items())
+        lines = []
+
+        def labels(key):
+            endpoint, method, status = key
+            return f'endpoint="{_escape(endpoint)}",method="{method}",status="{status}"'
+
+        _histogram(lines, 'http_request_duration_seconds', 'Request latency in seconds', self.latency_buckets,
+                   [(labels(key), t.latency_counts, t.latency_sum) for key, t in totals])
+        _histogram(lines, 'http_request_sql_queries', 'SQL statements executed per request', QUERY_COUNT_BUCKETS,
+                   [(labels(key), t.query_counts, t.queries) for key, t in totals])
+        for name, attribute, description in (
+            ('http_request_sql_duration_seconds_total', 'sql_seconds', 'Time spent executing SQL'),
+            ('http_request_sql_rows_total', 'rows', 'Rows fetched from the database'),
+            ('http_request_serialization_seconds_total', 'serialization_seconds',
+             'Time spent in compiled schema dumps and JSON encoding'),
+            ('http_response_bytes_total', 'response_bytes', 'Response body bytes sent (streamed bodies excluded)')
+        ):
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+            lines += [f'{name}{{{labels(key)}}} {_number(getattr(t, attribute))}' for key, t in totals]
+
+        if pool_monitor is not None:
+            _pool_metrics(lines, pool_monitor.stats())
+        if replica_router is not None:
+            lines += ['# HELP db_replica_healthy Whether reads may use the read replica',
+                      '# TYPE db_replica_healthy gauge',
+                      f'db_replica_healthy {int(replica_router.healthy)}',
+                      '# HELP db_replica_routed_requests_total Requests that read from the replica',
+                      '# TYPE db_replica_routed_requests_total counter',
+                      f'db_replica_routed_requests_total {replica_router.routed_requests}']
+        return '\n'.join(lines) + '\n'
+
+
+def _pool_metrics(lines, stats):
+    wait = stats['wait_time']
+    gauges = [('db_pool_checked_out', 'Connections currently checked out', stats['checked_out'])]
+    if 'size' in stats:
+        gauges += [('db_pool_size', 'Connections kept open', stats['size']),
+                   ('db_pool_overflow', 'Overflow connections open', stats['overflow'])]
+    for name, description, value in gauges:
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} gauge', f'{name} {value}']
+    for name, description, value in (
+        ('db_pool_checkouts_total', 'Connections checked out of the pool', stats['checkouts']),
+        ('db_pool_timeouts_total', 'Checkouts that timed out waiting for a connection', stats['timeouts']),
+        ('db_pool_held_too_long_total', 'Connections returned after DB_POOL_HOLD_WARNING seconds',
+         stats['held_too_long']['total'])
+    ):
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} counter', f'{name} {value}']
+    if wait['count']:
+        # PoolMonitor's buckets are cumulative and in milliseconds
+        buckets = [bucket['le_ms'] / 1000 for bucket in wait['buckets'][:-1]]
+        counts, previous = [], 0
+        for bucket in wait['buckets']:
+            counts.append(bucket['count'] - previous)
+            previous = bucket['count']
+        _histogram(lines, 'db_pool_wait_seconds', 'Time spent waiting for a connection', buckets,
+                   [('', counts, wait['sum_ms'] / 1000)])
+
+
+def _histogram(lines, name, description, buckets, series):
+    """Append a histogram family; series are (labels, per-bucket counts incl. +Inf, sum)"""
+    lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+    for label_text, counts, total in series:
+        prefix = label_text + ',' if label_text else ''
+        cumulative = 0
+        for bound, count in zip(tuple(buckets) + ('+Inf',), counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{_number(bound)}"}} {cumulative}')
+        braces = f'{{{label_text}}}' if label_text else ''
+        lines.append(f'{name}_sum{braces} {_number(total)}')
+        lines.append(f'{name}_count{braces} {cumulative}')
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_metrics = RequestMetrics()
@@ -1,41 +1,86 @@
+import re
 from application.extensions import db
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
-from werkzeug.security import generate_password_hash, check_password_hash
+from application.passwords import password_hasher
+from application.vin_decoder import vin_columns
+
+
+def normalize_phone(phone):
+    """Reduce a phone number to its digits (dropping a leading US country code) for indexed lookups"""
+    if phone is None:
+        return None
+    digits = re.sub(r'\D', '', str(phone))
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits
 
 
 class Customer(db.Model):
     __tablename__ = 'customers'
+    __table_args__ = (
+        # Prefix index for "last name, first name" lookups from the front desk
+        db.Index(
+            'ix_customers_last_first',
+            'last_name', 'first_name',
+            mysql_length={'last_name': 50, 'first_name': 50}
+        ),
+    )
     
     customer_id: Mapped[int] = mapped_column(primary_key=True)
     first_name: Mapped[str] = mapped_column(db.String(255), nullable=False)
     last_name: Mapped[str] = mapped_column(db.String(255), nullable=False)
     email: Mapped[str] = mapped_column(db.String(255), nullable=False, unique=True)
     phone: Mapped[str] = mapped_column(db.String(50), nullable=False)
+    # Search columns maintained on write (see validators below) so lookups are pure index seeks
+    phone_normalized: Mapped[Optional[str]] = mapped_column(db.String(20), nullable=True, index=True)
+    email_lower: Mapped[Optional[str]] = mapped_column(db.String(255), nullable=True, index=True)
     address: Mapped[Optional[str]] = mapped_column(db.String(255), nullable=True)
     city: Mapped[Optional[str]] = mapped_column(db.String(100), nullable=True)
     state: Mapped[Optional[str]] = mapped_column(db.String(50), nullable=True)
     postal_code: Mapped[Optional[str]] = mapped_column(db.String(20), nullable=True)
     password_hash: Mapped[str] = mapped_column(db.String(255), nullable=False)
+    # Carried in every access token ('ver' claim); bumping it invalidates all outstanding tokens
+    token_version: Mapped[int] = mapped_column(nullable=False, default=0, server_default='0')
     created_at: Mapped[datetime] = mapped_column(db.TIMESTAMP, default=datetime.utcnow)
     
     # Relationships
     vehicles: Mapped[List['Vehicle']] = relationship(back_populates='customer')
     service_tickets: Mapped[List['ServiceTicket']] = relationship(back_populates='customer')
     
+    @validates('phone')
+    def _sync_phone_normalized(self, key, phone):
+        """Keep phone_normalized in step with phone on every write"""
+        self.phone_normalized = normalize_phone(phone)
+        return phone
+    
+    @validates('email')
+    def _sync_email_lower(self, key, email):
+        """Keep email_lower in step with email on every write"""
+        self.email_lower = email.lower() if email is not None else None
+        return email
+    
     def set_password(self, password):
-        """Hash and set the user's password"""
-        self.password_hash = generate_password_hash(password)
+        """Hash and set the user's password (in the hashing pool, see application/passwords.py)"""
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Check if the provided password matches the hash"""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash was made with outdated cost parameters"""
+        return password_hasher.needs_rehash(self.password_hash)
 
 
 class Vehicle(db.Model):
     __tablename__ = 'vehicles'
+    __table_args__ = (
+        # Reporting by manufacturer and model year
+        db.Index('ix_vehicles_vin_manufacturer_year', 'vin_manufacturer', 'vin_model_year'),
+    )
     
     vehicle_id: Mapped[int] = mapped_column(primary_key=True)
     customer_id: Mapped[int] = mapped_column(db.ForeignKey('customers.customer_id'), nullable=False)
@@ -44,10 +89,23 @@ class Vehicle(db.Model):
     model: Mapped[str] = mapped_column(db.String(100), nullable=False)
     year: Mapped[int] = mapped_column(nullable=False)
     color: Mapped[str] = mapped_column(db.String(50), nullable=False)
+    # Attributes decoded from the VIN on write (see application/vin_decoder.py)
+    vin_wmi: Mapped[Optional[str]] = mapped_column(db.String(3), nullable=True, index=True)
+    vin_manufacturer: Mapped[Optional[str]] = mapped_column(db.String(100), nullable=True)
+    vin_model_year: Mapped[Optional[int]] = mapped_column(nullable=True, index=True)
+    vin_plant_code: Mapped[Optional[str]] = mapped_column(db.String(1), nullable=True)
+    vin_check_digit_valid: Mapped[Optional[bool]] = mapped_column(db.Boolean, nullable=True)
     
     # Relationships
     customer: Mapped['Customer'] = relationship(back_populates='vehicles')
     service_tickets: Mapped[List['ServiceTicket']] = relationship(back_populates='vehicle')
+    
+    @validates('vin')
+    def _decode_vin(self, key, vin):
+        """Store the decoded VIN attributes alongside the VIN on every write"""
+        for column, value in vin_columns(vin).items():
+            setattr(self, column, value)
+        return vin
 
 
 class Mechanic(db.Model):
@@ -89,6 +147,10 @@ class Service(db.Model):
 
 class ServiceTicket(db.Model):
     __tablename__ = 'service_tickets'
+    __table_args__ = (
+        # Serves "tickets for this vehicle, newest first" as a single index range scan
+        db.Index('ix_service_tickets_vehicle_ticket', 'vehicle_id', 'ticket_id'),
+    )
     
     ticket_id: Mapped[int] = mapped_column(primary_key=True)
     vehicle_id: Mapped[int] = mapped_column(db.ForeignKey('vehicles.vehicle_id'), nullable=False)
@@ -187,7 +249,7 @@ class TicketPart(db.Model):
     def get_total_cost(self):
         """Calculate total cost with markup"""
         base_cost = (self.quantity_used * self.unit_cost_cents) / 100
-        markup = base_cost * (self.markup_percentage / 100)
+        markup = base_cost * (float(self.markup_percentage) / 100)  # Numeric columns load as Decimal
         return round(base_cost + markup, 2)
     
     def is_under_warranty(self):
@@ -283,3 +345,66 @@ class ServicePackageItem(db.Model):
     # Relationships
     package: Mapped['ServicePackage'] = relationship(back_populates='included_services')
     service: Mapped['Service'] = relationship(back_populates='package_memberships')
+
+
+class ServiceReminder(db.Model):
+    """Materialized "package due soon" list, rebuilt by the reminder engine (application/reminders.py)"""
+    __tablename__ = 'service_reminders'
+    
+    # Rows are inserted most-overdue first, so reminder_id order is due order
+    reminder_id: Mapped[int] = mapped_column(primary_key=True)
+    # Derived rows: they go away with the vehicle or package they were computed for
+    vehicle_id: Mapped[int] = mapped_column(
+        db.ForeignKey('vehicles.vehicle_id', ondelete='CASCADE'), nullable=False, index=True
+    )
+    package_id: Mapped[int] = mapped_column(
+        db.ForeignKey('service_packages.package_id', ondelete='CASCADE'), nullable=False, index=True
+    )
+    last_odometer_miles: Mapped[int] = mapped_column(nullable=False)
+    last_visit_at: Mapped[datetime] = mapped_column(db.TIMESTAMP, nullable=False)
+    miles_per_day: Mapped[float] = mapped_column(db.Float, nullable=False)
+    projected_odometer_miles: Mapped[int] = mapped_column(nullable=False)
+    due_odometer_miles: Mapped[int] = mapped_column(nullable=False)
+    due_date: Mapped[date] = mapped_column(db.Date, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(db.TIMESTAMP, nullable=False)
+    
+    # Relationships
+    vehicle: Mapped['Vehicle'] = relationship()
+    package: Mapped['ServicePackage'] = relationship()
+
+
+class DeletionJob(db.Model):
+    """Progress of a chunked cascade delete (see application/deletion.py)"""
+    __tablename__ = 'deletion_jobs'
+    __table_args__ = (
+        db.Index('ix_deletion_jobs_target', 'target_type', 'target_id'),
+    )
+    
+    job_id: Mapped[str] = mapped_column(db.String(32), primary_key=True)
+    target_type: Mapped[str] = mapped_column(db.String(50), nullable=False)
+    target_id: Mapped[int] = mapped_column(nullable=False)
+    status: Mapped[str] = mapped_column(db.String(20), nullable=False, default='pending')
+    restock_parts: Mapped[bool] = mapped_column(db.Boolean, nullable=False, default=False)
+    # Rows deleted so far, per table: {"ticket_parts": 120, "service_tickets": 40, ...}
+    progress: Mapped[dict] = mapped_column(db.JSON, nullable=False, default=dict)
+    parts_restocked: Mapped[int] = mapped_column(nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(db.Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(db.TIMESTAMP, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(db.TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(db.TIMESTAMP, nullable=True)
+    
+    def record_deleted(self, table, count):
+        """Add to the per-table deleted row count (reassigned so the JSON column is flagged dirty)"""
+        self.progress = {**(self.progress or {}), table: (self.progress or {}).get(table, 0) + count}
+
+
+class RevokedToken(db.Model):
+    """A logged-out access or refresh token (see application/revocation.py)"""
+    __tablename__ = 'revoked_tokens'
+    
+    jti: Mapped[str] = mapped_column(db.String(36), primary_key=True)
+    token_type: Mapped[str] = mapped_column(db.String(10), nullable=False)
+    customer_id: Mapped[Optional[int]] = mapped_column(nullable=True)
+    # The row is only needed until the token would have expired anyway
+    expires_at: Mapped[datetime] = mapped_column(db.TIMESTAMP, nullable=False, index=True)
+    revoked_at: Mapped[datetime] = mapped_column(db.TIMESTAMP, nullable=False, default=datetime.utcnow, index=True)
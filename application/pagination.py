@@ -0,0 +1,163 @@
+"""
+Shared helpers for list endpoints
+
+Two techniques are used by the large list endpoints (mechanics, inventory, customers):
+
+1. Keyset pagination: instead of LIMIT/OFFSET (which makes the database scan and
+   throw away every skipped row), each page continues from the last primary key
+   the client saw: WHERE pk > :cursor ORDER BY pk LIMIT :limit. Every page costs
+   a single index range seek no matter how deep the client pages.
+
+2. Sparse fieldsets: a ?fields=a,b,c query parameter limits the response to the
+   listed fields. The selection is pushed down into the SQL projection with
+   load_only(), so list views never read large Text columns they don't display.
+"""
+from functools import lru_cache
+from sqlalchemy.orm import load_only
+
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+
+
+class PaginationError(ValueError):
+    """Raised when pagination or fieldset query parameters are invalid"""
+    pass
+
+
+def wants_keyset(args):
+    """Keyset mode is opt-in: it is used when the client sends limit or cursor"""
+    return 'limit' in args or 'cursor' in args
+
+
+def parse_keyset_args(args, default_limit=DEFAULT_PAGE_LIMIT, max_limit=MAX_PAGE_LIMIT):
+    """
+    Read the keyset pagination parameters from the query string
+
+    Query parameters:
+    - limit: Page size (default: 20, max: 100)
+    - cursor: The next_cursor value returned by the previous page (omit for the first page)
+
+    Returns:
+        tuple: (limit, cursor) where cursor is None for the first page
+    """
+    try:
+        limit = int(args.get('limit', default_limit))
+    except (TypeError, ValueError):
+        raise PaginationError("limit must be an integer")
+    if limit < 1 or limit > max_limit:
+        raise PaginationError(f"limit must be between 1 and {max_limit}")
+
+    cursor = args.get('cursor')
+    if cursor in (None, ''):
+        return limit, None
+    try:
+        cursor = int(cursor)
+    except (TypeError, ValueError):
+        raise PaginationError("cursor must be an integer")
+    if cursor < 0:
+        raise PaginationError("cursor must be >= 0")
+    return limit, cursor
+
+
+def apply_keyset(query, key_column, cursor, limit, descending=False):
+    """
+    Restrict a select() to one keyset page
+
+    One extra row is fetched so the caller can tell whether a next page exists
+    without running a COUNT query. With descending=True the newest rows come
+    first and the cursor continues towards smaller keys.
+    """
+    if descending:
+        if cursor is not None:
+            query = query.where(key_column < cursor)
+        return query.order_by(key_column.desc()).limit(limit + 1)
+    if cursor is not None:
+        query = query.where(key_column > cursor)
+    return query.order_by(key_column).limit(limit + 1)
+
+
+def keyset_page(rows, limit, key_name):
+    """
+    Trim the extra look-ahead row fetched by apply_keyset()
+
+    Returns:
+        tuple: (rows, pagination) where pagination is the metadata dict for the response
+    """
+    rows = list(rows)
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = getattr(rows[-1], key_name) if has_next and rows else None
+    return rows, {
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'has_next': has_next
+    }
+
+
+def parse_fields(args, schema):
+    """
+    Read the ?fields= sparse fieldset parameter
+
+    Returns:
+        frozenset | None: The requested field names, or None when the full representation is wanted
+
+    Raises:
+        PaginationError: If a requested field is not part of the schema
+    """
+    raw = args.get('fields')
+    if not raw:
+        return None
+
+    requested = frozenset(name.strip() for name in raw.split(',') if name.strip())
+    if not requested:
+        return None
+
+    available = {name for name, field in schema.fields.items() if not field.load_only}
+    unknown = sorted(requested - available)
+    if unknown:
+        raise PaginationError(f"Unknown field(s) requested: {', '.join(unknown)}")
+    return requested
+
+
+def projection_options(model, fields, key_column, dependencies=None):
+    """
+    Build a load_only() loader option covering exactly the requested fields
+
+    Args:
+        model: The mapped class being queried
+        fields: Field names from parse_fields()
+        key_column: The primary key column (always loaded; keyset paging needs it)
+        dependencies: Optional mapping of computed schema fields to the columns they read,
+            e.g. {'needs_reorder': ('quantity_in_stock', 'reorder_level')}
+
+    Returns:
+        list: Loader options to pass to query.options(*...)
+    """
+    dependencies = dependencies or {}
+    columns = set(model.__table__.columns.keys())
+
+    wanted = {key_column.key}
+    for name in fields:
+        if name in columns:
+            wanted.add(name)
+        wanted.update(dependencies.get(name, ()))
+
+    return [load_only(*(getattr(model, name) for name in sorted(wanted)))]
+
+
+@lru_cache(maxsize=128)
+def _sparse_schema(schema_class, fields):
+    return schema_class(many=True, only=tuple(sorted(fields)))
+
+
+def sparse_schema(schema, fields):
+    """
+    Return a many=True schema instance that dumps only the requested fields
+
+    Schema instances are cached per (schema class, fieldset) so building the
+    field map is paid once per distinct fieldset, not once per request.
+    """
+    if fields is None:
+        return schema
+    return _sparse_schema(type(schema), fields)
@@ -0,0 +1,117 @@
+"""
+Password hashing service
+
+scrypt/pbkdf2 are deliberately CPU-expensive, and doing them inside the request
+worker means a burst of logins (opening time, a mobile app release) pins every
+worker and stalls unrelated requests. The hasher runs the work in a bounded
+process pool instead:
+
+- PASSWORD_HASH_WORKERS processes do the hashing, so hashing never uses more
+  than that many cores however many requests arrive
+- At most PASSWORD_HASH_MAX_PENDING hashes are queued or running; a request
+  that can't get a slot within PASSWORD_HASH_QUEUE_TIMEOUT seconds fails fast
+  with PasswordHashingBusy (503 + Retry-After) instead of piling up
+- PASSWORD_HASH_POOL = 'inline' hashes in the calling thread (tests, CLI)
+
+The cost parameters are the Werkzeug method string in PASSWORD_HASH_METHOD
+(e.g. 'scrypt:32768:8:1', 'pbkdf2:sha256:600000'). Hashes made with other
+parameters still verify, and needs_rehash() tells the login route to upgrade
+them while the plain-text password is at hand.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHashingBusy(ServiceUnavailable):
+    """Raised when the hashing pool is saturated"""
+    description = "Too many sign-ins are being processed. Please retry shortly."
+
+
+def _hash_password(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def _verify_password(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+class PasswordHasher:
+    """Flask extension that hashes and verifies passwords off the request thread"""
+
+    def __init__(self, app=None):
+        self.method = 'scrypt:32768:8:1'
+        self.method_prefix = self.method
+        self.salt_length = 16
+        self.pool_mode = 'process'
+        self.workers = 2
+        self.queue_timeout = 5.0
+        self.retry_after = 1
+        self._slots = None
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.method = config.setdefault('PASSWORD_HASH_METHOD', self.method)
+        self.salt_length = config.setdefault('PASSWORD_HASH_SALT_LENGTH', self.salt_length)
+        # What Werkzeug writes before the first '$' for this method: 'scrypt' or 'pbkdf2' are
+        # stored with their default parameters expanded (scrypt:32768:8:1), so hash once to see
+        self.method_prefix = _hash_password('', self.method, 1).split('$', 1)[0]
+        self.pool_mode = config.setdefault('PASSWORD_HASH_POOL', self.pool_mode)
+        self.workers = config.setdefault('PASSWORD_HASH_WORKERS', os.cpu_count() or self.workers)
+        self.queue_timeout = config.setdefault('PASSWORD_HASH_QUEUE_TIMEOUT', self.queue_timeout)
+        max_pending = config.setdefault('PASSWORD_HASH_MAX_PENDING', self.workers * 4)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.shutdown()
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(_hash_password, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        """Check a password against a stored hash (any supported method)"""
+        if not pwhash:
+            return False
+        return self._run(_verify_password, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if the hash was made with different cost parameters than the configured ones"""
+        return not pwhash or pwhash.split('$', 1)[0] != self.method_prefix
+
+    def shutdown(self):
+        """Stop the worker processes (they are restarted on the next hash)"""
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _run(self, func, *args):
+        if self.pool_mode == 'inline':
+            return func(*args)
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHashingBusy(retry_after=self.retry_after)
+        try:
+            return self._get_executor().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def _get_executor(self):
+        # Pools don't survive fork (e.g. gunicorn preloading the app), so each process starts its own
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    self._executor_pid = pid
+        return self._executor
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,263 @@
+"""
+Service prerequisite graph
+
+ServicePrerequisite rows say "service A needs service B first" (is_required),
+or only recommend it, optionally with a gap in hours between the two. The
+whole graph is small and read on every quote, so it is loaded once per process
+into a PrerequisiteGraph:
+
+- services are numbered 0..n-1 in service_id order; prerequisites are
+  adjacency tuples of those indices (all edges, and required edges only)
+- a topological rank per service (prerequisites first, service_id breaking
+  ties) is computed once with Kahn's algorithm
+- the transitive closure of each service's required prerequisites is computed
+  on first use and memoized, and so is every work plan
+
+A work plan for a set of requested services is the union of their closures,
+sorted by rank, so repeat quotes cost a dictionary lookup and new ones a few
+set unions. A service or prerequisite written through the ORM drops the graph
+in the process that wrote it (via the cache invalidation registry), and it is
+rebuilt on the next use. That version is per process, so writes from other
+workers, migrations and direct SQL don't drop it: every graph is also rebuilt
+once it is CATALOG_SNAPSHOT_MAX_AGE seconds old, like the catalog snapshot.
+
+Writes are checked as well: a flush that adds or changes prerequisite rows
+re-reads the graph inside the transaction and raises PrerequisiteCycleError if
+it now contains a cycle, so the commit fails before a cycle is stored.
+"""
+import heapq
+import threading
+import time
+from functools import lru_cache
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from application.extensions import db
+from application.db_routing import primary_reads
+from application.models import Service, ServicePrerequisite
+from application.cache_invalidation import invalidates, on_bump, cache_version
+
+
+PREREQUISITE_NAMESPACE = 'service_prerequisites'
+PREREQUISITE_KEY = 'graph'
+
+WORK_PLAN_CACHE_SIZE = 4096
+
+
+class PrerequisiteCycleError(ValueError):
+    """Raised when prerequisites would make a service (indirectly) depend on itself"""
+
+    def __init__(self, service_ids):
+        self.service_ids = list(service_ids)
+        super().__init__(
+            'Service prerequisites form a cycle between services ' + ', '.join(str(i) for i in self.service_ids)
+        )
+
+
+class PrerequisiteGraph:
+    """Immutable adjacency arrays for the prerequisite graph, with memoized closures"""
+
+    def __init__(self, version, services, edges):
+        """
+        Args:
+            version (int): Cache version the graph was loaded at
+            services (list): (service_id, name, default_labor_minutes, base_price_cents) rows
+            edges (list): (service_id, prerequisite_service_id, is_required, recommended_gap_hours) rows
+
+        Raises:
+            PrerequisiteCycleError: If the edges contain a cycle
+        """
+        self.version = version
+        self.built_at = time.monotonic()
+        self.service_ids = [row[0] for row in services]
+        self.index = {service_id: i for i, service_id in enumerate(self.service_ids)}
+        self.services = services
+
+        count = len(self.service_ids)
+        prerequisites = [[] for _ in range(count)]
+        required = [[] for _ in range(count)]
+        self.gap_hours = {}
+        for service_id, prerequisite_id, is_required, gap_hours in edges:
+            service, prerequisite = self.index[service_id], self.index[prerequisite_id]
+            prerequisites[service].append(prerequisite)
+            if is_required or is_required is None:
+                required[service].append(prerequisite)
+            self.gap_hours[(service, prerequisite)] = gap_hours
+        self.prerequisites = tuple(tuple(sorted(row)) for row in prerequisites)
+        self.required = tuple(tuple(sorted(row)) for row in required)
+
+        self.rank = self._topological_rank()
+        self._closures = [None] * count
+        self._lock = threading.Lock()
+        self.work_plan = lru_cache(maxsize=WORK_PLAN_CACHE_SIZE)(self._work_plan)
+
+    def _topological_rank(self):
+        """Kahn's algorithm over all edges, smallest service_id first among ready services"""
+        count = len(self.service_ids)
+        waiting_on = [len(row) for row in self.prerequisites]
+        dependents = [[] for _ in range(count)]
+        for service, row in enumerate(self.prerequisites):
+            for prerequisite in row:
+                dependents[prerequisite].append(service)
+
+        ready = [i for i in range(count) if waiting_on[i] == 0]
+        heapq.heapify(ready)
+        rank = [None] * count
+        position = 0
+        while ready:
+            service = heapq.heappop(ready)
+            rank[service] = position
+            position += 1
+            for dependent in dependents[service]:
+                waiting_on[dependent] -= 1
+                if waiting_on[dependent] == 0:
+                    heapq.heappush(ready, dependent)
+
+        if position < count:
+            raise PrerequisiteCycleError(self.service_ids[i] for i in range(count) if rank[i] is None)
+        return tuple(rank)
+
+    def closure(self, service):
+        """Indices of every service the given one requires, directly or transitively (memoized)"""
+        closures = self._closures
+        if closures[service] is not None:
+            return closures[service]
+
+        # Depth-first with an explicit stack (chains can be longer than the recursion limit): a
+        # service is closed once all of its prerequisites are; the graph has no cycles, so this ends
+        stack = [service]
+        while stack:
+            current = stack[-1]
+            if closures[current] is not None:
+                stack.pop()
+                continue
+            pending = [prerequisite for prerequisite in self.required[current] if closures[prerequisite] is None]
+            if pending:
+                stack.extend(pending)
+                continue
+            closure = frozenset(self.required[current]).union(
+                *(closures[prerequisite] for prerequisite in self.required[current])
+            )
+            with self._lock:
+                closures[current] = closure
+            stack.pop()
+        return closures[service]
+
+    def _work_plan(self, requested):
+        needed = set(requested)
+        for service in requested:
+            needed |= self.closure(service)
+        order = sorted(needed, key=self.rank.__getitem__)
+
+        steps = []
+        for service in order:
+            service_id, name, labor_minutes, price_cents = self.services[service]
+            steps.append({
+                'service_id': service_id,
+                'name': name,
+                'default_labor_minutes': labor_minutes,
+                'base_price_cents': price_cents,
+                'requested': service in requested,
+                'prerequisites': [
+                    {
+                        'service_id': self.service_ids[prerequisite],
+                        'recommended_gap_hours': self.gap_hours[(service, prerequisite)]
+                    }
+                    for prerequisite in self.required[service]
+                ],
+                'recommended': [
+                    self.service_ids[prerequisite]
+                    for prerequisite in self.prerequisites[service]
+                    if prerequisite not in self.required[service] and prerequisite not in needed
+                ]
+            })
+        return tuple(steps)
+
+    def plan(self, service_ids):
+        """
+        Topologically ordered, transitively closed work plan for the requested services
+
+        Every required prerequisite is included (marked requested=False) and
+        comes before the services that need it. Optional prerequisites that are
+        not already in the plan are listed under 'recommended'.
+
+        Raises:
+            KeyError: If a service_id doesn't exist
+        """
+        return self.work_plan(frozenset(self.index[service_id] for service_id in service_ids))
+
+
+_graph = None
+_build_lock = threading.Lock()
+
+
+@primary_reads()  # Kept until the catalog version changes: never from a lagging replica
+def load_prerequisite_graph(connection=None, version=None):
+    """Read services and prerequisites (two queries) into a new graph"""
+    execute = connection.execute if connection is not None else db.session.execute
+    services = [tuple(row) for row in execute(
+        select(Service.service_id, Service.name, Service.default_labor_minutes, Service.base_price_cents)
+        .order_by(Service.service_id)
+    )]
+    edges = [tuple(row) for row in execute(
+        select(
+            ServicePrerequisite.service_id, ServicePrerequisite.prerequisite_service_id,
+            ServicePrerequisite.is_required, ServicePrerequisite.recommended_gap_hours
+        )
+    )]
+    return PrerequisiteGraph(version, services, edges)
+
+
+def get_prerequisite_graph():
+    """Return the graph for the current catalog version, loading it if services or prerequisites changed or it expired"""
+    global _graph
+    version = cache_version(PREREQUISITE_NAMESPACE, PREREQUISITE_KEY)
+    max_age = current_app.config['CATALOG_SNAPSHOT_MAX_AGE']
+    graph = _graph
+    if _is_current(graph, version, max_age):
+        return graph
+
+    with _build_lock:
+        graph = _graph
+        if not _is_current(graph, version, max_age):
+            graph = load_prerequisite_graph(version=version)
+            _graph = graph
+    return graph
+
+
+def _is_current(graph, version, max_age):
+    return graph is not None and graph.version == version and time.monotonic() - graph.built_at < max_age
+
+
+def resolve_work_plan(service_ids):
+    """Work plan for the requested service_ids (see PrerequisiteGraph.plan)"""
+    return get_prerequisite_graph().plan(service_ids)
+
+
+# ===== CYCLE CHECK ON WRITE =====
+
+def _reject_cycles(session, flush_context):
+    if not any(isinstance(obj, ServicePrerequisite) for obj in list(session.new) + list(session.dirty)):
+        return
+    # The rows are flushed but not committed: reading the graph through the same
+    # connection sees them, and raising here makes the commit fail
+    load_prerequisite_graph(connection=session.connection())
+
+
+def init_prerequisite_guard():
+    """Attach the cycle check to session flushes (safe to call once per app)"""
+    if not event.contains(Session, 'after_flush', _reject_cycles):
+        event.listen(Session, 'after_flush', _reject_cycles)
+
+
+# ===== CACHE INVALIDATION RULES =====
+
+@invalidates(Service, ServicePrerequisite)
+def _graph_changed(session, row):
+    return [(PREREQUISITE_NAMESPACE, PREREQUISITE_KEY)]
+
+
+@on_bump(PREREQUISITE_NAMESPACE)
+def _drop_graph(key):
+    global _graph
+    _graph = None
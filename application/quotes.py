@@ -0,0 +1,193 @@
+"""
+Package quotes for service tickets
+
+Adding a service package to a ticket turns the package into ticket line items:
+
+- the package's required items, plus whichever optional items the customer
+  chose, in sequence_order
+- before each item, its required prerequisites (transitively, prerequisites
+  first) that aren't already on the quote, at base price
+- each package item's unit price is its base price less the item's
+  discount_percentage, less the package's package_discount_percentage,
+  rounded so the package lines add up to the package price exactly as the
+  catalog rounds it (see _package_unit_prices)
+
+Everything a quote needs is already in process memory: priced packages in the
+catalog snapshot and work plans in the prerequisite graph. Building a quote
+makes no queries (apart from rebuilding either read model after a catalog
+change), so a dry run is free and a real one costs one INSERT for all of its
+line items.
+
+The insert is a Core statement, which bypasses the ORM session events, so the
+ticket's customer summary and vehicle history are invalidated explicitly once
+it commits.
+"""
+from decimal import Decimal, ROUND_FLOOR
+from sqlalchemy import insert
+from application.extensions import db
+from application.models import TicketLineItem
+from application.cache_invalidation import bump_cache_version
+from application.prerequisites import resolve_work_plan
+from application.blueprints.catalog.snapshot import get_catalog_snapshot, _apply_discount, _to_cents
+
+
+LINE_TYPE_PACKAGE = 'package'
+LINE_TYPE_PREREQUISITE = 'prerequisite'
+
+# Columns written to ticket_line_items; the other keys of a quote line are informational
+LINE_ITEM_COLUMNS = ('service_id', 'line_type', 'description', 'quantity', 'unit_price_cents')
+
+
+class PackageNotFound(LookupError):
+    """Raised when a quoted package doesn't exist or isn't active"""
+
+    def __init__(self, package_id):
+        self.package_id = package_id
+        super().__init__(f'Service package {package_id} not found')
+
+
+class InvalidOptionalServices(ValueError):
+    """Raised when chosen optional services aren't optional items of the package"""
+
+    def __init__(self, service_ids):
+        self.service_ids = list(service_ids)
+        super().__init__('Not optional items of this package: ' + ', '.join(str(i) for i in self.service_ids))
+
+
+def build_package_quote(package_id, optional_service_ids=(), include_prerequisites=True):
+    """
+    Expand an active package into priced ticket lines
+
+    Args:
+        package_id (int): Package to quote
+        optional_service_ids (iterable): Optional items of the package to include
+        include_prerequisites (bool): Add each item's missing required prerequisites
+
+    Returns:
+        dict: package_id, name, lines, labor_minutes and total_cents
+
+    Raises:
+        PackageNotFound: If the package doesn't exist or isn't active
+        InvalidOptionalServices: If an optional_service_id isn't an optional item of the package
+    """
+    package = get_catalog_snapshot().packages_by_id.get(package_id)
+    if package is None:
+        raise PackageNotFound(package_id)
+
+    optional_ids = {item['service_id'] for item in package['items'] if item['is_optional']}
+    chosen = set(optional_service_ids)
+    unknown = sorted(chosen - optional_ids)
+    if unknown:
+        raise InvalidOptionalServices(unknown)
+
+    items = [item for item in package['items'] if not item['is_optional'] or item['service_id'] in chosen]
+    unit_prices = _package_unit_prices(package, items)
+    package_service_ids = {item['service_id'] for item in items}
+    quoted = set()
+    lines = []
+
+    for item, prices in zip(items, unit_prices):
+        if include_prerequisites:
+            for step in resolve_work_plan([item['service_id']]):
+                # Prerequisites the package itself schedules are left to its own sequence_order
+                if step['requested'] or step['service_id'] in quoted or step['service_id'] in package_service_ids:
+                    continue
+                quoted.add(step['service_id'])
+                lines.append(_line(
+                    step['service_id'], LINE_TYPE_PREREQUISITE, f"{step['name']} (prerequisite of {item['name']})",
+                    1, step['base_price_cents'], step['default_labor_minutes']
+                ))
+
+        quoted.add(item['service_id'])
+        for quantity, unit_price_cents in prices:
+            lines.append(_line(
+                item['service_id'], LINE_TYPE_PACKAGE, f"{item['name']} ({package['name']})",
+                quantity, unit_price_cents, item['default_labor_minutes']
+            ))
+
+    return {
+        'package_id': package_id,
+        'name': package['name'],
+        'lines': lines,
+        'labor_minutes': sum(line['labor_minutes'] for line in lines),
+        'total_cents': sum(line['price_cents'] for line in lines)
+    }
+
+
+def _package_unit_prices(package, items):
+    """
+    Price the package lines: a list of (quantity, unit_price_cents) per item
+
+    The catalog (_price_package) discounts unrounded amounts and rounds once,
+    the package total; rounding each unit price on its own can miss that total
+    by a cent or more. Unit prices start rounded down and the missing cents go
+    to the items whose unit price lost the most (largest remainder). An item
+    whose quantity is more than the cents left over is split, the remaining
+    cents' worth of units priced a cent higher.
+    """
+    package_discount = Decimal(str(package['package_discount_percentage'] or 0))
+    exact = []
+    items_price = Decimal(0)
+    for item in items:
+        base = Decimal(item['unit_price_cents'])
+        item_discount = Decimal(str(item['discount_percentage']))  # A float in the snapshot
+        exact.append(_apply_discount(_apply_discount(base, item_discount), package_discount))
+        items_price += _apply_discount(base * item['quantity'], item_discount)
+    total_cents = _to_cents(_apply_discount(items_price, package_discount))
+
+    units = [int(price.to_integral_value(rounding=ROUND_FLOOR)) for price in exact]
+    remaining = total_cents - sum(unit * item['quantity'] for unit, item in zip(units, items))
+    by_remainder = sorted((i for i in range(len(items)) if exact[i] != units[i]),
+                          key=lambda i: exact[i] - units[i], reverse=True)
+    rounded_up = set()
+    for i in by_remainder:
+        if 0 < items[i]['quantity'] <= remaining:
+            units[i] += 1
+            remaining -= items[i]['quantity']
+            rounded_up.add(i)
+
+    prices = [[(item['quantity'], unit)] for unit, item in zip(units, items)]
+    if remaining:
+        split = next(i for i in by_remainder if i not in rounded_up)
+        unit = units[split]
+        prices[split] = [(items[split]['quantity'] - remaining, unit), (remaining, unit + 1)]
+    return prices
+
+
+def _line(service_id, line_type, description, quantity, unit_price_cents, labor_minutes):
+    return {
+        'service_id': service_id,
+        'line_type': line_type,
+        'description': description,
+        'quantity': quantity,
+        'unit_price_cents': unit_price_cents,
+        'price_cents': unit_price_cents * quantity,
+        'labor_minutes': (labor_minutes or 0) * quantity
+    }
+
+
+def insert_quote_lines(ticket, quote):
+    """
+    Add a quote's lines to a ticket with one multi-row INSERT and commit
+
+    Returns:
+        int: Number of line items inserted
+    """
+    # Imported here: importing a blueprint package imports its routes, and the service ticket routes import this module
+    from application.blueprints.customer.summary import SUMMARY_NAMESPACE
+    from application.blueprints.vehicle.history import HISTORY_NAMESPACE
+
+    rows = [
+        {'ticket_id': ticket.ticket_id, **{column: line[column] for column in LINE_ITEM_COLUMNS}}
+        for line in quote['lines']
+    ]
+    if not rows:
+        return 0
+
+    customer_id, vehicle_id = ticket.customer_id, ticket.vehicle_id
+    db.session.execute(insert(TicketLineItem.__table__).values(rows))
+    db.session.commit()
+
+    bump_cache_version(SUMMARY_NAMESPACE, customer_id)
+    bump_cache_version(HISTORY_NAMESPACE, vehicle_id)
+    return len(rows)
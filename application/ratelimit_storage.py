@@ -0,0 +1,243 @@
+"""
+SQLite rate limit storage
+
+Flask-Limiter's default memory:// storage is per process, so with N gunicorn
+workers every limit is really N times as generous. This registers a
+sqlite:// storage scheme with the limits library: all workers on a host share
+one database file in WAL mode, and the limits hold across workers without
+running Redis or memcached.
+
+    RATELIMIT_STORAGE_URI = 'sqlite:////var/lib/mechanic_shop/ratelimit.db'
+    RATELIMIT_STRATEGY = 'fixed-window' | 'moving-window' | 'sliding-window-counter'
+
+Every hit is one short write transaction:
+
+- fixed-window / sliding-window-counter: one UPSERT ... RETURNING on a counter row
+- moving-window: count + insert on an (key, timestamp) event log, under
+  BEGIN IMMEDIATE so concurrent workers can't both take the last slot
+
+SQLite's own busy handler polls with growing sleeps, which under a burst gives
+some writers multi-millisecond stalls (or "database is locked" once the
+timeout passes). Writers therefore queue on a thread lock plus an flock() on
+<path>.lock instead, which wakes the next writer as soon as the lock is
+released; SQLite itself then never sees two writers at once. Reads don't take
+the lock (WAL readers don't block writers).
+
+Expired counters and events are swept every SWEEP_EVERY writes per connection.
+For limits shared between hosts, point RATELIMIT_STORAGE_URI at Redis instead.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from math import floor
+from limits.storage.base import (
+    Storage, MovingWindowSupport, SlidingWindowCounterSupport, TimestampedSlidingWindow
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to SQLite's busy handler
+    fcntl = None
+
+
+SWEEP_EVERY = 1000
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS events (key TEXT NOT NULL, at REAL NOT NULL, expires_at REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS ix_events_key_at ON events (key, at)',
+    'CREATE INDEX IF NOT EXISTS ix_events_expires_at ON events (expires_at)',
+)
+
+
+class SQLiteStorage(Storage, MovingWindowSupport, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """limits storage backed by a local SQLite file, shared by every process on the host"""
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri=None, wrap_exceptions=False, timeout=5.0, **options):
+        # Same form as SQLAlchemy URLs: sqlite:////absolute/path.db or sqlite:///relative/path.db
+        self.path = uri[len('sqlite:///'):] if uri and uri.startswith('sqlite:///') else ':memory:'
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        self._write_mutex = threading.Lock()
+        self._lock_file = None
+        self._lock_file_pid = None
+        if self.path != ':memory:' and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads or survive fork: one per thread per process
+        local = self._local
+        if getattr(local, 'connection', None) is None or local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            local.connection = connection
+            local.pid = os.getpid()
+            local.writes = 0
+        return local.connection
+
+    @contextmanager
+    def _writing(self):
+        """Hold the host-wide writer lock (one writer at a time, woken in turn)"""
+        with self._write_mutex:
+            if fcntl is None or self.path == ':memory:':
+                yield
+                return
+            if self._lock_file is None or self._lock_file_pid != os.getpid():
+                # flock() locks belong to the open file, which a forked worker must not share
+                self._lock_file = open(self.path + '.lock', 'a')
+                self._lock_file_pid = os.getpid()
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _wrote(self, connection, now):
+        local = self._local
+        local.writes += 1
+        if local.writes % SWEEP_EVERY == 0:
+            connection.execute('DELETE FROM counters WHERE expires_at <= ?', (now,))
+            connection.execute('DELETE FROM events WHERE expires_at <= ?', (now,))
+
+    # ===== FIXED WINDOW =====
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        connection = self._connection()
+        with self._writing():
+            # An expired counter restarts at amount with a fresh expiry, in the same statement
+            value = connection.execute(
+                'INSERT INTO counters (key, value, expires_at) VALUES (?1, ?2, ?3 + ?4) '
+                'ON CONFLICT (key) DO UPDATE SET '
+                'value = CASE WHEN expires_at <= ?3 THEN excluded.value ELSE value + excluded.value END, '
+                'expires_at = CASE WHEN expires_at <= ?3 THEN excluded.expires_at ELSE expires_at END '
+                'RETURNING value',
+                (key, amount, now, expiry)
+            ).fetchone()[0]
+            self._wrote(connection, now)
+        return value
+
+    def decr(self, key, amount=1):
+        connection = self._connection()
+        with self._writing():
+            row = connection.execute(
+                'UPDATE counters SET value = MAX(value - ?, 0) WHERE key = ? AND expires_at > ? RETURNING value',
+                (amount, key, time.time())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM counters WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        row = self._connection().execute(
+            'SELECT expires_at FROM counters WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def clear(self, key):
+        connection = self._connection()
+        with self._writing():
+            connection.execute('DELETE FROM counters WHERE key = ?', (key,))
+            connection.execute('DELETE FROM events WHERE key = ?', (key,))
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        connection = self._connection()
+        with self._writing():
+            counters = connection.execute('DELETE FROM counters').rowcount
+            events = connection.execute('DELETE FROM events').rowcount
+        return max(counters, events)
+
+    # ===== MOVING WINDOW =====
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        connection = self._connection()
+        with self._writing():
+            now = time.time()
+            # IMMEDIATE takes SQLite's write lock up front, so the count and the insert are one atomic step
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                acquired = connection.execute(
+                    'SELECT COUNT(*) FROM events WHERE key = ? AND at > ?', (key, now - expiry)
+                ).fetchone()[0]
+                if acquired + amount > limit:
+                    connection.execute('COMMIT')
+                    return False
+                connection.executemany(
+                    'INSERT INTO events (key, at, expires_at) VALUES (?, ?, ?)', [(key, now, now + expiry)] * amount
+                )
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            self._wrote(connection, now)
+        return True
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        oldest, acquired = self._connection().execute(
+            'SELECT MIN(at), COUNT(*) FROM events WHERE key = ? AND at > ?', (key, now - expiry)
+        ).fetchone()
+        return (oldest, acquired) if acquired else (now, 0)
+
+    # ===== SLIDING WINDOW COUNTER =====
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count, previous_ttl, current_count, _ = self._sliding_window_info(
+            previous_key, current_key, expiry, now
+        )
+        if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+            return False
+        # The current window's counter lives for two windows: it is the previous one next time round
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if floor(previous_count * previous_ttl / expiry + current_count) > limit:
+            # Another worker took the last slot between the read and the increment
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def _sliding_window_info(self, previous_key, current_key, expiry, now):
+        previous_count = self.get(previous_key)
+        current_count = self.get(current_key)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._sliding_window_info(previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
@@ -0,0 +1,221 @@
+"""
+Mileage-based service reminders
+
+Connects ServicePackage.recommended_mileage_interval to the odometer readings
+recorded on service tickets and materializes the list of (vehicle, package)
+pairs that are due within a horizon into service_reminders.
+
+For every vehicle with ticket history:
+
+- last reading: highest odometer on any ticket, and when the latest visit was
+- accrual rate: miles per day between the first and last visits, or
+  REMINDER_DEFAULT_MILES_PER_DAY when the history is too short to tell
+- projected odometer today: last reading + rate * days since the last visit
+
+For every active package with a mileage interval, the next due mileage is the
+odometer at which any of the package's required services was last performed
+plus the interval, or the next multiple of the interval if it never was. The
+pair is due when the projected odometer reaches that mileage within
+REMINDER_HORIZON_DAYS.
+
+The database does the per-vehicle aggregation (two GROUP BY queries); the
+projection runs as NumPy array arithmetic over a vehicles x packages matrix.
+For 200k vehicles the projection itself takes around 0.1s; a full refresh is
+a few seconds, almost all of it fetching the aggregates and inserting the due
+rows.
+"""
+from datetime import datetime
+import numpy as np
+from flask import current_app
+from sqlalchemy import select, func, delete, insert, type_coerce, String
+from application.extensions import db
+from application.models import (
+    ServiceTicket, TicketLineItem, ServicePackage, ServicePackageItem, ServiceReminder
+)
+
+
+# Shorter histories give a meaningless rate (two visits in one week), use the default instead
+MIN_OBSERVED_DAYS = 30
+# Anything faster is a typo in an odometer reading, not a vehicle
+MAX_MILES_PER_DAY = 1000.0
+
+_ONE_DAY = np.timedelta64(1, 'D')
+
+
+def refresh_service_reminders(now=None, horizon_days=None, default_miles_per_day=None, batch_size=5000):
+    """
+    Recompute and replace the materialized due list
+
+    The old rows are deleted and the new ones inserted in one transaction, so
+    readers see either the previous list or the new one.
+
+    Returns:
+        int: Number of reminders stored
+    """
+    config = current_app.config
+    now = now or datetime.utcnow()
+    horizon_days = config['REMINDER_HORIZON_DAYS'] if horizon_days is None else horizon_days
+    default_miles_per_day = default_miles_per_day or config['REMINDER_DEFAULT_MILES_PER_DAY']
+
+    packages = db.session.execute(
+        select(ServicePackage.package_id, ServicePackage.recommended_mileage_interval)
+        .where(ServicePackage.is_active.is_(True), ServicePackage.recommended_mileage_interval > 0)
+        .order_by(ServicePackage.package_id)
+    ).all()
+    history = load_odometer_history()
+
+    rows = []
+    if packages and history['vehicle_ids'].size:
+        package_ids = np.array([package.package_id for package in packages], dtype=np.int64)
+        intervals = np.array([package.recommended_mileage_interval for package in packages], dtype=np.float64)
+        last_done = load_last_done_odometers(history['vehicle_ids'], package_ids)
+
+        due = project_due(
+            history, intervals, last_done, np.datetime64(now, 's'), horizon_days, default_miles_per_day
+        )
+        rows = _reminder_rows(history, package_ids, due, now)
+
+    # Core executemany: the rows are plain dicts, there is nothing for the ORM to track
+    reminders = ServiceReminder.__table__
+    db.session.execute(delete(reminders))
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(insert(reminders), rows[start:start + batch_size])
+    db.session.commit()
+    return len(rows)
+
+
+def load_odometer_history():
+    """
+    First/last visit and odometer per vehicle, as arrays sorted by vehicle_id
+
+    Returns:
+        dict: vehicle_ids, first_seen, last_seen (datetime64[s]), first_odometer, last_odometer (float64)
+    """
+    # Timestamps skip SQLAlchemy's per-row datetime processing: NumPy converts whatever the
+    # driver returns (datetime objects, or ISO strings on SQLite) in one vectorized pass
+    rows = db.session.execute(
+        select(
+            ServiceTicket.vehicle_id,
+            type_coerce(func.min(ServiceTicket.opened_at), String),
+            type_coerce(func.max(ServiceTicket.opened_at), String),
+            func.min(ServiceTicket.odometer_miles),
+            func.max(ServiceTicket.odometer_miles)
+        )
+        .where(ServiceTicket.opened_at.is_not(None))
+        .group_by(ServiceTicket.vehicle_id)
+        .order_by(ServiceTicket.vehicle_id)
+    ).tuples().all()
+
+    vehicle_ids, first_seen, last_seen, first_odometer, last_odometer = zip(*rows) if rows else ((),) * 5
+    return {
+        'vehicle_ids': np.array(vehicle_ids, dtype=np.int64),
+        'first_seen': np.array(first_seen, dtype='datetime64[s]'),
+        'last_seen': np.array(last_seen, dtype='datetime64[s]'),
+        'first_odometer': np.array(first_odometer, dtype=np.float64),
+        'last_odometer': np.array(last_odometer, dtype=np.float64)
+    }
+
+
+def load_last_done_odometers(vehicle_ids, package_ids):
+    """
+    Odometer at which each package was last (partly) performed on each vehicle
+
+    Returns:
+        ndarray: float64 matrix (vehicles x packages), NaN where never performed
+    """
+    last_done = np.full((vehicle_ids.size, package_ids.size), np.nan)
+    rows = db.session.execute(
+        select(ServiceTicket.vehicle_id, ServicePackageItem.package_id, func.max(ServiceTicket.odometer_miles))
+        .join(TicketLineItem, TicketLineItem.ticket_id == ServiceTicket.ticket_id)
+        .join(ServicePackageItem, ServicePackageItem.service_id == TicketLineItem.service_id)
+        .where(
+            ServicePackageItem.package_id.in_(package_ids.tolist()),
+            ServicePackageItem.is_optional.is_not(True)
+        )
+        .group_by(ServiceTicket.vehicle_id, ServicePackageItem.package_id)
+    ).tuples().all()
+    if rows:
+        done_vehicles, done_packages, odometers = (np.array(column) for column in zip(*rows))
+        # Drop vehicles the history doesn't have (no dated ticket, or a first ticket committed
+        # after it was read): their positions would point at a neighbouring vehicle or past the end
+        known = np.isin(done_vehicles, vehicle_ids)
+        done_vehicles, done_packages, odometers = done_vehicles[known], done_packages[known], odometers[known]
+        # Both id arrays are sorted, so positions are a binary search away
+        last_done[np.searchsorted(vehicle_ids, done_vehicles), np.searchsorted(package_ids, done_packages)] = odometers
+    return last_done
+
+
+def project_due(history, intervals, last_done, now, horizon_days, default_miles_per_day):
+    """
+    Vectorized due-date projection for every vehicle x package pair
+
+    Args:
+        history (dict): Arrays from load_odometer_history()
+        intervals (ndarray): Mileage interval per package
+        last_done (ndarray): Matrix from load_last_done_odometers()
+        now (datetime64): Reference time
+        horizon_days (int): Report pairs due within this many days (overdue pairs always)
+        default_miles_per_day (float): Rate for vehicles without enough history
+
+    Returns:
+        dict: vehicle_index, package_index, miles_per_day, projected_odometer,
+              due_odometer, days_until_due; one entry per due pair, most overdue first
+    """
+    observed_days = (history['last_seen'] - history['first_seen']) / _ONE_DAY
+    observed_miles = history['last_odometer'] - history['first_odometer']
+    measured = (observed_days >= MIN_OBSERVED_DAYS) & (observed_miles > 0)
+    miles_per_day = np.full(observed_days.shape, float(default_miles_per_day))
+    np.divide(observed_miles, observed_days, out=miles_per_day, where=measured)
+    np.clip(miles_per_day, 1e-3, MAX_MILES_PER_DAY, out=miles_per_day)
+
+    days_since_visit = np.maximum((now - history['last_seen']) / _ONE_DAY, 0.0)
+    projected_odometer = history['last_odometer'] + miles_per_day * days_since_visit
+
+    last_odometer = history['last_odometer'][:, None]
+    on_schedule = (np.floor(last_odometer / intervals) + 1) * intervals
+    due_odometer = np.where(np.isnan(last_done), on_schedule, last_done + intervals)
+    days_until_due = (due_odometer - projected_odometer[:, None]) / miles_per_day[:, None]
+
+    vehicle_index, package_index = np.nonzero(days_until_due <= horizon_days)
+    order = np.argsort(days_until_due[vehicle_index, package_index], kind='stable')
+    vehicle_index, package_index = vehicle_index[order], package_index[order]
+
+    return {
+        'vehicle_index': vehicle_index,
+        'package_index': package_index,
+        'miles_per_day': miles_per_day[vehicle_index],
+        'projected_odometer': projected_odometer[vehicle_index],
+        'due_odometer': due_odometer[vehicle_index, package_index],
+        'days_until_due': days_until_due[vehicle_index, package_index]
+    }
+
+
+def _reminder_rows(history, package_ids, due, now):
+    """Turn the projection arrays into insert parameters (plain Python types for the DB driver)"""
+    vehicle_index = due['vehicle_index']
+    due_dates = np.datetime64(now, 'D') + np.floor(due['days_until_due']).astype('timedelta64[D]')
+    columns = zip(
+        history['vehicle_ids'][vehicle_index].tolist(),
+        package_ids[due['package_index']].tolist(),
+        history['last_odometer'][vehicle_index].astype(np.int64).tolist(),
+        history['last_seen'][vehicle_index].astype(object).tolist(),
+        np.round(due['miles_per_day'], 2).tolist(),
+        np.round(due['projected_odometer']).astype(np.int64).tolist(),
+        due['due_odometer'].astype(np.int64).tolist(),
+        due_dates.astype(object).tolist()
+    )
+    return [
+        {
+            'vehicle_id': vehicle_id,
+            'package_id': package_id,
+            'last_odometer_miles': last_odometer,
+            'last_visit_at': last_visit_at,
+            'miles_per_day': miles_per_day,
+            'projected_odometer_miles': projected_odometer,
+            'due_odometer_miles': due_odometer,
+            'due_date': due_date,
+            'computed_at': now
+        }
+        for vehicle_id, package_id, last_odometer, last_visit_at, miles_per_day,
+            projected_odometer, due_odometer, due_date in columns
+    ]
@@ -0,0 +1,162 @@
+"""
+Token revocation list
+
+POST /auth/logout revokes the presented token (and optionally the client's
+refresh token) by storing its jti in revoked_tokens. Flask-JWT-Extended asks
+token_in_blocklist_loader about every protected request, so the check has to
+be close to free for the overwhelmingly common case of a token that was never
+revoked:
+
+- Each process keeps a Bloom filter of the revoked jtis. A jti that isn't in
+  the filter is definitely not revoked, and the request goes on without a
+  query
+- A filter hit (a revoked token, or a false positive at roughly
+  TOKEN_REVOCATION_ERROR_RATE) is confirmed with a primary key lookup
+- Every TOKEN_REVOCATION_SYNC_INTERVAL seconds the filter picks up jtis
+  revoked by other processes since the last sync (one indexed range query),
+  so a logout elsewhere takes effect here within that interval
+
+Rows are only needed until the token would have expired anyway; flask tokens
+purge deletes the rest. The filter is rebuilt from the table after a purge, or
+when more jtis were revoked than it was sized for.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from application.extensions import db, jwt
+from application.models import RevokedToken
+from application.db_routing import primary_reads
+
+
+# Tokens revoked around a sync are picked up by the next one, even with some clock skew between hosts
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives, tunable false positive rate)"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(int(capacity), 1)
+        self.size = max(int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocationList:
+    """Flask extension that records revoked jtis and answers the blocklist check"""
+
+    def __init__(self, app=None):
+        self.capacity = 100000
+        self.error_rate = 0.001
+        self.sync_interval = 5.0
+        self._bloom = None
+        self._next_sync = 0.0
+        self._synced_at = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.capacity = config.setdefault('TOKEN_REVOCATION_CAPACITY', self.capacity)
+        self.error_rate = config.setdefault('TOKEN_REVOCATION_ERROR_RATE', self.error_rate)
+        self.sync_interval = config.setdefault('TOKEN_REVOCATION_SYNC_INTERVAL', self.sync_interval)
+        self.reset()
+        app.extensions['token_revocation'] = self
+
+    def reset(self):
+        """Forget the filter; it is rebuilt from the table on the next check"""
+        with self._lock:
+            self._bloom = None
+            self._next_sync = 0.0
+            self._synced_at = None
+
+    @primary_reads()  # A logout must take effect at once, whatever the replica lag
+    def is_revoked(self, jti):
+        """True if the jti was revoked (a database lookup only on a filter hit)"""
+        if jti not in self._sync_if_due():
+            return False
+        return db.session.get(RevokedToken, jti) is not None
+
+    def revoke(self, jwt_payload):
+        """Revoke one decoded token until it expires"""
+        jti = jwt_payload['jti']
+        if db.session.get(RevokedToken, jti) is None:
+            db.session.add(RevokedToken(
+                jti=jti,
+                token_type=jwt_payload.get('type', 'access'),
+                customer_id=int(jwt_payload['sub']) if jwt_payload.get('sub') else None,
+                expires_at=datetime.utcfromtimestamp(jwt_payload['exp']),
+                revoked_at=datetime.utcnow()
+            ))
+            db.session.commit()
+        bloom = self._sync_if_due()
+        with self._lock:
+            bloom.add(jti)
+
+    def purge_expired(self, now=None):
+        """
+        Delete rows for tokens that have expired (they can no longer be presented)
+
+        Returns:
+            int: Rows deleted
+        """
+        result = db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at < (now or datetime.utcnow())))
+        db.session.commit()
+        self.reset()
+        return result.rowcount
+
+    def _sync_if_due(self):
+        """Return the filter, first catching up with the table if the sync interval has passed"""
+        bloom = self._bloom
+        if bloom is not None and time.monotonic() < self._next_sync:
+            return bloom
+        with self._lock:
+            if self._bloom is not None and time.monotonic() < self._next_sync:
+                return self._bloom
+            started = datetime.utcnow()
+            if self._bloom is None or self._bloom.count > self._bloom.capacity:
+                jtis = db.session.execute(
+                    select(RevokedToken.jti).where(RevokedToken.expires_at >= started)
+                ).scalars().all()
+                # Leave headroom so a busy logout day doesn't force a rebuild on every sync
+                bloom = BloomFilter(max(self.capacity, len(jtis) * 2), self.error_rate)
+            else:
+                bloom = self._bloom
+                jtis = db.session.execute(
+                    select(RevokedToken.jti).where(RevokedToken.revoked_at >= self._synced_at - SYNC_OVERLAP)
+                ).scalars().all()
+            for jti in jtis:
+                if jti not in bloom:
+                    bloom.add(jti)
+            self._bloom = bloom
+            self._synced_at = started
+            self._next_sync = time.monotonic() + self.sync_interval
+            return bloom
+
+
+token_revocation_list = TokenRevocationList()
+
+
+@jwt.token_in_blocklist_loader
+def _token_revoked(jwt_header, jwt_payload):
+    return token_revocation_list.is_revoked(jwt_payload['jti'])
@@ -0,0 +1,493 @@
+"""
+Compiled schemas
+
+marshmallow dumps every object field by field through generic machinery: each
+field looks its value up through an accessor, checks for missing values and
+dispatches to the field class, and a load pays the same per field plus error
+bookkeeping. For the big list responses that overhead is most of the dump.
+
+compile_schema() reads a schema's fields once and generates (exec) one plain
+function that does only what those particular fields need:
+
+Dump
+- attributes are read with getattr, or for SQLAlchemy models straight from the
+  instance __dict__ when the column is loaded (what SQLAlchemy's descriptor
+  would return, without the descriptor call); missing ones are skipped or
+  replaced by dump_default, as marshmallow does
+- String, Integer, Float, Boolean and DateTime fields are converted inline,
+  Method fields (needs_reorder) call the bound schema method, and Nested or
+  List(Nested) fields call the nested schema's compiled dump
+- any other field calls its own field.serialize(), so its output is marshmallow's
+- schemas with pre_dump/post_dump hooks, and objects read by key (dicts), are
+  dumped by marshmallow
+
+Load
+- well-formed input takes the fast path: the pre_load hooks (run on a copy),
+  exact type checks for the common JSON types, Length checks inline, the other
+  field validators and the post_load hooks, called one item at a time as
+  marshmallow calls them; marshmallow-sqlalchemy's make_instance builds new
+  rows with the model's constructor keys worked out once (rows looked up by
+  primary key still go through make_instance itself)
+- anything else (a missing required field, an unknown key, a value of another
+  type, a failed validator) is handed to schema.load() untouched, so every
+  error and error message is marshmallow's own
+- schemas with @validates/@validates_schema hooks or INCLUDE/partial defaults,
+  and load() calls with extra arguments, always use schema.load()
+
+Endpoints opt in per call site with compiled(schema).dump(...) or
+compiled(schema).load(...). compiled() caches one compiled schema per schema
+instance, and returns the schema itself when SCHEMA_COMPILER_ENABLED is off.
+"""
+import functools
+import math
+import threading
+import weakref
+from flask import current_app, has_app_context
+from marshmallow import Schema, fields, validate, missing, EXCLUDE, RAISE, ValidationError
+from marshmallow.decorators import PRE_DUMP, POST_DUMP, PRE_LOAD, POST_LOAD, VALIDATES, VALIDATES_SCHEMA
+from marshmallow_sqlalchemy.fields import get_primary_keys
+from marshmallow_sqlalchemy.load_instance_mixin import LoadInstanceMixin
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from application.metrics import timed_serialization
+
+
+class _Fallback(Exception):
+    """Raised by a compiled loader for input that only marshmallow itself should handle"""
+
+
+_LOAD_METHODS = (Schema.load, LoadInstanceMixin.Schema.load)
+
+
+class CompiledSchema:
+    """Drop-in dump()/load() for one schema instance, backed by generated functions"""
+
+    def __init__(self, schema, _compiling=None):
+        self.schema = schema
+        self.many = schema.many
+        compiling = _compiling if _compiling is not None else set()
+        compiling.add(id(schema))
+        try:
+            self._dump_plan = _compile_dump(schema, compiling)
+        finally:
+            compiling.discard(id(schema))
+        self._dump_functions = {}
+        self.dump_sources = {}
+        self.load_source, self._load_fields = _compile_load(schema)
+        self._pre_load = bool(schema._hooks[PRE_LOAD])
+        self._post_load = bool(schema._hooks[POST_LOAD])
+        # Hooks called directly, one item at a time, when marshmallow would call them that way
+        self._pre_load_hooks = _item_hooks(schema, PRE_LOAD)
+        self._post_load_hooks = _item_hooks(schema, POST_LOAD)
+
+    def __repr__(self):
+        return f'<CompiledSchema {type(self.schema).__name__}>'
+
+    # ===== DUMP =====
+
+    def dump(self, obj, *, many=None):
+        return timed_serialization(self._dump, obj, self.many if many is None else bool(many))
+
+    def _dump(self, obj, many):
+        if self._dump_plan is None or obj is None:
+            return self.schema.dump(obj, many=many)
+        if not many:
+            return self._dump_one(obj)
+        functions = self._dump_functions
+        result = []
+        for item in obj:
+            function = functions.get(item.__class__) or self._dump_function(item.__class__)
+            result.append(function(item))
+        return result
+
+    def _dump_one(self, obj):
+        function = self._dump_functions.get(obj.__class__) or self._dump_function(obj.__class__)
+        return function(obj)
+
+    def _dump_function(self, cls):
+        """Generate (once) the dump function for instances of cls"""
+        with _compile_lock:
+            function = self._dump_functions.get(cls)
+            if function is None:
+                if hasattr(cls, '__getitem__'):
+                    # Key lookups (dicts...): marshmallow's accessor rules apply
+                    function = functools.partial(self.schema.dump, many=False)
+                else:
+                    source, function = self._dump_plan.generate(cls)
+                    self.dump_sources[cls] = source
+                self._dump_functions[cls] = function
+        return function
+
+    # ===== LOAD =====
+
+    def load(self, data, *, many=None, partial=None, unknown=None, **kwargs):
+        schema = self.schema
+        if self._load_fields is None or partial is not None or unknown is not None or kwargs:
+            return schema.load(data, many=many, partial=partial, unknown=unknown, **kwargs)
+        if getattr(schema, '_load_instance', False) and not (schema.transient or schema.session):
+            return schema.load(data, many=many)  # raises marshmallow-sqlalchemy's "requires a session"
+
+        many = self.many if many is None else bool(many)
+        try:
+            if many:
+                return self._load_many(data)
+            return self._load_one(data)
+        except (_Fallback, ValidationError):
+            # Re-run from the caller's untouched data so the errors are marshmallow's own
+            return schema.load(data, many=many)
+
+    def _invoke(self, tag, data, many, original_data):
+        return self.schema._invoke_load_processors(
+            tag, data, many=many, original_data=original_data, partial=self.schema.partial, unknown=self.schema.unknown
+        )
+
+    def _call_hooks(self, hooks, item, many):
+        schema = self.schema
+        for hook in hooks:
+            item = hook(item, many=many, partial=schema.partial, unknown=schema.unknown)
+        return item
+
+    def _load_one(self, data):
+        if data.__class__ is not dict:
+            raise _Fallback
+        processed = data
+        if self._pre_load:
+            # pre_load hooks may edit the dict in place: keep the caller's copy for a fallback
+            processed = dict(data)
+            if self._pre_load_hooks is not None:
+                processed = self._call_hooks(self._pre_load_hooks, processed, False)
+            else:
+                processed = self._invoke(PRE_LOAD, processed, False, processed)
+        result = self._load_fields(processed)
+        if self._post_load:
+            if self._post_load_hooks is not None:
+                result = self._call_hooks(self._post_load_hooks, result, False)
+            else:
+                result = self._invoke(POST_LOAD, result, False, data)
+        return result
+
+    def _load_many(self, data):
+        if data.__class__ is not list or any(item.__class__ is not dict for item in data):
+            raise _Fallback
+        processed = data
+        if self._pre_load:
+            processed = [dict(item) for item in data]
+            if self._pre_load_hooks is not None:
+                processed = [self._call_hooks(self._pre_load_hooks, item, True) for item in processed]
+            else:
+                processed = self._invoke(PRE_LOAD, processed, True, processed)
+                if processed.__class__ is not list:
+                    raise _Fallback
+        load_fields = self._load_fields
+        result = [load_fields(item) for item in processed]
+        if self._post_load:
+            if self._post_load_hooks is not None:
+                result = [self._call_hooks(self._post_load_hooks, item, True) for item in result]
+            else:
+                result = self._invoke(POST_LOAD, result, True, data)
+        return result
+
+
+# ===== CODE GENERATION =====
+
+class _Namespace:
+    """Constants referenced by generated code, each under a generated name"""
+
+    def __init__(self, **initial):
+        self.values = dict(initial)
+
+    def add(self, prefix, value):
+        name = f'_{prefix}{len(self.values)}'
+        self.values[name] = value
+        return name
+
+
+def _exec(source, namespace, function_name, schema):
+    code = compile(source, f'<compiled {type(schema).__name__}>', 'exec')
+    exec(code, namespace.values)
+    return namespace.values[function_name]
+
+
+def _is(field, method, base):
+    return getattr(type(field), method) is getattr(base, method)
+
+
+def _nested_dump(nested_field, namespace, compiling):
+    """Name of a function dumping one value of a Nested field, or None if it can't be compiled (cycles)"""
+    if not _is(nested_field, '_serialize', fields.Nested):
+        return None
+    nested_schema = nested_field.schema
+    if id(nested_schema) in compiling:
+        return None
+    compiled_nested = CompiledSchema(nested_schema, compiling)
+    many = bool(nested_schema.many or nested_field.many)
+    if compiled_nested._dump_plan is not None and not many:
+        return namespace.add('nested', compiled_nested._dump_one)
+    return namespace.add('nested', functools.partial(compiled_nested._dump, many=many))
+
+
+def _dump_expression(field, namespace, compiling):
+    """Python expression converting v (never missing) like field._serialize(v), or None if there's no inline form"""
+    if _is(field, '_serialize', fields.String):
+        text = namespace.add('text', _ensure_text_type)
+        return f'None if v is None else (v if v.__class__ is str else {text}(v))'
+    if _is(field, '_serialize', fields.Field):
+        return 'v'  # Boolean, Raw: the value as is
+    if (_is(field, '_serialize', fields.Number) and _is(field, '_format_num', fields.Number)
+            and not field.as_string and field.num_type in (int, float)):
+        cast = field.num_type.__name__
+        return f'None if v is None else (v if v.__class__ is {cast} else {cast}(v))'
+    if isinstance(field, fields.DateTime) and _is(field, '_serialize', fields.DateTime):
+        function = type(field).SERIALIZATION_FUNCS.get(field.format or field.DEFAULT_FORMAT)
+        if function is not None:
+            return f"None if v is None else {namespace.add('format', function)}(v)"
+        return None
+    if isinstance(field, fields.Nested):
+        dump = _nested_dump(field, namespace, compiling)
+        if dump is None:
+            return None
+        return f'None if v is None else {dump}(v)'
+    if isinstance(field, fields.List) and _is(field, '_serialize', fields.List) and isinstance(field.inner, fields.Nested):
+        dump = _nested_dump(field.inner, namespace, compiling)
+        if dump is None:
+            return None
+        return f'None if v is None else [None if e is None else {dump}(e) for e in v]'
+    return None
+
+
+def _ensure_text_type(value):
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    return str(value)
+
+
+class _DumpPlan:
+    """
+    Per-field dump steps for a schema, turned into one function per object class
+
+    Columns and relationships SQLAlchemy has loaded sit in the instance
+    __dict__, which is exactly what their descriptors return; for those
+    attributes the generated function reads the __dict__ and only calls getattr
+    when the value isn't there (expired, deferred, not loaded yet).
+    """
+
+    def __init__(self, schema, namespace, steps):
+        self.schema = schema
+        self.namespace = namespace
+        self.steps = steps
+
+    def generate(self, cls):
+        direct = {
+            step[1] for step in self.steps
+            if step[0] == 'value' and isinstance(getattr(cls, step[1], None), InstrumentedAttribute)
+        }
+        lines = ['def dump_one(obj):']
+        if direct:
+            lines.append('    d = obj.__dict__')
+        lines.append('    ret = {}')
+        for step in self.steps:
+            if step[0] == 'lines':
+                lines += step[1]
+                continue
+            _, attribute, key, expression, default = step
+            if attribute in direct:
+                lines += [f'    v = d.get({attribute!r}, _missing)', '    if v is _missing:',
+                          f'        v = getattr(obj, {attribute!r}, _missing)']
+            else:
+                lines.append(f'    v = getattr(obj, {attribute!r}, _missing)')
+            if default is not None:
+                lines += ['    if v is _missing:', f'        v = {default}']
+            lines += ['    if v is not _missing:', f'        ret[{key}] = {expression}']
+        lines.append('    return ret')
+
+        source = '\n'.join(lines) + '\n'
+        return source, _exec(source, self.namespace, 'dump_one', self.schema)
+
+
+def _compile_dump(schema, compiling):
+    """Plan the generated dump for a schema, or None if marshmallow must dump it"""
+    if schema._hooks[PRE_DUMP] or schema._hooks[POST_DUMP] or schema.dict_class is not dict:
+        return None
+    if type(schema).get_attribute is not Schema.get_attribute:
+        return None
+
+    namespace = _Namespace(_missing=missing, _get_attribute=schema.get_attribute)
+    steps = []
+    for attr_name, field in schema.dump_fields.items():
+        key = repr(field.data_key if field.data_key is not None else attr_name)
+        attribute = field.attribute if field.attribute is not None else attr_name
+
+        if isinstance(field, fields.Method) and _is(field, '_serialize', fields.Method):
+            if field._serialize_method is None:
+                continue  # dumps nothing
+            method = namespace.add('method', field._serialize_method)
+            steps.append(('lines', [f'    v = {method}(obj)', '    if v is not _missing:', f'        ret[{key}] = v']))
+            continue
+
+        expression = _dump_expression(field, namespace, compiling) if field._CHECK_ATTRIBUTE and '.' not in attribute else None
+        if expression is None:
+            field_name = namespace.add('field', field)
+            steps.append(('lines', [
+                f'    v = {field_name}.serialize({attr_name!r}, obj, accessor=_get_attribute)',
+                '    if v is not _missing:',
+                f'        ret[{key}] = v',
+            ]))
+            continue
+
+        default = None
+        if field.dump_default is not missing:
+            default = namespace.add('default', field.dump_default) + ('()' if callable(field.dump_default) else '')
+        steps.append(('value', attribute, key, expression, default))
+    return _DumpPlan(schema, namespace, steps)
+
+
+def _load_statements(field, data_key, namespace):
+    """Statements turning v (present, not None) into x, raising for anything marshmallow should see"""
+    field_name = namespace.add('field', field)
+    generic = f'x = {field_name}.deserialize(v, {data_key!r}, data)'
+    validate = _validate_statements(field, field_name)
+
+    if _is(field, '_deserialize', fields.String):
+        return ['if v.__class__ is str:', '    x = v', *('    ' + line for line in validate), 'else:', '    ' + generic]
+    if (isinstance(field, fields.Integer) and _is(field, '_deserialize', fields.Number)
+            and _is(field, '_validated', fields.Integer) and _is(field, '_format_num', fields.Number)):
+        return ['if v.__class__ is int:', '    x = v', *('    ' + line for line in validate), 'else:', '    ' + generic]
+    if (isinstance(field, fields.Float) and _is(field, '_deserialize', fields.Number)
+            and _is(field, '_validated', fields.Float) and _is(field, '_format_num', fields.Number)):
+        finite = '' if field.allow_nan else f" and {namespace.add('isfinite', math.isfinite)}(v)"
+        return [f'if v.__class__ is float{finite}:', '    x = v', *('    ' + line for line in validate),
+                'else:', '    ' + generic]
+    if (isinstance(field, fields.Boolean) and _is(field, '_deserialize', fields.Boolean)
+            and (not field.truthy or (True in field.truthy and False in field.falsy))):
+        return ['if v is True or v is False:', '    x = v', *('    ' + line for line in validate),
+                'else:', '    ' + generic]
+    return [generic]
+
+
+def _validate_statements(field, field_name):
+    """Inline Length checks (raising _Fallback); any other validator runs through field._validate()"""
+    if not field.validators:
+        return []
+    if any(type(validator) is not validate.Length for validator in field.validators):
+        return [f'{field_name}._validate(x)']
+    checks = []
+    for length in field.validators:
+        if length.equal is not None:
+            checks.append(f'len(x) != {length.equal!r}')
+        if length.min is not None:
+            checks.append(f'len(x) < {length.min!r}')
+        if length.max is not None:
+            checks.append(f'len(x) > {length.max!r}')
+    return [f"if {' or '.join(checks)}:", '    raise _Fallback'] if checks else []
+
+
+def _compile_load(schema):
+    """Generate load_fields(data) for a schema, or (None, None) if marshmallow must load it"""
+    if schema._hooks[VALIDATES] or schema._hooks[VALIDATES_SCHEMA]:
+        return None, None
+    if schema.partial or schema.unknown not in (RAISE, EXCLUDE) or schema.dict_class is not dict:
+        return None, None
+    if type(schema).load not in _LOAD_METHODS:
+        return None, None
+
+    namespace = _Namespace(_missing=missing, _Fallback=_Fallback)
+    load_fields = schema.load_fields
+    known = frozenset(field.data_key if field.data_key is not None else name for name, field in load_fields.items())
+    lines = ['def load_fields(data):']
+    if schema.unknown == RAISE:
+        lines += [f"    if not {namespace.add('known', known)}.issuperset(data):", '        raise _Fallback']
+    lines.append('    ret = {}')
+
+    for attr_name, field in load_fields.items():
+        data_key = field.data_key if field.data_key is not None else attr_name
+        target = field.attribute or attr_name
+        if '.' in target:
+            return None, None
+
+        lines += [f'    v = data.get({data_key!r}, _missing)', '    if v is _missing:']
+        if field.required:
+            lines.append('        raise _Fallback')
+        elif field.load_default is not missing:
+            default = namespace.add('default', field.load_default)
+            call = '()' if callable(field.load_default) else ''
+            lines.append(f'        ret[{target!r}] = {default}{call}')
+        else:
+            lines.append('        pass')
+        lines.append('    elif v is None:')
+        lines.append(f'        ret[{target!r}] = None' if field.allow_none else '        raise _Fallback')
+        lines.append('    else:')
+        lines += ['        ' + line for line in _load_statements(field, data_key, namespace)]
+        lines.append(f'        ret[{target!r}] = x')
+    lines.append('    return ret')
+
+    source = '\n'.join(lines) + '\n'
+    return source, _exec(source, namespace, 'load_fields', schema)
+
+
+def _item_hooks(schema, tag):
+    """
+    The tag's hooks as callables taking one item, or None if a hook needs
+    marshmallow's own invocation (pass_collection/pass_original)
+
+    marshmallow-sqlalchemy's make_instance is replaced by _instance_maker():
+    it checks every key for an association proxy on each call, which costs
+    more than the rest of the load.
+    """
+    hooks = []
+    for attr_name, pass_collection, hook_kwargs in schema._hooks[tag]:
+        if pass_collection or hook_kwargs.get('pass_original'):
+            return None
+        if (tag == POST_LOAD and attr_name == 'make_instance'
+                and getattr(type(schema), attr_name) is LoadInstanceMixin.Schema.make_instance):
+            hooks.append(_instance_maker(schema))
+        else:
+            hooks.append(getattr(schema, attr_name))
+    return hooks
+
+
+def _instance_maker(schema):
+    """make_instance() for new rows, with the model's constructor keys worked out once"""
+    model = schema.opts.model
+    primary_keys = tuple(prop.key for prop in get_primary_keys(model))
+    targets = {field.attribute or name for name, field in schema.load_fields.items()}
+    if any(hasattr(getattr(model, key, None), 'remote_attr') for key in targets):
+        return schema.make_instance  # association proxies are set after construction
+    model_keys = frozenset(key for key in targets if hasattr(model, key))
+
+    def make_instance(data, **kwargs):
+        if (not schema._load_instance or schema.instance is not None
+                or (not schema.transient and None not in [data.get(key) for key in primary_keys])):
+            # Plain dict, or an existing row to look up and update: marshmallow-sqlalchemy's own rules
+            return schema.make_instance(data, **kwargs)
+        if model_keys.issuperset(data):
+            return model(**data)
+        return model(**{key: value for key, value in data.items() if key in model_keys})
+    return make_instance
+
+
+# ===== PER-ENDPOINT SELECTION =====
+
+_compiled = weakref.WeakKeyDictionary()
+_compile_lock = threading.Lock()
+
+
+def compile_schema(schema):
+    """Compile a schema instance (uncached; see compiled())"""
+    return CompiledSchema(schema)
+
+
+def compiled(schema):
+    """
+    Return the compiled form of a schema instance, compiling it on first use
+
+    Returns the schema itself when SCHEMA_COMPILER_ENABLED is False, so call
+    sites can always use compiled(schema).dump(...) / .load(...).
+    """
+    if has_app_context() and not current_app.config.get('SCHEMA_COMPILER_ENABLED', True):
+        return schema
+    result = _compiled.get(schema)
+    if result is None:
+        with _compile_lock:
+            result = _compiled.get(schema)
+            if result is None:
+                result = _compiled[schema] = CompiledSchema(schema)
+    return result
@@ -0,0 +1,164 @@
+"""
+Offline VIN decoder
+
+Decodes the parts of a 17-character VIN that don't need a manufacturer database:
+
+- Position 1-3   World Manufacturer Identifier (WMI) -> manufacturer, region
+- Position 9     Check digit (validated with the standard transliteration/weights)
+- Position 10    Model year (30-year cycle, disambiguated by position 7)
+- Position 11    Assembly plant code -> plant name where the manufacturer is known
+
+The lookup tables ship with the application (application/data/vin_tables.json).
+They are read once per process into plain dicts with interned strings, and
+decode_vin() is memoized with an LRU so repeat lookups (the same VIN on every
+ticket, bulk backfills with duplicates) cost a dict probe.
+"""
+import json
+import os
+import sys
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+
+VIN_TABLES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'vin_tables.json')
+
+# Letters I, O and Q never appear in a VIN (too easily confused with 1 and 0)
+_TRANSLITERATION = {
+    **{str(digit): digit for digit in range(10)},
+    'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8,
+    'J': 1, 'K': 2, 'L': 3, 'M': 4, 'N': 5, 'P': 7, 'R': 9,
+    'S': 2, 'T': 3, 'U': 4, 'V': 5, 'W': 6, 'X': 7, 'Y': 8, 'Z': 9,
+}
+_WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# Model year codes repeat every 30 years starting in 1980
+_YEAR_CODES = 'ABCDEFGHJKLMNPRSTVWXY123456789'
+_YEAR_BY_CODE = {code: 1980 + offset for offset, code in enumerate(_YEAR_CODES)}
+
+
+class VinDecodeError(ValueError):
+    """Raised when a VIN is not a well-formed 17-character VIN"""
+    pass
+
+
+class DecodedVin(NamedTuple):
+    """Attributes decoded from a VIN (immutable, so safe to share from the LRU cache)"""
+    vin: str
+    wmi: str
+    manufacturer: Optional[str]
+    region: Optional[str]
+    model_year: Optional[int]
+    plant_code: str
+    plant: Optional[str]
+    check_digit_valid: bool
+
+
+@lru_cache(maxsize=1)
+def load_vin_tables():
+    """Read the bundled lookup tables once per process"""
+    with open(VIN_TABLES_PATH, encoding='utf-8') as f:
+        raw = json.load(f)
+
+    # Intern manufacturer/plant names so thousands of WMI entries share one string each
+    wmi = {code: sys.intern(name) for code, name in raw['wmi'].items()}
+    plants = {
+        sys.intern(manufacturer): {code: sys.intern(name) for code, name in codes.items()}
+        for manufacturer, codes in raw['plants'].items()
+    }
+    return {'wmi': wmi, 'plants': plants, 'regions': raw['regions']}
+
+
+def normalize_vin(vin):
+    """Upper-case and strip a VIN, rejecting anything that is not 17 valid VIN characters"""
+    if not isinstance(vin, str):
+        raise VinDecodeError("VIN must be a string")
+    vin = vin.strip().upper()
+    if len(vin) != 17:
+        raise VinDecodeError("VIN must be exactly 17 characters")
+    if any(char not in _TRANSLITERATION for char in vin):
+        raise VinDecodeError("VIN contains invalid characters (I, O and Q are not allowed)")
+    return vin
+
+
+def compute_check_digit(vin):
+    """Return the expected position-9 check digit ('0'-'9' or 'X') for a normalized VIN"""
+    remainder = sum(_TRANSLITERATION[char] * weight for char, weight in zip(vin, _WEIGHTS)) % 11
+    return 'X' if remainder == 10 else str(remainder)
+
+
+def is_check_digit_valid(vin):
+    """True if the VIN is well formed and its check digit matches"""
+    try:
+        vin = normalize_vin(vin)
+    except VinDecodeError:
+        return False
+    return vin[8] == compute_check_digit(vin)
+
+
+def decode_model_year(vin):
+    """
+    Decode the model year from position 10
+
+    The code alone is ambiguous across 30-year cycles. For passenger vehicles a
+    digit in position 7 means 1980-2009 and a letter means 2010-2039.
+    """
+    base_year = _YEAR_BY_CODE.get(vin[9])
+    if base_year is None:
+        return None
+    return base_year + 30 if vin[6].isalpha() else base_year
+
+
+@lru_cache(maxsize=8192)
+def decode_vin(vin):
+    """
+    Decode a VIN
+
+    Returns:
+        DecodedVin: The decoded attributes (manufacturer/plant are None when not in the tables)
+
+    Raises:
+        VinDecodeError: If the VIN is not 17 valid VIN characters
+    """
+    vin = normalize_vin(vin)
+    tables = load_vin_tables()
+
+    wmi = vin[:3]
+    manufacturer = tables['wmi'].get(wmi)
+    plant_code = vin[10]
+    plant = tables['plants'].get(manufacturer, {}).get(plant_code) if manufacturer else None
+
+    return DecodedVin(
+        vin=vin,
+        wmi=wmi,
+        manufacturer=manufacturer,
+        region=tables['regions'].get(vin[0]),
+        model_year=decode_model_year(vin),
+        plant_code=plant_code,
+        plant=plant,
+        check_digit_valid=vin[8] == compute_check_digit(vin)
+    )
+
+
+def vin_columns(vin):
+    """
+    Map a VIN to the decoded Vehicle columns
+
+    Malformed VINs (e.g. pre-1981 vehicles) decode to all-None columns rather than failing.
+    """
+    try:
+        decoded = decode_vin(vin)
+    except VinDecodeError:
+        return {
+            'vin_wmi': None,
+            'vin_manufacturer': None,
+            'vin_model_year': None,
+            'vin_plant_code': None,
+            'vin_check_digit_valid': False
+        }
+    return {
+        'vin_wmi': decoded.wmi,
+        'vin_manufacturer': decoded.manufacturer,
+        'vin_model_year': decoded.model_year,
+        'vin_plant_code': decoded.plant_code,
+        'vin_check_digit_valid': decoded.check_digit_valid
+    }
@@ -0,0 +1,128 @@
+"""
+JSON encoding benchmark
+
+Compares the stdlib and orjson JSON providers (application/json_provider.py) on
+the large list endpoints: GET /service_tickets (with line items and mechanics),
+GET /inventory and GET /customers?per_page=100. For each endpoint it reports
+the time to encode the response alone and the whole request.
+
+    python benchmarks/json_encoding.py
+    python benchmarks/json_encoding.py --tickets 2000 --parts 5000 --requests 50
+
+Runs against a throwaway SQLite database; rate limiting is disabled (testing config).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINTS = ('/service_tickets', '/inventory', '/customers?per_page=100')
+
+
+def create_bench_app(database_path, tickets, parts):
+    os.environ['TEST_DATABASE_URL'] = f'sqlite:///{database_path}'
+    from application import create_app
+    from application.extensions import db
+    from application.models import (
+        Customer, Vehicle, Mechanic, ServiceTicket, TicketLineItem, TicketMechanic, Part, Service
+    )
+
+    app = create_app('testing')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        customers = [Customer(first_name=f'First{i}', last_name=f'Last{i}', email=f'customer{i}@example.com',
+                              phone=f'555-{i:07d}', password_hash='x') for i in range(200)]
+        mechanics = [Mechanic(full_name=f'Mechanic {i}', email=f'mechanic{i}@example.com',
+                              phone=f'555-9{i:06d}', salary=55000, is_active=True) for i in range(10)]
+        service = Service(name='Diagnostics', default_labor_minutes=60, base_price_cents=9999)
+        db.session.add_all(customers + mechanics + [service])
+        db.session.flush()
+        vehicles = [Vehicle(customer_id=customer.customer_id, vin=f'BENCH{customer.customer_id:012d}', make='Honda',
+                            model='Accord', year=2018, color='Blue') for customer in customers]
+        db.session.add_all(vehicles)
+        db.session.flush()
+        for i in range(tickets):
+            vehicle = vehicles[i % len(vehicles)]
+            ticket = ServiceTicket(vehicle_id=vehicle.vehicle_id, customer_id=vehicle.customer_id, status='open',
+                                   problem_description=f'Customer reports noise #{i}', odometer_miles=10000 + i,
+                                   priority=1 + i % 5)
+            ticket.ticket_line_items = [
+                TicketLineItem(service_id=service.service_id, line_type='service', description=f'Diagnostics {n}',
+                               quantity=Decimal('1.50'), unit_price_cents=9999)
+                for n in range(3)
+            ]
+            ticket.ticket_mechanics = [TicketMechanic(mechanic_id=mechanics[i % len(mechanics)].mechanic_id,
+                                                      role='Technician', minutes_worked=90)]
+            db.session.add(ticket)
+        db.session.add_all([
+            Part(part_number=f'P-{i:06d}', name=f'Part {i}', description='Bench part', category='Filters',
+                 manufacturer='Acme', current_cost_cents=1000 + i, quantity_in_stock=i % 20, reorder_level=5,
+                 supplier='Acme Supply')
+            for i in range(parts)
+        ])
+        db.session.commit()
+    return app
+
+
+def bearer_token(app):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        return create_access_token(identity='1')
+
+
+def time_endpoint(app, headers, url, requests):
+    """Return (median encode ms, median request ms, response bytes) for one endpoint"""
+    client = app.test_client()
+    payload = client.get(url, headers=headers).get_json()
+
+    encode, total = [], []
+    with app.test_request_context():
+        for _ in range(requests):
+            started = time.perf_counter()
+            app.json.response(payload)
+            encode.append((time.perf_counter() - started) * 1000)
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        total.append((time.perf_counter() - started) * 1000)
+        size = len(response.data)
+    return statistics.median(encode), statistics.median(total), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=1000)
+    parser.add_argument('--parts', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=30, help='Requests per endpoint and provider')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_bench_app(os.path.join(directory, 'bench.db'), args.tickets, args.parts)
+        from application.json_provider import JSON_PROVIDERS, orjson
+        if orjson is None:
+            sys.exit('orjson is not installed: pip install orjson')
+        headers = {'Authorization': f'Bearer {bearer_token(app)}'}
+
+        results = {}
+        for name, provider in JSON_PROVIDERS.items():
+            app.json = provider(app)
+            results[name] = {url: time_endpoint(app, headers, url, args.requests) for url in ENDPOINTS}
+
+        print(f"{'endpoint':<28}{'bytes':>10}{'json enc ms':>13}{'orjson enc ms':>15}{'speedup':>9}"
+              f"{'json req ms':>13}{'orjson req ms':>15}{'saved':>8}")
+        for url in ENDPOINTS:
+            json_encode, json_total, size = results['json'][url]
+            orjson_encode, orjson_total, _ = results['orjson'][url]
+            print(f"{url:<28}{size:>10}{json_encode:>13.2f}{orjson_encode:>15.2f}{json_encode / orjson_encode:>8.1f}x"
+                  f"{json_total:>13.2f}{orjson_total:>15.2f}{1 - orjson_total / json_total:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
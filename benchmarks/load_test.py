@@ -0,0 +1,375 @@
+"""
+Load test
+
+Seeds a database at a chosen scale, drives a weighted mix of realistic requests
+(customer lookups and summaries, ticket reads, inventory lists and stock
+adjustments, new tickets, ...) from concurrent clients for a fixed time, and
+reports requests per second and p50/p95/p99 latency per endpoint.
+
+    python benchmarks/load_test.py --scale small --duration 30
+    python benchmarks/load_test.py --scale large --database /tmp/bench.db --threads 8 --processes 4
+    python benchmarks/load_test.py --database /tmp/bench.db --output results/$(git rev-parse --short HEAD).json
+    python benchmarks/load_test.py --database /tmp/bench.db --compare results/abc1234.json
+
+The data comes from the synthetic data generator (application/datagen.py, also
+`flask data generate`). Scales (customers / vehicles / tickets / parts): small
+2k/3.2k/20k/1.6k, medium 10k/16k/100k/8k, large 50k/80k/500k/40k, xlarge
+500k/800k/5M/100k; --customers etc. override one count.
+
+By default requests go through the WSGI app in-process (Flask test clients,
+testing config: rate limiting off, cheap password hashes). Seeding takes a
+while at the large scale, so pass --database to keep the SQLite file and reuse
+it on the next run (--reseed to start over). To measure a real server, seed a
+file, start the app on it (the testing config, so rate limits stay out of the
+way) and point --url at it:
+
+    python benchmarks/load_test.py --scale large --database /tmp/bench.db --seed-only
+    FLASK_CONFIG=testing TEST_DATABASE_URL=sqlite:////tmp/bench.db gunicorn -w 4 app:app
+    python benchmarks/load_test.py --database /tmp/bench.db --url http://127.0.0.1:8000 --threads 16
+
+Clients log in once as alice.johnson@email.com. Each client is a thread;
+--processes runs that many processes of --threads clients each, so the client
+side isn't held back by the GIL. --output writes the results, with the commit
+and settings they were measured at, as JSON; --compare prints the change from
+an earlier results file.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Fixed, so data seeded on different days is the same
+DATA_UNTIL = datetime(2026, 1, 1)
+
+
+# ===== SEEDING =====
+
+def open_database(args):
+    """Create (and seed, if needed) the database; return the app and what the request mix draws from"""
+    from application import create_app
+    from application.datagen import (DatabaseWriter, DEFAULT_PASSWORD, DEMO_CUSTOMER, LAST_NAMES, generate,
+                                     scale_counts)
+    from application.extensions import db
+    from application.models import Customer, Vehicle, Part, ServiceTicket
+    from application.passwords import password_hasher
+    from sqlalchemy import func, select
+
+    app = create_app(args.config)
+    with app.app_context():
+        if args.reseed:
+            db.drop_all()
+        db.create_all()
+        if not db.session.scalar(select(func.count()).select_from(Customer)):
+            counts = scale_counts(args.scale, **{name: getattr(args, name) for name in
+                                                 ('customers', 'vehicles', 'tickets', 'parts', 'mechanics')})
+            started = time.perf_counter()
+            print(f'seeding {counts} ...', flush=True)
+            db.session.remove()
+            writer = DatabaseWriter(db.engine)
+            try:
+                generate(writer, counts, seed=args.seed, until=DATA_UNTIL,
+                         password_hash=password_hasher.hash(DEFAULT_PASSWORD))
+            finally:
+                writer.close()
+            print(f'seeded in {time.perf_counter() - started:.1f}s', flush=True)
+        vehicles = db.session.execute(select(Vehicle.vehicle_id, Vehicle.customer_id, Vehicle.vin)).all()
+        dataset = {
+            'login': {'email': DEMO_CUSTOMER[2], 'password': DEFAULT_PASSWORD},
+            'last_names': LAST_NAMES,
+            'vehicles': [tuple(row) for row in vehicles],
+            'customers': db.session.scalar(select(func.max(Customer.customer_id))),
+            'tickets': db.session.scalar(select(func.max(ServiceTicket.ticket_id))),
+            'parts': db.session.scalar(select(func.max(Part.part_id))),
+            'rows': {'customers': db.session.scalar(select(func.count()).select_from(Customer)),
+                     'vehicles': len(vehicles),
+                     'tickets': db.session.scalar(select(func.count()).select_from(ServiceTicket)),
+                     'parts': db.session.scalar(select(func.count()).select_from(Part))}
+        }
+        db.session.remove()
+    return app, dataset
+
+
+# ===== REQUEST MIX =====
+
+# (name, weight, request builder(rng, dataset) -> (method, path, json body or None))
+REQUEST_MIX = [
+    ('GET /customers', 8, lambda rng, d: ('GET', '/customers?limit=50', None)),
+    ('GET /customers/search', 6, lambda rng, d: ('GET', f'/customers/search?q={rng.choice(d["last_names"])}', None)),
+    ('GET /customers/<id>', 10, lambda rng, d: ('GET', f'/customers/{rng.randint(1, d["customers"])}', None)),
+    ('GET /customers/<id>/summary', 8,
+     lambda rng, d: ('GET', f'/customers/{rng.choice(d["vehicles"])[1]}/summary', None)),
+    ('GET /customers/<id>/vehicles', 8,
+     lambda rng, d: ('GET', f'/customers/{rng.choice(d["vehicles"])[1]}/vehicles', None)),
+    ('GET /vehicles/<vin>/history', 8, lambda rng, d: ('GET', f'/vehicles/{rng.choice(d["vehicles"])[2]}/history', None)),
+    ('GET /service_tickets/<id>', 12, lambda rng, d: ('GET', f'/service_tickets/{rng.randint(1, d["tickets"])}', None)),
+    ('GET /service_tickets/<id>/line-items', 8,
+     lambda rng, d: ('GET', f'/service_tickets/{rng.randint(1, d["tickets"])}/line-items', None)),
+    ('GET /inventory', 6, lambda rng, d: ('GET', '/inventory?limit=50', None)),
+    ('GET /inventory/<id>', 8, lambda rng, d: ('GET', f'/inventory/{rng.randint(1, d["parts"])}', None)),
+    ('GET /mechanics', 3, lambda rng, d: ('GET', '/mechanics', None)),
+    ('GET /mechanics/by-activity', 2, lambda rng, d: ('GET', '/mechanics/by-activity', None)),
+    ('GET /catalog', 3, lambda rng, d: ('GET', '/catalog', None)),
+    ('PATCH /inventory/<id>/adjust-quantity', 3,
+     lambda rng, d: ('PATCH', f'/inventory/{rng.randint(1, d["parts"])}/adjust-quantity', {'adjustment': 1})),
+    ('POST /service_tickets', 2, lambda rng, d: ('POST', '/service_tickets', _new_ticket(rng, d))),
+]
+
+
+def _new_ticket(rng, dataset):
+    vehicle_id, customer_id, _ = rng.choice(dataset['vehicles'])
+    return {'vehicle_id': vehicle_id, 'customer_id': customer_id, 'status': 'open',
+            'problem_description': 'Check engine light', 'odometer_miles': rng.randrange(1_000, 200_000),
+            'priority': rng.randint(1, 5)}
+
+
+class InProcessClient:
+    """Requests through the WSGI app with a Flask test client"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+        self.headers = {}
+
+    def login(self, credentials):
+        response = self.client.post('/auth/login', json=credentials)
+        assert response.status_code == 200, response.data
+        self.headers = {'Authorization': f'Bearer {response.get_json()["access_token"]}'}
+
+    def request(self, method, path, body):
+        response = self.client.open(path, method=method, json=body, headers=self.headers)
+        response.close()
+        return response.status_code
+
+
+class HttpClient:
+    """Requests to a running server over one keep-alive connection"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.prefix = parts.path.rstrip('/')
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=60)
+        self.headers = {'Content-Type': 'application/json'}
+
+    def login(self, credentials):
+        status = self.request('POST', '/auth/login', credentials, keep_body=True)
+        assert status == 200, self.body
+        self.headers['Authorization'] = f'Bearer {json.loads(self.body)["access_token"]}'
+
+    def request(self, method, path, body, keep_body=False):
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.connection.request(method, self.prefix + path, body=payload, headers=self.headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()  # Reconnects on the next request
+            return 'connection error'
+        if keep_body:
+            self.body = data
+        return response.status
+
+
+def run_clients(options, app=None, dataset=None):
+    """Run options['threads'] clients until the deadline; return {name: {'latencies': [...], 'errors': {...}}}"""
+    if app is None:
+        app, dataset = open_database(argparse.Namespace(**options['database']))
+    names = [name for name, _, _ in REQUEST_MIX]
+    weights = [weight for _, weight, _ in REQUEST_MIX]
+    builders = dict((name, builder) for name, _, builder in REQUEST_MIX)
+    results = {name: {'latencies': [], 'errors': {}} for name in names}
+    lock = threading.Lock()
+    barrier = threading.Barrier(options['threads'])
+
+    def client_loop(number):
+        rng = random.Random(f"{options['seed']}-{options['worker']}-{number}")
+        client = HttpClient(options['url']) if options['url'] else InProcessClient(app)
+        client.login(dataset['login'])
+        mine = {name: {'latencies': [], 'errors': {}} for name in names}
+        barrier.wait()
+        measure_from = time.monotonic() + options['warmup']
+        deadline = measure_from + options['duration']
+        while True:
+            started = time.monotonic()
+            if started >= deadline:
+                break
+            name = rng.choices(names, weights)[0]
+            status = client.request(*builders[name](rng, dataset))
+            elapsed = time.monotonic() - started
+            if started < measure_from:
+                continue
+            entry = mine[name]
+            entry['latencies'].append(elapsed)
+            if status == 'connection error' or status >= 400:
+                entry['errors'][str(status)] = entry['errors'].get(str(status), 0) + 1
+        with lock:
+            for name, entry in mine.items():
+                results[name]['latencies'].extend(entry['latencies'])
+                for status, count in entry['errors'].items():
+                    results[name]['errors'][status] = results[name]['errors'].get(status, 0) + count
+
+    threads = [threading.Thread(target=client_loop, args=(number,)) for number in range(options['threads'])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+# ===== REPORTING =====
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(len(ordered) * fraction + 0.999999) - 1))]
+
+
+def summarize(latencies, errors, duration):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': sum(errors.values()),
+        'error_statuses': errors,
+        'rps': round(len(ordered) / duration, 2),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def git_revision():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': dirty}
+
+
+def print_report(report):
+    print(f'{"endpoint":<40} {"requests":>8} {"errors":>6} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} '
+          f'{"p99 ms":>8} {"max ms":>8}')
+    for name, row in list(report['endpoints'].items()) + [('TOTAL', report['total'])]:
+        print(f'{name:<40} {row["requests"]:>8} {row["errors"]:>6} {row["rps"]:>8.1f} {row["p50_ms"]:>8.1f} '
+              f'{row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f} {row["max_ms"]:>8.1f}')
+
+
+def print_comparison(report, baseline):
+    print(f'\ncompared with {baseline["meta"].get("commit") or "?"} ({baseline["meta"].get("timestamp")}):')
+    print(f'{"endpoint":<40} {"req/s":>16} {"p50 ms":>16} {"p95 ms":>16} {"p99 ms":>16}')
+
+    def change(old, new):
+        if not old:
+            return f'{"-":>16}'
+        return f'{new:>8.1f} {(new - old) / old:>+7.0%}'
+
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['total'])]
+    for name, row in rows:
+        old = baseline['total'] if name == 'TOTAL' else baseline['endpoints'].get(name)
+        if old is None:
+            print(f'{name:<40} (not in baseline)')
+            continue
+        print(f'{name:<40} ' + ' '.join(change(old[key], row[key]) for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default='small', help='Dataset size preset: sample, small, medium, large or xlarge')
+    for name in ('customers', 'vehicles', 'tickets', 'parts', 'mechanics'):
+        parser.add_argument(f'--{name}', type=int, help=f'Number of {name} (overrides the scale)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the data and the request mix')
+    parser.add_argument('--database', help='SQLite file to seed or reuse (default: a throwaway file)')
+    parser.add_argument('--database-url', help='SQLAlchemy URL of the database to seed or reuse instead')
+    parser.add_argument('--reseed', action='store_true', help='Drop and seed the database again')
+    parser.add_argument('--seed-only', action='store_true', help='Seed the database and exit')
+    parser.add_argument('--config', default='testing', help='Config name for create_app (in-process runs)')
+    parser.add_argument('--url', help='Base URL of a running server (default: in-process WSGI)')
+    parser.add_argument('--threads', type=int, default=4, help='Client threads per process')
+    parser.add_argument('--processes', type=int, default=1, help='Client processes')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds of requests before measuring')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--compare', help='Results JSON of an earlier run to compare against')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.database_url:
+            url = args.database_url
+        else:
+            url = f'sqlite:///{os.path.abspath(args.database or os.path.join(tmp, "load_test.db"))}'
+        # create_app reads the database URL from the environment; spawned processes inherit it
+        for name in ('TEST_DATABASE_URL', 'DEV_DATABASE_URL', 'DATABASE_URL'):
+            os.environ[name] = url
+        from application.datagen import SCALES
+        if args.scale not in SCALES:
+            parser.error(f"--scale must be one of {', '.join(SCALES)}")
+        database = {name: getattr(args, name) for name in ('scale', 'customers', 'vehicles', 'tickets', 'parts',
+                                                           'mechanics', 'seed', 'reseed', 'config')}
+        app, dataset = open_database(argparse.Namespace(**database))
+        if args.seed_only:
+            print(f'{url}: {dataset["rows"]}')
+            return
+        database['reseed'] = False
+
+        options = {'threads': args.threads, 'url': args.url, 'seed': args.seed, 'warmup': args.warmup,
+                   'duration': args.duration, 'database': database, 'worker': 0}
+        print(f'{args.processes} process(es) x {args.threads} client(s), {args.duration:g}s after {args.warmup:g}s '
+              f'warmup, against {args.url or "in-process WSGI"} on {dataset["rows"]}', flush=True)
+        if args.processes == 1:
+            runs = [run_clients(options, app, dataset)]
+        else:
+            with ProcessPoolExecutor(args.processes, mp_context=get_context('spawn')) as pool:
+                runs = list(pool.map(run_clients, [dict(options, worker=number) for number in range(args.processes)]))
+
+    merged = {name: {'latencies': [], 'errors': {}} for name, _, _ in REQUEST_MIX}
+    for run in runs:
+        for name, entry in run.items():
+            merged[name]['latencies'].extend(entry['latencies'])
+            for status, count in entry['errors'].items():
+                merged[name]['errors'][status] = merged[name]['errors'].get(status, 0) + count
+    all_errors = {}
+    for entry in merged.values():
+        for status, count in entry['errors'].items():
+            all_errors[status] = all_errors.get(status, 0) + count
+
+    report = {
+        'meta': dict(git_revision(), timestamp=datetime.now().isoformat(timespec='seconds'),
+                     python=platform.python_version(), target=args.url or 'in-process', config=args.config,
+                     threads=args.threads, processes=args.processes, duration=args.duration, warmup=args.warmup,
+                     seed=args.seed, rows=dataset['rows']),
+        'endpoints': {name: summarize(entry['latencies'], entry['errors'], args.duration)
+                      for name, entry in merged.items() if entry['latencies']},
+        'total': summarize([latency for entry in merged.values() for latency in entry['latencies']], all_errors,
+                           args.duration)
+    }
+    print_report(report)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nresults written to {args.output}')
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Login throughput benchmark
+
+Measures POST /auth/login throughput and latency with N concurrent clients,
+hashing inline in the request threads vs. in the bounded process pool
+(application/passwords.py), using production-strength hash parameters.
+
+    python benchmarks/login_throughput.py
+    python benchmarks/login_throughput.py --clients 1 8 32 --logins 20 --method scrypt:32768:8:1
+
+Runs against a throwaway SQLite database; rate limiting is disabled (testing config).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EMAIL = 'bench.user@example.com'
+PASSWORD = 'BenchPass123!'
+
+
+def create_bench_app(database_path, pool_mode, method, workers):
+    os.environ['TEST_DATABASE_URL'] = f'sqlite:///{database_path}'
+    from application import create_app
+    from application.extensions import db
+    from application.models import Customer
+
+    app = create_app('testing')
+    app.config.update(PASSWORD_HASH_POOL=pool_mode, PASSWORD_HASH_METHOD=method,
+                      PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_MAX_PENDING=10_000)
+    # The hasher is a shared extension instance: re-read the overridden config
+    from application.passwords import password_hasher
+    password_hasher.init_app(app)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        customer = Customer(first_name='Bench', last_name='User', email=EMAIL, phone='555-000-0000')
+        customer.set_password(PASSWORD)
+        db.session.add(customer)
+        db.session.commit()
+    return app
+
+
+def run(app, clients, logins_per_client):
+    """Return (logins per second, p50 ms, p95 ms) for one concurrency level"""
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients + 1)
+    body = json.dumps({'email': EMAIL, 'password': PASSWORD})
+
+    def client_loop():
+        client = app.test_client()
+        mine = []
+        barrier.wait()
+        for _ in range(logins_per_client):
+            started = time.perf_counter()
+            response = client.post('/auth/login', data=body, content_type='application/json')
+            mine.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.data
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p95 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16], help='Concurrent clients to test')
+    parser.add_argument('--logins', type=int, default=10, help='Logins per client')
+    parser.add_argument('--method', default='scrypt:32768:8:1', help='Werkzeug hash method string')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Hashing pool processes')
+    parser.add_argument('--modes', nargs='+', default=['inline', 'process'], choices=['inline', 'process'])
+    args = parser.parse_args()
+
+    print(f'method={args.method} pool_workers={args.workers} logins_per_client={args.logins}')
+    print(f'{"mode":<8} {"clients":>7} {"logins/s":>9} {"p50 ms":>8} {"p95 ms":>8}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            app = create_bench_app(os.path.join(tmp, f'{mode}.db'), mode, args.method, args.workers)
+            for clients in args.clients:
+                throughput, p50, p95 = run(app, clients, args.logins)
+                print(f'{mode:<8} {clients:>7} {throughput:>9.1f} {p50:>8.1f} {p95:>8.1f}')
+            from application.passwords import password_hasher
+            password_hasher.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Rate limiter overhead benchmark
+
+Measures the cost of one rate limit check (limits strategy hit) per storage and
+window strategy, with P worker processes x T threads all checking the same
+endpoint limit for a rotating set of client addresses, i.e. many clients
+hitting one rate-limited route at once.
+
+    python benchmarks/rate_limit_overhead.py
+    python benchmarks/rate_limit_overhead.py --processes 1 4 8 --threads 4 --hits 2000
+
+memory:// is listed for reference only: each process counts on its own, so it
+enforces nothing across workers. The default limit is high enough that every
+hit is allowed, so each hit pays for the full write path.
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STRATEGIES = ['fixed-window', 'moving-window', 'sliding-window-counter']
+
+
+def _strategy_class(name):
+    from limits.strategies import STRATEGIES as LIMITS_STRATEGIES
+    return LIMITS_STRATEGIES[name]
+
+
+def worker(uri, strategy_name, limit_string, clients, threads, hits, barrier, results):
+    """One worker process: T threads, each doing `hits` checks; reports (start, end, per-hit latencies)"""
+    import application.ratelimit_storage  # noqa: F401  (registers sqlite://)
+    from limits import parse
+    from limits.storage import storage_from_string
+
+    storage = storage_from_string(uri)
+    strategy = _strategy_class(strategy_name)(storage)
+    limit = parse(limit_string)
+    addresses = [f'203.0.{i // 256}.{i % 256}' for i in range(clients)]
+    latencies = []
+    lock = threading.Lock()
+    local_barrier = threading.Barrier(threads + 1)
+
+    def thread_loop():
+        mine = []
+        local_barrier.wait()
+        for i in range(hits):
+            address = addresses[(i * 7919 + threading.get_ident()) % clients]
+            started = time.perf_counter()
+            strategy.hit(limit, 'auth.login', address)
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+
+    pool = [threading.Thread(target=thread_loop) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    # Start timing once every process has imported and connected
+    barrier.wait()
+    started = time.perf_counter()
+    local_barrier.wait()
+    for thread in pool:
+        thread.join()
+    results.put((started, time.perf_counter(), latencies))
+
+
+def run(uri, strategy_name, limit_string, clients, processes, threads, hits):
+    """Return (checks per second, p50 us, p99 us) for one configuration"""
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    barrier = context.Barrier(processes)
+    workers = [
+        context.Process(target=worker, args=(uri, strategy_name, limit_string, clients, threads, hits, barrier, results))
+        for _ in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    starts, ends, latencies = [], [], []
+    for _ in workers:
+        started, finished, process_latencies = results.get()
+        starts.append(started)
+        ends.append(finished)
+        latencies.extend(process_latencies)
+    for process in workers:
+        process.join()
+    # perf_counter is CLOCK_MONOTONIC on Linux, so the timestamps compare across processes
+    elapsed = max(ends) - min(starts)
+
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1e6, p99 * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 4], help='Worker processes to test')
+    parser.add_argument('--threads', type=int, default=2, help='Threads per worker process')
+    parser.add_argument('--hits', type=int, default=1000, help='Checks per thread')
+    parser.add_argument('--limit', default='1000/minute', help='Limit checked on every hit')
+    parser.add_argument('--clients', type=int, default=500, help='Distinct client addresses')
+    parser.add_argument('--strategies', nargs='+', default=STRATEGIES, choices=STRATEGIES)
+    args = parser.parse_args()
+
+    print(f'limit={args.limit} clients={args.clients} threads_per_process={args.threads} hits_per_thread={args.hits}')
+    print(f'{"storage":<8} {"strategy":<24} {"procs":>5} {"checks/s":>10} {"p50 us":>8} {"p99 us":>9}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for strategy_name in args.strategies:
+            for processes in args.processes:
+                for storage, uri in (
+                    ('memory', 'memory://'),
+                    ('sqlite', 'sqlite:///' + os.path.join(tmp, f'{strategy_name}-{processes}.db'))
+                ):
+                    throughput, p50, p99 = run(
+                        uri, strategy_name, args.limit, args.clients, processes, args.threads, args.hits
+                    )
+                    print(f'{storage:<8} {strategy_name:<24} {processes:>5} {throughput:>10.0f} {p50:>8.1f} {p99:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
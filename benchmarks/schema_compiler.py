@@ -0,0 +1,158 @@
+"""
+Schema compiler benchmark
+
+Compares marshmallow with the compiled schemas (application/schema_compiler.py)
+on the schemas behind the hot endpoints: dumping the customer, part, mechanic
+and service ticket lists (tickets with line items and mechanics nested) as
+loaded from the database, and loading valid create payloads. Every compiled
+result is checked against marshmallow's before it is timed.
+
+    python benchmarks/schema_compiler.py
+    python benchmarks/schema_compiler.py --rows 2000 --repeat 20
+
+Runs against a throwaway SQLite database.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def create_bench_app(database_path, rows):
+    os.environ['TEST_DATABASE_URL'] = f'sqlite:///{database_path}'
+    from application import create_app
+    from application.extensions import db
+    from application.models import (
+        Customer, Vehicle, Mechanic, ServiceTicket, TicketLineItem, TicketMechanic, Part, Service
+    )
+
+    app = create_app('testing')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        customers = [Customer(first_name=f'First{i}', last_name=f'Last{i}', email=f'customer{i}@example.com',
+                              phone=f'555-{i:07d}', address=f'{i} Main St', password_hash='x') for i in range(rows)]
+        mechanics = [Mechanic(full_name=f'Mechanic {i}', email=f'mechanic{i}@example.com',
+                              phone=f'555-9{i:06d}', salary=55000, is_active=True) for i in range(rows)]
+        service = Service(name='Diagnostics', default_labor_minutes=60, base_price_cents=9999)
+        db.session.add_all(customers + mechanics + [service])
+        db.session.flush()
+        vehicles = [Vehicle(customer_id=customer.customer_id, vin=f'BENCH{customer.customer_id:012d}', make='Honda',
+                            model='Accord', year=2018, color='Blue') for customer in customers]
+        db.session.add_all(vehicles)
+        db.session.flush()
+        for i, vehicle in enumerate(vehicles):
+            ticket = ServiceTicket(vehicle_id=vehicle.vehicle_id, customer_id=vehicle.customer_id, status='open',
+                                   problem_description=f'Customer reports noise #{i}', odometer_miles=10000 + i,
+                                   priority=1 + i % 5)
+            ticket.ticket_line_items = [
+                TicketLineItem(service_id=service.service_id, line_type='service', description=f'Diagnostics {n}',
+                               quantity=Decimal('1.50'), unit_price_cents=9999)
+                for n in range(3)
+            ]
+            ticket.ticket_mechanics = [TicketMechanic(mechanic_id=mechanics[i].mechanic_id,
+                                                      role='Technician', minutes_worked=90)]
+            db.session.add(ticket)
+        db.session.add_all([
+            Part(part_number=f'P-{i:06d}', name=f'Part {i}', description='Bench part', category='Filters',
+                 manufacturer='Acme', current_cost_cents=1000 + i, quantity_in_stock=i % 20, reorder_level=5,
+                 supplier='Acme Supply')
+            for i in range(rows)
+        ])
+        db.session.commit()
+    return app
+
+
+def load_payloads(rows):
+    return {
+        'customer': [{'first_name': f'First{i}', 'last_name': f'Last{i}', 'email': f'new{i}@example.com',
+                      'phone': f'555-{i:07d}', 'address': f'{i} Main St'} for i in range(rows)],
+        'part': [{'part_number': f'N-{i:06d}', 'name': f'Part {i}', 'category': 'Filters', 'manufacturer': 'Acme',
+                  'current_cost_cents': 1000 + i, 'quantity_in_stock': 10, 'reorder_threshold': 5,
+                  'supplier': 'Acme Supply'} for i in range(rows)],
+        'mechanic': [{'first_name': 'Mechanic', 'last_name': str(i), 'email': f'new{i}@example.com',
+                      'phone': f'555-8{i:06d}', 'salary': 60000} for i in range(rows)],
+        'service ticket': [{'vehicle_id': 1 + i, 'customer_id': 1 + i, 'status': 'open',
+                            'problem_description': 'Brakes squeal', 'odometer_miles': 42000, 'priority': 2}
+                           for i in range(rows)],
+    }
+
+
+def best_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000, help='Rows per table and payloads per load')
+    parser.add_argument('--repeat', type=int, default=15, help='Timed runs per schema (the best run is reported)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_bench_app(os.path.join(directory, 'bench.db'), args.rows)
+        from sqlalchemy import select
+        from sqlalchemy.orm import selectinload
+        from application.extensions import db
+        from application.models import Customer, Mechanic, Part, ServiceTicket, TicketMechanic
+        from application.schema_compiler import compile_schema
+        from application.blueprints.customer.customerSchemas import customers_schema
+        from application.blueprints.inventory.inventorySchemas import parts_schema
+        from application.blueprints.mechanic.mechanicSchemas import mechanics_schema
+        from application.blueprints.service_ticket.serviceTicketSchemas import service_tickets_schema
+
+        results = []
+        with app.app_context():
+            dumps = {
+                'customer': (customers_schema, select(Customer)),
+                'part': (parts_schema, select(Part)),
+                'mechanic': (mechanics_schema, select(Mechanic)),
+                'service ticket': (service_tickets_schema, select(ServiceTicket).options(
+                    selectinload(ServiceTicket.ticket_line_items),
+                    selectinload(ServiceTicket.ticket_mechanics).selectinload(TicketMechanic.mechanic))),
+            }
+            for name, (schema, query) in dumps.items():
+                objects = db.session.execute(query).scalars().all()
+                fast = compile_schema(schema)
+                if fast.dump(objects) != schema.dump(objects):
+                    sys.exit(f'{name}: compiled dump differs from marshmallow')
+                results.append((f'dump {name}', best_ms(lambda: schema.dump(objects), args.repeat),
+                                best_ms(lambda: fast.dump(objects), args.repeat)))
+
+            # Part loads build model instances (load_instance): session needed, nothing is added to it
+            payloads = load_payloads(args.rows)
+            for name, schema in (('customer', customers_schema), ('part', parts_schema),
+                                 ('mechanic', mechanics_schema), ('service ticket', service_tickets_schema)):
+                data = payloads[name]
+                fast = compile_schema(schema)
+                marshmallow_result, compiled_result = schema.load(data), fast.load(data)
+                if [vars_of(item) for item in compiled_result] != [vars_of(item) for item in marshmallow_result]:
+                    sys.exit(f'{name}: compiled load differs from marshmallow')
+                results.append((f'load {name}', best_ms(lambda: schema.load(data), args.repeat),
+                                best_ms(lambda: fast.load(data), args.repeat)))
+            db.session.rollback()
+
+        print(f'{args.rows} objects per run, best of {args.repeat} (median in brackets)')
+        print(f"{'':<22}{'marshmallow ms':>22}{'compiled ms':>22}{'speedup':>9}")
+        for label, (slow, slow_median), (fast, fast_median) in results:
+            print(f"{label:<22}{slow:>11.2f} ({slow_median:>7.2f}){fast:>11.2f} ({fast_median:>7.2f}){slow / fast:>8.1f}x")
+
+
+def vars_of(item):
+    """Comparable form of a load result (plain dict, or a model instance from load_instance schemas)"""
+    if isinstance(item, dict):
+        return item
+    return {key: value for key, value in vars(item).items() if not key.startswith('_')}
+
+
+if __name__ == '__main__':
+    main()
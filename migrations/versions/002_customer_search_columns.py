@@ -0,0 +1,55 @@
+"""Customer search columns and indexes
+
+Revision ID: 002_customer_search_columns
+Revises: 001_initial_schema
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002_customer_search_columns'
+down_revision = '001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def _normalize_phone(phone):
+    # Mirrors application.models.normalize_phone (kept inline so the migration is self-contained)
+    digits = re.sub(r'\D', '', phone or '')
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits
+
+
+def upgrade():
+    op.add_column('customers', sa.Column('phone_normalized', sa.String(length=20), nullable=True))
+    op.add_column('customers', sa.Column('email_lower', sa.String(length=255), nullable=True))
+
+    # Backfill existing rows
+    bind = op.get_bind()
+    bind.execute(sa.text('UPDATE customers SET email_lower = LOWER(email)'))
+    rows = bind.execute(sa.text('SELECT customer_id, phone FROM customers')).fetchall()
+    if rows:
+        bind.execute(
+            sa.text('UPDATE customers SET phone_normalized = :phone WHERE customer_id = :customer_id'),
+            [{'customer_id': row.customer_id, 'phone': _normalize_phone(row.phone)} for row in rows]
+        )
+
+    op.create_index('ix_customers_phone_normalized', 'customers', ['phone_normalized'])
+    op.create_index('ix_customers_email_lower', 'customers', ['email_lower'])
+    op.create_index(
+        'ix_customers_last_first', 'customers', ['last_name', 'first_name'],
+        mysql_length={'last_name': 50, 'first_name': 50}
+    )
+
+
+def downgrade():
+    op.drop_index('ix_customers_last_first', table_name='customers')
+    op.drop_index('ix_customers_email_lower', table_name='customers')
+    op.drop_index('ix_customers_phone_normalized', table_name='customers')
+    op.drop_column('customers', 'email_lower')
+    op.drop_column('customers', 'phone_normalized')
@@ -0,0 +1,24 @@
+"""Index service tickets by vehicle for service history
+
+Revision ID: 003_service_ticket_vehicle_index
+Revises: 002_customer_search_columns
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003_service_ticket_vehicle_index'
+down_revision = '002_customer_search_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_service_tickets_vehicle_ticket', 'service_tickets', ['vehicle_id', 'ticket_id'])
+
+
+def downgrade():
+    op.drop_index('ix_service_tickets_vehicle_ticket', table_name='service_tickets')
@@ -0,0 +1,40 @@
+"""Decoded VIN columns on vehicles
+
+Revision ID: 004_vehicle_vin_decoding
+Revises: 003_service_ticket_vehicle_index
+Create Date: 2026-10-19 11:00:00.000000
+
+Existing rows are left NULL here; populate them with: flask vin backfill
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004_vehicle_vin_decoding'
+down_revision = '003_service_ticket_vehicle_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('vehicles', sa.Column('vin_wmi', sa.String(length=3), nullable=True))
+    op.add_column('vehicles', sa.Column('vin_manufacturer', sa.String(length=100), nullable=True))
+    op.add_column('vehicles', sa.Column('vin_model_year', sa.Integer(), nullable=True))
+    op.add_column('vehicles', sa.Column('vin_plant_code', sa.String(length=1), nullable=True))
+    op.add_column('vehicles', sa.Column('vin_check_digit_valid', sa.Boolean(), nullable=True))
+
+    op.create_index('ix_vehicles_vin_wmi', 'vehicles', ['vin_wmi'])
+    op.create_index('ix_vehicles_vin_model_year', 'vehicles', ['vin_model_year'])
+    op.create_index('ix_vehicles_vin_manufacturer_year', 'vehicles', ['vin_manufacturer', 'vin_model_year'])
+
+
+def downgrade():
+    op.drop_index('ix_vehicles_vin_manufacturer_year', table_name='vehicles')
+    op.drop_index('ix_vehicles_vin_model_year', table_name='vehicles')
+    op.drop_index('ix_vehicles_vin_wmi', table_name='vehicles')
+    op.drop_column('vehicles', 'vin_check_digit_valid')
+    op.drop_column('vehicles', 'vin_plant_code')
+    op.drop_column('vehicles', 'vin_model_year')
+    op.drop_column('vehicles', 'vin_manufacturer')
+    op.drop_column('vehicles', 'vin_wmi')
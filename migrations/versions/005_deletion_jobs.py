@@ -0,0 +1,39 @@
+"""Deletion job progress table
+
+Revision ID: 005_deletion_jobs
+Revises: 004_vehicle_vin_decoding
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005_deletion_jobs'
+down_revision = '004_vehicle_vin_decoding'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'deletion_jobs',
+        sa.Column('job_id', sa.String(length=32), nullable=False),
+        sa.Column('target_type', sa.String(length=50), nullable=False),
+        sa.Column('target_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('restock_parts', sa.Boolean(), nullable=False),
+        sa.Column('progress', sa.JSON(), nullable=False),
+        sa.Column('parts_restocked', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('finished_at', sa.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_index('ix_deletion_jobs_target', 'deletion_jobs', ['target_type', 'target_id'])
+
+
+def downgrade():
+    op.drop_index('ix_deletion_jobs_target', table_name='deletion_jobs')
+    op.drop_table('deletion_jobs')
@@ -0,0 +1,44 @@
+"""Materialized service reminders
+
+Revision ID: 006_service_reminders
+Revises: 005_deletion_jobs
+Create Date: 2026-10-19 13:00:00.000000
+
+The table starts empty; fill it with: flask reminders refresh
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006_service_reminders'
+down_revision = '005_deletion_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'service_reminders',
+        sa.Column('reminder_id', sa.Integer(), nullable=False),
+        sa.Column('vehicle_id', sa.Integer(), nullable=False),
+        sa.Column('package_id', sa.Integer(), nullable=False),
+        sa.Column('last_odometer_miles', sa.Integer(), nullable=False),
+        sa.Column('last_visit_at', sa.TIMESTAMP(), nullable=False),
+        sa.Column('miles_per_day', sa.Float(), nullable=False),
+        sa.Column('projected_odometer_miles', sa.Integer(), nullable=False),
+        sa.Column('due_odometer_miles', sa.Integer(), nullable=False),
+        sa.Column('due_date', sa.Date(), nullable=False),
+        sa.Column('computed_at', sa.TIMESTAMP(), nullable=False),
+        sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.vehicle_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['package_id'], ['service_packages.package_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('reminder_id')
+    )
+    op.create_index('ix_service_reminders_vehicle_id', 'service_reminders', ['vehicle_id'])
+    op.create_index('ix_service_reminders_package_id', 'service_reminders', ['package_id'])
+
+
+def downgrade():
+    op.drop_index('ix_service_reminders_package_id', table_name='service_reminders')
+    op.drop_index('ix_service_reminders_vehicle_id', table_name='service_reminders')
+    op.drop_table('service_reminders')
@@ -0,0 +1,23 @@
+"""Customer token version
+
+Revision ID: 007_customer_token_version
+Revises: 006_service_reminders
+Create Date: 2026-10-19 14:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_customer_token_version'
+down_revision = '006_service_reminders'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('customers', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('customers', 'token_version')
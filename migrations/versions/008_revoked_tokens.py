@@ -0,0 +1,35 @@
+"""Revoked token table
+
+Revision ID: 008_revoked_tokens
+Revises: 007_customer_token_version
+Create Date: 2026-10-19 15:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_revoked_tokens'
+down_revision = '007_customer_token_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('token_type', sa.String(length=10), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=True),
+        sa.Column('expires_at', sa.TIMESTAMP(), nullable=False),
+        sa.Column('revoked_at', sa.TIMESTAMP(), nullable=False),
+        sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'])
+    op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'])
+
+
+def downgrade():
+    op.drop_index('ix_revoked_tokens_revoked_at', table_name='revoked_tokens')
+    op.drop_index('ix_revoked_tokens_expires_at', table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
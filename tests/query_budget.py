@@ -0,0 +1,138 @@
+"""
+Query budgets for endpoint tests
+
+Status codes don't show an endpoint that runs one query per row. These helpers
+record the SQL each request runs and fail a test whose requests go over budget:
+
+    with count_queries() as queries:          # every statement, grouped per request
+        self.client.get('/service_tickets', headers=self.headers)
+    self.assertEqual(len(queries), 4)
+
+    @query_budget('mechanic.get_mechanics', maximum=2)
+    def test_...(self): ...                   # each request to the endpoint: at most 2 statements
+
+    @query_budget('service_ticket.get_service_tickets', constant=True)
+    def test_...(self): ...                   # O(1) in the row count: the test requests the
+                                              # endpoint, adds rows, requests it again
+
+Budgets are per endpoint (Flask endpoint name), so the requests a test makes to
+set up data don't count. A constant budget fails when a statement runs more than
+once in a later request and more often than in the first one; statements that
+come and go (the periodic token revocation sync) don't count as growth.
+
+A failure lists the offending statements as fingerprints (literals and
+parameters replaced by ?, IN lists collapsed) with how often each ran, e.g.
+
+    service_ticket.get_service_tickets: statements grew with the data (request 1 -> 2)
+        1 -> 6  SELECT ticket_mechanics.ticket_id, ... WHERE ? = ticket_mechanics.ticket_id
+"""
+import functools
+import re
+from collections import Counter
+from contextlib import contextmanager
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETERS = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\?")
+_IN_LISTS = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """Statement with literals and parameters replaced by ?, IN lists collapsed and whitespace squeezed"""
+    statement = _STRINGS.sub('?', statement)
+    statement = _NUMBERS.sub('?', statement)
+    statement = _PARAMETERS.sub('?', statement)
+    statement = _IN_LISTS.sub('IN (...)', statement)
+    return _SPACES.sub(' ', statement).strip()
+
+
+class QueryLog:
+    """Statements executed while counting, with the requests they ran in"""
+
+    def __init__(self):
+        self.statements = []
+        self.requests = []  # (endpoint, [statements]) in request order
+        self._key = f'query_budget.{id(self)}'
+
+    def __len__(self):
+        return len(self.statements)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        if not has_request_context():
+            return
+        environ = request.environ
+        statements = environ.get(self._key)
+        if statements is None:
+            statements = environ[self._key] = []
+            self.requests.append((request.endpoint, statements))
+        statements.append(statement)
+
+    def for_endpoint(self, endpoint):
+        """Statement lists of the requests that reached endpoint"""
+        return [statements for name, statements in self.requests if name == endpoint]
+
+    def fingerprints(self, statements=None):
+        return Counter(fingerprint(statement) for statement in (self.statements if statements is None else statements))
+
+
+@contextmanager
+def count_queries():
+    """Record every SQL statement executed inside the block (any engine)"""
+    log = QueryLog()
+    event.listen(Engine, 'before_cursor_execute', log.record)
+    try:
+        yield log
+    finally:
+        event.remove(Engine, 'before_cursor_execute', log.record)
+
+
+def _report(counts):
+    return '\n'.join(f'    {count:>3} x  {statement}' for statement, count in counts.most_common())
+
+
+def check_query_budget(log, endpoint, exact=None, maximum=None, constant=False):
+    """Raise AssertionError, listing the statement fingerprints, if endpoint's requests broke the budget"""
+    requests = log.for_endpoint(endpoint)
+    if not requests:
+        raise AssertionError(f"{endpoint}: no request reached the endpoint, so its query budget wasn't checked")
+    for number, statements in enumerate(requests, 1):
+        if exact is not None and len(statements) != exact:
+            raise AssertionError(f"{endpoint}: request {number} ran {len(statements)} statements, "
+                                 f"budget is exactly {exact}\n{_report(log.fingerprints(statements))}")
+        if maximum is not None and len(statements) > maximum:
+            raise AssertionError(f"{endpoint}: request {number} ran {len(statements)} statements, "
+                                 f"budget is at most {maximum}\n{_report(log.fingerprints(statements))}")
+    if constant:
+        if len(requests) < 2:
+            raise AssertionError(f"{endpoint}: a constant query budget needs requests at two data sizes")
+        first = log.fingerprints(requests[0])
+        for number, statements in enumerate(requests[1:], 2):
+            counts = log.fingerprints(statements)
+            grown = [statement for statement, count in counts.most_common() if count > max(first[statement], 1)]
+            if grown:
+                lines = [f'    {first[statement]:>3} -> {counts[statement]:<3} {statement}' for statement in grown]
+                raise AssertionError(f"{endpoint}: statements grew with the data (request 1 -> {number})\n"
+                                     + '\n'.join(lines))
+
+
+def query_budget(endpoint, exact=None, maximum=None, constant=False):
+    """
+    Fail the decorated test if its requests to endpoint break the query budget
+
+    exact / maximum: statements allowed per request. constant: no statement may run
+    more often in later requests, made after adding rows (O(1) in the row count).
+    """
+    def decorator(test):
+        @functools.wraps(test)
+        def wrapper(*args, **kwargs):
+            with count_queries() as log:
+                result = test(*args, **kwargs)
+            check_query_budget(log, endpoint, exact, maximum, constant)
+            return result
+        return wrapper
+    return decorator
@@ -1,8 +1,16 @@
 import unittest
 import json
+import threading
+from datetime import datetime
+from flask import Flask
+from flask_jwt_extended import decode_token
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
 from application import create_app
 from application.extensions import db
-from application.models import Customer
+from application.models import Customer, RevokedToken
+from application.passwords import PasswordHasher, password_hasher
+from application.revocation import BloomFilter, token_revocation_list
 
 
 class TestAuthRoutes(unittest.TestCase):
@@ -163,6 +171,74 @@ class TestAuthRoutes(unittest.TestCase):
         self.assertIn('customer', json_data)
         self.assertEqual(json_data['message'], 'Login successful')
     
+    def test_login_rehashes_outdated_hash(self):
+        """Test a successful login upgrades a hash made with old cost parameters"""
+        customer = Customer(first_name="Old", last_name="Hash", email="old.hash@example.com", phone="555-123-4567",
+                            password_hash=generate_password_hash("SecurePass123!", method="pbkdf2:sha256:500"))
+        db.session.add(customer)
+        db.session.commit()
+        
+        response = self.client.post(
+            '/auth/login',
+            data=json.dumps({"email": "old.hash@example.com", "password": "SecurePass123!"}),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        db.session.expire_all()
+        customer = db.session.get(Customer, customer.customer_id)
+        self.assertTrue(customer.password_hash.startswith(self.app.config['PASSWORD_HASH_METHOD'] + '$'))
+        self.assertTrue(customer.check_password("SecurePass123!"))
+    
+    def test_login_hashing_pool_saturated(self):
+        """Test login fails fast with 503 when no hashing slot frees up (negative test)"""
+        customer = Customer(first_name="Busy", last_name="Pool", email="busy@example.com", phone="555-123-4567")
+        customer.set_password("SecurePass123!")
+        db.session.add(customer)
+        db.session.commit()
+        
+        saved = (password_hasher.pool_mode, password_hasher.queue_timeout, password_hasher._slots)
+        password_hasher.pool_mode, password_hasher.queue_timeout = 'process', 0.01
+        password_hasher._slots = threading.BoundedSemaphore(1)
+        password_hasher._slots.acquire()
+        try:
+            response = self.client.post(
+                '/auth/login',
+                data=json.dumps({"email": "busy@example.com", "password": "SecurePass123!"}),
+                content_type='application/json'
+            )
+        finally:
+            password_hasher.pool_mode, password_hasher.queue_timeout, password_hasher._slots = saved
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+    
+    def test_process_pool_hash_and_verify(self):
+        """Test hashing and verification in worker processes"""
+        app = Flask(__name__)
+        app.config.update(PASSWORD_HASH_POOL='process', PASSWORD_HASH_WORKERS=1,
+                          PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+        hasher = PasswordHasher(app)
+        try:
+            pwhash = hasher.hash("SecurePass123!")
+            self.assertTrue(pwhash.startswith('pbkdf2:sha256:1000$'))
+            self.assertTrue(hasher.verify(pwhash, "SecurePass123!"))
+            self.assertFalse(hasher.verify(pwhash, "WrongPass123!"))
+            self.assertFalse(hasher.needs_rehash(pwhash))
+            self.assertTrue(hasher.needs_rehash(generate_password_hash("x", method='pbkdf2:sha256:500')))
+        finally:
+            hasher.shutdown()
+    
+    def test_needs_rehash_with_default_parameters(self):
+        """Test a method without parameters matches the hashes Werkzeug writes for it"""
+        app = Flask(__name__)
+        app.config.update(PASSWORD_HASH_POOL='inline', PASSWORD_HASH_METHOD='scrypt')
+        hasher = PasswordHasher(app)
+        
+        self.assertFalse(hasher.needs_rehash(hasher.hash("SecurePass123!")))
+        self.assertFalse(hasher.needs_rehash(generate_password_hash("x", method='scrypt:32768:8:1')))
+        self.assertTrue(hasher.needs_rehash(generate_password_hash("x", method='scrypt:16384:8:1')))
+    
     def test_login_invalid_password(self):
         """Test login with invalid password (negative test)"""
         # First register a customer
@@ -267,6 +343,174 @@ class TestAuthRoutes(unittest.TestCase):
         self.assertEqual(json_data['email'], 'john.doe@example.com')
         self.assertEqual(json_data['first_name'], 'John')
     
+    def _register_tokens(self):
+        """Register a customer and return the response body (customer, access_token, refresh_token)"""
+        response = self.client.post(
+            '/auth/register',
+            data=json.dumps({
+                "first_name": "John",
+                "last_name": "Doe",
+                "email": "john.doe@example.com",
+                "password": "SecurePass123!",
+                "phone": "555-123-4567"
+            }),
+            content_type='application/json'
+        )
+        return json.loads(response.data)
+    
+    def _register(self):
+        """Register a customer and return (customer_id, auth headers)"""
+        json_data = self._register_tokens()
+        return json_data['customer']['customer_id'], {'Authorization': f"Bearer {json_data['access_token']}"}
+    
+    def test_get_current_user_served_from_identity_cache(self):
+        """Test a repeat /auth/me makes no database round trips"""
+        _, headers = self._register()
+        self.client.get('/auth/me', headers=headers)
+        
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.get('/auth/me', headers=headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statements, [])
+    
+    def test_get_current_user_refreshed_after_update(self):
+        """Test updating the customer invalidates their cached identity"""
+        customer_id, headers = self._register()
+        self.client.get('/auth/me', headers=headers)
+        
+        response = self.client.put(
+            f'/customers/{customer_id}',
+            data=json.dumps({"first_name": "Johnny", "last_name": "Doe", "email": "john.doe@example.com", "phone": "555-123-4567"}),
+            content_type='application/json',
+            headers=headers
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/auth/me', headers=headers)
+        
+        self.assertEqual(json.loads(response.data)['first_name'], 'Johnny')
+    
+    def test_revoked_token_version_rejected(self):
+        """Test tokens issued before a token version bump no longer authorize (negative test)"""
+        customer_id, headers = self._register()
+        self.client.get('/auth/me', headers=headers)
+        
+        customer = db.session.get(Customer, customer_id)
+        customer.token_version += 1
+        db.session.commit()
+        
+        response = self.client.put(
+            f'/customers/{customer_id}',
+            data=json.dumps({"first_name": "Johnny", "last_name": "Doe", "email": "john.doe@example.com", "phone": "555-123-4567"}),
+            content_type='application/json',
+            headers=headers
+        )
+        self.assertEqual(response.status_code, 401)
+    
+    def test_refresh_issues_access_token(self):
+        """Test a refresh token is exchanged for a working access token"""
+        tokens = self._register_tokens()
+        
+        response = self.client.post(
+            '/auth/refresh',
+            headers={'Authorization': f"Bearer {tokens['refresh_token']}"}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        access_token = json.loads(response.data)['access_token']
+        response = self.client.get('/auth/me', headers={'Authorization': f'Bearer {access_token}'})
+        self.assertEqual(response.status_code, 200)
+    
+    def test_refresh_with_access_token(self):
+        """Test an access token can't be used as a refresh token (negative test)"""
+        tokens = self._register_tokens()
+        
+        response = self.client.post(
+            '/auth/refresh',
+            headers={'Authorization': f"Bearer {tokens['access_token']}"}
+        )
+        
+        self.assertEqual(response.status_code, 422)
+    
+    def test_logout_revokes_tokens(self):
+        """Test logout revokes the access token and the refresh token sent with it"""
+        tokens = self._register_tokens()
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        
+        response = self.client.post(
+            '/auth/logout',
+            data=json.dumps({"refresh_token": tokens['refresh_token']}),
+            content_type='application/json',
+            headers=headers
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.client.get('/auth/me', headers=headers)
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post(
+            '/auth/refresh',
+            headers={'Authorization': f"Bearer {tokens['refresh_token']}"}
+        )
+        self.assertEqual(response.status_code, 401)
+    
+    def test_logout_with_foreign_refresh_token(self):
+        """Test logout rejects a refresh token issued to another customer (negative test)"""
+        tokens = self._register_tokens()
+        response = self.client.post(
+            '/auth/register',
+            data=json.dumps({
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "email": "jane.doe@example.com",
+                "password": "SecurePass123!",
+                "phone": "555-123-4568"
+            }),
+            content_type='application/json'
+        )
+        other_refresh_token = json.loads(response.data)['refresh_token']
+        
+        response = self.client.post(
+            '/auth/logout',
+            data=json.dumps({"refresh_token": other_refresh_token}),
+            content_type='application/json',
+            headers={'Authorization': f"Bearer {tokens['access_token']}"}
+        )
+        
+        self.assertEqual(response.status_code, 400)
+    
+    def test_revocation_from_another_process_picked_up_on_sync(self):
+        """Test jtis revoked elsewhere (rows in revoked_tokens) are rejected after the next sync"""
+        tokens = self._register_tokens()
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        self.client.get('/auth/me', headers=headers)
+        
+        claims = decode_token(tokens['access_token'])
+        db.session.add(RevokedToken(
+            jti=claims['jti'], token_type='access', customer_id=int(claims['sub']),
+            expires_at=datetime.utcfromtimestamp(claims['exp'])
+        ))
+        db.session.commit()
+        token_revocation_list._next_sync = 0.0
+        
+        response = self.client.get('/auth/me', headers=headers)
+        self.assertEqual(response.status_code, 401)
+    
+    def test_bloom_filter_has_no_false_negatives(self):
+        """Test every added jti is reported present and the false positive rate stays near target"""
+        bloom = BloomFilter(1000, 0.01)
+        added = [f'revoked-{i}' for i in range(1000)]
+        for jti in added:
+            bloom.add(jti)
+        
+        self.assertTrue(all(jti in bloom for jti in added))
+        false_positives = sum(f'live-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+    
     def test_get_current_user_no_token(self):
         """Test getting current user without token (negative test)"""
         response = self.client.get('/auth/me')
@@ -0,0 +1,301 @@
+import sys
+import unittest
+import json
+from sqlalchemy import event
+from application import create_app
+from application.extensions import db, cache
+from application.models import Service, ServicePackage, ServicePackageItem, ServicePrerequisite
+from application.prerequisites import PrerequisiteGraph, PrerequisiteCycleError, resolve_work_plan
+
+
+class TestCatalogRoutes(unittest.TestCase):
+    """Test cases for the service catalog routes"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up test database with three services, one active and one inactive package"""
+        db.drop_all()
+        db.create_all()
+        cache.clear()
+
+        self.oil = Service(name="Oil Change", default_labor_minutes=30, base_price_cents=4999)
+        self.rotation = Service(name="Tire Rotation", default_labor_minutes=45, base_price_cents=2500)
+        self.wipers = Service(name="Wiper Blades", default_labor_minutes=10, base_price_cents=1999)
+        db.session.add_all([self.oil, self.rotation, self.wipers])
+        db.session.flush()
+
+        self.package = ServicePackage(name="Basic Maintenance", package_discount_percentage=10, is_active=True)
+        db.session.add(self.package)
+        db.session.flush()
+        db.session.add_all([
+            ServicePackageItem(package_id=self.package.package_id, service_id=self.oil.service_id,
+                               quantity=1, discount_percentage=0, sequence_order=1),
+            ServicePackageItem(package_id=self.package.package_id, service_id=self.rotation.service_id,
+                               quantity=2, discount_percentage=20, sequence_order=2),
+            ServicePackageItem(package_id=self.package.package_id, service_id=self.wipers.service_id,
+                               quantity=1, is_optional=True, discount_percentage=0, sequence_order=3)
+        ])
+        db.session.add(ServicePackage(name="Retired Package", package_discount_percentage=5, is_active=False))
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test database"""
+        db.session.remove()
+        db.drop_all()
+
+    def _count_statements(self, func):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            result = func()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return result, statements
+
+    def test_get_catalog_prices_packages(self):
+        """Test packages are priced from item and package discounts (optional items excluded)"""
+        response = self.client.get('/catalog')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(len(data['services']), 3)
+        self.assertEqual([package['name'] for package in data['packages']], ["Basic Maintenance"])
+
+        package = data['packages'][0]
+        self.assertEqual([item['service_id'] for item in package['items']],
+                         [self.oil.service_id, self.rotation.service_id, self.wipers.service_id])
+        rotation = package['items'][1]
+        self.assertEqual(rotation['list_price_cents'], 5000)
+        self.assertEqual(rotation['price_cents'], 4000)
+        # 4999 + 5000 list; 4999 + 4000 after item discounts; less 10% package discount
+        self.assertEqual(package['list_price_cents'], 9999)
+        self.assertEqual(package['items_price_cents'], 8999)
+        self.assertEqual(package['final_price_cents'], 8099)
+        self.assertEqual(package['savings_cents'], 1900)
+        self.assertEqual(package['labor_minutes'], 120)
+
+    def test_get_catalog_served_from_memory(self):
+        """Test repeat catalog requests make no database round trips"""
+        self.client.get('/catalog/packages')
+
+        response, statements = self._count_statements(lambda: self.client.get('/catalog/packages'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statements, [])
+
+    def test_get_catalog_not_modified(self):
+        """Test a matching If-None-Match gets a 304 without a body"""
+        response = self.client.get('/catalog/services')
+        etag = response.headers['ETag']
+
+        response = self.client.get('/catalog/services', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+    def test_catalog_rebuilt_after_change(self):
+        """Test changing a price rebuilds the snapshot and changes the ETag"""
+        response = self.client.get(f'/catalog/packages/{self.package.package_id}')
+        etag = response.headers['ETag']
+
+        self.oil.base_price_cents = 5999
+        db.session.commit()
+        response = self.client.get(
+            f'/catalog/packages/{self.package.package_id}', headers={'If-None-Match': etag}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(json.loads(response.data)['list_price_cents'], 10999)
+
+    def test_catalog_rebuilt_after_max_age(self):
+        """Test a change that doesn't bump the catalog version (direct SQL) shows up once the snapshot expires"""
+        response = self.client.get(f'/catalog/packages/{self.package.package_id}')
+        etag = response.headers['ETag']
+        db.session.execute(
+            Service.__table__.update().where(Service.service_id == self.oil.service_id).values(base_price_cents=5999)
+        )
+        db.session.commit()
+
+        response = self.client.get(f'/catalog/packages/{self.package.package_id}')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        self.app.config['CATALOG_SNAPSHOT_MAX_AGE'] = 0
+        try:
+            response = self.client.get(f'/catalog/packages/{self.package.package_id}')
+        finally:
+            self.app.config['CATALOG_SNAPSHOT_MAX_AGE'] = 30
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(json.loads(response.data)['list_price_cents'], 10999)
+
+    def test_get_inactive_package(self):
+        """Test inactive packages are not in the catalog (negative test)"""
+        retired = db.session.execute(
+            db.select(ServicePackage).where(ServicePackage.is_active.is_(False))
+        ).scalars().one()
+
+        response = self.client.get(f'/catalog/packages/{retired.package_id}')
+
+        self.assertEqual(response.status_code, 404)
+
+    def _add_prerequisite(self, service, prerequisite, is_required=True, gap_hours=None):
+        db.session.add(ServicePrerequisite(
+            service_id=service.service_id, prerequisite_service_id=prerequisite.service_id,
+            is_required=is_required, recommended_gap_hours=gap_hours
+        ))
+        db.session.commit()
+
+    def _auth_headers(self):
+        response = self.client.post(
+            '/auth/register',
+            data=json.dumps({
+                "first_name": "Test",
+                "last_name": "User",
+                "email": "test@example.com",
+                "password": "TestPass123!",
+                "phone": "555-000-0000"
+            }),
+            content_type='application/json'
+        )
+        return {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+
+    def test_get_work_plan_orders_transitive_prerequisites(self):
+        """Test a work plan includes prerequisites of prerequisites, in dependency order"""
+        self._add_prerequisite(self.wipers, self.rotation, gap_hours=2)
+        self._add_prerequisite(self.rotation, self.oil)
+
+        response = self.client.get(f'/catalog/work-plan?service_id={self.wipers.service_id}')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([step['service_id'] for step in data['services']],
+                         [self.oil.service_id, self.rotation.service_id, self.wipers.service_id])
+        self.assertEqual([step['requested'] for step in data['services']], [False, False, True])
+        self.assertEqual(data['services'][2]['prerequisites'],
+                         [{'service_id': self.rotation.service_id, 'recommended_gap_hours': 2}])
+        self.assertEqual(data['labor_minutes'], 85)
+
+    def test_work_plan_memoized_until_prerequisites_change(self):
+        """Test repeat work plans are served from memory and refreshed after a prerequisite write"""
+        self._add_prerequisite(self.rotation, self.oil)
+        resolve_work_plan([self.rotation.service_id])
+
+        plan, statements = self._count_statements(lambda: resolve_work_plan([self.rotation.service_id]))
+        self.assertEqual(statements, [])
+        self.assertEqual(len(plan), 2)
+
+        self._add_prerequisite(self.oil, self.wipers)
+        plan = resolve_work_plan([self.rotation.service_id])
+        self.assertEqual([step['service_id'] for step in plan],
+                         [self.wipers.service_id, self.oil.service_id, self.rotation.service_id])
+
+    def test_work_plan_rebuilt_after_max_age(self):
+        """Test a prerequisite written with direct SQL shows up once the graph expires"""
+        resolve_work_plan([self.rotation.service_id])
+        db.session.execute(ServicePrerequisite.__table__.insert().values(
+            service_id=self.rotation.service_id, prerequisite_service_id=self.oil.service_id, is_required=True
+        ))
+        db.session.commit()
+
+        plan = resolve_work_plan([self.rotation.service_id])
+        self.assertEqual([step['service_id'] for step in plan], [self.rotation.service_id])
+
+        self.app.config['CATALOG_SNAPSHOT_MAX_AGE'] = 0
+        try:
+            plan = resolve_work_plan([self.rotation.service_id])
+        finally:
+            self.app.config['CATALOG_SNAPSHOT_MAX_AGE'] = 30
+        self.assertEqual([step['service_id'] for step in plan], [self.oil.service_id, self.rotation.service_id])
+
+    def test_optional_prerequisite_recommended(self):
+        """Test optional prerequisites are recommended rather than added to the plan"""
+        self._add_prerequisite(self.rotation, self.wipers, is_required=False)
+
+        plan = resolve_work_plan([self.rotation.service_id])
+
+        self.assertEqual([step['service_id'] for step in plan], [self.rotation.service_id])
+        self.assertEqual(plan[0]['recommended'], [self.wipers.service_id])
+
+    def test_get_work_plan_unknown_service(self):
+        """Test a work plan for a service that doesn't exist (negative test)"""
+        response = self.client.get('/catalog/work-plan?service_id=999')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_add_prerequisite(self):
+        """Test adding a prerequisite through the API"""
+        response = self.client.post(
+            f'/catalog/services/{self.rotation.service_id}/prerequisites',
+            data=json.dumps({"prerequisite_service_id": self.oil.service_id, "recommended_gap_hours": 1}),
+            content_type='application/json',
+            headers=self._auth_headers()
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.data)['service_id'], self.rotation.service_id)
+
+    def test_add_prerequisite_cycle(self):
+        """Test a prerequisite that closes a cycle is rejected (negative test)"""
+        self._add_prerequisite(self.rotation, self.oil)
+        self._add_prerequisite(self.oil, self.wipers)
+
+        response = self.client.post(
+            f'/catalog/services/{self.wipers.service_id}/prerequisites',
+            data=json.dumps({"prerequisite_service_id": self.rotation.service_id}),
+            content_type='application/json',
+            headers=self._auth_headers()
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(json.loads(response.data)['cycle']),
+                         sorted([self.oil.service_id, self.rotation.service_id, self.wipers.service_id]))
+        self.assertEqual(db.session.query(ServicePrerequisite).count(), 2)
+
+    def test_self_prerequisite_rejected_on_commit(self):
+        """Test the flush guard rejects cycles written outside the API (negative test)"""
+        db.session.add(ServicePrerequisite(service_id=self.oil.service_id, prerequisite_service_id=self.oil.service_id))
+
+        with self.assertRaises(PrerequisiteCycleError):
+            db.session.commit()
+        db.session.rollback()
+
+    def test_graph_closure_without_database(self):
+        """Test closures and ranks on a hand-built graph (diamond dependency)"""
+        services = [(i, f'Service {i}', 10, 100) for i in (1, 2, 3, 4)]
+        # 4 needs 2 and 3, both of which need 1
+        graph = PrerequisiteGraph(0, services, [(4, 2, True, None), (4, 3, True, None), (2, 1, True, None), (3, 1, True, None)])
+
+        plan = graph.plan([4])
+
+        self.assertEqual([step['service_id'] for step in plan], [1, 2, 3, 4])
+        self.assertIs(graph.plan([4]), plan)
+        with self.assertRaises(PrerequisiteCycleError):
+            PrerequisiteGraph(0, services, [(1, 2, True, None), (2, 1, False, None)])
+
+    def test_graph_closure_deeper_than_recursion_limit(self):
+        """Test a required-prerequisite chain longer than the recursion limit still resolves"""
+        depth = sys.getrecursionlimit() + 100
+        services = [(i, f'Service {i}', 10, 100) for i in range(1, depth + 1)]
+        # Each service needs the one before it
+        graph = PrerequisiteGraph(0, services, [(i, i - 1, True, None) for i in range(2, depth + 1)])
+
+        plan = graph.plan([depth])
+
+        self.assertEqual([step['service_id'] for step in plan], list(range(1, depth + 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+import gzip
+import json
+import zlib
+from flask import Response, stream_with_context
+from application import create_app
+from application.extensions import db, cache
+from application.compression import compressor, brotli
+from application.models import Part, Service
+
+
+class TestCompression(unittest.TestCase):
+    """Test cases for negotiated response compression"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client, a streaming test route and application context once for all tests"""
+        cls.app = create_app('testing')
+
+        @cls.app.route('/test-stream')
+        def stream():
+            chunks = (json.dumps({"row": i, "text": "x" * 50}) + "\n" for i in range(200))
+            return Response(stream_with_context(chunks), mimetype='application/json')
+
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up test database with enough parts for a compressible list, and an auth token"""
+        db.drop_all()
+        db.create_all()
+        cache.clear()
+        compressor.clear()
+
+        db.session.add_all([
+            Part(part_number=f"FLT-{i:03d}", name=f"Oil Filter {i}", category="Filters",
+                 current_cost_cents=899, quantity_in_stock=40, reorder_level=10)
+            for i in range(40)
+        ] + [Service(name="Oil Change", default_labor_minutes=30, base_price_cents=4999)])
+        db.session.commit()
+
+        response = self.client.post('/auth/register', data=json.dumps({
+            "first_name": "Test", "last_name": "User", "email": "test@example.com",
+            "password": "TestPass123!", "phone": "555-000-0000"
+        }), content_type='application/json')
+        self.token = json.loads(response.data)['access_token']
+
+    def tearDown(self):
+        """Clean up test database"""
+        compressor.min_size = self.app.config['COMPRESSION_MIN_SIZE']
+        db.session.remove()
+        db.drop_all()
+
+    def _get(self, url, accept_encoding=None, **headers):
+        headers['Authorization'] = f'Bearer {self.token}'
+        if accept_encoding is not None:
+            headers['Accept-Encoding'] = accept_encoding
+        return self.client.get(url, headers=headers)
+
+    def test_gzip_negotiated(self):
+        """Test a large list is gzipped when the client accepts gzip, and decodes to the same document"""
+        plain = self._get('/inventory')
+        compressed = self._get('/inventory', 'gzip, deflate')
+
+        self.assertIsNone(plain.headers.get('Content-Encoding'))
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed.headers['Vary'])
+        self.assertEqual(int(compressed.headers['Content-Length']), len(compressed.data))
+        self.assertLess(len(compressed.data), len(plain.data) / 4)
+        self.assertEqual(gzip.decompress(compressed.data), plain.data)
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_preferred_unless_client_prefers_gzip(self):
+        """Test brotli wins ties, and q-values decide otherwise"""
+        plain = self._get('/inventory')
+
+        response = self._get('/inventory', 'gzip, br')
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.data), plain.data)
+
+        self.assertEqual(self._get('/inventory', 'br;q=0.5, gzip').headers['Content-Encoding'], 'gzip')
+
+    def test_not_compressed(self):
+        """Test small bodies, refused encodings and unknown encodings are sent as is"""
+        for accept_encoding in ('identity', 'gzip;q=0, br;q=0', 'compress'):
+            with self.subTest(accept_encoding=accept_encoding):
+                self.assertNotIn('Content-Encoding', self._get('/inventory', accept_encoding).headers)
+
+        small = self._get('/inventory?fields=part_id&limit=1', 'gzip')
+        self.assertNotIn('Content-Encoding', small.headers)
+        self.assertIn('Accept-Encoding', small.headers['Vary'])
+
+    def test_streamed_response_compressed(self):
+        """Test streamed responses are compressed chunk by chunk without a Content-Length"""
+        response = self.client.get('/test-stream', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response.headers)
+        lines = zlib.decompress(response.data, 16 + zlib.MAX_WBITS).decode().splitlines()
+        self.assertEqual(len(lines), 200)
+        self.assertEqual(json.loads(lines[-1])['row'], 199)
+
+    def test_cached_payload_compressed_once(self):
+        """Test responses with an ETag reuse their compressed bytes, and revalidation still gives 304"""
+        compressor.min_size = 0
+        first = self.client.get('/catalog', headers={'Accept-Encoding': 'gzip'})
+        second = self.client.get('/catalog', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual((compressor.misses, compressor.hits), (1, 1))
+        self.assertTrue(first.headers['ETag'].startswith('W/'))
+
+        revalidated = self.client.get('/catalog', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']
+        })
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_cached_view_compressed_once(self):
+        """Test the Flask-Caching cached mechanic list is compressed once per cache fill"""
+        compressor.min_size = 0
+        first = self._get('/mechanics', 'gzip')
+        second = self._get('/mechanics', 'gzip')
+
+        self.assertEqual(first.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(compressor.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
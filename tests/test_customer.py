@@ -1,8 +1,9 @@
 import unittest
 import json
 from application import create_app
-from application.extensions import db
-from application.models import Customer, Vehicle
+from application.extensions import db, cache
+from sqlalchemy import event
+from application.models import Customer, Vehicle, Service, Part, ServiceTicket, TicketLineItem, TicketPart
 
 
 class TestCustomerRoutes(unittest.TestCase):
@@ -69,6 +70,73 @@ class TestCustomerRoutes(unittest.TestCase):
         self.assertEqual(json_data['pagination']['page'], 1)
         self.assertEqual(json_data['pagination']['per_page'], 5)
     
+    def test_get_customers_cursor_mode(self):
+        """Test keyset pagination over customers with limit and cursor"""
+        for i in range(2):
+            self.client.post(
+                '/auth/register',
+                data=json.dumps({
+                    "first_name": "Cursor",
+                    "last_name": f"User{i}",
+                    "email": f"cursor{i}@example.com",
+                    "password": "TestPass123!",
+                    "phone": "555-000-0000"
+                }),
+                content_type='application/json'
+            )
+        
+        response = self.client.get('/customers?limit=2', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        first_page = json.loads(response.data)
+        self.assertEqual(len(first_page['customers']), 2)
+        self.assertTrue(first_page['pagination']['has_next'])
+        self.assertNotIn('total_customers', first_page['pagination'])
+        
+        cursor = first_page['pagination']['next_cursor']
+        response = self.client.get(f'/customers?limit=2&cursor={cursor}', headers=self.headers)
+        second_page = json.loads(response.data)
+        self.assertEqual(len(second_page['customers']), 1)
+        self.assertFalse(second_page['pagination']['has_next'])
+        self.assertGreater(second_page['customers'][0]['customer_id'], cursor)
+    
+    def test_get_customers_cached_total(self):
+        """Test total_customers is served from the counter and follows register/delete"""
+        cache.clear()
+        response = self.client.get('/customers?limit=5&include_total=true', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['pagination']['total_customers'], 1)
+        
+        register_response = self.client.post(
+            '/auth/register',
+            data=json.dumps({
+                "first_name": "Count",
+                "last_name": "Me",
+                "email": "count@example.com",
+                "password": "TestPass123!",
+                "phone": "555-000-0000"
+            }),
+            content_type='application/json'
+        )
+        other = json.loads(register_response.data)
+        response = self.client.get('/customers', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['pagination']['total_customers'], 2)
+        
+        self.client.delete(
+            f"/customers/{other['customer']['customer_id']}",
+            headers={'Authorization': f"Bearer {other['access_token']}"}
+        )
+        response = self.client.get('/customers', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['pagination']['total_customers'], 1)
+    
+    def test_get_customers_without_total(self):
+        """Test page mode can skip the total"""
+        response = self.client.get('/customers?include_total=false', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertNotIn('total_customers', json_data['pagination'])
+        self.assertFalse(json_data['pagination']['has_next'])
+    
     def test_get_customers_invalid_page(self):
         """Test getting customers with invalid page (negative test)"""
         response = self.client.get('/customers?page=0', headers=self.headers)
@@ -81,6 +149,88 @@ class TestCustomerRoutes(unittest.TestCase):
         
         self.assertEqual(response.status_code, 401)
     
+    # ===== SEARCH CUSTOMERS TESTS =====
+    
+    def _register_customer(self, first_name, last_name, email, phone):
+        """Register an extra customer directly so search has something to rank"""
+        customer = Customer(first_name=first_name, last_name=last_name, email=email, phone=phone)
+        customer.set_password('Password123!')
+        db.session.add(customer)
+        db.session.commit()
+        return customer.customer_id
+    
+    def test_search_customers_by_phone(self):
+        """Test phone search ignores punctuation and ranks exact matches first"""
+        exact_id = self._register_customer("Pat", "Exact", "pat@example.com", "(555) 123-4567")
+        prefix_id = self._register_customer("Sam", "Prefix", "sam@example.com", "555.123.45678")
+        
+        response = self.client.get('/customers/search?q=555-123-4567', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data['match_type'], 'phone')
+        self.assertEqual([c['customer_id'] for c in json_data['customers']], [exact_id, prefix_id])
+    
+    def test_search_customers_by_email_case_insensitive(self):
+        """Test email search matches regardless of case"""
+        customer_id = self._register_customer("Alice", "Johnson", "Alice.Johnson@Example.com", "555-222-3333")
+        
+        response = self.client.get('/customers/search?q=alice.johnson@', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data['match_type'], 'email')
+        self.assertEqual([c['customer_id'] for c in json_data['customers']], [customer_id])
+    
+    def test_search_customers_by_name(self):
+        """Test name search by last name prefix and by 'Last, First'"""
+        self._register_customer("Al", "Smith", "al@example.com", "555-444-0001")
+        self._register_customer("Bo", "Smithers", "bo@example.com", "555-444-0002")
+        
+        response = self.client.get('/customers/search?q=Smith', headers=self.headers)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data['match_type'], 'name')
+        self.assertEqual([c['last_name'] for c in json_data['customers']], ['Smith', 'Smithers'])
+        
+        response = self.client.get('/customers/search?q=Smith, B', headers=self.headers)
+        json_data = json.loads(response.data)
+        self.assertEqual([c['first_name'] for c in json_data['customers']], ['Bo'])
+    
+    def test_search_customers_pagination(self):
+        """Test search results are paginated"""
+        for i in range(3):
+            self._register_customer("Page", "Searchable", f"page{i}@example.com", f"555-777-000{i}")
+        
+        response = self.client.get('/customers/search?q=Searchable&per_page=2', headers=self.headers)
+        json_data = json.loads(response.data)
+        self.assertEqual(len(json_data['customers']), 2)
+        self.assertTrue(json_data['pagination']['has_next'])
+        
+        response = self.client.get('/customers/search?q=Searchable&per_page=2&page=2', headers=self.headers)
+        json_data = json.loads(response.data)
+        self.assertEqual(len(json_data['customers']), 1)
+        self.assertFalse(json_data['pagination']['has_next'])
+    
+    def test_search_customers_hides_search_columns(self):
+        """Test derived search columns are not exposed in responses"""
+        response = self.client.get('/customers/search?q=User', headers=self.headers)
+        
+        json_data = json.loads(response.data)
+        self.assertNotIn('phone_normalized', json_data['customers'][0])
+        self.assertNotIn('email_lower', json_data['customers'][0])
+    
+    def test_search_customers_query_too_short(self):
+        """Test search with a one-character query (negative test)"""
+        response = self.client.get('/customers/search?q=a', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 400)
+    
+    def test_search_customers_no_auth(self):
+        """Test search without authentication (negative test)"""
+        response = self.client.get('/customers/search?q=Smith')
+        
+        self.assertEqual(response.status_code, 401)
+    
     # ===== GET ONE CUSTOMER TESTS =====
     
     def test_get_customer_success(self):
@@ -240,6 +390,113 @@ class TestCustomerRoutes(unittest.TestCase):
         
         self.assertEqual(response.status_code, 401)
     
+    # ===== CUSTOMER SUMMARY TESTS =====
+    
+    def _add_summary_vehicle(self):
+        """Create a vehicle for the test customer and the service used on its tickets"""
+        vehicle = Vehicle(customer_id=self.customer_id, vin="1HGCM82633A123456", make="Honda", model="Accord", year=2020, color="Blue")
+        service = Service(name="Diagnosis", default_labor_minutes=60, base_price_cents=5000)
+        db.session.add_all([vehicle, service])
+        db.session.commit()
+        self.service_id = service.service_id
+        return vehicle
+    
+    def _add_ticket(self, vehicle_id, status, labor_cents, part_id=None):
+        """Create a ticket with one line item and optionally one part at 50% markup"""
+        ticket = ServiceTicket(vehicle_id=vehicle_id, customer_id=self.customer_id, status=status,
+                               problem_description="Check engine light", odometer_miles=30000, priority=2)
+        db.session.add(ticket)
+        db.session.flush()
+        db.session.add(TicketLineItem(ticket_id=ticket.ticket_id, service_id=self.service_id, line_type="labor", description="Diagnosis",
+                                      quantity=1, unit_price_cents=labor_cents))
+        if part_id:
+            db.session.add(TicketPart(ticket_id=ticket.ticket_id, part_id=part_id, quantity_used=2,
+                                      unit_cost_cents=1000, markup_percentage=50.0))
+        db.session.commit()
+        return ticket.ticket_id
+    
+    def test_get_customer_summary_success(self):
+        """Test summary aggregates vehicles, open tickets, spend and last visit"""
+        vehicle = self._add_summary_vehicle()
+        part = Part(part_number="SPK-001", name="Spark Plug", category="Ignition", current_cost_cents=1000)
+        db.session.add(part)
+        db.session.commit()
+        self._add_ticket(vehicle.vehicle_id, "completed", 5000, part_id=part.part_id)
+        open_ticket = self._add_ticket(vehicle.vehicle_id, "open", 2000)
+        self._add_ticket(vehicle.vehicle_id, "cancelled", 9900)
+        
+        response = self.client.get(f'/customers/{self.customer_id}/summary', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data['customer']['customer_id'], self.customer_id)
+        self.assertEqual(len(json_data['vehicles']), 1)
+        self.assertEqual([ticket['ticket_id'] for ticket in json_data['open_tickets']], [open_ticket])
+        stats = json_data['stats']
+        self.assertEqual(stats['total_tickets'], 3)
+        self.assertEqual(stats['tickets_by_status']['cancelled'], 1)
+        self.assertEqual(stats['labor_spend_cents'], 7000)
+        self.assertEqual(stats['parts_spend_cents'], 3000)
+        self.assertEqual(stats['lifetime_spend_cents'], 10000)
+        self.assertIsNotNone(stats['last_visit'])
+    
+    def test_get_customer_summary_query_count_is_bounded(self):
+        """Test the number of queries does not grow with the customer's history"""
+        vehicle = self._add_summary_vehicle()
+        
+        def count_queries():
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                cache.clear()
+                db.session.expire_all()
+                self.client.get(f'/customers/{self.customer_id}/summary', headers=self.headers)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+            return len(statements)
+        
+        self._add_ticket(vehicle.vehicle_id, "completed", 1000)
+        few = count_queries()
+        for _ in range(5):
+            self._add_ticket(vehicle.vehicle_id, "open", 1000)
+        many = count_queries()
+        
+        self.assertEqual(few, many)
+    
+    def test_get_customer_summary_invalidated_on_ticket_change(self):
+        """Test the cached summary is refreshed when the customer's tickets change"""
+        vehicle = self._add_summary_vehicle()
+        ticket_id = self._add_ticket(vehicle.vehicle_id, "open", 1000)
+        
+        response = self.client.get(f'/customers/{self.customer_id}/summary', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['stats']['lifetime_spend_cents'], 1000)
+        
+        # Changing a line item on one of the customer's tickets refreshes the spend
+        line_item = db.session.execute(db.select(TicketLineItem).where(TicketLineItem.ticket_id == ticket_id)).scalar_one()
+        line_item.unit_price_cents = 4000
+        db.session.commit()
+        response = self.client.get(f'/customers/{self.customer_id}/summary', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['stats']['lifetime_spend_cents'], 4000)
+        
+        # Closing the ticket removes it from the open list
+        db.session.get(ServiceTicket, ticket_id).status = "completed"
+        db.session.commit()
+        response = self.client.get(f'/customers/{self.customer_id}/summary', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['open_tickets'], [])
+    
+    def test_get_customer_summary_not_found(self):
+        """Test summary for a non-existent customer (negative test)"""
+        response = self.client.get('/customers/99999/summary', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 404)
+    
+    def test_get_customer_summary_no_auth(self):
+        """Test summary without authentication (negative test)"""
+        response = self.client.get(f'/customers/{self.customer_id}/summary')
+        
+        self.assertEqual(response.status_code, 401)
+    
     # ===== CREATE VEHICLE TESTS =====
     
     def test_create_vehicle_success(self):
@@ -348,6 +605,107 @@ class TestCustomerRoutes(unittest.TestCase):
         
         self.assertEqual(response.status_code, 401)
     
+    # ===== FLEET ONBOARDING TESTS =====
+    
+    def _fleet_payload(self, vehicles):
+        return {
+            "customer": {
+                "first_name": "Acme",
+                "last_name": "Logistics",
+                "email": "fleet@acme.com",
+                "password": "FleetPass123!",
+                "phone": "555-010-0100"
+            },
+            "vehicles": vehicles
+        }
+    
+    def _fleet_vehicle(self, i):
+        return {"vin": f"FLEETVIN{i:09d}", "make": "Ford", "model": "Transit", "year": 2022, "color": "White"}
+    
+    def test_onboard_fleet_success(self):
+        """Test creating a customer with many vehicles in one request"""
+        vehicles = [self._fleet_vehicle(i) for i in range(25)]
+        
+        response = self.client.post(
+            '/customers/fleet',
+            data=json.dumps(self._fleet_payload(vehicles)),
+            content_type='application/json',
+            headers=self.headers
+        )
+        
+        self.assertEqual(response.status_code, 201)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data['vehicles_created'], 25)
+        self.assertEqual(json_data['errors'], [])
+        new_customer_id = json_data['customer']['customer_id']
+        self.assertTrue(all(v['customer_id'] == new_customer_id for v in json_data['vehicles']))
+    
+    def test_onboard_fleet_reports_row_errors(self):
+        """Test invalid, repeated and already registered VINs are reported per row"""
+        existing = Vehicle(customer_id=self.customer_id, vin="FLEETVIN000000002", make="Ford",
+                           model="Transit", year=2021, color="White")
+        db.session.add(existing)
+        db.session.commit()
+        
+        vehicles = [self._fleet_vehicle(i) for i in range(4)]
+        vehicles[1] = {"vin": "BADROW", "make": "Ford"}      # Missing fields
+        vehicles[3] = self._fleet_vehicle(0)                  # Repeats row 0
+        
+        response = self.client.post(
+            '/customers/fleet',
+            data=json.dumps(self._fleet_payload(vehicles)),
+            content_type='application/json',
+            headers=self.headers
+        )
+        
+        self.assertEqual(response.status_code, 201)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data['vehicles_created'], 1)
+        self.assertEqual([error['index'] for error in json_data['errors']], [1, 2, 3])
+        self.assertIn('model', json_data['errors'][0]['errors'])
+        self.assertEqual(json_data['errors'][1]['vin'], "FLEETVIN000000002")
+    
+    def test_onboard_fleet_atomic_rejects_batch(self):
+        """Test atomic mode creates nothing when any vehicle is invalid (negative test)"""
+        vehicles = [self._fleet_vehicle(0), {"vin": "BADROW"}]
+        
+        response = self.client.post(
+            '/customers/fleet?atomic=true',
+            data=json.dumps(self._fleet_payload(vehicles)),
+            content_type='application/json',
+            headers=self.headers
+        )
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(db.session.execute(
+            db.select(Customer).where(Customer.email == "fleet@acme.com")
+        ).scalar_one_or_none())
+    
+    def test_onboard_fleet_invalid_customer(self):
+        """Test onboarding with an invalid customer (negative test)"""
+        payload = self._fleet_payload([self._fleet_vehicle(0)])
+        del payload['customer']['email']
+        
+        response = self.client.post(
+            '/customers/fleet',
+            data=json.dumps(payload),
+            content_type='application/json',
+            headers=self.headers
+        )
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', json.loads(response.data)['customer_errors'])
+    
+    def test_onboard_fleet_no_auth(self):
+        """Test onboarding without authentication (negative test)"""
+        response = self.client.post(
+            '/customers/fleet',
+            data=json.dumps(self._fleet_payload([self._fleet_vehicle(0)])),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 401)
+    
     # ===== GET CUSTOMER VEHICLES TESTS =====
     
     def test_get_customer_vehicles_success(self):
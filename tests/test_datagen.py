@@ -0,0 +1,123 @@
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import func, select
+from application import create_app
+from application.extensions import db
+from application.models import (Customer, Vehicle, Mechanic, MechanicSpecialization, ServicePackageItem,
+                                ServiceTicket, TicketLineItem, TicketMechanic, TicketPart)
+from application.datagen import (DEFAULT_PASSWORD, DEMO_CUSTOMER, DatabaseWriter, MySQLDumpWriter, generate,
+                                 scale_counts)
+from application.passwords import password_hasher
+from application.vin_decoder import is_check_digit_valid
+
+COUNTS = {'customers': 30, 'vehicles': 45, 'tickets': 200, 'parts': 40, 'mechanics': 6}
+UNTIL = datetime(2026, 1, 1)
+
+
+class TestDataGenerator(unittest.TestCase):
+    """Test cases for the synthetic data generator and flask data generate"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up an empty test database"""
+        db.create_all()
+
+    def tearDown(self):
+        """Clean up test database"""
+        db.session.remove()
+        db.drop_all()
+
+    def _dump(self, seed):
+        out = io.StringIO()
+        generate(MySQLDumpWriter(out, batch_size=50), COUNTS, seed=seed, until=UNTIL, password_hash='x')
+        return out.getvalue()
+
+    def test_generate_fills_every_model_consistently(self):
+        """Test the generated rows have the requested counts, valid references and decodable VINs"""
+        writer = DatabaseWriter(db.engine, batch_size=50)
+        written = generate(writer, COUNTS, seed=7, until=UNTIL, password_hash=password_hasher.hash(DEFAULT_PASSWORD))
+        writer.close()
+
+        count = lambda model: db.session.scalar(select(func.count()).select_from(model))
+        self.assertEqual(count(Customer), 30)
+        self.assertEqual(count(Vehicle), 45)
+        self.assertEqual(count(Mechanic), 6)
+        self.assertEqual(count(ServiceTicket), 200)
+        for model in (TicketLineItem, TicketMechanic, TicketPart, MechanicSpecialization, ServicePackageItem):
+            self.assertGreater(count(model), 0)
+            self.assertEqual(written[model.__tablename__], count(model))
+        # Each ticket belongs to the vehicle's owner
+        mismatched = select(func.count()).select_from(ServiceTicket).join(Vehicle).where(
+            ServiceTicket.customer_id != Vehicle.customer_id)
+        self.assertEqual(db.session.scalar(mismatched), 0)
+        for vehicle in db.session.scalars(select(Vehicle)):
+            self.assertTrue(is_check_digit_valid(vehicle.vin))
+            self.assertEqual((vehicle.vin_manufacturer, vehicle.vin_model_year), (vehicle.make, vehicle.year))
+
+        response = self.client.post('/auth/login', json={'email': DEMO_CUSTOMER[2], 'password': DEFAULT_PASSWORD})
+        self.assertEqual(response.status_code, 200)
+
+    def test_same_seed_same_rows(self):
+        """Test generation is deterministic for a seed and differs between seeds"""
+        self.assertEqual(self._dump(3), self._dump(3))
+        self.assertNotEqual(self._dump(3), self._dump(4))
+
+    def test_mysql_dump_literals(self):
+        """Test values are written as escaped MySQL literals"""
+        writer = MySQLDumpWriter(io.StringIO())
+
+        self.assertEqual(writer.literal("O'Brien \\ Sons"), "'O\\'Brien \\\\ Sons'")
+        self.assertEqual(writer.literal(None), 'NULL')
+        self.assertEqual(writer.literal(True), '1')
+        self.assertEqual(writer.literal(Decimal('30.00')), '30.00')
+        self.assertEqual(writer.literal(datetime(2025, 10, 1, 9, 30)), "'2025-10-01 09:30:00'")
+
+    def test_cli_generates_into_empty_database_only(self):
+        """Test flask data generate fills the app database and refuses one that has customers (negative test)"""
+        runner = self.app.test_cli_runner()
+        args = ['data', 'generate', '--scale', 'sample', '--tickets', '20', '--until', '2026-01-01']
+
+        result = runner.invoke(args=args)
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(db.session.scalar(select(func.count()).select_from(ServiceTicket)), 20)
+
+        result = runner.invoke(args=args)
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn('already has customers', result.output)
+
+    def test_cli_writes_sqlite_file(self):
+        """Test --sqlite writes a new database file with the schema and the rows"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'shop.db')
+            result = self.app.test_cli_runner().invoke(
+                args=['data', 'generate', '--scale', 'sample', '--customers', '12', '--sqlite', path])
+            self.assertEqual(result.exit_code, 0, result.output)
+
+            connection = sqlite3.connect(path)
+            try:
+                self.assertEqual(connection.execute('SELECT COUNT(*) FROM customers').fetchone()[0], 12)
+                self.assertEqual(connection.execute('SELECT COUNT(*) FROM service_tickets').fetchone()[0],
+                                 scale_counts('sample')['tickets'])
+            finally:
+                connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
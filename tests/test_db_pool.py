@@ -0,0 +1,128 @@
+import unittest
+import json
+import os
+import tempfile
+from flask import Flask
+from sqlalchemy import create_engine, exc, text
+from application import create_app
+from application.extensions import db
+from application.db_pool import TimedQueuePool, PoolMonitor, init_engine_options
+
+
+class TestDatabasePool(unittest.TestCase):
+    """Test cases for pool configuration and the pool statistics endpoint"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        cls.monitor = cls.app.extensions['db_pool_monitor']
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up test database and zero the pool counters"""
+        db.create_all()
+        self.monitor.reset()
+
+    def tearDown(self):
+        """Clean up test database"""
+        self.monitor.hold_warning = self.app.config['DB_POOL_HOLD_WARNING']
+        db.session.remove()
+        db.drop_all()
+
+    def _stats(self, **kwargs):
+        response = self.client.get('/internal/db-pool', **kwargs)
+        return response, json.loads(response.data)
+
+    def test_engine_options_from_config(self):
+        """Test pool size, overflow and timeout come from the DB_POOL_* settings"""
+        pool = db.engine.pool
+        if not isinstance(pool, TimedQueuePool):
+            self.skipTest("in-memory SQLite runs on a single static connection")
+
+        self.assertEqual(pool.size(), self.app.config['DB_POOL_SIZE'])
+        self.assertEqual(pool.timeout(), self.app.config['DB_POOL_TIMEOUT'])
+        self.assertFalse(self.app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_pre_ping'])
+
+    def test_explicit_engine_options_win(self):
+        """Test SQLALCHEMY_ENGINE_OPTIONS keys override DB_POOL_*, and in-memory SQLite gets no pool sizing"""
+        app = Flask(__name__)
+        app.config.update(SQLALCHEMY_DATABASE_URI='mysql+mysqlconnector://user@db/shop', DB_POOL_SIZE=8,
+                          DB_POOL_PRE_PING=True, SQLALCHEMY_ENGINE_OPTIONS={'pool_size': 3})
+        options = init_engine_options(app)
+        self.assertEqual((options['pool_size'], options['max_overflow'], options['pool_pre_ping']), (3, 10, True))
+        self.assertIs(options['poolclass'], TimedQueuePool)
+
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        self.assertEqual(init_engine_options(app), {'pool_pre_ping': False})
+
+    def test_stats_after_requests(self):
+        """Test checkouts and wait times are recorded for requests using the database"""
+        self.client.post('/auth/register', data=json.dumps({
+            "first_name": "Test", "last_name": "User", "email": "test@example.com",
+            "password": "TestPass123!", "phone": "555-000-0000"
+        }), content_type='application/json')
+        db.session.remove()  # The test's app context outlives the request; a real request returns it on teardown
+
+        response, stats = self._stats()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(stats['checkouts'], 1)
+        self.assertEqual(stats['checked_out'], 0)
+        if stats['pool_class'] == 'TimedQueuePool':
+            buckets = stats['wait_time']['buckets']
+            self.assertEqual(buckets[-1], {'le_ms': '+Inf', 'count': stats['wait_time']['count']})
+            self.assertGreaterEqual(stats['wait_time']['count'], 1)
+            self.assertEqual(stats['overflow'], 0)
+
+    def test_connections_held_too_long(self):
+        """Test long checkouts are counted when returned and listed while still held"""
+        self.monitor.hold_warning = 0
+        connection = db.engine.connect()
+        try:
+            _, stats = self._stats()
+            self.assertEqual(len(stats['held_too_long']['current']), 1)
+            self.assertIsNone(stats['held_too_long']['current'][0]['endpoint'])
+        finally:
+            connection.close()
+
+        _, stats = self._stats(query_string={'reset': 'true'})
+        self.assertGreaterEqual(stats['held_too_long']['total'], 1)
+        self.assertEqual(self.monitor.stats()['held_too_long']['total'], 0)
+
+    def test_pool_timeouts_counted(self):
+        """Test a checkout that times out on an exhausted pool is recorded"""
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'pool.db')}", poolclass=TimedQueuePool,
+                                   pool_size=1, max_overflow=0, pool_timeout=0.05)
+            monitor = PoolMonitor(engine)
+            held = engine.connect()
+            held.execute(text('SELECT 1'))
+            with self.assertRaises(exc.TimeoutError):
+                engine.connect()
+            stats = monitor.stats()
+            held.close()
+            engine.dispose()
+
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['checked_out'], 1)
+        self.assertEqual(stats['wait_time']['count'], 2)
+        self.assertGreaterEqual(stats['wait_time']['max_ms'], 50)
+
+    def test_internal_endpoint_hidden_from_other_addresses(self):
+        """Test callers outside INTERNAL_ALLOWED_IPS get a 404 (negative test)"""
+        response, _ = self._stats(environ_base={'REMOTE_ADDR': '203.0.113.7'})
+
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
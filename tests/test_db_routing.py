@@ -0,0 +1,154 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from sqlalchemy import select, update
+from application import create_app
+from application.extensions import db
+from application.models import Customer, Part
+from application.identity import create_customer_token
+from application.db_routing import primary_reads, STICKY_COOKIE
+from config import config, TestingConfig
+
+
+class TestReplicaRouting(unittest.TestCase):
+    """Test cases for read-replica routing, using two SQLite files as primary and replica"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up an app with a primary and a replica database file"""
+        cls.directory = tempfile.mkdtemp()
+        cls.primary_path = os.path.join(cls.directory, 'primary.db')
+        cls.replica_path = os.path.join(cls.directory, 'replica.db')
+        config['testing_replica'] = type('ReplicaTestingConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{cls.primary_path}',
+            'REPLICA_DATABASE_URL': f'sqlite:///{cls.replica_path}',
+            'REPLICA_HEALTH_CHECK_INTERVAL': 0  # Probe on every GET
+        })
+        cls.app = create_app('testing_replica')
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        cls.router = cls.app.extensions['db_router']
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context and the database files"""
+        cls.app_context.pop()
+        del config['testing_replica']
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        """Set up a customer on the primary and replicate it; clients don't keep cookies unless a test asks"""
+        db.drop_all()
+        db.create_all()
+        self.router._sticky.clear()
+        customer = Customer(first_name="Test", last_name="User", email="test@example.com",
+                            phone="555-000-0000", password_hash="x")
+        db.session.add(customer)
+        db.session.commit()
+        self.customer_id = customer.customer_id
+        self.headers = {'Authorization': f'Bearer {create_customer_token(customer)}'}
+        self.client = self.app.test_client(use_cookies=False)
+        self._replicate()
+
+    def tearDown(self):
+        """Clean up both databases"""
+        db.session.remove()
+        db.drop_all()
+
+    def _replicate(self):
+        """Copy the primary onto the replica (what replication does, minus the lag)"""
+        db.session.remove()
+        db.engines['replica'].dispose()
+        shutil.copyfile(self.primary_path, self.replica_path)
+
+    def _add_part_on_primary(self, part_number="BRK-001"):
+        db.session.add(Part(part_number=part_number, name="Brake Pad Set", category="Brakes", current_cost_cents=4500,
+                            quantity_in_stock=25, reorder_level=5))
+        db.session.commit()
+        db.session.remove()
+
+    def _part_numbers(self, client=None, headers=None):
+        response = (client or self.client).get('/inventory', headers=headers or self.headers)
+        db.session.remove()  # The test's app context outlives the request; a real request ends its session
+        return [part['part_number'] for part in json.loads(response.data)]
+
+    def test_get_reads_from_replica(self):
+        """Test GET requests don't see rows that haven't reached the replica yet"""
+        self._add_part_on_primary()
+
+        self.assertEqual(self._part_numbers(), [])
+        self._replicate()
+        self.assertEqual(self._part_numbers(), ["BRK-001"])
+
+    def test_client_reads_its_own_writes(self):
+        """Test a client that wrote reads from the primary; other clients still read the replica"""
+        response = self.client.post('/inventory', data=json.dumps({
+            "part_number": "FLT-001", "name": "Oil Filter", "category": "Filters", "current_cost_cents": 899, "quantity_in_stock": 40
+        }), content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        db.session.remove()
+
+        self.assertEqual(self._part_numbers(), ["FLT-001"])
+        other_client = {'Authorization': f'Bearer {create_customer_token(db.session.get(Customer, self.customer_id))}'}
+        self.assertEqual(self._part_numbers(headers=other_client), [])
+
+        self.router.sticky_seconds, sticky_seconds = 0, self.router.sticky_seconds
+        try:
+            self.router._sticky.clear()
+            self.assertEqual(self._part_numbers(), [])
+        finally:
+            self.router.sticky_seconds = sticky_seconds
+
+    def test_sticky_cookie_across_workers(self):
+        """Test the cookie set on a write pins the client even where the write wasn't seen (another worker)"""
+        client = self.app.test_client()
+        response = client.post('/inventory', data=json.dumps({
+            "part_number": "FLT-002", "name": "Air Filter", "category": "Filters", "current_cost_cents": 1299, "quantity_in_stock": 12
+        }), content_type='application/json', headers=self.headers)
+        self.assertIn(STICKY_COOKIE, response.headers['Set-Cookie'])
+        db.session.remove()
+        self.router._sticky.clear()
+
+        self.assertEqual(self._part_numbers(client=client), ["FLT-002"])
+
+    def test_falls_back_to_primary_when_replica_down(self):
+        """Test reads go to the primary while the replica can't be reached, and back once it recovers"""
+        self._add_part_on_primary()
+        db.engines['replica'].dispose()
+        os.remove(self.replica_path)
+        os.mkdir(self.replica_path)  # SQLite can't open a directory
+        try:
+            self.assertEqual(self._part_numbers(), ["BRK-001"])
+            self.assertFalse(self.router.healthy)
+        finally:
+            os.rmdir(self.replica_path)
+            shutil.copyfile(self.primary_path, self.replica_path)
+
+        self._add_part_on_primary("BRK-002")
+        self.assertEqual(self._part_numbers(), ["BRK-001"])
+        self.assertTrue(self.router.healthy)
+
+    def test_session_routing(self):
+        """Test reads use the replica until the request writes, and primary_reads() overrides it"""
+        primary, replica = db.engines[None], db.engines['replica']
+        with self.app.test_request_context('/inventory', method='GET'):
+            self.router.before_request()
+            session = db.session
+            try:
+                self.assertIs(session.get_bind(clause=select(Part)), replica)
+                with primary_reads():
+                    self.assertIs(session.get_bind(clause=select(Part)), primary)
+                self.assertIs(session.get_bind(clause=update(Part).values(name='x')), primary)
+                self.assertIs(session.get_bind(clause=select(Part)), primary)
+            finally:
+                session.info['use_replica'] = False
+
+        with self.app.test_request_context('/inventory', method='POST'):
+            self.router.before_request()
+            self.assertIs(db.session.get_bind(clause=select(Part)), primary)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import unittest
+import json
+from application import create_app
+from application.extensions import db, cache
+from application.models import (
+    Customer, Vehicle, Mechanic, Service, Part, ServiceTicket,
+    TicketLineItem, TicketMechanic, TicketPart, DeletionJob
+)
+from application.deletion import run_deletion_job, JOB_COMPLETED, JOB_FAILED, JOB_PENDING
+
+
+class TestDeletionJobs(unittest.TestCase):
+    """Test cases for chunked customer and service ticket deletion"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up test database, auth token and a customer with vehicles and tickets"""
+        # Start from empty tables even if an earlier test module failed before its tearDown
+        db.drop_all()
+        db.create_all()
+        cache.clear()
+
+        register_data = {
+            "first_name": "Test",
+            "last_name": "User",
+            "email": "test@example.com",
+            "password": "TestPass123!",
+            "phone": "555-000-0000"
+        }
+        response = self.client.post(
+            '/auth/register',
+            data=json.dumps(register_data),
+            content_type='application/json'
+        )
+        response_data = json.loads(response.data)
+        self.token = response_data['access_token']
+        self.customer_id = response_data['customer']['customer_id']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+        mechanic = Mechanic(full_name="Mike Mechanic", email="mike@mechanicshop.com", phone="555-111-2222", salary=50000)
+        service = Service(name="Brake Job", default_labor_minutes=90, base_price_cents=15000)
+        part = Part(part_number="BRK-001", name="Brake Pad", category="Brakes", current_cost_cents=2500, quantity_in_stock=10)
+        db.session.add_all([mechanic, service, part])
+        db.session.commit()
+        self.mechanic_id = mechanic.mechanic_id
+        self.service_id = service.service_id
+        self.part_id = part.part_id
+
+        self.vehicle_ids = []
+        for i in range(2):
+            vehicle = Vehicle(customer_id=self.customer_id, vin=f"1HGCM82633A00000{i}", make="Honda",
+                              model="Accord", year=2020, color="Blue")
+            db.session.add(vehicle)
+            db.session.commit()
+            self.vehicle_ids.append(vehicle.vehicle_id)
+
+        self.completed_ticket = self._add_ticket(self.vehicle_ids[0], "completed")
+        self.open_ticket = self._add_ticket(self.vehicle_ids[1], "open")
+
+    def tearDown(self):
+        """Clean up test database after each test"""
+        db.session.remove()
+        db.drop_all()
+
+    def _add_ticket(self, vehicle_id, status):
+        """Create a ticket with a line item, a mechanic and two brake pads"""
+        ticket = ServiceTicket(vehicle_id=vehicle_id, customer_id=self.customer_id, status=status,
+                               problem_description="Squeaky brakes", odometer_miles=40000, priority=2)
+        db.session.add(ticket)
+        db.session.flush()
+        db.session.add_all([
+            TicketLineItem(ticket_id=ticket.ticket_id, service_id=self.service_id, line_type="service",
+                           description="Brake Job", quantity=1, unit_price_cents=15000),
+            TicketMechanic(ticket_id=ticket.ticket_id, mechanic_id=self.mechanic_id, role="Technician", minutes_worked=90),
+            TicketPart(ticket_id=ticket.ticket_id, part_id=self.part_id, quantity_used=2, unit_cost_cents=2500)
+        ])
+        db.session.commit()
+        return ticket.ticket_id
+
+    def _count(self, model):
+        return db.session.execute(db.select(db.func.count()).select_from(model)).scalar()
+
+    # ===== CUSTOMER DELETION TESTS =====
+
+    def test_delete_customer_removes_dependent_rows(self):
+        """Test deleting a customer removes their vehicles, tickets and ticket child rows"""
+        response = self.client.delete(f'/customers/{self.customer_id}', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        job = json.loads(response.data)['job']
+        self.assertEqual(job['status'], JOB_COMPLETED)
+        self.assertEqual(job['progress'], {
+            'ticket_parts': 2, 'ticket_mechanics': 2, 'ticket_line_items': 2,
+            'service_tickets': 2, 'vehicles': 2, 'customers': 1
+        })
+        for model in (Customer, Vehicle, ServiceTicket, TicketLineItem, TicketMechanic, TicketPart):
+            self.assertEqual(self._count(model), 0)
+        # Parts are not restocked unless asked for
+        self.assertEqual(db.session.get(Part, self.part_id).quantity_in_stock, 10)
+
+    def test_delete_customer_restocks_unfinished_tickets(self):
+        """Test restock=true returns parts from open tickets only"""
+        response = self.client.delete(f'/customers/{self.customer_id}?restock=true', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['job']['parts_restocked'], 2)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Part, self.part_id).quantity_in_stock, 12)
+
+    def test_deletion_runs_in_chunks(self):
+        """Test every table is drained across several chunks when the chunk size is small"""
+        for _ in range(3):
+            self._add_ticket(self.vehicle_ids[0], "completed")
+        job = DeletionJob(job_id="chunked", target_type="customer", target_id=self.customer_id,
+                          status=JOB_PENDING, restock_parts=False, progress={}, parts_restocked=0)
+        db.session.add(job)
+        db.session.commit()
+
+        job = run_deletion_job("chunked", chunk_size=2)
+
+        self.assertEqual(job.status, JOB_COMPLETED)
+        self.assertEqual(job.progress['service_tickets'], 5)
+        self.assertEqual(self._count(ServiceTicket), 0)
+        self.assertIsNone(db.session.get(Customer, self.customer_id))
+
+    def test_delete_customer_removes_other_accounts_tickets_on_their_vehicles(self):
+        """Test tickets opened under another account on the customer's vehicles don't block the delete"""
+        other = Customer(first_name="Other", last_name="Owner", email="other@example.com", phone="555-999-0000")
+        other.set_password("OtherPass123!")
+        db.session.add(other)
+        db.session.commit()
+        db.session.execute(db.update(ServiceTicket).where(ServiceTicket.ticket_id == self.completed_ticket)
+                           .values(customer_id=other.customer_id))
+        db.session.commit()
+
+        response = self.client.delete(f'/customers/{self.customer_id}', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(db.session.get(ServiceTicket, self.completed_ticket))
+        self.assertIsNotNone(db.session.get(Customer, other.customer_id))
+
+    def test_delete_customer_invalidates_summary(self):
+        """Test the cached customer summary is dropped after a delete"""
+        self.client.get(f'/customers/{self.customer_id}/summary', headers=self.headers)
+
+        response = self.client.delete(f'/service_tickets/{self.open_ticket}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(f'/customers/{self.customer_id}/summary', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['stats']['total_tickets'], 1)
+
+    # ===== SERVICE TICKET DELETION TESTS =====
+
+    def test_delete_service_ticket_with_restock(self):
+        """Test deleting an open ticket removes its child rows and restocks its parts"""
+        response = self.client.delete(f'/service_tickets/{self.open_ticket}?restock=true', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(db.session.get(ServiceTicket, self.open_ticket))
+        self.assertEqual(self._count(TicketPart), 1)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Part, self.part_id).quantity_in_stock, 12)
+
+    # ===== JOB STATUS TESTS =====
+
+    def test_get_deletion_job(self):
+        """Test polling a deletion job"""
+        response = self.client.delete(f'/service_tickets/{self.open_ticket}', headers=self.headers)
+        job_id = json.loads(response.data)['job']['job_id']
+
+        response = self.client.get(f'/deletion_jobs/{job_id}', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data['target_type'], 'service_ticket')
+        self.assertEqual(json_data['status'], JOB_COMPLETED)
+
+    def test_get_deletion_job_not_found(self):
+        """Test polling an unknown deletion job (negative test)"""
+        response = self.client.get('/deletion_jobs/unknown', headers=self.headers)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_resume_command_finishes_failed_job(self):
+        """Test flask deletion resume re-runs failed jobs"""
+        job = DeletionJob(job_id="failed", target_type="service_ticket", target_id=self.open_ticket,
+                          status=JOB_FAILED, restock_parts=False, progress={}, parts_restocked=0)
+        db.session.add(job)
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['deletion', 'resume'])
+
+        self.assertIn('Resumed 1 deletion jobs', result.output)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(DeletionJob, "failed").status, JOB_COMPLETED)
+        self.assertIsNone(db.session.get(ServiceTicket, self.open_ticket))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -226,6 +226,74 @@ class TestInventoryRoutes(unittest.TestCase):
         self.assertEqual(len(json_data), 1)
         self.assertEqual(json_data[0]['category'], 'Brakes')
     
+    def test_get_parts_keyset_pagination(self):
+        """Test paging through parts with limit and cursor"""
+        for i in range(3):
+            self.client.post(
+                '/inventory',
+                data=json.dumps({
+                    "part_number": f"FLT-00{i}",
+                    "name": f"Filter {i}",
+                    "category": "Filters",
+                    "current_cost_cents": 1000,
+                    "quantity_in_stock": 10,
+                    "reorder_threshold": 2
+                }),
+                content_type='application/json',
+                headers=self.headers
+            )
+        
+        response = self.client.get('/inventory?limit=2', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        first_page = json.loads(response.data)
+        self.assertEqual(len(first_page['parts']), 2)
+        self.assertTrue(first_page['pagination']['has_next'])
+        
+        cursor = first_page['pagination']['next_cursor']
+        response = self.client.get(f'/inventory?limit=2&cursor={cursor}', headers=self.headers)
+        second_page = json.loads(response.data)
+        self.assertEqual(len(second_page['parts']), 1)
+        self.assertFalse(second_page['pagination']['has_next'])
+        self.assertIsNone(second_page['pagination']['next_cursor'])
+        self.assertGreater(second_page['parts'][0]['part_id'], cursor)
+    
+    def test_get_parts_sparse_fields(self):
+        """Test requesting a sparse fieldset"""
+        self.client.post(
+            '/inventory',
+            data=json.dumps({
+                "part_number": "BRK-001",
+                "name": "Brake Pad Set",
+                "description": "Front brake pads",
+                "category": "Brakes",
+                "current_cost_cents": 4500,
+                "quantity_in_stock": 3,
+                "reorder_threshold": 5
+            }),
+            content_type='application/json',
+            headers=self.headers
+        )
+        
+        response = self.client.get('/inventory?fields=name,needs_reorder', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data, [{"name": "Brake Pad Set", "needs_reorder": True}])
+    
+    def test_get_parts_unknown_field(self):
+        """Test requesting a field that does not exist (negative test)"""
+        response = self.client.get('/inventory?fields=name,bogus', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', json.loads(response.data))
+    
+    def test_get_parts_invalid_limit(self):
+        """Test keyset pagination with an out-of-range limit (negative test)"""
+        response = self.client.get('/inventory?limit=0', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 400)
+    
     # ===== GET ONE PART TESTS =====
     
     def test_get_part_success(self):
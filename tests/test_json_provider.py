@@ -0,0 +1,88 @@
+import unittest
+import json
+from datetime import datetime, date, timezone
+from decimal import Decimal
+from application import create_app
+from application.extensions import db
+from application.json_provider import OrjsonProvider, StdlibJSONProvider, init_json_provider, orjson
+
+
+@unittest.skipIf(orjson is None, "orjson is not installed")
+class TestJSONProvider(unittest.TestCase):
+    """Test cases for the orjson provider and its stdlib fallback"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up test database"""
+        db.create_all()
+
+    def tearDown(self):
+        """Clean up test database and restore the configured provider"""
+        db.session.remove()
+        db.drop_all()
+        init_json_provider(self.app)
+
+    def test_orjson_installed_by_default(self):
+        """Test create_app installs the orjson provider"""
+        self.assertIsInstance(self.app.json, OrjsonProvider)
+
+    def test_providers_produce_same_documents(self):
+        """Test both providers encode dates as ISO 8601 and Decimals as strings"""
+        payload = {
+            "opened_at": datetime(2024, 5, 1, 9, 30, 0, 250),
+            "closed_at": datetime(2024, 5, 2, tzinfo=timezone.utc),
+            "due": date(2024, 6, 1),
+            "markup_percentage": Decimal("30.00"),
+            "items": [{"b": 1, "a": None}]
+        }
+        with self.app.test_request_context():
+            fast = OrjsonProvider(self.app).response(payload).get_data()
+            stdlib = StdlibJSONProvider(self.app).response(payload).get_data()
+
+        self.assertEqual(json.loads(fast), json.loads(stdlib))
+        self.assertEqual(json.loads(fast)["opened_at"], "2024-05-01T09:30:00.000250")
+        self.assertEqual(json.loads(fast)["markup_percentage"], "30.00")
+        self.assertTrue(fast.startswith(b'{"closed_at":"2024-05-02T00:00:00+00:00",'))
+
+    def test_fallback_for_unsupported_values(self):
+        """Test values orjson can't encode are handed to the stdlib encoder"""
+        with self.app.test_request_context():
+            body = OrjsonProvider(self.app).response({"big": 2 ** 70}).get_data()
+
+        self.assertEqual(body, b'{"big":1180591620717411303424}\n')
+
+    def test_stdlib_provider_configured(self):
+        """Test JSON_PROVIDER = 'json' selects the stdlib encoder"""
+        self.app.config['JSON_PROVIDER'] = 'json'
+        try:
+            self.assertIsInstance(init_json_provider(self.app), StdlibJSONProvider)
+            self.assertNotIsInstance(self.app.json, OrjsonProvider)
+        finally:
+            self.app.config['JSON_PROVIDER'] = 'orjson'
+
+    def test_request_bodies_decoded(self):
+        """Test JSON request bodies are parsed through the provider"""
+        response = self.client.post(
+            '/auth/login',
+            data=json.dumps({"email": "nobody@example.com", "password": "Wrong123!"}),
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("error", json.loads(response.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,8 @@ import unittest
 import json
 from application import create_app
 from application.extensions import db
-from application.models import Customer, Mechanic
+from application.models import Customer, Mechanic, Vehicle, ServiceTicket, TicketMechanic
+from tests.query_budget import query_budget
 
 
 class TestMechanicRoutes(unittest.TestCase):
@@ -184,6 +185,42 @@ class TestMechanicRoutes(unittest.TestCase):
         
         self.assertEqual(response.status_code, 401)
     
+    def test_get_mechanics_keyset_pagination_with_fields(self):
+        """Test paging through mechanics with a sparse fieldset"""
+        for i in range(3):
+            self.client.post(
+                '/mechanics',
+                data=json.dumps({
+                    "first_name": "Page",
+                    "last_name": f"Tester{i}",
+                    "email": f"page{i}@mechanicshop.com",
+                    "phone": "555-000-1111",
+                    "salary": 50000
+                }),
+                content_type='application/json',
+                headers=self.headers
+            )
+        
+        response = self.client.get('/mechanics?limit=2&fields=mechanic_id,full_name', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertEqual(len(json_data['mechanics']), 2)
+        self.assertEqual(set(json_data['mechanics'][0].keys()), {'mechanic_id', 'full_name'})
+        self.assertTrue(json_data['pagination']['has_next'])
+        
+        cursor = json_data['pagination']['next_cursor']
+        response = self.client.get(f'/mechanics?limit=2&cursor={cursor}&fields=mechanic_id,full_name', headers=self.headers)
+        json_data = json.loads(response.data)
+        self.assertEqual(len(json_data['mechanics']), 1)
+        self.assertFalse(json_data['pagination']['has_next'])
+    
+    def test_get_mechanics_invalid_cursor(self):
+        """Test keyset pagination with a non-numeric cursor (negative test)"""
+        response = self.client.get('/mechanics?cursor=abc', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 400)
+    
     # ===== GET MECHANICS BY ACTIVITY TESTS =====
     
     def test_get_mechanics_by_activity_success(self):
@@ -213,6 +250,33 @@ class TestMechanicRoutes(unittest.TestCase):
         if len(json_data) > 0:
             self.assertIn('ticket_count', json_data[0])
     
+    @query_budget('mechanic.get_mechanics_by_activity', constant=True)
+    def test_get_mechanics_by_activity_query_count_is_constant(self):
+        """Test ticket counts come from one query, not one per mechanic"""
+        customer = db.session.execute(db.select(Customer)).scalar_one()
+        vehicle = Vehicle(customer=customer, vin="1HGCM82633A123456", make="Honda", model="Accord",
+                          year=2020, color="Blue")
+        ticket = ServiceTicket(vehicle=vehicle, customer=customer, status="open",
+                               problem_description="Brake noise", odometer_miles=25000, priority=3)
+        db.session.add(ticket)
+        
+        def add_mechanics(count):
+            for _ in range(count):
+                number = db.session.query(Mechanic).count()
+                mechanic = Mechanic(full_name=f"Mechanic {number}", email=f"mechanic{number}@mechanicshop.com",
+                                    phone="555-111-2222", salary=50000)
+                ticket.ticket_mechanics.append(TicketMechanic(mechanic=mechanic, role="Technician", minutes_worked=30))
+            db.session.commit()
+            db.session.expire_all()
+        
+        add_mechanics(1)
+        self.client.get('/mechanics/by-activity', headers=self.headers)
+        add_mechanics(4)
+        response = self.client.get('/mechanics/by-activity', headers=self.headers)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([mechanic['ticket_count'] for mechanic in json.loads(response.data)], [1] * 5)
+    
     def test_get_mechanics_by_activity_no_auth(self):
         """Test getting mechanics by activity without auth (negative test)"""
         response = self.client.get('/mechanics/by-activity')
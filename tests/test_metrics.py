@@ -0,0 +1,115 @@
+import unittest
+import json
+from sqlalchemy import select
+from application import create_app
+from application.extensions import db
+from application.models import Customer, Part
+from application.identity import create_customer_token
+from application.metrics import timed_serialization
+from config import config, TestingConfig
+
+PARTS_KEY = ('inventory.get_parts', 'GET', '200')
+
+
+class TestRequestMetrics(unittest.TestCase):
+    """Test cases for per-endpoint request metrics and GET /metrics"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        cls.metrics = cls.app.extensions['request_metrics']
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up test database, a customer token and ten parts; start from empty totals"""
+        db.create_all()
+        customer = Customer(first_name="Test", last_name="User", email="test@example.com",
+                            phone="555-000-0000", password_hash="x")
+        db.session.add(customer)
+        db.session.add_all(Part(part_number=f"BRK-{i:03d}", name="Brake Pad Set", category="Brakes",
+                                current_cost_cents=4500, quantity_in_stock=25) for i in range(10))
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {create_customer_token(customer)}'}
+        db.session.remove()
+        self.metrics.reset()
+
+    def tearDown(self):
+        """Clean up test database"""
+        db.session.remove()
+        db.drop_all()
+
+    def _get_parts(self):
+        response = self.client.get('/inventory', headers=self.headers)
+        db.session.remove()  # The test's app context outlives the request; a real request ends its session
+        return response
+
+    def test_request_costs_recorded(self):
+        """Test latency, SQL statements and time, rows, serialization time and bytes are recorded per endpoint"""
+        response = self._get_parts()
+        self._get_parts()
+
+        totals = self.metrics.snapshot()[PARTS_KEY]
+        self.assertEqual(sum(totals.latency_counts), 2)
+        self.assertGreater(totals.latency_sum, 0)
+        self.assertGreaterEqual(totals.queries, 2)
+        self.assertEqual(sum(totals.query_counts), 2)
+        self.assertGreater(totals.sql_seconds, 0)
+        self.assertGreaterEqual(totals.rows, 20)
+        self.assertGreater(totals.serialization_seconds, 0)
+        self.assertEqual(totals.response_bytes, 2 * len(response.data))
+
+    def test_metrics_endpoint_prometheus_format(self):
+        """Test /metrics serves histograms and counters in the Prometheus text format"""
+        self._get_parts()
+
+        response = self.client.get('/metrics')
+        text = response.data.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        labels = 'endpoint="inventory.get_parts",method="GET",status="200"'
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', text)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 1', text)
+        self.assertIn(f'http_request_sql_rows_total{{{labels}}}', text)
+        self.assertIn('db_pool_checkouts_total', text)
+        for line in text.splitlines():
+            if line and not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                float(value)
+
+    def test_nothing_recorded_outside_requests(self):
+        """Test queries and dumps outside a request don't touch the totals"""
+        db.session.execute(select(Part)).scalars().all()
+        self.assertEqual(timed_serialization(sum, [1, 2]), 3)
+
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_metrics_hidden_from_other_addresses(self):
+        """Test callers outside INTERNAL_ALLOWED_IPS get a 404 (negative test)"""
+        response = self.client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_metrics_disabled(self):
+        """Test METRICS_ENABLED = False installs no hooks and hides /metrics"""
+        config['testing_no_metrics'] = type('NoMetricsTestingConfig', (TestingConfig,), {'METRICS_ENABLED': False})
+        try:
+            app = create_app('testing_no_metrics')
+        finally:
+            del config['testing_no_metrics']
+
+        self.assertNotIn('request_metrics', app.extensions)
+        self.assertEqual(app.test_client().get('/metrics').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+from application import create_app
+from application.extensions import db
+from application.models import Customer, Vehicle, Mechanic, Service, ServiceTicket, TicketMechanic, TicketLineItem
+from application.identity import create_customer_token
+from tests.query_budget import QueryLog, count_queries, check_query_budget, fingerprint, query_budget
+
+
+class TestQueryBudget(unittest.TestCase):
+    """Test cases for the query budget helpers and the ticket list's budget"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up test database with a customer, vehicle, mechanic and service"""
+        db.create_all()
+        self.customer = Customer(first_name="Test", last_name="User", email="test@example.com",
+                                 phone="555-000-0000", password_hash="x")
+        self.vehicle = Vehicle(customer=self.customer, vin="1HGCM82633A123456", make="Honda", model="Accord",
+                               year=2020, color="Blue")
+        self.mechanic = Mechanic(full_name="Mike Mechanic", email="mike@mechanicshop.com", phone="555-111-2222",
+                                 salary=50000)
+        self.service = Service(name="Oil Change", default_labor_minutes=30, base_price_cents=4999)
+        db.session.add_all([self.customer, self.vehicle, self.mechanic, self.service])
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {create_customer_token(self.customer)}'}
+
+    def tearDown(self):
+        """Clean up test database"""
+        db.session.remove()
+        db.drop_all()
+
+    def _add_tickets(self, count):
+        for _ in range(count):
+            ticket = ServiceTicket(vehicle=self.vehicle, customer=self.customer, status="open",
+                                   problem_description="Oil change", odometer_miles=25000, priority=3)
+            ticket.ticket_mechanics.append(TicketMechanic(mechanic=self.mechanic, role="Technician", minutes_worked=30))
+            ticket.ticket_line_items.append(TicketLineItem(service=self.service, line_type="labor",
+                                                           description="Oil change", quantity=1,
+                                                           unit_price_cents=4999))
+            db.session.add(ticket)
+        db.session.commit()
+
+    def _get_tickets(self):
+        db.session.expire_all()
+        response = self.client.get('/service_tickets', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    @query_budget('service_ticket.get_service_tickets', constant=True)
+    def test_ticket_list_nested_dumps_constant_queries(self):
+        """Test the ticket list loads nested mechanics and line items in a fixed number of queries"""
+        self._add_tickets(1)
+        self._get_tickets()
+        self._add_tickets(5)
+        self._get_tickets()
+
+    def _add_mechanics(self, count):
+        """Assign count new mechanics to the only ticket and start the next request from an empty session"""
+        ticket = db.session.execute(db.select(ServiceTicket)).scalar_one()
+        for i in range(count):
+            mechanic = Mechanic(full_name=f"Mechanic {i}", email=f"mechanic{i}@mechanicshop.com",
+                                phone=f"555-222-{i:04d}", salary=50000)
+            ticket.ticket_mechanics.append(TicketMechanic(mechanic=mechanic, role="Helper", minutes_worked=15))
+        db.session.commit()
+        ticket_id = ticket.ticket_id
+        # Requests share the test's session here: expired rows left in it would be refreshed one by one
+        db.session.expunge_all()
+        return ticket_id
+
+    @query_budget('service_ticket.get_service_ticket', constant=True)
+    def test_ticket_nested_dump_constant_queries(self):
+        """Test one ticket loads its mechanics and line items in a fixed number of queries"""
+        self._add_tickets(1)
+        for count in (0, 5):
+            ticket_id = self._add_mechanics(count)
+            response = self.client.get(f'/service_tickets/{ticket_id}', headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['ticket_mechanics']), 6)
+
+    @query_budget('service_ticket.update_service_ticket', constant=True)
+    def test_ticket_update_constant_queries(self):
+        """Test updating a ticket dumps its mechanics and line items in a fixed number of queries"""
+        self._add_tickets(1)
+        update = {"vehicle_id": self.vehicle.vehicle_id, "customer_id": self.customer.customer_id, "status": "open",
+                  "problem_description": "Oil change", "odometer_miles": 25000, "priority": 2}
+        for count in (0, 5):
+            ticket_id = self._add_mechanics(count)
+            response = self.client.put(f'/service_tickets/{ticket_id}', headers=self.headers, json=update)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['ticket_mechanics']), 6)
+
+    def test_fingerprint_normalizes_literals_and_in_lists(self):
+        """Test statements differing only in values share a fingerprint"""
+        self.assertEqual(
+            fingerprint("SELECT * FROM parts\n  WHERE parts.part_id IN (?, ?, ?) AND name = 'Brake' LIMIT 10"),
+            "SELECT * FROM parts WHERE parts.part_id IN (...) AND name = ? LIMIT ?"
+        )
+        self.assertEqual(fingerprint("SELECT * FROM parts WHERE part_id = %(part_id_1)s"),
+                         fingerprint("SELECT * FROM parts WHERE part_id = %s"))
+
+    def test_count_queries_groups_statements_by_request(self):
+        """Test statements are recorded per request and endpoint, setup queries outside any request"""
+        with count_queries() as queries:
+            db.session.get(Customer, self.customer.customer_id, populate_existing=True)
+            self._get_tickets()
+            self._get_tickets()
+
+        self.assertGreater(len(queries), 1)
+        self.assertEqual([endpoint for endpoint, _ in queries.requests], ['service_ticket.get_service_tickets'] * 2)
+        self.assertEqual(len(queries), 1 + sum(len(statements) for _, statements in queries.requests))
+
+    def test_budget_failure_lists_fingerprints(self):
+        """Test a request over its budget fails with the statements it ran (negative test)"""
+        self._add_tickets(1)
+
+        over_budget = query_budget('service_ticket.get_service_tickets', maximum=1)(lambda: self._get_tickets())
+
+        with self.assertRaises(AssertionError) as raised:
+            over_budget()
+        message = str(raised.exception)
+        self.assertIn('budget is at most 1', message)
+        self.assertIn('FROM ticket_line_items WHERE ticket_line_items.ticket_id IN (...)', message)
+
+    def test_constant_budget_reports_growing_statements(self):
+        """Test a per-row query is reported with its count at both data sizes (negative test)"""
+        log = QueryLog()
+        per_row = "SELECT mechanics.full_name FROM mechanics WHERE mechanics.mechanic_id = ?"
+        log.requests = [('mechanic.get_mechanics_by_activity', ["SELECT * FROM mechanics", per_row]),
+                        ('mechanic.get_mechanics_by_activity', ["SELECT * FROM mechanics"] + [per_row] * 4)]
+
+        with self.assertRaises(AssertionError) as raised:
+            check_query_budget(log, 'mechanic.get_mechanics_by_activity', constant=True)
+        self.assertIn(f'  1 -> 4   {per_row}', str(raised.exception))
+
+    def test_budget_needs_a_request_to_the_endpoint(self):
+        """Test a budget on an endpoint the test never requested fails instead of passing silently"""
+        with self.assertRaises(AssertionError):
+            check_query_budget(QueryLog(), 'inventory.get_parts', maximum=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import unittest
+import json
+from sqlalchemy import event
+from application import create_app
+from application.extensions import db, cache
+from application.models import (
+    Service, ServicePackage, ServicePackageItem, ServicePrerequisite, Vehicle, ServiceTicket, TicketLineItem
+)
+from application.quotes import build_package_quote, PackageNotFound
+from application.blueprints.catalog.snapshot import get_catalog_snapshot
+
+
+class TestPackageQuotes(unittest.TestCase):
+    """Test cases for adding service packages to tickets"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up a customer with a ticket, four services and a package with one optional item"""
+        db.drop_all()
+        db.create_all()
+        cache.clear()
+
+        response = self.client.post(
+            '/auth/register',
+            data=json.dumps({
+                "first_name": "Test",
+                "last_name": "User",
+                "email": "test@example.com",
+                "password": "TestPass123!",
+                "phone": "555-000-0000"
+            }),
+            content_type='application/json'
+        )
+        data = json.loads(response.data)
+        self.headers = {'Authorization': f"Bearer {data['access_token']}"}
+        customer_id = data['customer']['customer_id']
+
+        self.vehicle = Vehicle(customer_id=customer_id, vin="1HGCM82633A123456", make="Honda",
+                               model="Accord", year=2020, color="Blue")
+        db.session.add(self.vehicle)
+        db.session.flush()
+        self.ticket = ServiceTicket(vehicle_id=self.vehicle.vehicle_id, customer_id=customer_id, status='open',
+                                    problem_description="30k service", odometer_miles=30000, priority=3)
+
+        self.oil = Service(name="Oil Change", default_labor_minutes=30, base_price_cents=4999)
+        self.rotation = Service(name="Tire Rotation", default_labor_minutes=45, base_price_cents=2500)
+        self.wipers = Service(name="Wiper Blades", default_labor_minutes=10, base_price_cents=1999)
+        self.inspection = Service(name="Lift Inspection", default_labor_minutes=15, base_price_cents=1500)
+        db.session.add_all([self.ticket, self.oil, self.rotation, self.wipers, self.inspection])
+        db.session.flush()
+
+        self.package = ServicePackage(name="Basic Maintenance", package_discount_percentage=10, is_active=True)
+        db.session.add(self.package)
+        db.session.flush()
+        db.session.add_all([
+            ServicePackageItem(package_id=self.package.package_id, service_id=self.oil.service_id,
+                               quantity=1, discount_percentage=0, sequence_order=1),
+            ServicePackageItem(package_id=self.package.package_id, service_id=self.rotation.service_id,
+                               quantity=2, discount_percentage=20, sequence_order=2),
+            ServicePackageItem(package_id=self.package.package_id, service_id=self.wipers.service_id,
+                               quantity=1, is_optional=True, discount_percentage=0, sequence_order=3),
+            # Rotation needs the car on the lift first; oil change is already in the package
+            ServicePrerequisite(service_id=self.rotation.service_id, prerequisite_service_id=self.inspection.service_id),
+            ServicePrerequisite(service_id=self.rotation.service_id, prerequisite_service_id=self.oil.service_id)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test database"""
+        db.session.remove()
+        db.drop_all()
+
+    def _count_statements(self, func):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            result = func()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return result, statements
+
+    def _add_package(self, body=None, package_id=None):
+        return self.client.post(
+            f'/service_tickets/{self.ticket.ticket_id}/packages/{package_id or self.package.package_id}',
+            data=json.dumps(body or {}),
+            content_type='application/json',
+            headers=self.headers
+        )
+
+    def test_quote_prices_lines_and_adds_prerequisites(self):
+        """Test lines follow sequence_order with missing prerequisites first, discounts applied per unit"""
+        quote = build_package_quote(self.package.package_id)
+
+        self.assertEqual([(line['service_id'], line['line_type']) for line in quote['lines']], [
+            (self.oil.service_id, 'package'),
+            (self.inspection.service_id, 'prerequisite'),
+            (self.rotation.service_id, 'package')
+        ])
+        # Oil: 4999 less 10%; rotation: 2500 less 20% less 10%; inspection at base price
+        self.assertEqual([line['unit_price_cents'] for line in quote['lines']], [4499, 1500, 1800])
+        self.assertEqual(quote['total_cents'], 4499 + 1500 + 2 * 1800)
+        self.assertEqual(quote['labor_minutes'], 30 + 15 + 2 * 45)
+        self.assertEqual(quote['lines'][1]['description'], "Lift Inspection (prerequisite of Tire Rotation)")
+
+    def test_quote_optional_items_without_prerequisites(self):
+        """Test chosen optional items are included and prerequisites can be left out"""
+        quote = build_package_quote(self.package.package_id, [self.wipers.service_id], include_prerequisites=False)
+
+        self.assertEqual([line['service_id'] for line in quote['lines']],
+                         [self.oil.service_id, self.rotation.service_id, self.wipers.service_id])
+
+    def test_quote_total_matches_catalog_price(self):
+        """Test package lines add up to the catalog's final price when per-unit rounding wouldn't"""
+        fluid = Service(name="Brake Fluid", default_labor_minutes=20, base_price_cents=1005)
+        pads = Service(name="Brake Pads", default_labor_minutes=40, base_price_cents=1005)
+        db.session.add_all([fluid, pads])
+        db.session.flush()
+        package = ServicePackage(name="Brake Service", package_discount_percentage=10, is_active=True)
+        db.session.add(package)
+        db.session.flush()
+        db.session.add_all([
+            ServicePackageItem(package_id=package.package_id, service_id=fluid.service_id,
+                               quantity=1, discount_percentage=0, sequence_order=1),
+            ServicePackageItem(package_id=package.package_id, service_id=pads.service_id,
+                               quantity=2, discount_percentage=0, sequence_order=2)
+        ])
+        db.session.commit()
+
+        quote = build_package_quote(package.package_id)
+
+        # 3015 less 10% is 2713.5: the catalog says 2714, three units rounded on their own 2715
+        self.assertEqual(get_catalog_snapshot().packages_by_id[package.package_id]['final_price_cents'], 2714)
+        self.assertEqual(quote['total_cents'], 2714)
+        self.assertEqual([(line['service_id'], line['quantity'], line['unit_price_cents']) for line in quote['lines']],
+                         [(fluid.service_id, 1, 905), (pads.service_id, 1, 904), (pads.service_id, 1, 905)])
+
+    def test_quote_unknown_package(self):
+        """Test quoting a package that doesn't exist raises PackageNotFound (negative test)"""
+        with self.assertRaises(PackageNotFound):
+            build_package_quote(999)
+
+    def test_add_package_inserts_lines_in_one_statement(self):
+        """Test adding a package writes every line item with a single INSERT"""
+        build_package_quote(self.package.package_id)
+
+        response, statements = self._count_statements(lambda: self._add_package())
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.data)['labor_minutes'], 135)
+        inserts = [statement for statement in statements if statement.startswith('INSERT INTO ticket_line_items')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(db.session.query(TicketLineItem).count(), 3)
+
+        response = self.client.get(f'/service_tickets/{self.ticket.ticket_id}/line-items', headers=self.headers)
+        self.assertEqual([item['unit_price_cents'] for item in json.loads(response.data)], [4499, 1500, 1800])
+
+    def test_add_package_invalidates_vehicle_history(self):
+        """Test the bulk insert still refreshes the cached vehicle history"""
+        self.client.get(f'/vehicles/{self.vehicle.vin}/history', headers=self.headers)
+
+        self._add_package()
+        response = self.client.get(f'/vehicles/{self.vehicle.vin}/history', headers=self.headers)
+
+        visit = json.loads(response.data)['visits'][0]
+        self.assertEqual(len(visit['line_items']), 3)
+
+    def test_add_package_dry_run(self):
+        """Test a dry run returns the quote without adding line items"""
+        response = self._add_package({"dry_run": True})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.data)['lines']), 3)
+        self.assertEqual(db.session.query(TicketLineItem).count(), 0)
+
+    def test_add_package_unknown_optional_item(self):
+        """Test choosing a service that isn't an optional item of the package (negative test)"""
+        response = self._add_package({"optional_service_ids": [self.oil.service_id]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data)['service_ids'], [self.oil.service_id])
+
+    def test_add_package_not_found(self):
+        """Test adding a package that doesn't exist (negative test)"""
+        response = self._add_package(package_id=999)
+
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
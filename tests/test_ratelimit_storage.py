@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+import unittest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import (
+    FixedWindowRateLimiter, MovingWindowRateLimiter, SlidingWindowCounterRateLimiter
+)
+from application import create_app
+from application.extensions import limiter
+from application.ratelimit_storage import SQLiteStorage
+
+
+class TestSQLiteRateLimitStorage(unittest.TestCase):
+    """Test cases for the shared sqlite:// rate limit storage"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.uri = 'sqlite:///' + os.path.join(self.tmp.name, 'limits', 'ratelimit.db')
+        # Two storage instances on one file stand in for two gunicorn workers
+        self.worker_a = storage_from_string(self.uri)
+        self.worker_b = storage_from_string(self.uri)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def _assert_shared_limit(self, strategy):
+        limit = parse('5/minute')
+        first, second = strategy(self.worker_a), strategy(self.worker_b)
+        
+        allowed = [worker.hit(limit, 'login', '127.0.0.1') for worker in [first, second] * 4]
+        
+        self.assertEqual(allowed.count(True), 5)
+        self.assertFalse(first.hit(limit, 'login', '127.0.0.1'))
+        self.assertTrue(first.hit(limit, 'login', '10.0.0.1'))
+    
+    def test_scheme_registered(self):
+        """Test sqlite:// URIs resolve to the SQLite storage"""
+        self.assertIsInstance(self.worker_a, SQLiteStorage)
+        self.assertTrue(self.worker_a.check())
+    
+    def test_fixed_window_shared_between_workers(self):
+        """Test a fixed window limit holds across storage instances"""
+        self._assert_shared_limit(FixedWindowRateLimiter)
+    
+    def test_moving_window_shared_between_workers(self):
+        """Test a moving window limit holds across storage instances"""
+        self._assert_shared_limit(MovingWindowRateLimiter)
+    
+    def test_sliding_window_counter_shared_between_workers(self):
+        """Test a sliding window counter limit holds across storage instances"""
+        self._assert_shared_limit(SlidingWindowCounterRateLimiter)
+    
+    def test_counter_expires(self):
+        """Test an expired counter starts again from zero"""
+        self.assertEqual(self.worker_a.incr('key', 1), 1)
+        self.assertEqual(self.worker_b.incr('key', 1), 2)
+        time.sleep(1.1)
+        
+        self.assertEqual(self.worker_a.get('key'), 0)
+        self.assertEqual(self.worker_b.incr('key', 1), 1)
+    
+    def test_window_stats_and_reset(self):
+        """Test window stats report the remaining hits and reset clears them"""
+        limit = parse('3/minute')
+        strategy = MovingWindowRateLimiter(self.worker_a)
+        strategy.hit(limit, 'me')
+        
+        self.assertEqual(MovingWindowRateLimiter(self.worker_b).get_window_stats(limit, 'me').remaining, 2)
+        self.worker_b.reset()
+        self.assertEqual(strategy.get_window_stats(limit, 'me').remaining, 3)
+    
+    def test_app_uses_configured_storage(self):
+        """Test RATELIMIT_STORAGE_URI and RATELIMIT_STRATEGY reach Flask-Limiter"""
+        class SharedStorageConfig:
+            RATELIMIT_STORAGE_URI = self.uri
+            RATELIMIT_STRATEGY = 'moving-window'
+        app = create_app('testing')
+        app.config.from_object(SharedStorageConfig)
+        app.config['RATELIMIT_ENABLED'] = True
+        limiter.init_app(app)
+        
+        with app.app_context():
+            self.assertIsInstance(limiter.storage, SQLiteStorage)
+            self.assertIsInstance(limiter.limiter, MovingWindowRateLimiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
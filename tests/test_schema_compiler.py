@@ -0,0 +1,249 @@
+import unittest
+import json
+from datetime import datetime
+from decimal import Decimal
+from marshmallow import ValidationError
+from application import create_app
+from application.extensions import db
+from application.models import (
+    Customer, Vehicle, Mechanic, Part, Service, ServiceTicket, TicketLineItem, TicketMechanic
+)
+from application.schema_compiler import CompiledSchema, compile_schema, compiled
+from application.pagination import sparse_schema
+from application.blueprints.customer.customerSchemas import customer_schema, customers_schema
+from application.blueprints.inventory.inventorySchemas import part_schema, parts_schema
+from application.blueprints.mechanic.mechanicSchemas import mechanic_schema, mechanics_schema
+from application.blueprints.service_ticket.serviceTicketSchemas import service_ticket_schema, service_tickets_schema
+
+
+class TestSchemaCompiler(unittest.TestCase):
+    """Parity tests: compiled schemas must dump and load exactly like marshmallow"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up customers, parts, mechanics and a ticket with line items and a mechanic"""
+        db.drop_all()
+        db.create_all()
+
+        self.customers = [
+            Customer(first_name="Ada", last_name="Lovelace", email="ada@example.com", phone="555-000-0001",
+                     address="12 Analytical Way", city="London", password_hash="x"),
+            Customer(first_name="Grace", last_name="Hopper", email="grace@example.com", phone="555-000-0002",
+                     password_hash="x")
+        ]
+        self.parts = [
+            Part(part_number="BRK-001", name="Brake Pad Set", category="Brakes", current_cost_cents=4500,
+                 quantity_in_stock=2, reorder_level=5),
+            Part(part_number="FLT-001", name="Oil Filter", description="Spin-on", category="Filters",
+                 current_cost_cents=899, quantity_in_stock=40, reorder_level=10, supplier="Acme")
+        ]
+        self.mechanic = Mechanic(full_name="Sam Wrench", email="sam@example.com", phone="555-100-0000",
+                                 salary=60000, is_active=True)
+        service = Service(name="Diagnostics", default_labor_minutes=60, base_price_cents=9999)
+        db.session.add_all(self.customers + self.parts + [self.mechanic, service])
+        db.session.flush()
+
+        vehicle = Vehicle(customer_id=self.customers[0].customer_id, vin="1HGCM82633A123456", make="Honda",
+                          model="Accord", year=2020, color="Blue")
+        db.session.add(vehicle)
+        db.session.flush()
+        self.tickets = [
+            ServiceTicket(vehicle_id=vehicle.vehicle_id, customer_id=vehicle.customer_id, status='completed',
+                          problem_description="Grinding brakes", odometer_miles=42000, priority=2,
+                          closed_at=datetime(2024, 5, 2, 16, 45, 0, 120)),
+            ServiceTicket(vehicle_id=vehicle.vehicle_id, customer_id=vehicle.customer_id, status='open',
+                          problem_description="Check engine light", odometer_miles=43000, priority=4)
+        ]
+        self.tickets[0].ticket_line_items = [
+            TicketLineItem(service_id=service.service_id, line_type='service', description="Diagnostics",
+                           quantity=Decimal('1.50'), unit_price_cents=9999)
+        ]
+        self.tickets[0].ticket_mechanics = [
+            TicketMechanic(mechanic_id=self.mechanic.mechanic_id, role="Technician", minutes_worked=90)
+        ]
+        db.session.add_all(self.tickets)
+        db.session.commit()
+        db.session.expunge_all()
+
+    def tearDown(self):
+        """Clean up test database and restore the compiler setting"""
+        self.app.config['SCHEMA_COMPILER_ENABLED'] = True
+        db.session.remove()
+        db.drop_all()
+
+    def _assert_dump_parity(self, schema, objects):
+        expected = schema.dump(objects)
+        self.assertEqual(compile_schema(schema).dump(objects), expected)
+        return expected
+
+    def _assert_load_parity(self, schema, data):
+        """Assert both loads return the same result, or raise the same errors"""
+        try:
+            expected = schema.load(json.loads(json.dumps(data)))
+        except ValidationError as e:
+            with self.assertRaises(ValidationError) as raised:
+                compile_schema(schema).load(data)
+            self.assertEqual(raised.exception.messages, e.messages)
+            return None
+        result = compile_schema(schema).load(data)
+        if isinstance(expected, dict):
+            self.assertEqual(result, expected)
+        else:
+            self.assertIs(type(result), type(expected))
+            self.assertEqual(
+                {key: value for key, value in vars(result).items() if not key.startswith('_')},
+                {key: value for key, value in vars(expected).items() if not key.startswith('_')}
+            )
+        return result
+
+    # ===== DUMP PARITY =====
+
+    def test_customer_dump_parity(self):
+        """Test customers dump identically, including unset optional columns"""
+        customers = db.session.query(Customer).order_by(Customer.customer_id).all()
+
+        dumped = self._assert_dump_parity(customers_schema, customers)
+
+        self.assertIsNone(dumped[1]['address'])
+        self.assertNotIn('password_hash', dumped[0])
+        self.assertEqual(compile_schema(customer_schema).dump(customers[0]), customer_schema.dump(customers[0]))
+
+    def test_part_dump_includes_needs_reorder(self):
+        """Test the needs_reorder Method field is computed like marshmallow does"""
+        parts = db.session.query(Part).order_by(Part.part_id).all()
+
+        dumped = self._assert_dump_parity(parts_schema, parts)
+
+        self.assertEqual([part['needs_reorder'] for part in dumped], [True, False])
+
+    def test_sparse_and_expired_attributes(self):
+        """Test sparse fieldsets and attributes SQLAlchemy must reload (not in the instance __dict__)"""
+        parts = db.session.query(Part).order_by(Part.part_id).all()
+        db.session.expire(parts[0])
+
+        self._assert_dump_parity(parts_schema, parts)
+        self._assert_dump_parity(sparse_schema(parts_schema, ('part_number', 'needs_reorder')), parts)
+
+    def test_nested_ticket_dump_parity(self):
+        """Test tickets dump with nested line items, mechanics and ISO 8601 dates"""
+        tickets = db.session.query(ServiceTicket).order_by(ServiceTicket.ticket_id).all()
+
+        dumped = self._assert_dump_parity(service_tickets_schema, tickets)
+
+        self.assertEqual(dumped[0]['closed_at'], '2024-05-02T16:45:00.000120')
+        self.assertEqual(dumped[0]['ticket_line_items'][0]['quantity'], 1.5)
+        self.assertEqual(dumped[0]['ticket_mechanics'][0]['mechanic']['full_name'], "Sam Wrench")
+        self.assertEqual(dumped[1]['ticket_line_items'], [])
+
+    def test_plain_objects_and_dicts(self):
+        """Test objects that aren't models, and dicts (read by key), dump like marshmallow"""
+        row = {"mechanic_id": 7, "full_name": "Dana", "email": "dana@example.com", "salary": "61000",
+               "is_active": False, "ticket_count": 3}
+
+        self._assert_dump_parity(mechanics_schema, [row])
+        self._assert_dump_parity(mechanic_schema, type('Row', (), row)())
+
+    # ===== LOAD PARITY =====
+
+    def test_mechanic_load_runs_pre_load(self):
+        """Test first_name/last_name are combined by the pre_load hook, without touching the caller's data"""
+        data = {"first_name": "Sam", "last_name": "Wrench", "email": "sam2@example.com",
+                "phone": "555-100-0001", "salary": 60000}
+
+        result = self._assert_load_parity(mechanic_schema, data)
+
+        self.assertEqual(result['full_name'], "Sam Wrench")
+        self.assertTrue(result['is_active'])
+        self.assertIn('first_name', data)
+
+    def test_part_load_builds_instance(self):
+        """Test the PartSchema pre_load rename and load_instance produce the same Part"""
+        result = self._assert_load_parity(part_schema, {
+            "part_number": "BLT-001", "name": "Serpentine Belt", "category": "Belts",
+            "current_cost_cents": 2500, "quantity_in_stock": 8, "reorder_threshold": 3
+        })
+
+        self.assertIsInstance(result, Part)
+        self.assertEqual(result.reorder_level, 3)
+
+    def test_part_load_existing_row(self):
+        """Test a payload with an existing part_id updates that Part, as marshmallow-sqlalchemy does"""
+        part = db.session.query(Part).order_by(Part.part_id).first()
+
+        part_schema.session = db.session  # The lookup needs a real session, whatever the import order
+        try:
+            result = compile_schema(part_schema).load({"part_id": part.part_id, "part_number": "BRK-002",
+                                                       "name": "Brake Pad Set", "category": "Brakes",
+                                                       "current_cost_cents": 4700})
+        finally:
+            part_schema.session = None
+
+        self.assertIs(result, part)
+        self.assertEqual((part.part_number, part.current_cost_cents), ("BRK-002", 4700))
+        db.session.rollback()
+
+    def test_load_errors_match(self):
+        """Test invalid input raises marshmallow's own errors (negative test)"""
+        valid = {"vehicle_id": 1, "customer_id": 1, "status": "open", "problem_description": "Noise",
+                 "odometer_miles": 1000, "priority": 3}
+        invalid = [
+            {key: value for key, value in valid.items() if key != 'status'},
+            {**valid, "priority": 9},
+            {**valid, "status": "lost"},
+            {**valid, "odometer_miles": "1000"},
+            {**valid, "odometer_miles": "many"},
+            {**valid, "ticket_id": 5},
+            {**valid, "closed_at": None},
+            {**valid, "mileage": 1000}
+        ]
+        for data in invalid:
+            with self.subTest(data=data):
+                self._assert_load_parity(service_ticket_schema, data)
+        self._assert_load_parity(mechanic_schema, {"full_name": "Sam", "email": "not-an-email",
+                                                   "phone": "555", "salary": 1})
+        self._assert_load_parity(customer_schema, {"first_name": None, "last_name": "X"})
+        self._assert_load_parity(customer_schema, {"first_name": "A" * 256, "last_name": "X", "email": "a@example.com",
+                                                   "phone": "555"})
+        self._assert_load_parity(mechanics_schema, [{"full_name": "Sam"}, "not an object"])
+
+    # ===== SELECTION =====
+
+    def test_compiled_is_cached_and_can_be_disabled(self):
+        """Test compiled() reuses one compiled schema and returns the schema itself when disabled"""
+        self.assertIsInstance(compiled(parts_schema), CompiledSchema)
+        self.assertIs(compiled(parts_schema), compiled(parts_schema))
+
+        self.app.config['SCHEMA_COMPILER_ENABLED'] = False
+
+        self.assertIs(compiled(parts_schema), parts_schema)
+
+    def test_endpoint_output_unchanged(self):
+        """Test GET /inventory returns the same document with the compiler on and off"""
+        response = self.client.post('/auth/register', data=json.dumps({
+            "first_name": "Test", "last_name": "User", "email": "test@example.com",
+            "password": "TestPass123!", "phone": "555-000-0000"
+        }), content_type='application/json')
+        headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+
+        fast = self.client.get('/inventory', headers=headers)
+        self.app.config['SCHEMA_COMPILER_ENABLED'] = False
+        slow = self.client.get('/inventory', headers=headers)
+
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.data, slow.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,341 @@
+import unittest
+import json
+import numpy as np
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from application import create_app
+from application.extensions import db, cache
+from application.models import (
+    Vehicle, Mechanic, Service, Part, ServiceTicket,
+    TicketLineItem, TicketMechanic, TicketPart,
+    ServicePackage, ServicePackageItem, ServiceReminder
+)
+from application.reminders import refresh_service_reminders, load_last_done_odometers
+
+
+class TestVehicleRoutes(unittest.TestCase):
+    """Test cases for Vehicle routes"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test client and application context once for all tests"""
+        cls.app = create_app('testing')
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up application context"""
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Set up test database, auth token and a vehicle with service history"""
+        # Start from empty tables even if an earlier test module failed before its tearDown
+        db.drop_all()
+        db.create_all()
+        cache.clear()
+
+        # Create a test customer and get auth token
+        register_data = {
+            "first_name": "Test",
+            "last_name": "User",
+            "email": "test@example.com",
+            "password": "TestPass123!",
+            "phone": "555-000-0000"
+        }
+        response = self.client.post(
+            '/auth/register',
+            data=json.dumps(register_data),
+            content_type='application/json'
+        )
+        response_data = json.loads(response.data)
+        self.token = response_data['access_token']
+        self.customer_id = response_data['customer']['customer_id']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+        self.vin = "1HGCM82633A123456"
+        vehicle = Vehicle(customer_id=self.customer_id, vin=self.vin, make="Honda", model="Accord", year=2020, color="Blue")
+        mechanic = Mechanic(full_name="Mike Mechanic", email="mike@mechanicshop.com", phone="555-111-2222", salary=50000)
+        service = Service(name="Oil Change", default_labor_minutes=30, base_price_cents=3500)
+        part = Part(part_number="OIL-001", name="Oil Filter", category="Filters", current_cost_cents=800, quantity_in_stock=10)
+        db.session.add_all([vehicle, mechanic, service, part])
+        db.session.commit()
+        self.vehicle_id = vehicle.vehicle_id
+        self.mechanic_id = mechanic.mechanic_id
+        self.service_id = service.service_id
+        self.part_id = part.part_id
+
+    def tearDown(self):
+        """Clean up test database after each test"""
+        db.session.remove()
+        db.drop_all()
+
+    def _add_visit(self, odometer_miles, warranty_months=None, installed_date=None):
+        """Create a ticket with one line item, one mechanic and one part"""
+        ticket = ServiceTicket(
+            vehicle_id=self.vehicle_id,
+            customer_id=self.customer_id,
+            status="completed",
+            problem_description="Routine service",
+            odometer_miles=odometer_miles,
+            priority=3
+        )
+        db.session.add(ticket)
+        db.session.flush()
+        db.session.add_all([
+            TicketLineItem(ticket_id=ticket.ticket_id, service_id=self.service_id, line_type="service",
+                           description="Oil Change", quantity=1, unit_price_cents=3500),
+            TicketMechanic(ticket_id=ticket.ticket_id, mechanic_id=self.mechanic_id, role="Technician", minutes_worked=30),
+            TicketPart(ticket_id=ticket.ticket_id, part_id=self.part_id, quantity_used=1, unit_cost_cents=800,
+                       markup_percentage=30.0, warranty_months=warranty_months,
+                       installed_date=installed_date or datetime.utcnow(), installed_by_mechanic_id=self.mechanic_id)
+        ])
+        db.session.commit()
+        return ticket.ticket_id
+
+    # ===== SERVICE HISTORY TESTS =====
+
+    def test_get_history_success(self):
+        """Test history includes line items, mechanics and parts with warranty status"""
+        old_ticket = self._add_visit(20000, warranty_months=3, installed_date=datetime.utcnow() - timedelta(days=365))
+        new_ticket = self._add_visit(25000, warranty_months=12)
+
+        response = self.client.get(f'/vehicles/{self.vin}/history', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data['vehicle']['vehicle_id'], self.vehicle_id)
+        self.assertEqual([visit['ticket_id'] for visit in json_data['visits']], [new_ticket, old_ticket])
+
+        latest = json_data['visits'][0]
+        self.assertEqual(latest['line_items'][0]['description'], "Oil Change")
+        self.assertEqual(latest['mechanics'][0]['full_name'], "Mike Mechanic")
+        self.assertEqual(latest['parts'][0]['part_number'], "OIL-001")
+        self.assertEqual(latest['parts'][0]['installed_by']['mechanic_id'], self.mechanic_id)
+        self.assertTrue(latest['parts'][0]['under_warranty'])
+        self.assertFalse(json_data['visits'][1]['parts'][0]['under_warranty'])
+
+    def test_get_history_pagination(self):
+        """Test paging through visits with limit and cursor"""
+        ticket_ids = [self._add_visit(10000 + i * 5000) for i in range(3)]
+
+        response = self.client.get(f'/vehicles/{self.vin}/history?limit=2', headers=self.headers)
+        first_page = json.loads(response.data)
+        self.assertEqual([visit['ticket_id'] for visit in first_page['visits']], ticket_ids[:0:-1])
+        self.assertTrue(first_page['pagination']['has_next'])
+
+        cursor = first_page['pagination']['next_cursor']
+        response = self.client.get(f'/vehicles/{self.vin}/history?limit=2&cursor={cursor}', headers=self.headers)
+        second_page = json.loads(response.data)
+        self.assertEqual([visit['ticket_id'] for visit in second_page['visits']], [ticket_ids[0]])
+        self.assertFalse(second_page['pagination']['has_next'])
+
+    def test_get_history_query_count_is_bounded(self):
+        """Test the number of queries does not grow with the number of visits"""
+        def count_queries():
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                cache.clear()
+                db.session.expire_all()
+                self.client.get(f'/vehicles/{self.vin}/history?limit=50', headers=self.headers)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+            return len(statements)
+
+        self._add_visit(10000)
+        few = count_queries()
+        for i in range(5):
+            self._add_visit(20000 + i)
+        many = count_queries()
+
+        self.assertEqual(few, many)
+
+    def test_get_history_invalidated_on_ticket_change(self):
+        """Test the cached history is refreshed when the vehicle's tickets change"""
+        self._add_visit(10000)
+        response = self.client.get(f'/vehicles/{self.vin}/history', headers=self.headers)
+        self.assertEqual(len(json.loads(response.data)['visits']), 1)
+
+        # New ticket invalidates the cached page
+        self._add_visit(15000)
+        response = self.client.get(f'/vehicles/{self.vin}/history', headers=self.headers)
+        visits = json.loads(response.data)['visits']
+        self.assertEqual(len(visits), 2)
+
+        # So does a change to a child row of an existing ticket
+        ticket_mechanic = db.session.get(TicketMechanic, (visits[0]['ticket_id'], self.mechanic_id))
+        ticket_mechanic.minutes_worked = 90
+        db.session.commit()
+        response = self.client.get(f'/vehicles/{self.vin}/history', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['visits'][0]['mechanics'][0]['minutes_worked'], 90)
+
+    # ===== VIN DECODING TESTS =====
+
+    def test_vehicle_stores_decoded_vin(self):
+        """Test decoded VIN attributes are stored when a vehicle is created"""
+        vehicle = db.session.get(Vehicle, self.vehicle_id)
+
+        self.assertEqual(vehicle.vin_wmi, "1HG")
+        self.assertEqual(vehicle.vin_manufacturer, "Honda")
+        self.assertEqual(vehicle.vin_model_year, 2003)
+        self.assertFalse(vehicle.vin_check_digit_valid)
+
+    def test_backfill_decodes_existing_vehicles(self):
+        """Test the backfill command fills decoded columns for old rows"""
+        db.session.execute(db.update(Vehicle).values(vin_wmi=None, vin_manufacturer=None, vin_check_digit_valid=None))
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['vin', 'backfill', '--batch-size', '1'])
+
+        self.assertIn('Decoded 1 vehicle VINs', result.output)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Vehicle, self.vehicle_id).vin_manufacturer, "Honda")
+
+    def test_create_vehicle_rejects_bad_check_digit_when_enforced(self):
+        """Test VIN_REQUIRE_VALID_CHECK_DIGIT rejects VINs with a wrong check digit (negative test)"""
+        self.app.config['VIN_REQUIRE_VALID_CHECK_DIGIT'] = True
+        try:
+            response = self.client.post(
+                f'/customers/{self.customer_id}/vehicles',
+                data=json.dumps({"vin": "1HGCM82633A654321", "make": "Honda", "model": "Accord", "year": 2003, "color": "Red"}),
+                content_type='application/json',
+                headers=self.headers
+            )
+        finally:
+            self.app.config['VIN_REQUIRE_VALID_CHECK_DIGIT'] = False
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_decode_vin_endpoint(self):
+        """Test the offline decode endpoint"""
+        response = self.client.get('/vehicles/decode/1HGCM82633A004352', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertEqual(json_data['manufacturer'], "Honda")
+        self.assertTrue(json_data['check_digit_valid'])
+
+    def test_decode_vin_endpoint_malformed(self):
+        """Test decoding a malformed VIN (negative test)"""
+        response = self.client.get('/vehicles/decode/SHORT', headers=self.headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    # ===== SERVICE REMINDER TESTS =====
+
+    def _add_reading(self, odometer_miles, days_ago, service_id=None, vehicle_id=None):
+        """Create a completed ticket recording an odometer reading (optionally performing a service)"""
+        ticket = ServiceTicket(
+            vehicle_id=vehicle_id or self.vehicle_id,
+            customer_id=self.customer_id,
+            status="completed",
+            problem_description="Inspection",
+            odometer_miles=odometer_miles,
+            priority=3,
+            opened_at=datetime.utcnow() - timedelta(days=days_ago)
+        )
+        db.session.add(ticket)
+        db.session.flush()
+        if service_id:
+            db.session.add(TicketLineItem(ticket_id=ticket.ticket_id, service_id=service_id, line_type="service",
+                                          description="Package service", quantity=1, unit_price_cents=3500))
+        db.session.commit()
+
+    def _add_package(self, name, interval):
+        """Create an active package containing the oil change service"""
+        package = ServicePackage(name=name, recommended_mileage_interval=interval, is_active=True)
+        db.session.add(package)
+        db.session.flush()
+        db.session.add(ServicePackageItem(package_id=package.package_id, service_id=self.service_id, sequence_order=1))
+        db.session.commit()
+        return package.package_id
+
+    def test_refresh_reminders_projects_due_packages(self):
+        """Test the engine projects mileage from the accrual rate and stores only packages due soon"""
+        due_package = self._add_package("30k Service", 30000)
+        self._add_package("60k Service", 60000)
+        self._add_reading(20000, days_ago=200)
+        self._add_reading(29000, days_ago=10)
+
+        stored = refresh_service_reminders(horizon_days=30)
+
+        self.assertEqual(stored, 1)
+        reminder = db.session.execute(db.select(ServiceReminder)).scalar_one()
+        self.assertEqual(reminder.package_id, due_package)
+        self.assertEqual(reminder.due_odometer_miles, 30000)
+        self.assertAlmostEqual(reminder.miles_per_day, 9000 / 190, places=1)
+        self.assertEqual(reminder.projected_odometer_miles, 29474)
+        self.assertEqual(reminder.due_date, (datetime.utcnow() + timedelta(days=11)).date())
+
+    def test_refresh_reminders_uses_last_performed_odometer(self):
+        """Test a package performed recently is next due one interval later"""
+        self._add_package("30k Service", 30000)
+        self._add_reading(20000, days_ago=200)
+        self._add_reading(29000, days_ago=10, service_id=self.service_id)
+
+        self.assertEqual(refresh_service_reminders(horizon_days=30), 0)
+
+    def test_last_done_ignores_vehicles_missing_from_history(self):
+        """Test a package done on a vehicle the history doesn't have isn't credited to another vehicle"""
+        package_id = self._add_package("30k Service", 30000)
+        self._add_reading(20000, days_ago=200)
+        other = Vehicle(customer_id=self.customer_id, vin="1HGCM82633A654321", make="Honda", model="Civic",
+                        year=2019, color="Red")
+        db.session.add(other)
+        db.session.commit()
+        self._add_reading(29500, days_ago=5, service_id=self.service_id, vehicle_id=other.vehicle_id)
+
+        # As if the other vehicle's ticket was committed after the history was read
+        last_done = load_last_done_odometers(np.array([self.vehicle_id]), np.array([package_id]))
+
+        self.assertTrue(np.isnan(last_done).all())
+
+    def test_refresh_reminders_default_rate_for_short_history(self):
+        """Test vehicles with a single visit use the default accrual rate"""
+        self._add_package("30k Service", 30000)
+        self._add_reading(29900, days_ago=0)
+
+        refresh_service_reminders(horizon_days=30, default_miles_per_day=40)
+
+        reminder = db.session.execute(db.select(ServiceReminder)).scalar_one()
+        self.assertEqual(reminder.miles_per_day, 40)
+
+    def test_get_vehicles_due_for_service(self):
+        """Test paging through the due list"""
+        package_id = self._add_package("30k Service", 30000)
+        self._add_reading(29900, days_ago=0)
+        refresh_service_reminders()
+
+        response = self.client.get(f'/vehicles/due-for-service?limit=10&package_id={package_id}', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        json_data = json.loads(response.data)
+        self.assertEqual(len(json_data['reminders']), 1)
+        self.assertEqual(json_data['reminders'][0]['vehicle']['vin'], self.vin)
+        self.assertEqual(json_data['reminders'][0]['package_name'], "30k Service")
+        self.assertFalse(json_data['pagination']['has_next'])
+
+    def test_get_vehicles_due_for_service_invalid_package(self):
+        """Test the due list rejects a non-numeric package_id (negative test)"""
+        response = self.client.get('/vehicles/due-for-service?package_id=abc', headers=self.headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_history_not_found(self):
+        """Test history for an unknown VIN (negative test)"""
+        response = self.client.get('/vehicles/UNKNOWNVIN/history', headers=self.headers)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_history_no_auth(self):
+        """Test history without authentication (negative test)"""
+        response = self.client.get(f'/vehicles/{self.vin}/history')
+
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from application.vin_decoder import (
+    decode_vin, is_check_digit_valid, compute_check_digit, vin_columns, VinDecodeError
+)
+
+
+class TestVinDecoder(unittest.TestCase):
+    """Test cases for the offline VIN decoder"""
+    
+    def test_decode_known_vin(self):
+        """Test decoding manufacturer, region, model year and plant"""
+        decoded = decode_vin("1HGCM82633A004352")
+        
+        self.assertEqual(decoded.wmi, "1HG")
+        self.assertEqual(decoded.manufacturer, "Honda")
+        self.assertEqual(decoded.region, "United States")
+        self.assertEqual(decoded.model_year, 2003)
+        self.assertEqual(decoded.plant_code, "A")
+        self.assertEqual(decoded.plant, "Marysville, OH")
+        self.assertTrue(decoded.check_digit_valid)
+    
+    def test_decode_normalizes_case_and_whitespace(self):
+        """Test lower-case input with surrounding whitespace decodes the same"""
+        self.assertEqual(decode_vin("  1hgcm82633a004352 ").vin, "1HGCM82633A004352")
+    
+    def test_model_year_cycle_uses_position_seven(self):
+        """Test a letter in position 7 moves the model year into the 2010+ cycle"""
+        vin = "5YJ3E1EA" + "0" + "KF317000"
+        vin = vin[:8] + compute_check_digit(vin) + vin[9:]
+        
+        self.assertEqual(decode_vin(vin).model_year, 2019)
+        self.assertTrue(is_check_digit_valid(vin))
+    
+    def test_invalid_check_digit(self):
+        """Test a VIN with a wrong check digit is decoded but flagged (negative test)"""
+        decoded = decode_vin("1HGCM82633A123456")
+        
+        self.assertFalse(decoded.check_digit_valid)
+        self.assertEqual(decoded.manufacturer, "Honda")
+    
+    def test_unknown_wmi(self):
+        """Test a VIN from an unlisted manufacturer still decodes year and plant code"""
+        decoded = decode_vin("9ZZCM82633A004352")
+        
+        self.assertIsNone(decoded.manufacturer)
+        self.assertEqual(decoded.model_year, 2003)
+    
+    def test_malformed_vin(self):
+        """Test wrong length and forbidden letters are rejected (negative test)"""
+        with self.assertRaises(VinDecodeError):
+            decode_vin("1HGCM826")
+        with self.assertRaises(VinDecodeError):
+            decode_vin("1HGCM82633AO04352")
+    
+    def test_vin_columns_for_malformed_vin(self):
+        """Test malformed VINs map to empty decoded columns instead of failing"""
+        columns = vin_columns("OLD-CHASSIS-123")
+        
+        self.assertIsNone(columns['vin_manufacturer'])
+        self.assertFalse(columns['vin_check_digit_valid'])
+
+
+if __name__ == '__main__':
+    unittest.main()